@@ -0,0 +1,379 @@
+"""
+Length-Bucketed Batch Scheduler
+Raggruppa le news per lunghezza in token per ridurre il padding nei batch;
+la dimensione dei batch può adattarsi a un budget di token o a una
+latenza obiettivo, con backoff in caso di memoria esaurita
+"""
+
+from collections import Counter
+
+import numpy as np
+
+
+class LengthBucketScheduler:
+    """
+    Costruisce batch con padding minimo a partire dalle lunghezze in token
+
+    Le news vengono divise in bucket secondo `bucket_boundaries` e, dentro
+    ogni bucket, ordinate per lunghezza: ogni batch contiene così sequenze
+    di lunghezza simile e il padding fino alla più lunga è minimo.
+    I batch sono array di indici nel dataset originale, quindi i risultati
+    possono essere riportati nell'ordine del DataFrame.
+    """
+
+    def __init__(self, batch_size=32, bucket_boundaries=None, sort_by_length=True,
+                 max_tokens=None):
+        """
+        Inizializza lo scheduler
+
+        Args:
+            batch_size (int): Numero massimo di news per batch
+            bucket_boundaries (list, optional): Limiti superiori (in token)
+                dei bucket, es. [16, 32, 64]; i batch non attraversano mai
+                il confine tra due bucket
+            sort_by_length (bool): Ordina per lunghezza dentro ogni bucket;
+                se False e senza bucket, mantiene l'ordine originale
+            max_tokens (int, optional): Budget di token con padding per
+                batch (news x lunghezza della più lunga): batch grandi per
+                le news corte, piccoli per quelle lunghe
+        """
+        if batch_size < 1:
+            raise ValueError(f"batch_size deve essere >= 1 (ricevuto {batch_size})")
+        if max_tokens is not None and max_tokens < 1:
+            raise ValueError(f"max_tokens deve essere >= 1 (ricevuto {max_tokens})")
+        self.batch_size = batch_size
+        self.bucket_boundaries = sorted(bucket_boundaries) if bucket_boundaries else []
+        self.sort_by_length = sort_by_length
+        self.max_tokens = max_tokens
+
+    def assign_buckets(self, lengths):
+        """
+        Ritorna l'indice del bucket di ogni news
+        """
+        return np.searchsorted(self.bucket_boundaries, lengths, side='left')
+
+    def schedule(self, lengths):
+        """
+        Crea i batch
+
+        Args:
+            lengths (array-like): Lunghezza in token di ogni news
+
+        Returns:
+            list: Array di indici (posizioni nel dataset), uno per batch
+        """
+        return list(self.iter_batches(lengths))
+
+    def iter_batches(self, lengths, sizer=None):
+        """
+        Generatore di batch; con `sizer` la dimensione è decisa batch per batch
+
+        Prima di ogni batch vengono letti il numero massimo di news e il
+        budget di token correnti del sizer, quindi un budget ridotto
+        (latenza sopra l'obiettivo, memoria esaurita) vale già dal batch
+        successivo.
+
+        Args:
+            lengths (array-like): Lunghezza in token di ogni news
+            sizer (AdaptiveBatchSizer, optional): Dimensionamento dinamico
+                (default: `batch_size` e `max_tokens` fissi)
+
+        Yields:
+            np.ndarray: Indici (posizioni nel dataset) del batch
+        """
+        lengths = np.asarray(lengths)
+        for group in self._groups(lengths):
+            start = 0
+            while start < len(group):
+                if sizer is not None:
+                    cap, budget = sizer.max_batch_size, sizer.token_budget()
+                else:
+                    cap, budget = self.batch_size, self.max_tokens
+                candidate = group[start:start + cap]
+                size = _fit_token_budget(lengths[candidate], budget)
+                yield candidate[:size]
+                start += size
+
+    def _groups(self, lengths):
+        """
+        Indici ordinati per (bucket, lunghezza), spezzati dove cambia bucket
+        """
+        if len(lengths) == 0:
+            return []
+
+        buckets = self.assign_buckets(lengths)
+        if self.sort_by_length:
+            # Ordina per (bucket, lunghezza); stabile per news di pari lunghezza
+            order = np.lexsort((lengths, buckets))
+        else:
+            order = np.argsort(buckets, kind='stable')
+
+        sorted_buckets = buckets[order]
+        cuts = np.flatnonzero(np.diff(sorted_buckets)) + 1
+        return np.split(order, cuts)
+
+    def padding_stats(self, lengths, batches):
+        """
+        Calcola l'efficienza del padding dei batch
+
+        Args:
+            lengths (array-like): Lunghezza in token di ogni news
+            batches (list): Batch prodotti da `schedule`
+
+        Returns:
+            dict: token reali, token con padding, efficienza
+                (reali / con padding), confronto con batch nell'ordine
+                originale e dettaglio per bucket
+        """
+        lengths = np.asarray(lengths)
+        real, padded = _count_tokens(lengths, batches)
+
+        # Riferimento: batch consecutivi nell'ordine del DataFrame
+        naive = [np.arange(start, min(start + self.batch_size, len(lengths)))
+                 for start in range(0, len(lengths), self.batch_size)]
+        _, naive_padded = _count_tokens(lengths, naive)
+
+        per_bucket = {}
+        if self.bucket_boundaries:
+            buckets = self.assign_buckets(lengths)
+            edges = [0] + list(self.bucket_boundaries)
+            for batch in batches:
+                if len(batch) == 0:
+                    continue
+                b = int(buckets[batch[0]])
+                label = (f"{edges[b] + 1}-{edges[b + 1]}" if b < len(self.bucket_boundaries)
+                         else f">{edges[-1]}")
+                stats = per_bucket.setdefault(label, {'rows': 0, 'batches': 0,
+                                                      'real_tokens': 0, 'padded_tokens': 0})
+                stats['rows'] += len(batch)
+                stats['batches'] += 1
+                stats['real_tokens'] += int(lengths[batch].sum())
+                stats['padded_tokens'] += int(lengths[batch].max()) * len(batch)
+            for stats in per_bucket.values():
+                stats['efficiency'] = stats['real_tokens'] / stats['padded_tokens']
+
+        return {
+            'batches': len(batches),
+            'real_tokens': real,
+            'padded_tokens': padded,
+            'efficiency': real / padded if padded else 1.0,
+            'naive_padded_tokens': naive_padded,
+            'naive_efficiency': real / naive_padded if naive_padded else 1.0,
+            'per_bucket': per_bucket,
+        }
+
+
+def merge_padding_stats(stats_list):
+    """
+    Combina le statistiche di padding di più esecuzioni (es. shard paralleli)
+
+    Args:
+        stats_list (list): Dizionari prodotti da `padding_stats`
+
+    Returns:
+        dict: Statistiche complessive, con le efficienze ricalcolate sui totali
+    """
+    merged = {'batches': 0, 'real_tokens': 0, 'padded_tokens': 0,
+              'naive_padded_tokens': 0, 'per_bucket': {}}
+    for stats in stats_list:
+        for field in ('batches', 'real_tokens', 'padded_tokens', 'naive_padded_tokens'):
+            merged[field] += stats[field]
+        for label, bucket in stats['per_bucket'].items():
+            target = merged['per_bucket'].setdefault(
+                label, {'rows': 0, 'batches': 0, 'real_tokens': 0, 'padded_tokens': 0})
+            for field in target:
+                target[field] += bucket[field]
+
+    real = merged['real_tokens']
+    merged['efficiency'] = real / merged['padded_tokens'] if merged['padded_tokens'] else 1.0
+    merged['naive_efficiency'] = (real / merged['naive_padded_tokens']
+                                  if merged['naive_padded_tokens'] else 1.0)
+    for bucket in merged['per_bucket'].values():
+        bucket['efficiency'] = bucket['real_tokens'] / bucket['padded_tokens']
+    return merged
+
+
+class AdaptiveBatchSizer:
+    """
+    Sceglie la dimensione dei batch durante l'inferenza
+
+    Il batch successivo rispetta il budget di token più stretto tra:
+    `max_tokens` fisso, il budget derivato da `target_latency_ms` (costo
+    per token con padding stimato con una media mobile esponenziale sui
+    batch già eseguiti) e il limite imposto da un errore di memoria
+    esaurita (metà dei token del batch fallito). Registra le dimensioni
+    usate per il report.
+    """
+
+    # Peso dell'ultimo batch nella stima del costo per token
+    SMOOTHING = 0.3
+    # Variazione massima del budget di latenza tra due batch
+    MAX_STEP = 2.0
+
+    def __init__(self, max_batch_size=32, max_tokens=None, target_latency_ms=None):
+        """
+        Args:
+            max_batch_size (int): Numero massimo di sequenze per batch
+            max_tokens (int, optional): Budget fisso di token con padding
+            target_latency_ms (float, optional): Latenza obiettivo per batch
+        """
+        if target_latency_ms is not None and target_latency_ms <= 0:
+            raise ValueError(f"target_latency_ms deve essere > 0 (ricevuto {target_latency_ms})")
+        self.max_batch_size = max_batch_size
+        self.max_tokens = max_tokens
+        self.target_latency = target_latency_ms / 1000 if target_latency_ms else None
+        self.seconds_per_token = None
+        self.latency_budget = None
+        self.oom_budget = None
+        self.batch_sizes = Counter()
+        self.batch_seconds = 0.0
+        self.padded_tokens = 0
+        self.oom_backoffs = 0
+        self.over_target = 0
+
+    def token_budget(self):
+        """
+        Token con padding ammessi nel prossimo batch (None = nessun limite)
+        """
+        budgets = [budget for budget in (self.max_tokens, self.latency_budget, self.oom_budget)
+                   if budget is not None]
+        return int(min(budgets)) if budgets else None
+
+    def observe(self, batch_size, padded_tokens, seconds):
+        """
+        Registra un batch eseguito e aggiorna il budget di latenza
+        """
+        self.batch_sizes[batch_size] += 1
+        self.batch_seconds += seconds
+        self.padded_tokens += padded_tokens
+        if self.target_latency is None or padded_tokens == 0:
+            return
+        if seconds > self.target_latency:
+            self.over_target += 1
+        cost = seconds / padded_tokens
+        self.seconds_per_token = (cost if self.seconds_per_token is None else
+                                  (1 - self.SMOOTHING) * self.seconds_per_token
+                                  + self.SMOOTHING * cost)
+        budget = self.target_latency / self.seconds_per_token
+        # Crescita e riduzione graduali rispetto al batch appena eseguito
+        self.latency_budget = max(1.0, min(budget, padded_tokens * self.MAX_STEP))
+
+    def on_out_of_memory(self, padded_tokens):
+        """
+        Memoria esaurita su un batch: dimezza il budget di token
+        """
+        self.oom_backoffs += 1
+        self.oom_budget = max(1, padded_tokens // 2)
+
+    def stats(self):
+        """
+        Report delle dimensioni dei batch usate
+
+        Returns:
+            dict: Istogramma delle dimensioni, min/media/max, latenza media,
+                backoff per memoria esaurita, budget finale
+        """
+        return {
+            'batch_sizes': dict(sorted(self.batch_sizes.items())),
+            'batches': sum(self.batch_sizes.values()),
+            'batch_seconds': self.batch_seconds,
+            'padded_tokens': self.padded_tokens,
+            'oom_backoffs': self.oom_backoffs,
+            'over_target': self.over_target,
+            'token_budget': self.token_budget(),
+            'target_latency_ms': self.target_latency * 1000 if self.target_latency else None,
+            'max_tokens': self.max_tokens,
+        }
+
+
+def merge_batch_stats(stats_list):
+    """
+    Combina i report dei batch di più esecuzioni (chunk, shard paralleli)
+
+    Args:
+        stats_list (list): Dizionari prodotti da `AdaptiveBatchSizer.stats`
+
+    Returns:
+        dict: Report complessivo (budget finale: il più stretto)
+    """
+    sizes = Counter()
+    merged = {'batch_seconds': 0.0, 'padded_tokens': 0, 'oom_backoffs': 0, 'over_target': 0}
+    for stats in stats_list:
+        sizes.update(stats['batch_sizes'])
+        for field in merged:
+            merged[field] += stats[field]
+    budgets = [stats['token_budget'] for stats in stats_list if stats['token_budget'] is not None]
+    merged.update(
+        batch_sizes=dict(sorted(sizes.items())),
+        batches=sum(sizes.values()),
+        token_budget=min(budgets) if budgets else None,
+        target_latency_ms=stats_list[0]['target_latency_ms'] if stats_list else None,
+        max_tokens=stats_list[0]['max_tokens'] if stats_list else None,
+    )
+    return merged
+
+
+def batch_size_summary(stats):
+    """
+    Dimensione minima, mediana, media e massima dei batch di un report
+    """
+    sizes = np.array(list(stats['batch_sizes']), dtype=np.int64)
+    counts = np.array(list(stats['batch_sizes'].values()), dtype=np.int64)
+    if counts.sum() == 0:
+        return {'min': 0, 'median': 0, 'mean': 0.0, 'max': 0}
+    cumulative = np.cumsum(counts)
+    median = int(sizes[np.searchsorted(cumulative, (cumulative[-1] + 1) // 2)])
+    return {'min': int(sizes.min()), 'median': median,
+            'mean': float((sizes * counts).sum() / counts.sum()), 'max': int(sizes.max())}
+
+
+def pad_batch(sequences, pad_id, padding_side='right'):
+    """
+    Matrici input_ids e attention_mask di un batch, con padding alla sequenza più lunga
+
+    Le sequenze (liste o array, anche viste di un token store in
+    memory-map) vengono copiate una sola volta, direttamente nella
+    matrice del batch.
+
+    Args:
+        sequences (list): Token id di ogni sequenza
+        pad_id (int): Id del token di padding
+        padding_side (str): 'right' o 'left', come il tokenizer
+
+    Returns:
+        tuple: (input_ids, attention_mask) come array int64 (batch, lunghezza)
+    """
+    lengths = np.fromiter(map(len, sequences), dtype=np.int64, count=len(sequences))
+    width = int(lengths.max()) if len(lengths) else 0
+    attention_mask = (np.arange(width) < lengths[:, None]).astype(np.int64)
+    if padding_side == 'left':
+        attention_mask = attention_mask[:, ::-1]
+    input_ids = np.full((len(sequences), width), pad_id, dtype=np.int64)
+    # In ordine di riga le posizioni reali sono consecutive per ogni sequenza
+    input_ids[attention_mask.astype(bool)] = np.concatenate(sequences) if width else []
+    return input_ids, np.ascontiguousarray(attention_mask)
+
+
+def _fit_token_budget(lengths, budget):
+    """
+    Quante delle prime news entrano nel budget di token con padding (almeno una)
+    """
+    if budget is None:
+        return len(lengths)
+    padded = np.maximum.accumulate(lengths) * np.arange(1, len(lengths) + 1)
+    return max(1, int(np.searchsorted(padded, budget, side='right')))
+
+
+def _count_tokens(lengths, batches):
+    """
+    Token reali e token con padding (ogni batch paddato alla sua news più lunga)
+    """
+    real = 0
+    padded = 0
+    for batch in batches:
+        if len(batch) == 0:
+            continue
+        batch_lengths = lengths[batch]
+        real += int(batch_lengths.sum())
+        padded += int(batch_lengths.max()) * len(batch)
+    return real, padded
@@ -0,0 +1,135 @@
+"""
+Utility comuni ai benchmark
+Costruisce un piccolo DistilBERT inizializzato a caso, salvato in locale,
+così i benchmark girano offline e senza scaricare modelli
+"""
+
+import os
+import re
+import sys
+import tempfile
+
+# Rende importabili i moduli nella root del progetto
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from phrasebank import read_phrasebank_file  # noqa: E402
+
+PHRASEBANK_DIR = os.path.join(ROOT_DIR, 'data', 'FinancialPhraseBank')
+PHRASEBANK_FILE = os.path.join(PHRASEBANK_DIR, 'Sentences_50Agree.txt')
+
+SPECIAL_TOKENS = ['[PAD]', '[UNK]', '[CLS]', '[SEP]', '[MASK]']
+
+
+def read_phrasebank_sentences(path=PHRASEBANK_FILE):
+    """
+    Legge le frasi (senza label) da un file PhraseBank `frase@label`
+    
+    Returns:
+        list: Frasi nell'ordine del file
+    """
+    sentences, _ = read_phrasebank_file(path)
+    return sentences
+
+
+def synthetic_dataset(n_rows, seed=0):
+    """
+    Dataset sintetico di `n_rows` news tutte diverse tra loro, con label
+    
+    Le frasi PhraseBank vengono ripetute aggiungendo un riferimento
+    numerico, così deduplicazione e cache non falsano le misure; ogni
+    testo conserva la label originale della frase da cui deriva.
+    
+    Returns:
+        tuple: (testi, label) come liste
+    """
+    import numpy as np
+    
+    sentences, labels = read_phrasebank_file(PHRASEBANK_FILE)
+    # Il file contiene frasi ripetute: si tiene la prima occorrenza
+    first = {}
+    for sentence, label in zip(sentences, labels):
+        first.setdefault(sentence, label)
+    sentences, labels = list(first), list(first.values())
+    order = np.random.default_rng(seed).permutation(n_rows)
+    # Il riferimento dipende dal valore della permutazione, non dalla
+    # posizione: a ogni valore corrisponde un solo testo
+    texts = [f"{sentences[value % len(sentences)]} (ref {value})"
+             if value >= len(sentences) else sentences[value] for value in order]
+    return texts, [labels[value % len(sentences)] for value in order]
+
+
+def synthetic_corpus(n_rows, seed=0):
+    """
+    Corpus sintetico di `n_rows` news tutte diverse tra loro (vedi `synthetic_dataset`)
+    
+    Returns:
+        list: Testi
+    """
+    return synthetic_dataset(n_rows, seed)[0]
+
+
+def build_tiny_model(model_dir=None, dim=64, n_layers=2, n_heads=2, seed=0):
+    """
+    Crea (una sola volta) un DistilBERT minuscolo con pesi casuali
+    
+    Il vocabolario WordPiece è costruito dalle parole di FinancialPhraseBank,
+    quindi la tokenizzazione ha lunghezze realistiche.
+    
+    Args:
+        model_dir (str, optional): Directory di destinazione
+        dim (int): Dimensione degli embedding
+        n_layers (int): Numero di layer transformer
+        n_heads (int): Numero di attention heads
+        seed (int): Seed per l'inizializzazione dei pesi
+    
+    Returns:
+        str: Percorso del modello, utilizzabile come `model_name`
+    """
+    if model_dir is None:
+        model_dir = os.path.join(
+            tempfile.gettempdir(),
+            f"fsa_tiny_distilbert_{dim}x{n_layers}x{n_heads}_s{seed}_wp"
+        )
+    if os.path.exists(os.path.join(model_dir, 'config.json')):
+        return model_dir
+    
+    import torch
+    from transformers import (DistilBertConfig,
+                              DistilBertForSequenceClassification,
+                              DistilBertTokenizerFast)
+    
+    os.makedirs(model_dir, exist_ok=True)
+    
+    # Vocabolario dalle frasi del dataset
+    words = set()
+    for sentence in read_phrasebank_sentences():
+        words.update(re.findall(r"\w+|[^\w\s]", sentence.lower()))
+    tokens = SPECIAL_TOKENS + sorted(words)
+    vocab_path = os.path.join(model_dir, 'vocab.txt')
+    with open(vocab_path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(tokens) + '\n')
+    
+    # transformers 5 ignora vocab_file e vuole il vocabolario esplicito
+    tokenizer = DistilBertTokenizerFast(vocab_file=vocab_path,
+                                        vocab={token: i for i, token in enumerate(tokens)},
+                                        do_lower_case=True)
+    if len(tokenizer) != len(tokens):
+        raise RuntimeError(f"Vocabolario non caricato ({len(tokenizer)} token su {len(tokens)})")
+    
+    torch.manual_seed(seed)
+    config = DistilBertConfig(
+        vocab_size=len(tokenizer),
+        dim=dim,
+        n_layers=n_layers,
+        n_heads=n_heads,
+        hidden_dim=dim * 4,
+        initializer_range=0.2,
+        id2label={0: 'NEGATIVE', 1: 'POSITIVE'},
+        label2id={'NEGATIVE': 0, 'POSITIVE': 1},
+    )
+    model = DistilBertForSequenceClassification(config)
+    model.save_pretrained(model_dir)
+    tokenizer.save_pretrained(model_dir)
+    return model_dir
@@ -0,0 +1,123 @@
+"""
+Benchmark Adaptive Batching
+Confronta batch di dimensione fissa, budget di token e latenza obiettivo
+su un feed misto (headline brevi di PhraseBank più articoli lunghi
+ottenuti concatenando frasi): news/secondo, latenza dei batch e token con
+padding del batch più grande (indicatore del picco di memoria)
+
+Uso:
+    python benchmarks/benchmark_adaptive_batching.py [--rows 4000] [--long-fraction 0.1]
+                                                     [--max-tokens 4096 8192]
+                                                     [--target-latency-ms 20 50]
+"""
+
+import argparse
+import contextlib
+import io
+import time
+
+import numpy as np
+import pandas as pd
+
+from _common import build_tiny_model, synthetic_corpus
+from financial_sentiment_analyzer import FinancialSentimentAnalyzer
+
+
+def mixed_feed(rows, long_fraction, seed=0):
+    """
+    Headline brevi più una quota di articoli lunghi (10-25 frasi)
+    """
+    rng = np.random.default_rng(seed)
+    sentences = synthetic_corpus(rows, seed)
+    n_long = int(rows * long_fraction)
+    articles = [" ".join(rng.choice(sentences, rng.integers(10, 26))) for _ in range(n_long)]
+    texts = sentences[:rows - n_long] + articles
+    return [texts[i] for i in rng.permutation(len(texts))]
+
+
+def run(analyzer, options):
+    """
+    Un'analisi silenziosa
+
+    Returns:
+        dict: news/s, statistiche dei batch, label e confidence
+    """
+    batch_latencies = []
+    forward = analyzer.backend.forward
+
+    def timed_forward(input_ids, attention_mask):
+        start = time.perf_counter()
+        probs = forward(input_ids, attention_mask)
+        batch_latencies.append((time.perf_counter() - start, input_ids.size))
+        return probs
+
+    analyzer.backend.forward = timed_forward
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            df = analyzer.analyze_sentiment(**options)
+            elapsed = time.perf_counter() - start
+    finally:
+        analyzer.backend.forward = forward
+    latencies = np.array([seconds for seconds, _ in batch_latencies]) * 1000
+    return {
+        'throughput': len(df) / elapsed,
+        'batches': len(batch_latencies),
+        'p50_ms': np.percentile(latencies, 50),
+        'p95_ms': np.percentile(latencies, 95),
+        'max_ms': latencies.max(),
+        'max_padded_tokens': max(tokens for _, tokens in batch_latencies),
+        'labels': df['predicted_sentiment'].to_numpy(),
+        'scores': df['confidence'].to_numpy(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=4000)
+    parser.add_argument('--long-fraction', type=float, default=0.1)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[8, 32, 128])
+    parser.add_argument('--max-tokens', type=int, nargs='+', default=[4096, 8192])
+    parser.add_argument('--target-latency-ms', type=float, nargs='+', default=[20, 50])
+    parser.add_argument('--max-batch-size', type=int, default=256,
+                        help="Limite di sequenze per batch nelle modalità adattive")
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        analyzer = FinancialSentimentAnalyzer(None, model_name=build_tiny_model())
+        analyzer.warmup()
+    analyzer.df = pd.DataFrame({'text': mixed_feed(args.rows, args.long_fraction)})
+
+    print("=" * 70)
+    print("⏱️  BENCHMARK ADAPTIVE BATCHING")
+    print("=" * 70)
+    print(f"News: {args.rows:,} ({args.long_fraction:.0%} articoli lunghi)")
+    print()
+
+    configs = [(f"fisso {size}", {'batch_size': size}) for size in args.batch_sizes]
+    configs += [(f"budget {tokens:,} token",
+                 {'batch_size': args.max_batch_size, 'max_tokens': tokens})
+                for tokens in args.max_tokens]
+    configs += [(f"latenza {latency:g} ms",
+                 {'batch_size': args.max_batch_size, 'target_latency_ms': latency})
+                for latency in args.target_latency_ms]
+
+    print(f"   {'modalità':22} {'news/s':>8} {'batch':>6} {'p50':>9} {'p95':>9} {'max':>9} "
+          f"{'token max':>10}")
+    reference = None
+    for name, options in configs:
+        result = run(analyzer, options)
+        reference = reference or result
+        assert (result['labels'] == reference['labels']).all(), f"{name}: label diverse"
+        print(f"   {name:22} {result['throughput']:8.1f} {result['batches']:6,} "
+              f"{result['p50_ms']:6.1f} ms {result['p95_ms']:6.1f} ms {result['max_ms']:6.1f} ms "
+              f"{result['max_padded_tokens']:10,}")
+    print()
+    print("   ✅ Stesse label in tutte le modalità (cambia solo il raggruppamento)")
+    print("   'token max' = token con padding del batch più grande: determina il picco di memoria")
+    print()
+
+
+if __name__ == "__main__":
+    main()
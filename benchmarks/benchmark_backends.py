@@ -0,0 +1,129 @@
+"""
+Benchmark Inference Backends
+Confronta i backend di inferenza (torch fp32, torch-int8, onnx, onnx-int8)
+sulle frasi di FinancialPhraseBank: deriva rispetto a torch fp32 (label
+cambiate, differenza di confidence, accuracy vs label originali),
+throughput a batch, latenza della singola frase e dimensione del modello
+
+Di default usa il DistilBERT minuscolo locale (offline); con --model si
+misura la deriva reale del modello di produzione.
+
+Uso:
+    python benchmarks/benchmark_backends.py [--model distilbert-...]
+                                            [--backends torch torch-int8 onnx onnx-int8]
+                                            [--rows 4846] [--batch-size 32]
+                                            [--latency-samples 200]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import time
+
+import numpy as np
+import torch
+
+from _common import PHRASEBANK_FILE, build_tiny_model
+from financial_sentiment_analyzer import FinancialSentimentAnalyzer
+from inference_backends import BACKENDS
+from phrasebank import read_phrasebank_file
+
+
+def model_size_mb(backend):
+    """
+    Dimensione dei pesi del backend (state dict serializzato o file ONNX)
+    """
+    if hasattr(backend, 'path'):
+        return os.path.getsize(backend.path) / 1024 ** 2
+    buffer = io.BytesIO()
+    torch.save(backend.model.state_dict(), buffer)
+    return buffer.tell() / 1024 ** 2
+
+
+def measure(analyzer, sentences, batch_size, latency_samples):
+    """
+    Throughput a batch e latenza della singola frase
+
+    Returns:
+        dict: label, confidence, news/s, latenze p50/p95 in ms
+    """
+    analyzer.predict(sentences[:batch_size], batch_size=batch_size)  # warmup
+    start = time.perf_counter()
+    labels, scores = analyzer.predict(sentences, batch_size=batch_size)
+    elapsed = time.perf_counter() - start
+
+    latencies = []
+    for sentence in sentences[:latency_samples]:
+        start = time.perf_counter()
+        analyzer.predict([sentence])
+        latencies.append((time.perf_counter() - start) * 1000)
+    p50, p95 = np.percentile(latencies, [50, 95])
+    return {'labels': np.array(labels), 'scores': np.array(scores),
+            'throughput': len(sentences) / elapsed, 'p50_ms': p50, 'p95_ms': p95}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default=None, help="Default: DistilBERT minuscolo locale")
+    parser.add_argument('--backends', nargs='+', default=list(BACKENDS), choices=list(BACKENDS))
+    parser.add_argument('--rows', type=int, default=None, help="Default: tutte le frasi")
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--latency-samples', type=int, default=200)
+    args = parser.parse_args()
+
+    model_name = args.model or build_tiny_model()
+    sentences, gold = read_phrasebank_file(PHRASEBANK_FILE)
+    sentences, gold = sentences[:args.rows], np.array(gold[:args.rows])
+
+    print("=" * 70)
+    print("⏱️  BENCHMARK BACKEND DI INFERENZA")
+    print("=" * 70)
+    print(f"Modello: {model_name}")
+    print(f"Frasi PhraseBank: {len(sentences):,}   Batch: {args.batch_size}   "
+          f"Thread: {torch.get_num_threads()}")
+    print()
+
+    results = {}
+    for name in args.backends:
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                analyzer = FinancialSentimentAnalyzer(None, model_name=model_name, backend=name)
+                # Il modello è caricato alla prima inferenza: caricarlo qui fa
+                # emergere anche gli errori di creazione del backend
+                analyzer._ensure_model()
+        except ImportError as exc:
+            print(f"   ⚠️  {name}: non disponibile ({exc})")
+            continue
+        results[name] = measure(analyzer, sentences, args.batch_size, args.latency_samples)
+        results[name]['size_mb'] = model_size_mb(analyzer.backend)
+
+    if not results:
+        return
+    print(f"   {'backend':12} {'news/s':>9} {'p50 1 frase':>12} {'p95 1 frase':>12} "
+          f"{'modello':>10}")
+    for name, result in results.items():
+        print(f"   {name:12} {result['throughput']:9.1f} {result['p50_ms']:9.2f} ms "
+              f"{result['p95_ms']:9.2f} ms {result['size_mb']:7.2f} MB")
+    print()
+
+    reference = results.get('torch')
+    if reference is None:
+        print("   (deriva non calcolata: serve il backend torch come riferimento)")
+        return
+    print("📐 DERIVA RISPETTO A TORCH FP32")
+    print(f"   {'backend':12} {'label uguali':>13} {'cambiate':>9} {'Δconf media':>12} "
+          f"{'Δconf max':>10} {'accuracy':>9}")
+    for name, result in results.items():
+        same = result['labels'] == reference['labels']
+        delta = np.abs(result['scores'][same] - reference['scores'][same])
+        accuracy = (np.char.lower(result['labels'].astype(str)) == gold).mean()
+        print(f"   {name:12} {same.mean():12.2%} {int((~same).sum()):9,} "
+              f"{delta.mean() if delta.size else 0:12.5f} {delta.max() if delta.size else 0:10.5f} "
+              f"{accuracy:9.1%}")
+    print()
+
+
+if __name__ == "__main__":
+    main()
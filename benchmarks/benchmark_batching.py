@@ -0,0 +1,93 @@
+"""
+Benchmark Batched Inference
+Confronta le news/secondo del loop originale (una chiamata alla pipeline
+per news) con l'inferenza a batch di FinancialSentimentAnalyzer, con e
+senza raggruppamento per lunghezza (padding efficiency)
+
+Uso:
+    python benchmarks/benchmark_batching.py [--rows 1000] [--batch-sizes 1 8 32 64]
+                                            [--buckets 16 32 64]
+"""
+
+import argparse
+import contextlib
+import io
+import time
+
+import pandas as pd
+
+from _common import build_tiny_model, read_phrasebank_sentences
+from financial_sentiment_analyzer import FinancialSentimentAnalyzer
+
+
+def legacy_loop(analyzer):
+    """
+    Replica il loop originale: una chiamata alla pipeline per ogni news
+    """
+    sentiments, scores = [], []
+    for text in analyzer.df['text']:
+        result = analyzer.sentiment_pipeline(text[:512])[0]
+        sentiments.append(result['label'])
+        scores.append(result['score'])
+    return sentiments, scores
+
+
+def timed(fn):
+    """
+    Esegue `fn` silenziando l'output e ritorna (risultato, secondi)
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+    return result, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 8, 32, 64])
+    parser.add_argument('--buckets', type=int, nargs='*', default=None,
+                        help="Limiti dei bucket in token (default: solo ordinamento)")
+    args = parser.parse_args()
+    
+    model_dir = build_tiny_model()
+    with contextlib.redirect_stdout(io.StringIO()):
+        analyzer = FinancialSentimentAnalyzer(None, model_name=model_dir)
+    
+    sentences = read_phrasebank_sentences()[:args.rows]
+    analyzer.df = pd.DataFrame({'text': sentences})
+    
+    print("=" * 70)
+    print("⏱️  BENCHMARK BATCHED INFERENCE")
+    print("=" * 70)
+    print(f"Modello: {model_dir}")
+    print(f"News:    {len(sentences):,}")
+    print()
+    
+    # Warmup
+    timed(lambda: analyzer.sentiment_pipeline(sentences[:8], batch_size=8))
+    
+    (legacy_labels, _), elapsed = timed(lambda: legacy_loop(analyzer))
+    baseline = len(sentences) / elapsed
+    print(f"   {'loop originale':18} {baseline:9.1f} news/s")
+    
+    for batch_size in args.batch_sizes:
+        for sort_by_length in (False, True):
+            df, elapsed = timed(lambda: analyzer.analyze_sentiment(
+                batch_size=batch_size,
+                sort_by_length=sort_by_length,
+                bucket_boundaries=args.buckets if sort_by_length else None,
+            ))
+            rate = len(sentences) / elapsed
+            agree = (df['predicted_sentiment'] == pd.Series(legacy_labels, index=df.index)).mean()
+            name = f"batch_size={batch_size}" + (" +sort" if sort_by_length else "")
+            print(f"   {name:18} {rate:9.1f} news/s  (x{rate / baseline:.2f}, "
+                  f"padding eff. {analyzer.padding_stats['efficiency']:.1%}, "
+                  f"label uguali: {agree:.1%})")
+    print()
+
+
+if __name__ == "__main__":
+    main()
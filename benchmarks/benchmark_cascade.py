@@ -0,0 +1,120 @@
+"""
+Benchmark Cascade
+Curva costo/accuratezza della cascata a due stadi: il primo stadio
+(n-grammi con hashing) viene addestrato su una parte di
+FinancialPhraseBank e la cascata analizza le frasi escluse dal training
+con diverse soglie di confidence. Per ogni soglia: frazione mandata al
+transformer, speedup misurato, accordo con l'analisi del solo
+transformer (misurato e stimato dal campione di controllo) e accuracy
+rispetto alle label annotate
+
+Con il DistilBERT minuscolo di default il transformer è molto più
+economico di un modello reale e ha pesi casuali: il primo stadio impara
+quindi le sue predizioni (`--labels distill`) e lo speedup misurato è un
+limite inferiore.
+
+Uso:
+    python benchmarks/benchmark_cascade.py [--model distilbert-...] [--labels gold]
+                                           [--thresholds 0.7 0.8 0.9 0.95]
+                                           [--train-fraction 0.7] [--audit-rate 0.05]
+"""
+
+import argparse
+import contextlib
+import io
+import time
+
+import numpy as np
+
+from _common import PHRASEBANK_DIR, build_tiny_model
+from cascade import cascade_summary
+from financial_sentiment_analyzer import FALLBACK_LABEL, FinancialSentimentAnalyzer
+from phrasebank import load_phrasebank
+
+
+def run(analyzer, **options):
+    """
+    Un'analisi silenziosa
+
+    Returns:
+        tuple: (label, secondi)
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        df = analyzer.analyze_sentiment(**options)
+        elapsed = time.perf_counter() - start
+    return df['predicted_sentiment'].to_numpy(), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default=None, help="Default: DistilBERT minuscolo locale")
+    parser.add_argument('--labels', choices=('gold', 'distill'), default=None,
+                        help="Label di training del primo stadio (default: distill con il "
+                             "modello minuscolo, gold altrimenti)")
+    parser.add_argument('--thresholds', type=float, nargs='+',
+                        default=[0.6, 0.7, 0.8, 0.9, 0.95, 0.99])
+    parser.add_argument('--train-fraction', type=float, default=0.7)
+    parser.add_argument('--audit-rate', type=float, default=0.05)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    labels_mode = args.labels or ('gold' if args.model else 'distill')
+
+    data = load_phrasebank(PHRASEBANK_DIR)
+    order = np.random.default_rng(args.seed).permutation(len(data))
+    n_train = int(len(data) * args.train_fraction)
+    train, test = data.iloc[order[:n_train]], data.iloc[order[n_train:]]
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        analyzer = FinancialSentimentAnalyzer(None, model_name=args.model or build_tiny_model())
+        analyzer.warmup(batch_size=args.batch_size)
+        start = time.perf_counter()
+        analyzer.train_first_stage(train['text'], train['original_sentiment'],
+                                   distill=labels_mode == 'distill')
+        train_seconds = time.perf_counter() - start
+    analyzer.df = test[['text']].reset_index(drop=True)
+
+    print("=" * 70)
+    print("⏱️  BENCHMARK CASCADE")
+    print("=" * 70)
+    print(f"Training primo stadio: {len(train):,} frasi (label: {labels_mode}) in "
+          f"{train_seconds:.1f}s   Test: {len(test):,} frasi")
+    print()
+
+    # Riferimento: solo transformer
+    reference, reference_seconds = run(analyzer, batch_size=args.batch_size)
+    gold = test['original_sentiment'].astype(str).str.lower().to_numpy()
+    model_labels = [label for label in analyzer.label_dtype.categories if label != FALLBACK_LABEL]
+    comparable = np.isin(gold, [label.lower() for label in model_labels])
+
+    def accuracy(predicted):
+        predicted = np.char.lower(predicted.astype(str))
+        return (predicted[comparable] == gold[comparable]).mean() if comparable.any() else None
+
+    print(f"   Solo transformer: {reference_seconds:.2f}s "
+          f"({len(test) / reference_seconds:,.0f} news/s), accuracy {accuracy(reference):.1%} "
+          f"su {int(comparable.sum()):,} frasi con label del modello")
+    print()
+    print(f"   {'soglia':>7} {'al transformer':>15} {'speedup':>8} {'accordo':>8} "
+          f"{'stimato':>8} {'accuracy':>9}")
+    for threshold in args.thresholds:
+        predicted, seconds = run(analyzer, batch_size=args.batch_size,
+                                 cascade_threshold=threshold, cascade_audit_rate=args.audit_rate)
+        summary = cascade_summary(analyzer.cascade_stats)
+        estimated = summary['agreement']
+        print(f"   {threshold:7g} {summary['transformer_fraction']:15.1%} "
+              f"{reference_seconds / seconds:7.2f}x {(predicted == reference).mean():8.1%} "
+              f"{'n.d.' if estimated is None else format(estimated, '.1%'):>8} "
+              f"{accuracy(predicted):9.1%}")
+    print()
+    print("   'al transformer' include il campione di controllo "
+          f"({args.audit_rate:.0%} delle frasi accettate dal primo stadio)")
+    print("   'accordo' = stesse label dell'analisi con il solo transformer (misurato); "
+          "'stimato' = dal campione")
+    print()
+
+
+if __name__ == "__main__":
+    main()
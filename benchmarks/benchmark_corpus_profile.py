@@ -0,0 +1,107 @@
+"""
+Benchmark Corpus Profile
+Confronta tempo e picco di memoria (RSS) dell'esplorazione del dataset:
+passaggi sul DataFrame completo come faceva explore_data.py (stringa unica
+con tutte le parole, `Counter`, colonna `text_length`, `sample` per
+classe) contro il profilo in streaming di `corpus_profile` a blocchi.
+Ogni misura gira in un processo separato.
+
+Uso:
+    python benchmarks/benchmark_corpus_profile.py [--rows 100000 1000000 4000000]
+                                                  [--chunksize 100000]
+"""
+
+import argparse
+import os
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+
+import pandas as pd
+
+from benchmark_streaming import write_corpus
+from corpus_profile import DEFAULT_CHUNKSIZE, profile_corpus
+from streaming import iter_csv_chunks
+
+NAMES = ['sentiment', 'text']
+
+
+def profile_in_memory(path):
+    """
+    Le statistiche di explore_data.py calcolate sul DataFrame completo
+    """
+    df = pd.read_csv(path, encoding='latin-1', names=NAMES)
+    df['sentiment'].value_counts()
+    df.isnull().sum()
+    df['text_length'] = df['text'].str.len()
+    df['text_length'].median()
+    for sentiment in df['sentiment'].unique():
+        df[df['sentiment'] == sentiment].sample(min(3, len(df[df['sentiment'] == sentiment])))
+    all_text = ' '.join(df['text'].str.lower())
+    Counter(re.findall(r'\b[a-z]{5,}\b', all_text)).most_common(10)
+
+
+def measure(mode, path, chunksize):
+    """
+    Esegue un profilo nel processo corrente e stampa "secondi picco_MB"
+    """
+    start = time.perf_counter()
+    if mode == 'stream':
+        profile_corpus(iter_csv_chunks(path, chunksize, encoding='latin-1', names=NAMES))
+    else:
+        profile_in_memory(path)
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss è in KB su Linux; picco dell'intero processo (import inclusi)
+    print(f"{elapsed:.3f} {peak / 1024:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000, 4_000_000])
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument('--measure', nargs=2, metavar=('MODE', 'INPUT'), help=argparse.SUPPRESS)
+    parser.add_argument('--write', nargs=2, metavar=('ROWS', 'OUTPUT'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        measure(*args.measure, args.chunksize)
+        return
+    if args.write:
+        write_corpus(args.write[1], int(args.write[0]))
+        return
+
+    print("=" * 70)
+    print("⏱️  BENCHMARK CORPUS PROFILE (picco di memoria del processo)")
+    print("=" * 70)
+    print(f"Chunk: {args.chunksize:,} news")
+    print()
+    print(f"   {'news':>10} {'file':>9} {'in memoria':>22} {'streaming':>22}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            path = os.path.join(tmp, f"corpus_{rows}.csv")
+            # Anche il corpus viene generato in un processo separato: il picco
+            # di memoria del processo padre verrebbe ereditato dalle misure
+            subprocess.run([sys.executable, __file__, '--write', str(rows), path], check=True)
+            cells = []
+            for mode in ('memory', 'stream'):
+                result = subprocess.run(
+                    [sys.executable, __file__, '--chunksize', str(args.chunksize),
+                     '--measure', mode, path],
+                    capture_output=True, text=True, check=True,
+                )
+                elapsed, peak = result.stdout.split()[-2:]
+                cells.append(f"{float(peak):8.1f} MB {float(elapsed):7.1f} s")
+            size = os.path.getsize(path) / 1024 ** 2
+            print(f"   {rows:10,} {size:6.0f} MB {cells[0]:>22} {cells[1]:>22}")
+    print()
+
+
+if __name__ == "__main__":
+    main()
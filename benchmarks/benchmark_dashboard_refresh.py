@@ -0,0 +1,75 @@
+"""
+Benchmark Dashboard Refresh
+Aggiornamento dei grafici dopo l'aggiunta di poche righe a un CSV di
+risultati grande: rigenerazione completa (rilettura di tutto il file)
+contro refresh incrementale (`SentimentVisualizer(incremental=True)`),
+che legge solo le righe nuove e ridisegna solo i grafici cambiati
+
+Il refresh senza righe nuove non legge né ridisegna nulla.
+
+Uso:
+    python benchmarks/benchmark_dashboard_refresh.py [--sizes 100000 1000000]
+                                                     [--append 1000] [--dpi 100]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+from benchmark_visualizations import synthetic_results
+from visualizations import SentimentVisualizer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--append', type=int, default=1_000,
+                        help="Righe aggiunte al CSV prima del refresh")
+    parser.add_argument('--dpi', type=int, default=100)
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("⏱️  BENCHMARK DASHBOARD REFRESH")
+    print("=" * 70)
+    print(f"Righe aggiunte: {args.append:,}   DPI: {args.dpi}   Rendering in sequenza")
+    print()
+    print(f"   {'righe':>10} {'completo':>10} {'refresh +{0}'.format(args.append):>14} "
+          f"{'refresh vuoto':>14}")
+    for size in args.sizes:
+        workdir = tempfile.mkdtemp(prefix='fsa_bench_refresh_')
+        path = os.path.join(workdir, 'sentiment_results.csv')
+        df = synthetic_results(size + args.append)
+        df.iloc[:size].to_csv(path, index=False)
+        options = dict(output_dir=os.path.join(workdir, 'visualizations'), dpi=args.dpi)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            # Stato iniziale (come dopo il primo refresh in produzione)
+            visualizer = SentimentVisualizer(path, incremental=True, **options)
+            visualizer.refresh(workers=1)
+
+            df.iloc[size:].to_csv(path, mode='a', header=False, index=False)
+
+            start = time.perf_counter()
+            SentimentVisualizer(path, **options).generate_all_visualizations(workers=1)
+            full = time.perf_counter() - start
+
+            start = time.perf_counter()
+            visualizer.refresh(workers=1)
+            refresh = time.perf_counter() - start
+
+            start = time.perf_counter()
+            visualizer.refresh(workers=1)
+            empty = time.perf_counter() - start
+        print(f"   {size:10,} {full:9.2f}s {refresh:13.2f}s {empty:13.2f}s")
+    print()
+    print("   'refresh' include lettura delle righe nuove, rendering dei grafici")
+    print("   cambiati e salvataggio dello stato.")
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark Long Documents
+Misura separatamente il throughput su input brevi (frasi PhraseBank) e su
+articoli lunghi sintetici analizzati a finestre, a diverse lunghezze, per
+verificare che il costo cresca linearmente con la lunghezza del documento
+
+Uso:
+    python benchmarks/benchmark_long_documents.py [--short-rows 1000] [--docs 50]
+                                                   [--sentences 10 20 40 80]
+"""
+
+import argparse
+import contextlib
+import io
+import time
+
+import pandas as pd
+
+from _common import build_tiny_model, read_phrasebank_sentences
+from financial_sentiment_analyzer import FinancialSentimentAnalyzer
+
+
+def run(analyzer, texts, **kwargs):
+    """
+    Analizza `texts` in silenzio; ritorna (secondi, token totali, finestre)
+    """
+    analyzer.df = pd.DataFrame({'text': texts})
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        analyzer.analyze_sentiment(**kwargs)
+        elapsed = time.perf_counter() - start
+    return (elapsed,
+            analyzer.padding_stats['real_tokens'],
+            analyzer.truncation_stats['windows'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--short-rows', type=int, default=1000)
+    parser.add_argument('--docs', type=int, default=50, help="Articoli per lunghezza")
+    parser.add_argument('--sentences', type=int, nargs='+', default=[10, 20, 40, 80],
+                        help="Frasi per articolo sintetico")
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--max-length', type=int, default=128)
+    parser.add_argument('--stride', type=int, default=32)
+    parser.add_argument('--reducer', default='mean')
+    args = parser.parse_args()
+    
+    with contextlib.redirect_stdout(io.StringIO()):
+        analyzer = FinancialSentimentAnalyzer(None, model_name=build_tiny_model())
+    sentences = read_phrasebank_sentences()
+    options = dict(batch_size=args.batch_size, max_length=args.max_length,
+                   long_documents=True, stride=args.stride, reducer=args.reducer)
+    
+    print("=" * 70)
+    print("⏱️  BENCHMARK LONG DOCUMENTS")
+    print("=" * 70)
+    print(f"Finestre da {args.max_length} token, overlap {args.stride}, "
+          f"batch {args.batch_size}, reducer '{args.reducer}'")
+    print()
+    
+    # Warmup
+    run(analyzer, sentences[:64], **options)
+    
+    print("📰 Input brevi")
+    elapsed, tokens, windows = run(analyzer, sentences[:args.short_rows], **options)
+    print(f"   {args.short_rows:6,} frasi: {args.short_rows / elapsed:9.1f} doc/s, "
+          f"{tokens / elapsed:10,.0f} token/s, {windows / args.short_rows:.2f} finestre/doc")
+    print()
+    
+    print("📜 Articoli lunghi")
+    for n_sentences in args.sentences:
+        docs = [' '.join(sentences[(i * n_sentences + j) % len(sentences)]
+                         for j in range(n_sentences))
+                for i in range(args.docs)]
+        elapsed, tokens, windows = run(analyzer, docs, **options)
+        print(f"   {n_sentences:4} frasi/doc ({tokens / args.docs:7,.0f} token): "
+              f"{args.docs / elapsed:8.1f} doc/s, {tokens / elapsed:10,.0f} token/s, "
+              f"{windows / args.docs:6.1f} finestre/doc, "
+              f"{elapsed / args.docs * 1000:8.2f} ms/doc")
+    print()
+    print("ℹ️  Con costo lineare, token/s resta costante e ms/doc cresce")
+    print("   proporzionalmente alla lunghezza.")
+    print()
+
+
+if __name__ == "__main__":
+    main()
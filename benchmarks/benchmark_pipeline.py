@@ -0,0 +1,267 @@
+"""
+Benchmark Pipeline
+Misura la pipeline completa (load_data, analyze_sentiment,
+generate_statistics, save_results, generate_all_visualizations) su
+FinancialPhraseBank e su corpora sintetici di varie dimensioni, con un
+DistilBERT minuscolo locale (offline)
+
+Ogni corpus gira in un processo nuovo (memoria di picco per corpus,
+nessun effetto di riscaldamento tra un corpus e l'altro); seed, thread
+e dimensione dei batch sono fissi. I tempi sono la mediana di
+`--repeats` esecuzioni. I risultati vengono salvati in JSON e
+confrontati con una baseline salvata: uno stage più lento della baseline
+oltre la tolleranza è una regressione (exit code 1).
+
+La baseline dipende dalla macchina e non è versionata: la prima
+esecuzione la crea, `--save-baseline` la rigenera (es. dopo un
+aggiornamento di hardware o librerie).
+
+Uso:
+    python benchmarks/benchmark_pipeline.py [--sizes 10000 50000] [--repeats 3]
+                                            [--output benchmarks/results/pipeline.json]
+                                            [--baseline benchmarks/results/pipeline_baseline.json]
+                                            [--save-baseline] [--tolerance 0.25]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from _common import PHRASEBANK_DIR, ROOT_DIR, build_tiny_model, synthetic_dataset
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_OUTPUT = os.path.join(BENCHMARKS_DIR, 'results', 'pipeline.json')
+DEFAULT_BASELINE = os.path.join(BENCHMARKS_DIR, 'results', 'pipeline_baseline.json')
+
+STAGES = ('load_data', 'analyze_sentiment', 'generate_statistics', 'save_results',
+          'visualizations')
+
+# Sotto questa differenza assoluta (secondi) uno stage non è mai una regressione
+MIN_REGRESSION_SECONDS = 0.05
+
+
+def write_synthetic_csv(path, n_rows, seed):
+    """
+    Salva un corpus sintetico nel formato CSV di `load_data` (sentiment, testo)
+    """
+    texts, labels = synthetic_dataset(n_rows, seed)
+    pd.DataFrame({'sentiment': labels, 'text': texts}).to_csv(
+        path, header=False, index=False, encoding='latin-1', errors='replace')
+
+
+def run_corpus(data_path, model_name, batch_size, threads, repeats):
+    """
+    Esegue la pipeline su un corpus (nel processo corrente)
+
+    Returns:
+        dict: Righe, caricamento modello, mediana per stage, throughput, RSS di picco
+    """
+    import torch
+    torch.set_num_threads(threads)
+
+    from financial_sentiment_analyzer import FinancialSentimentAnalyzer
+    from visualizations import SentimentVisualizer
+
+    workdir = tempfile.mkdtemp(prefix='fsa_bench_pipeline_')
+    os.chdir(workdir)
+
+    timings = {stage: [] for stage in STAGES}
+    with contextlib.redirect_stdout(io.StringIO()):
+        analyzer = FinancialSentimentAnalyzer(data_path, model_name=model_name)
+        start = time.perf_counter()
+        analyzer.warmup(batch_size=batch_size)
+        model_load = time.perf_counter() - start
+
+        for _ in range(repeats):
+            steps = (
+                ('load_data', analyzer.load_data),
+                ('analyze_sentiment', lambda: analyzer.analyze_sentiment(batch_size=batch_size)),
+                ('generate_statistics', analyzer.generate_statistics),
+                ('save_results', lambda: analyzer.save_results('results')),
+                # Il visualizer legge results/ (Parquet se disponibile, altrimenti CSV)
+                ('visualizations',
+                 lambda: SentimentVisualizer().generate_all_visualizations()),
+            )
+            for stage, step in steps:
+                start = time.perf_counter()
+                step()
+                timings[stage].append(time.perf_counter() - start)
+
+    medians = {stage: statistics.median(values) for stage, values in timings.items()}
+    rows = len(analyzer.df)
+    return {
+        'rows': rows,
+        'model_load_seconds': model_load,
+        'stages': medians,
+        'total_seconds': sum(medians.values()),
+        'analyze_rows_per_second': rows / medians['analyze_sentiment'],
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def run_isolated(data_path, args, model_name):
+    """
+    Esegue `run_corpus` in un interprete nuovo e ne legge il risultato JSON
+    """
+    command = [sys.executable, os.path.abspath(__file__), '--single', data_path,
+               '--model', model_name, '--batch-size', str(args.batch_size),
+               '--threads', str(args.threads), '--repeats', str(args.repeats)]
+    output = subprocess.run(command, cwd=ROOT_DIR, check=True, capture_output=True,
+                            text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def environment(args, model_name):
+    """
+    Informazioni sull'ambiente, salvate con i risultati
+    """
+    import numpy
+    import torch
+    import transformers
+    from columnar import parquet_available
+    pyarrow_version = sys.modules['pyarrow'].__version__ if parquet_available() else None
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR,
+                                capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ''
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'git_commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'threads': args.threads,
+        'batch_size': args.batch_size,
+        'repeats': args.repeats,
+        'model': os.path.basename(model_name),
+        'versions': {'torch': torch.__version__, 'transformers': transformers.__version__,
+                     'pandas': pd.__version__, 'numpy': numpy.__version__,
+                     'pyarrow': pyarrow_version},
+    }
+
+
+def compare(results, baseline, tolerance):
+    """
+    Confronta i tempi per stage con la baseline
+
+    Returns:
+        list: Regressioni come (corpus, stage, secondi baseline, secondi attuali)
+    """
+    regressions = []
+    print(f"📐 CONFRONTO CON LA BASELINE ({baseline['environment'].get('timestamp', '?')}, "
+          f"commit {baseline['environment'].get('git_commit') or '?'}, "
+          f"tolleranza {tolerance:.0%})")
+    if baseline['environment'].get('platform') != results['environment']['platform']:
+        print("   ⚠️  Baseline registrata su un'altra macchina: confronto solo indicativo")
+    print(f"   {'corpus':14} {'stage':20} {'baseline':>10} {'attuale':>10} {'rapporto':>9}")
+    for corpus, current in results['corpora'].items():
+        reference = baseline['corpora'].get(corpus)
+        if reference is None:
+            print(f"   {corpus:14} (assente nella baseline)")
+            continue
+        for stage in STAGES:
+            old, new = reference['stages'].get(stage), current['stages'][stage]
+            if old is None:
+                continue
+            ratio = new / old if old else float('inf')
+            regressed = ratio > 1 + tolerance and new - old > MIN_REGRESSION_SECONDS
+            flag = '  ❌ regressione' if regressed else ''
+            print(f"   {corpus:14} {stage:20} {old:9.3f}s {new:9.3f}s {ratio:8.2f}x{flag}")
+            if regressed:
+                regressions.append((corpus, stage, old, new))
+    print()
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 50_000],
+                        help="Dimensioni dei corpora sintetici")
+    parser.add_argument('--no-phrasebank', action='store_true',
+                        help="Salta il corpus FinancialPhraseBank")
+    parser.add_argument('--model', default=None, help="Default: DistilBERT minuscolo locale")
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--threads', type=int, default=1)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="Rigenera la baseline con i risultati di questa esecuzione")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="Rallentamento relativo ammesso per stage")
+    parser.add_argument('--single', default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        print(json.dumps(run_corpus(args.single, args.model, args.batch_size, args.threads,
+                                    args.repeats)))
+        return 0
+
+    model_name = args.model or build_tiny_model()
+    corpora = {} if args.no_phrasebank else {'phrasebank': PHRASEBANK_DIR}
+    corpus_dir = tempfile.mkdtemp(prefix='fsa_bench_corpora_')
+    for size in args.sizes:
+        path = os.path.join(corpus_dir, f'synthetic_{size}.csv')
+        write_synthetic_csv(path, size, args.seed)
+        corpora[f'synthetic_{size}'] = path
+
+    print("=" * 70)
+    print("⏱️  BENCHMARK PIPELINE END-TO-END")
+    print("=" * 70)
+    print(f"Modello: {model_name}")
+    print(f"Thread: {args.threads}   Batch: {args.batch_size}   Ripetizioni: {args.repeats} "
+          f"(mediana)")
+    print()
+
+    results = {'environment': environment(args, model_name), 'corpora': {}}
+    header = ''.join(f"{stage[:12]:>13}" for stage in STAGES)
+    print(f"   {'corpus':18} {'righe':>8}{header} {'news/s':>9} {'RSS':>8}")
+    for name, path in corpora.items():
+        result = run_isolated(path, args, model_name)
+        results['corpora'][name] = result
+        stages = ''.join(f"{result['stages'][stage]:12.3f}s" for stage in STAGES)
+        print(f"   {name:18} {result['rows']:8,}{stages} "
+              f"{result['analyze_rows_per_second']:9.1f} {result['peak_rss_mb']:5.0f} MB")
+    print()
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"💾 Risultati: {args.output}")
+    if args.save_baseline or not os.path.exists(args.baseline):
+        # Prima esecuzione su questa macchina (o rigenerazione richiesta)
+        status = "aggiornata" if os.path.exists(args.baseline) else "creata"
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Baseline {status}: {args.baseline}")
+        print()
+        return 0
+    print()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"❌ {len(regressions)} regressioni rispetto alla baseline")
+        return 1
+    print("✅ Nessuna regressione rispetto alla baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""
+Benchmark Sentiment Service
+Avvia `sentiment_service` in locale con un DistilBERT minuscolo, invia
+richieste concorrenti e confronta micro-batch e una forward per richiesta.
+Verifica anche che i risultati coincidano con `analyzer.predict` e che la
+coda piena risponda 503 (backpressure).
+
+Uso:
+    python benchmarks/benchmark_service.py [--requests 2000] [--concurrency 64]
+                                           [--max-batch-size 32] [--max-wait-ms 5]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import time
+
+from _common import build_tiny_model, read_phrasebank_sentences
+from financial_sentiment_analyzer import FinancialSentimentAnalyzer
+from sentiment_service import SentimentService
+
+
+async def http_request(host, port, method, path, payload=None):
+    """
+    Una richiesta HTTP su una nuova connessione
+
+    Returns:
+        tuple: (status, JSON della risposta)
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    body = json.dumps(payload).encode() if payload is not None else b''
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, content = response.partition(b'\r\n\r\n')
+    return int(head.split()[1]), json.loads(content)
+
+
+async def load_test(service, sentences, n_requests, concurrency):
+    """
+    Invia `n_requests` richieste da un testo con al più `concurrency` in volo
+
+    Returns:
+        tuple: (secondi, risultati in ordine, status per richiesta)
+    """
+    host, port = service.server.sockets[0].getsockname()[:2]
+    semaphore = asyncio.Semaphore(concurrency)
+    results = [None] * n_requests
+    statuses = [None] * n_requests
+
+    async def one(i):
+        async with semaphore:
+            statuses[i], results[i] = await http_request(
+                host, port, 'POST', '/predict', {'text': sentences[i % len(sentences)]})
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(n_requests)))
+    return time.perf_counter() - start, results, statuses
+
+
+async def run_config(analyzer, sentences, args, max_batch_size, max_queue=1024):
+    service = SentimentService(analyzer, max_batch_size=max_batch_size,
+                               max_wait_ms=args.max_wait_ms, max_queue=max_queue)
+    await service.start(port=0)
+    try:
+        elapsed, results, statuses = await load_test(service, sentences, args.requests,
+                                                     args.concurrency)
+        host, port = service.server.sockets[0].getsockname()[:2]
+        _, metrics = await http_request(host, port, 'GET', '/metrics')
+    finally:
+        await service.stop()
+    return elapsed, results, statuses, metrics
+
+
+def print_metrics(title, elapsed, n_requests, metrics):
+    latency = metrics['latency']
+    print(f"   {title:28} {n_requests / elapsed:8.1f} req/s   "
+          f"p50 {latency['p50_ms']:6.1f} ms  p95 {latency['p95_ms']:6.1f} ms  "
+          f"p99 {latency['p99_ms']:6.1f} ms  batch medio {metrics['mean_batch_size']:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--max-batch-size', type=int, default=32)
+    parser.add_argument('--max-wait-ms', type=float, default=5.0)
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        analyzer = FinancialSentimentAnalyzer(None, model_name=build_tiny_model())
+    sentences = read_phrasebank_sentences()
+
+    print("=" * 70)
+    print("⏱️  BENCHMARK SENTIMENT SERVICE")
+    print("=" * 70)
+    print(f"Richieste: {args.requests:,}   Concorrenza: {args.concurrency}   "
+          f"Attesa max: {args.max_wait_ms} ms")
+    print()
+
+    # 1. Micro-batch vs una forward per richiesta
+    elapsed, results, statuses, metrics = asyncio.run(
+        run_config(analyzer, sentences, args, args.max_batch_size))
+    single_elapsed, _, _, single_metrics = asyncio.run(
+        run_config(analyzer, sentences, args, 1))
+    print_metrics(f"micro-batch (max {args.max_batch_size})", elapsed, args.requests, metrics)
+    print_metrics("una forward per richiesta", single_elapsed, args.requests, single_metrics)
+    print(f"   Istogramma batch: {metrics['batch_size_histogram']}")
+    print()
+
+    # 2. Correttezza: stessi risultati di analyzer.predict
+    expected_labels, expected_scores = analyzer.predict(
+        [sentences[i % len(sentences)] for i in range(args.requests)])
+    assert all(status == 200 for status in statuses), "richieste fallite"
+    assert [r['label'] for r in results] == expected_labels, "label diverse da predict()"
+    assert max(abs(r['score'] - s) for r, s in zip(results, expected_scores)) < 1e-5, \
+        "confidence diverse da predict()"
+    print("   ✅ Risultati identici a analyzer.predict()")
+
+    # 3. Backpressure: coda minuscola e molte richieste simultanee
+    args.concurrency = args.requests
+    _, _, statuses, metrics = asyncio.run(
+        run_config(analyzer, sentences, args, args.max_batch_size,
+                   max_queue=args.max_batch_size))
+    rejected = sum(status == 503 for status in statuses)
+    assert rejected == metrics['rejected'] and rejected > 0, "nessuna richiesta rifiutata"
+    assert all(status in (200, 503) for status in statuses)
+    print(f"   ✅ Backpressure: {rejected:,}/{args.requests:,} richieste rifiutate con 503 "
+          f"(coda da {args.max_batch_size})")
+    print()
+
+
+if __name__ == "__main__":
+    main()
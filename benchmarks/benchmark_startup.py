@@ -0,0 +1,118 @@
+"""
+Benchmark Startup
+Misura il costo di avvio in processi Python nuovi: tempo di import dei
+moduli (e quali librerie pesanti vengono caricate), creazione
+dell'analyzer, latenza della prima inferenza a freddo e dopo `warmup()`,
+latenza a regime
+
+Ogni misura gira in un sottoprocesso separato, così import e
+inizializzazioni non vengono ammortizzati tra una misura e l'altra.
+
+Uso:
+    python benchmarks/benchmark_startup.py [--model distilbert-...] [--repeats 3]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from _common import ROOT_DIR, build_tiny_model
+
+HEAVY_MODULES = ('torch', 'transformers', 'matplotlib', 'seaborn', 'pyarrow')
+
+IMPORT_SCRIPT = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed,
+                   'heavy': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+INFERENCE_SCRIPT = """
+import contextlib, io, json, sys, time
+sys.path.insert(0, {root!r})
+from financial_sentiment_analyzer import FinancialSentimentAnalyzer
+text = "Operating profit rose to EUR 13.1 mn from EUR 8.7 mn in the corresponding period"
+with contextlib.redirect_stdout(io.StringIO()):
+    start = time.perf_counter()
+    analyzer = FinancialSentimentAnalyzer(None, model_name={model!r})
+    init = time.perf_counter() - start
+    start = time.perf_counter()
+    if {warmup!r}:
+        analyzer.warmup()
+    prepare = time.perf_counter() - start
+    start = time.perf_counter()
+    analyzer.predict([text])
+    first = time.perf_counter() - start
+    steady = []
+    for _ in range(20):
+        start = time.perf_counter()
+        analyzer.predict([text])
+        steady.append(time.perf_counter() - start)
+print(json.dumps({{'init': init, 'prepare': prepare, 'first': first,
+                   'steady': sorted(steady)[len(steady) // 2]}}))
+"""
+
+
+def run_isolated(script):
+    """
+    Esegue uno script in un interprete nuovo e ne legge l'ultima riga JSON
+    """
+    output = subprocess.run([sys.executable, '-c', script], cwd=ROOT_DIR, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def median_of(runs, key):
+    return statistics.median(run[key] for run in runs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default=None, help="Default: DistilBERT minuscolo locale")
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+    model_name = args.model or build_tiny_model()
+
+    print("=" * 70)
+    print("⏱️  BENCHMARK STARTUP")
+    print("=" * 70)
+    print(f"Modello: {model_name}   Ripetizioni: {args.repeats} (mediana)")
+    print()
+
+    print("📦 IMPORT")
+    for module in ('financial_sentiment_analyzer', 'visualizations'):
+        runs = [run_isolated(IMPORT_SCRIPT.format(root=ROOT_DIR, module=module,
+                                                  heavy=HEAVY_MODULES))
+                for _ in range(args.repeats)]
+        heavy = ', '.join(runs[-1]['heavy']) or 'nessuna'
+        print(f"   {module:30} {median_of(runs, 'seconds') * 1000:8.0f} ms   "
+              f"librerie pesanti caricate: {heavy}")
+    print()
+
+    print("🚀 PRIMA INFERENZA (1 frase)")
+    print(f"   {'modalità':12} {'analyzer':>10} {'caric.+warmup':>14} {'1a inferenza':>13} "
+          f"{'a regime':>10}")
+    for label, warmup in (('a freddo', False), ('con warmup', True)):
+        runs = [run_isolated(INFERENCE_SCRIPT.format(root=ROOT_DIR, model=model_name,
+                                                     warmup=warmup))
+                for _ in range(args.repeats)]
+        print(f"   {label:12} {median_of(runs, 'init') * 1000:7.0f} ms "
+              f"{median_of(runs, 'prepare') * 1000:11.0f} ms "
+              f"{median_of(runs, 'first') * 1000:10.1f} ms "
+              f"{median_of(runs, 'steady') * 1000:7.1f} ms")
+    print()
+    print("   A freddo la prima inferenza include import di torch/transformers e "
+          "caricamento del modello;")
+    print("   con warmup() questo costo viene pagato prima, fuori dal percorso della richiesta.")
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark Streaming
+Confronta il picco di memoria (RSS) dell'analisi in memoria
+(load_data + analyze_sentiment + save CSV) con analyze_stream,
+a diverse dimensioni di input. Ogni misura gira in un processo separato.
+
+Uso:
+    python benchmarks/benchmark_streaming.py [--rows 5000 20000 80000] [--chunksize 5000]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from _common import build_tiny_model, synthetic_corpus
+
+
+def write_corpus(path, rows):
+    """
+    Scrive un CSV sintetico nel formato di `load_data`
+    """
+    texts = synthetic_corpus(rows)
+    labels = ['neutral', 'positive', 'negative']
+    pd.DataFrame({
+        'original_sentiment': [labels[i % 3] for i in range(rows)],
+        'text': texts,
+    }).to_csv(path, header=False, index=False, encoding='latin-1', errors='replace')
+
+
+def measure(mode, input_path, output_path, chunksize):
+    """
+    Esegue un'analisi nel processo corrente e stampa "secondi picco_MB"
+    """
+    from financial_sentiment_analyzer import FinancialSentimentAnalyzer
+    
+    with contextlib.redirect_stdout(io.StringIO()):
+        analyzer = FinancialSentimentAnalyzer(input_path, model_name=build_tiny_model())
+        baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        start = time.perf_counter()
+        if mode == 'stream':
+            analyzer.analyze_stream(output_path=output_path, chunksize=chunksize, max_length=128)
+        else:
+            analyzer.load_data()
+            analyzer.analyze_sentiment(max_length=128)
+            analyzer.df.to_csv(output_path, index=False)
+        elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss è in KB su Linux; crescita rispetto al modello già caricato
+    print(f"{elapsed:.3f} {(peak - baseline) / 1024:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[5000, 20000, 80000])
+    parser.add_argument('--chunksize', type=int, default=5000)
+    parser.add_argument('--measure', nargs=3, metavar=('MODE', 'INPUT', 'OUTPUT'),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.measure:
+        measure(*args.measure, args.chunksize)
+        return
+    
+    build_tiny_model()
+    print("=" * 70)
+    print("⏱️  BENCHMARK STREAMING (picco di memoria oltre il modello)")
+    print("=" * 70)
+    print(f"Chunk: {args.chunksize:,} news")
+    print()
+    print(f"   {'news':>9} {'in memoria':>22} {'streaming':>22}")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            input_path = os.path.join(tmp, f"corpus_{rows}.csv")
+            write_corpus(input_path, rows)
+            cells = []
+            for mode in ('memory', 'stream'):
+                result = subprocess.run(
+                    [sys.executable, __file__, '--chunksize', str(args.chunksize),
+                     '--measure', mode, input_path, os.path.join(tmp, f"out_{mode}.csv")],
+                    capture_output=True, text=True, check=True,
+                )
+                elapsed, peak = result.stdout.split()[-2:]
+                cells.append(f"{float(peak):8.1f} MB {float(elapsed):7.1f} s")
+            print(f"   {rows:9,} {cells[0]:>22} {cells[1]:>22}")
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark Token Store
+Confronta l'analisi di un corpus tokenizzato a ogni esecuzione con
+l'analisi che legge i token id dal token store pre-tokenizzato (memory-map):
+tempo della fase di tokenizzazione, tempo totale e dimensione dello store.
+Il costo della pre-tokenizzazione si paga una volta sola.
+
+Uso:
+    python benchmarks/benchmark_token_store.py [--model distilbert-...]
+                                               [--rows 20000] [--batch-size 64]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from _common import build_tiny_model, synthetic_corpus
+from financial_sentiment_analyzer import FinancialSentimentAnalyzer
+
+
+def run(model_name, texts, batch_size, token_store_path=None):
+    """
+    Analisi completa del corpus
+
+    Returns:
+        tuple: (secondi totali, secondi di tokenizzazione, predizioni)
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        analyzer = FinancialSentimentAnalyzer(None, model_name=model_name,
+                                              token_store_path=token_store_path)
+        analyzer.df = pd.DataFrame({'text': texts})
+        analyzer._ensure_model()
+        start = time.perf_counter()
+        results = analyzer.analyze_sentiment(batch_size=batch_size)
+    elapsed = time.perf_counter() - start
+    tokenize = sum(entry['seconds'] for path, entry in analyzer.metrics.stages.items()
+                   if path.split('/')[-1] == 'tokenize')
+    return elapsed, tokenize, results[['predicted_sentiment', 'confidence']].copy()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default=None, help="Default: DistilBERT minuscolo locale")
+    parser.add_argument('--rows', type=int, default=20_000)
+    parser.add_argument('--batch-size', type=int, default=64)
+    args = parser.parse_args()
+
+    model_name = args.model or build_tiny_model()
+    texts = synthetic_corpus(args.rows)
+
+    print("=" * 70)
+    print("⏱️  BENCHMARK TOKEN STORE")
+    print("=" * 70)
+    print(f"Modello: {model_name}")
+    print(f"News: {len(texts):,}   Batch: {args.batch_size}")
+    print()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store_path = os.path.join(tmp, 'token_store')
+        with contextlib.redirect_stdout(io.StringIO()):
+            analyzer = FinancialSentimentAnalyzer(None, model_name=model_name)
+            analyzer.df = pd.DataFrame({'text': texts})
+            store = analyzer.pretokenize(store_path)
+
+        plain = run(model_name, texts, args.batch_size)
+        stored = run(model_name, texts, args.batch_size, store_path)
+
+        print(f"   Pre-tokenizzazione (una volta): {store.meta['seconds']:.2f} s, "
+              f"{store.meta['tokens']:,} token, {store.nbytes / 1024 ** 2:.1f} MB "
+              f"({store.meta['dtype']})")
+        print()
+        print(f"   {'':22} {'tokenize':>10} {'totale':>10}")
+        print(f"   {'tokenizer a ogni run':22} {plain[1]:8.2f} s {plain[0]:8.2f} s")
+        print(f"   {'token store (mmap)':22} {stored[1]:8.2f} s {stored[0]:8.2f} s")
+        print()
+        print(f"   Predizioni identiche: {'✅' if plain[2].equals(stored[2]) else '❌'}")
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark Visualizations
+Tempo delle visualizzazioni su risultati sintetici di varie dimensioni:
+caricamento del file più calcolo degli aggregati (`ResultSummary`) e
+rendering dei tre grafici, in sequenza e in processi paralleli
+
+Il file viene letto a blocchi e il rendering usa solo gli aggregati,
+quindi memoria e tempo di rendering non dovrebbero crescere con il numero
+di righe; cresce solo il tempo di caricamento.
+
+Uso:
+    python benchmarks/benchmark_visualizations.py [--sizes 5000 500000 5000000]
+                                                  [--workers 3] [--dpi 300]
+                                                  [--violin-sample-cap 10000]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from _common import read_phrasebank_sentences
+from columnar import parquet_available, write_parquet
+from visualizations import SentimentVisualizer
+
+
+def synthetic_results(n_rows, seed=0):
+    """
+    Risultati sintetici: label sbilanciate e confidence concentrata vicino a 1
+
+    I testi sono frasi PhraseBank ripetute (stessi oggetti stringa), così
+    anche milioni di righe occupano poca memoria.
+    """
+    rng = np.random.default_rng(seed)
+    sentences = np.array(read_phrasebank_sentences(), dtype=object)
+    labels = rng.choice(['POSITIVE', 'NEGATIVE'], n_rows, p=[0.4, 0.6])
+    confidence = 1 - rng.beta(0.6, 6, n_rows) * 0.5
+    return pd.DataFrame({
+        'text': sentences[rng.integers(0, len(sentences), n_rows)],
+        'predicted_sentiment': pd.Categorical(labels),
+        'confidence': confidence.astype(np.float32),
+    })
+
+
+def write_results(df, directory):
+    """
+    Salva i risultati come farebbe `save_results` (Parquet se disponibile)
+    """
+    if parquet_available():
+        path = os.path.join(directory, 'sentiment_results.parquet')
+        write_parquet(df, path)
+    else:
+        path = os.path.join(directory, 'sentiment_results.csv')
+        df.to_csv(path, index=False)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[5_000, 500_000, 5_000_000])
+    parser.add_argument('--workers', type=int, default=3,
+                        help="Processi per il rendering parallelo")
+    parser.add_argument('--dpi', type=int, default=300)
+    parser.add_argument('--violin-sample-cap', type=int, default=None,
+                        help="Violin da un campione per label (default: dagli istogrammi)")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("⏱️  BENCHMARK VISUALIZATIONS")
+    print("=" * 70)
+    violin = (f"campione di {args.violin_sample_cap:,}" if args.violin_sample_cap
+              else "istogrammi")
+    print(f"Formato: {'Parquet' if parquet_available() else 'CSV'}   DPI: {args.dpi}   "
+          f"Core: {os.cpu_count()}   Violin: {violin}")
+    print()
+    print(f"   {'righe':>10} {'caricamento+aggregati':>22} {'rendering seq.':>15} "
+          f"{'rendering {0} proc.'.format(args.workers):>18}")
+    for size in args.sizes:
+        workdir = tempfile.mkdtemp(prefix='fsa_bench_viz_')
+        path = write_results(synthetic_results(size), workdir)
+        output_dir = os.path.join(workdir, 'visualizations')
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            visualizer = SentimentVisualizer(path, output_dir=output_dir, dpi=args.dpi,
+                                             violin_sample_cap=args.violin_sample_cap)
+            load = time.perf_counter() - start
+            timings = []
+            for workers in (1, args.workers):
+                start = time.perf_counter()
+                visualizer.generate_all_visualizations(workers=workers)
+                timings.append(time.perf_counter() - start)
+        print(f"   {size:10,} {load:21.2f}s {timings[0]:14.2f}s {timings[1]:17.2f}s")
+    print()
+    print("   Il rendering parallelo include l'avvio dei processi (import di matplotlib);")
+    print("   conviene con più core disponibili.")
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark Multi-Process Inference
+Misura le news/secondo con 1, 2, 4 e N processi worker (N = core disponibili),
+con threads-per-worker = core / workers, su un DistilBERT minuscolo locale
+
+Uso:
+    python benchmarks/benchmark_workers.py [--rows 4000] [--workers 1 2 4 8]
+                                           [--threads-per-worker 1]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import time
+
+import pandas as pd
+import torch
+
+from _common import build_tiny_model, synthetic_corpus
+from financial_sentiment_analyzer import FinancialSentimentAnalyzer
+
+
+def timed_run(analyzer, **kwargs):
+    """
+    Esegue un'analisi silenziosa e ritorna i secondi impiegati
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        analyzer.analyze_sentiment(**kwargs)
+        return time.perf_counter() - start
+
+
+def main():
+    cores = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=4000)
+    parser.add_argument('--workers', type=int, nargs='+',
+                        default=sorted({1, 2, 4, cores}))
+    parser.add_argument('--threads-per-worker', type=int, default=None,
+                        help="Default: core / workers")
+    parser.add_argument('--batch-size', type=int, default=32)
+    args = parser.parse_args()
+    
+    with contextlib.redirect_stdout(io.StringIO()):
+        analyzer = FinancialSentimentAnalyzer(None, model_name=build_tiny_model())
+    analyzer.df = pd.DataFrame({'text': synthetic_corpus(args.rows)})
+    
+    print("=" * 70)
+    print("⏱️  BENCHMARK MULTI-PROCESS INFERENCE")
+    print("=" * 70)
+    print(f"News: {args.rows:,}   Core disponibili: {cores}   Batch: {args.batch_size}")
+    print()
+    print(f"   {'workers x thread':18} {'avvio+run':>12} {'a regime':>14}")
+    
+    for workers in args.workers:
+        threads = args.threads_per_worker or max(1, cores // workers)
+        if workers == 1:
+            torch.set_num_threads(threads)
+        options = dict(batch_size=args.batch_size, workers=workers, threads_per_worker=threads)
+        
+        # Prima esecuzione: include avvio dei processi e caricamento modello
+        cold = timed_run(analyzer, **options)
+        warm = timed_run(analyzer, **options)
+        print(f"   {f'{workers} x {threads}':18} {args.rows / cold:8.1f} n/s "
+              f"{args.rows / warm:10.1f} n/s")
+        analyzer.close_pool()
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+"""
+Model Cascade
+Primo stadio economico (regressione logistica su n-grammi con hashing,
+solo numpy) che classifica le news più nette; le altre, sotto la soglia
+di confidence, passano al transformer. Statistiche di instradamento,
+accordo con il solo transformer e curva costo/accordo per soglia
+"""
+
+import re
+import zlib
+
+import numpy as np
+
+# Soglie riportate nella curva costo/accordo
+CURVE_THRESHOLDS = (0.5, 0.6, 0.7, 0.8, 0.85, 0.9, 0.95, 0.99)
+
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+
+class HashedNgramClassifier:
+    """
+    Regressione logistica multinomiale su unigrammi e bigrammi di parole
+
+    Le feature sono indirizzate con l'hashing trick (crc32, stabile tra
+    processi), quindi non serve un vocabolario: il modello è una matrice
+    `n_features x classi` e la predizione costa una somma di righe per
+    news. L'addestramento usa SGD a mini-batch con AdaGrad e penalità L2.
+    """
+
+    def __init__(self, n_features=2 ** 18, ngram_range=(1, 2), l2=1e-4, learning_rate=0.5,
+                 epochs=15, batch_size=64, seed=0):
+        """
+        Args:
+            n_features (int): Dimensione dello spazio delle feature
+            ngram_range (tuple): Lunghezza minima e massima degli n-grammi
+            l2 (float): Penalità L2 sui pesi
+            learning_rate (float): Passo iniziale di AdaGrad
+            epochs (int): Passate sui dati di training
+            batch_size (int): Esempi per aggiornamento
+            seed (int): Seed per l'ordine degli esempi
+        """
+        self.n_features = n_features
+        self.ngram_range = ngram_range
+        self.l2 = l2
+        self.learning_rate = learning_rate
+        self.epochs = epochs
+        self.batch_size = batch_size
+        self.seed = seed
+        self.classes = None
+        self.weights = None
+        self.bias = None
+
+    def _features(self, texts):
+        """
+        Matrice sparsa (CSR) delle feature: indici, valori e offset per news
+
+        Ogni news ha n-grammi distinti con valore 1, normalizzati a norma L2 unitaria.
+        """
+        low, high = self.ngram_range
+        indices, indptr = [], [0]
+        for text in texts:
+            tokens = _TOKEN.findall(text.lower()) if isinstance(text, str) else []
+            grams = {' '.join(tokens[i:i + n])
+                     for n in range(low, high + 1) for i in range(len(tokens) - n + 1)}
+            indices.extend(zlib.crc32(gram.encode()) % self.n_features for gram in grams)
+            indptr.append(len(indices))
+        indices = np.array(indices, dtype=np.int64)
+        indptr = np.array(indptr, dtype=np.int64)
+        counts = np.diff(indptr)
+        values = np.repeat(1 / np.sqrt(np.maximum(counts, 1)), counts).astype(np.float32)
+        return indices, values, indptr
+
+    def _logits(self, indices, values, indptr):
+        n_docs = len(indptr) - 1
+        logits = np.tile(self.bias, (n_docs, 1))
+        if len(indices):
+            docs = np.repeat(np.arange(n_docs), np.diff(indptr))
+            np.add.at(logits, docs, self.weights[indices] * values[:, None])
+        return logits
+
+    def fit(self, texts, labels):
+        """
+        Addestra il modello
+
+        Args:
+            texts (list): Testi di training
+            labels (list): Label (stringhe) allineate ai testi
+
+        Returns:
+            HashedNgramClassifier: Il modello stesso
+        """
+        self.classes, targets = np.unique(np.asarray(labels, dtype=object), return_inverse=True)
+        if len(self.classes) < 2:
+            raise ValueError(f"Servono almeno 2 classi per il training (trovate: "
+                             f"{list(self.classes)})")
+        indices, values, indptr = self._features(texts)
+        n_classes = len(self.classes)
+        self.weights = np.zeros((self.n_features, n_classes), dtype=np.float32)
+        self.bias = np.zeros(n_classes, dtype=np.float32)
+        grad_sq_w = np.full((self.n_features, n_classes), 1e-8, dtype=np.float32)
+        grad_sq_b = np.full(n_classes, 1e-8, dtype=np.float32)
+        rng = np.random.default_rng(self.seed)
+
+        for _ in range(self.epochs):
+            for batch in np.array_split(rng.permutation(len(targets)),
+                                        max(1, len(targets) // self.batch_size)):
+                # Righe CSR del mini-batch
+                starts, ends = indptr[batch], indptr[batch + 1]
+                lengths = ends - starts
+                positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + \
+                    np.arange(lengths.sum())
+                batch_indices, batch_values = indices[positions], values[positions]
+                batch_indptr = np.concatenate([[0], np.cumsum(lengths)])
+
+                probs = _softmax(self._logits(batch_indices, batch_values, batch_indptr))
+                probs[np.arange(len(batch)), targets[batch]] -= 1
+                probs /= len(batch)
+                docs = np.repeat(np.arange(len(batch)), lengths)
+
+                # Gradiente solo sulle righe delle feature presenti nel batch
+                rows, inverse = np.unique(batch_indices, return_inverse=True)
+                grad_w = np.zeros((len(rows), n_classes), dtype=np.float32)
+                np.add.at(grad_w, inverse, probs[docs] * batch_values[:, None])
+                grad_w += self.l2 * self.weights[rows]
+                grad_b = probs.sum(axis=0)
+
+                grad_sq_w[rows] += grad_w ** 2
+                grad_sq_b += grad_b ** 2
+                self.weights[rows] -= self.learning_rate * grad_w / np.sqrt(grad_sq_w[rows])
+                self.bias -= self.learning_rate * grad_b / np.sqrt(grad_sq_b)
+        return self
+
+    def predict_proba(self, texts):
+        """
+        Probabilità per classe (colonne nell'ordine di `classes`)
+        """
+        if self.weights is None:
+            raise RuntimeError("Modello non addestrato: chiama fit() o load()")
+        return _softmax(self._logits(*self._features(texts)))
+
+    def predict(self, texts):
+        """
+        Label e confidence (probabilità della classe scelta)
+
+        Returns:
+            tuple: (label, confidence) come array
+        """
+        probs = self.predict_proba(texts)
+        return self.classes[probs.argmax(axis=1)], probs.max(axis=1)
+
+    def save(self, path):
+        """
+        Salva il modello in un file .npz
+        """
+        np.savez_compressed(path, weights=self.weights, bias=self.bias,
+                            classes=np.asarray(self.classes, dtype=str),
+                            ngram_range=np.asarray(self.ngram_range))
+
+    @classmethod
+    def load(cls, path):
+        """
+        Carica un modello salvato con `save`
+        """
+        with np.load(path) as data:
+            model = cls(n_features=data['weights'].shape[0],
+                        ngram_range=tuple(int(n) for n in data['ngram_range']))
+            model.weights = data['weights']
+            model.bias = data['bias']
+            model.classes = data['classes'].astype(object)
+        return model
+
+
+def _softmax(logits):
+    shifted = np.exp(logits - logits.max(axis=1, keepdims=True))
+    return shifted / shifted.sum(axis=1, keepdims=True)
+
+
+def audit_mask(texts, rate):
+    """
+    Campione di controllo deterministico: True per circa `rate` dei testi
+
+    La scelta dipende solo dal testo (crc32), quindi è la stessa tra
+    esecuzioni, chunk, blocchi di checkpoint e processi.
+    """
+    if not rate:
+        return np.zeros(len(texts), dtype=bool)
+    limit = rate * 2 ** 32
+    return np.array([zlib.crc32(text.encode()) < limit for text in texts], dtype=bool)
+
+
+def cascade_stats(confidences, accepted, audited, agreed, threshold, audit_rate,
+                  first_stage_seconds=0.0, transformer_seconds=0.0):
+    """
+    Statistiche di un'esecuzione in cascata (sommabili tra chunk)
+
+    L'accordo con il solo transformer è noto per le news sotto soglia
+    (mandate al transformer) e per il campione di controllo (`audited`)
+    di quelle accettate dal primo stadio, che pesa 1/`audit_rate`: con le
+    stesse informazioni si stima l'accordo anche per altre soglie.
+
+    Args:
+        confidences (np.ndarray): Confidence del primo stadio per testo
+        accepted (np.ndarray): True per i testi con confidence >= soglia
+        audited (np.ndarray): True per i testi accettati ma controllati
+            anche con il transformer
+        agreed (np.ndarray): Stessa label nei due stadi (valido per i testi
+            passati dal transformer)
+        threshold (float): Soglia usata
+        audit_rate (float): Frazione dei testi accettati controllata
+        first_stage_seconds (float): Tempo del primo stadio
+        transformer_seconds (float): Tempo del transformer
+
+    Returns:
+        dict: Conteggi per stadio, tempi e contatori della curva
+    """
+    compared = ~accepted | audited
+    weights = np.where(audited, 1 / audit_rate if audit_rate else 0.0, 1.0)
+    curve = {}
+    for t in CURVE_THRESHOLDS:
+        sample = (confidences >= t) & compared
+        curve[t] = {'accepted': int((confidences >= t).sum()),
+                    'compared': float(weights[sample].sum()),
+                    'agreed': float(weights[sample & agreed].sum())}
+    return {
+        'threshold': threshold,
+        'audit_rate': audit_rate,
+        'texts': int(len(confidences)),
+        'first_stage': int((accepted & ~audited).sum()),
+        'transformer': int(compared.sum()),
+        'audited': int(audited.sum()),
+        'audit_agreed': int((audited & agreed).sum()),
+        'first_stage_seconds': first_stage_seconds,
+        'transformer_seconds': transformer_seconds,
+        'curve': curve,
+    }
+
+
+def merge_cascade_stats(stats_list):
+    """
+    Combina le statistiche di cascata di più chunk o blocchi
+    """
+    stats_list = [stats for stats in stats_list if stats]
+    if not stats_list:
+        return None
+    merged = dict(stats_list[0], curve={})
+    for field in ('texts', 'first_stage', 'transformer', 'audited', 'audit_agreed',
+                  'first_stage_seconds', 'transformer_seconds'):
+        merged[field] = sum(stats[field] for stats in stats_list)
+    for t in CURVE_THRESHOLDS:
+        merged['curve'][t] = {field: sum(stats['curve'][t][field] for stats in stats_list)
+                              for field in ('accepted', 'compared', 'agreed')}
+    return merged
+
+
+def cascade_summary(stats):
+    """
+    Frazioni per stadio, speedup e accordo stimati, curva per soglia
+
+    Lo speedup confronta il tempo della cascata con quello stimato del
+    solo transformer (tempo medio per testo x tutti i testi). L'accordo
+    con il solo transformer è 1 per i testi passati dal transformer e
+    quello del campione di controllo per gli altri (None senza campione).
+    Nella curva il costo non include il campione di controllo.
+
+    Returns:
+        dict: 'first_stage_fraction', 'transformer_fraction', 'speedup',
+            'agreement' e 'curve' (lista di dict per soglia)
+    """
+    texts = stats['texts']
+    per_text = stats['transformer_seconds'] / stats['transformer'] if stats['transformer'] else None
+    first_per_text = stats['first_stage_seconds'] / texts if texts else 0.0
+
+    def speedup(transformer_texts):
+        if per_text is None or not texts:
+            return None
+        cost = stats['first_stage_seconds'] + transformer_texts * per_text
+        return texts * per_text / cost if cost else None
+
+    if stats['audited']:
+        agreement = (stats['transformer'] + stats['first_stage'] * stats['audit_agreed']
+                     / stats['audited']) / texts
+    else:
+        agreement = 1.0 if not stats['first_stage'] else None
+
+    curve = []
+    for t, point in stats['curve'].items():
+        accepted = point['accepted']
+        accepted_agreement = (min(point['agreed'] / point['compared'], 1.0)
+                              if point['compared'] else None)
+        curve.append({
+            'threshold': t,
+            'transformer_fraction': (texts - accepted) / texts if texts else 0.0,
+            'speedup': speedup(texts - accepted),
+            'agreement': ((texts - accepted + accepted * accepted_agreement) / texts
+                          if texts and accepted_agreement is not None else
+                          (1.0 if texts and not accepted else None)),
+        })
+    return {
+        'first_stage_fraction': stats['first_stage'] / texts if texts else 0.0,
+        'transformer_fraction': stats['transformer'] / texts if texts else 0.0,
+        'speedup': speedup(stats['transformer']),
+        'first_stage_ms_per_text': first_per_text * 1000,
+        'agreement': agreement,
+        'curve': curve,
+    }
@@ -0,0 +1,143 @@
+"""
+Run Checkpoint
+File di checkpoint append-only per riprendere un'analisi interrotta:
+ogni riga registra un intervallo di news completato con i suoi risultati
+"""
+
+import json
+import os
+import zlib
+
+
+class RunCheckpoint:
+    """
+    Checkpoint di un'analisi su file JSON Lines, solo in append
+
+    La prima riga identifica l'analisi (dataset, modello, parametri);
+    le righe successive contengono intervalli [start, end) completati.
+    Ogni record ha un CRC32: una riga scritta a metà (crash, OOM, Ctrl-C)
+    o corrotta viene scartata insieme a tutto ciò che la segue.
+    """
+
+    def __init__(self, path, fingerprint, total_rows):
+        """
+        Args:
+            path (str): File di checkpoint
+            fingerprint (str): Impronta di dataset, modello e parametri
+            total_rows (int): Numero di news dell'analisi
+        """
+        self.path = path
+        self.fingerprint = fingerprint
+        self.total_rows = total_rows
+
+    def start(self, resume=False):
+        """
+        Prepara il checkpoint e ritorna gli intervalli già completati
+
+        Args:
+            resume (bool): Riprende un checkpoint esistente; se False (o se
+                il checkpoint appartiene a un'altra analisi) riparte da zero
+
+        Returns:
+            list: Tuple (start, end, labels, scores) già completate
+        """
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        if resume and os.path.exists(self.path):
+            header, ranges, valid_bytes = self._read()
+            if header == self._header():
+                # Elimina l'eventuale coda parziale prima di riprendere ad appendere
+                with open(self.path, 'r+b') as f:
+                    f.truncate(valid_bytes)
+                return ranges
+            print("   ⚠️  Checkpoint di un'altra analisi (dataset, modello o parametri "
+                  "diversi): si riparte da zero")
+
+        with open(self.path, 'wb') as f:
+            f.write(self._encode(self._header()))
+            f.flush()
+            os.fsync(f.fileno())
+        return []
+
+    def append(self, start, end, labels, scores):
+        """
+        Registra un intervallo completato (scrittura atomica di una riga)
+
+        Args:
+            start (int): Prima news dell'intervallo
+            end (int): News successiva all'ultima
+            labels (list): Label predette
+            scores (list): Confidence
+        """
+        record = {
+            'type': 'range',
+            'start': int(start),
+            'end': int(end),
+            'labels': [str(label) for label in labels],
+            'scores': [float(score) for score in scores],
+        }
+        with open(self.path, 'ab') as f:
+            f.write(self._encode(record))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _header(self):
+        return {'type': 'header', 'fingerprint': self.fingerprint, 'rows': self.total_rows}
+
+    @staticmethod
+    def _encode(record):
+        """
+        Serializza un record come riga JSON con CRC32
+        """
+        payload = json.dumps(record, separators=(',', ':'), sort_keys=True)
+        crc = zlib.crc32(payload.encode('utf-8'))
+        return (json.dumps({'crc': crc, 'data': record}, separators=(',', ':')) + '\n').encode('utf-8')
+
+    @staticmethod
+    def _decode(line):
+        """
+        Ritorna il record di una riga, o None se la riga è incompleta o corrotta
+        """
+        if not line.endswith(b'\n'):
+            return None
+        try:
+            wrapper = json.loads(line)
+            record = wrapper['data']
+            payload = json.dumps(record, separators=(',', ':'), sort_keys=True)
+            if zlib.crc32(payload.encode('utf-8')) != wrapper['crc']:
+                return None
+        except (ValueError, KeyError, TypeError):
+            return None
+        return record
+
+    def _read(self):
+        """
+        Legge il checkpoint fino al primo record non valido
+
+        Returns:
+            tuple: (header, intervalli validi, byte validi dall'inizio del file)
+        """
+        header = None
+        ranges = []
+        valid_bytes = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                record = self._decode(line)
+                if record is None:
+                    break
+                if header is None:
+                    if record.get('type') != 'header':
+                        break
+                    header = record
+                elif (record.get('type') != 'range'
+                      or not 0 <= record['start'] < record['end'] <= self.total_rows
+                      or len(record['labels']) != record['end'] - record['start']
+                      or len(record['scores']) != record['end'] - record['start']):
+                    break
+                else:
+                    ranges.append((record['start'], record['end'],
+                                   record['labels'], record['scores']))
+                valid_bytes += len(line)
+        return header, ranges, valid_bytes
@@ -0,0 +1,229 @@
+"""
+Columnar Results
+Salvataggio dei risultati in Parquet con tipi compatti (label categoriche,
+confidence float32), scrittura a row group e lettura con proiezione delle
+colonne, anche a blocchi
+"""
+
+import os
+
+import pandas as pd
+
+# pyarrow è opzionale (senza, si usa solo il CSV) e viene importato al primo uso
+pa = None
+pq = None
+_PYARROW_CHECKED = False
+
+# Colonne di appoggio create per i confronti, da non salvare
+HELPER_COLUMNS = ('original_lower', 'predicted_lower')
+
+# Colonne con pochi valori distinti, salvate come dizionario
+CATEGORICAL_COLUMNS = ('original_sentiment', 'predicted_sentiment')
+
+DEFAULT_ROW_GROUP_SIZE = 100_000
+
+
+def parquet_available():
+    """
+    True se pyarrow è installato (e importabile)
+    """
+    global pa, pq, _PYARROW_CHECKED
+    if not _PYARROW_CHECKED:
+        _PYARROW_CHECKED = True
+        try:
+            import pyarrow
+            import pyarrow.parquet
+            pa, pq = pyarrow, pyarrow.parquet
+        except ImportError:
+            pass
+    return pq is not None
+
+
+def _require_pyarrow():
+    if not parquet_available():
+        raise ImportError("Il formato Parquet richiede pyarrow: pip install pyarrow")
+
+
+def compact_results(df):
+    """
+    Copia dei risultati con tipi compatti e senza colonne di appoggio
+
+    Args:
+        df (pd.DataFrame): Risultati dell'analisi
+
+    Returns:
+        pd.DataFrame: Label categoriche e confidence float32
+    """
+    df = df.drop(columns=[column for column in HELPER_COLUMNS if column in df])
+    for column in CATEGORICAL_COLUMNS:
+        if column in df and not isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].astype('category')
+    if 'confidence' in df:
+        df['confidence'] = df['confidence'].astype('float32')
+    return df
+
+
+class ParquetResultWriter:
+    """
+    Scrive i risultati in un file Parquet un blocco alla volta
+
+    Ogni blocco diventa uno o più row group, quindi la memoria usata non
+    dipende dalla dimensione totale. Lo schema è fissato dal primo blocco:
+    le label sono colonne dizionario, indipendentemente dalle categorie
+    presenti in ciascun blocco.
+    """
+
+    def __init__(self, path, row_group_size=DEFAULT_ROW_GROUP_SIZE):
+        """
+        Args:
+            path (str): File Parquet (sovrascritto)
+            row_group_size (int): Righe massime per row group
+        """
+        _require_pyarrow()
+        if row_group_size < 1:
+            raise ValueError(f"row_group_size deve essere >= 1 (ricevuto {row_group_size})")
+        self.path = path
+        self.row_group_size = row_group_size
+        self.rows = 0
+        self._writer = None
+        self._schema = None
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def write(self, chunk):
+        """
+        Aggiunge un blocco di risultati
+
+        Args:
+            chunk (pd.DataFrame): Risultati (vengono compattati prima della scrittura)
+        """
+        chunk = compact_results(chunk)
+        if self._writer is None:
+            self._schema = self._build_schema(chunk)
+            self._writer = pq.ParquetWriter(self.path, self._schema, compression='zstd')
+        table = pa.Table.from_pandas(chunk, schema=self._schema, preserve_index=False)
+        self._writer.write_table(table, row_group_size=self.row_group_size)
+        self.rows += len(chunk)
+
+    @staticmethod
+    def _build_schema(chunk):
+        """
+        Schema dal primo blocco, con indici dizionario di ampiezza fissa
+        """
+        schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+        for i, field in enumerate(schema):
+            if pa.types.is_dictionary(field.type):
+                schema = schema.set(i, field.with_type(pa.dictionary(pa.int32(), pa.string())))
+        return schema
+
+    def close(self):
+        """
+        Chiude il file (scrive un file vuoto con schema minimo se non è arrivato nulla)
+        """
+        if self._writer is None:
+            empty = compact_results(pd.DataFrame({'predicted_sentiment': pd.Series(dtype=str),
+                                                  'confidence': pd.Series(dtype=float)}))
+            self._schema = self._build_schema(empty)
+            self._writer = pq.ParquetWriter(self.path, self._schema, compression='zstd')
+        self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def write_parquet(df, path, row_group_size=DEFAULT_ROW_GROUP_SIZE):
+    """
+    Salva un DataFrame di risultati in Parquet a row group
+
+    Args:
+        df (pd.DataFrame): Risultati
+        path (str): File di output
+        row_group_size (int): Righe per row group (scritte un blocco alla volta)
+    """
+    with ParquetResultWriter(path, row_group_size) as writer:
+        for start in range(0, len(df), row_group_size):
+            writer.write(df.iloc[start:start + row_group_size])
+
+
+def append_parquet(chunks, path, row_group_size=DEFAULT_ROW_GROUP_SIZE):
+    """
+    Generatore: scrive i chunk in un file Parquet man mano che arrivano
+
+    Equivalente di `streaming.append_csv`; il file viene chiuso quando i
+    chunk finiscono.
+
+    Args:
+        chunks (iterable): DataFrame da scrivere
+        path (str): File Parquet di output
+        row_group_size (int): Righe massime per row group
+
+    Yields:
+        pd.DataFrame: Gli stessi chunk, dopo la scrittura
+    """
+    with ParquetResultWriter(path, row_group_size) as writer:
+        for chunk in chunks:
+            writer.write(chunk)
+            yield chunk
+
+
+def is_parquet_path(path):
+    """
+    True se il percorso ha estensione Parquet
+    """
+    return str(path).lower().endswith(('.parquet', '.pq'))
+
+
+def read_results(path, columns=None):
+    """
+    Legge un file di risultati (Parquet o CSV) caricando solo le colonne richieste
+
+    Con Parquet le colonne non richieste non vengono nemmeno lette dal disco.
+
+    Args:
+        path (str): File Parquet o CSV
+        columns (list, optional): Colonne da caricare (default: tutte)
+
+    Returns:
+        pd.DataFrame: Risultati con tipi compatti
+    """
+    if is_parquet_path(path):
+        _require_pyarrow()
+        df = pd.read_parquet(path, columns=list(columns) if columns else None)
+    else:
+        df = pd.read_csv(path, usecols=list(columns) if columns else None)
+    return compact_results(df)
+
+
+def iter_results(path, columns=None, chunksize=DEFAULT_ROW_GROUP_SIZE):
+    """
+    Legge un file di risultati (Parquet o CSV) a blocchi, con tipi compatti
+
+    In memoria c'è un blocco alla volta, qualunque sia la dimensione del
+    file. L'indice di ogni blocco è la posizione delle righe nel file.
+
+    Args:
+        path (str): File Parquet o CSV
+        columns (list, optional): Colonne da caricare (default: tutte)
+        chunksize (int): Righe per blocco
+
+    Yields:
+        pd.DataFrame: Un blocco alla volta
+    """
+    if is_parquet_path(path):
+        _require_pyarrow()
+        parquet_file = pq.ParquetFile(path)
+        chunks = (batch.to_pandas() for batch in parquet_file.iter_batches(
+            batch_size=chunksize, columns=list(columns) if columns else None))
+    else:
+        chunks = pd.read_csv(path, usecols=list(columns) if columns else None,
+                             chunksize=chunksize)
+    offset = 0
+    for chunk in chunks:
+        chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+        offset += len(chunk)
+        yield compact_results(chunk)
@@ -0,0 +1,156 @@
+"""
+Fixture comuni dei test automatici
+I test girano offline: il modello è il DistilBERT minuscolo dei benchmark,
+creato in locale alla prima esecuzione (vedi benchmarks/_common.py)
+"""
+
+import asyncio
+import contextlib
+import io
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks._common import build_tiny_model, read_phrasebank_sentences
+
+# Script da lanciare a mano (scaricano il modello reale), non test pytest
+collect_ignore = ['test_install.py', 'test_sentiment.py']
+
+
+@pytest.fixture(scope='session')
+def tiny_model():
+    """
+    Percorso del DistilBERT minuscolo (pesi casuali, vocabolario PhraseBank)
+    """
+    return build_tiny_model()
+
+
+@pytest.fixture(scope='session')
+def sentences():
+    """
+    Frasi di FinancialPhraseBank (senza label)
+    """
+    return read_phrasebank_sentences()
+
+
+@pytest.fixture
+def quiet():
+    """
+    Esegue una funzione senza stampare nulla
+
+    Returns:
+        callable: fn, *args, **kwargs -> (risultato, testo stampato)
+    """
+    def run(fn, *args, **kwargs):
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            result = fn(*args, **kwargs)
+        return result, output.getvalue()
+    return run
+
+
+@pytest.fixture
+def make_analyzer(tiny_model, quiet):
+    """
+    Crea un analyzer sul modello minuscolo, con le news date come dataset
+
+    Returns:
+        callable: texts=None, **options -> FinancialSentimentAnalyzer
+    """
+    from financial_sentiment_analyzer import FinancialSentimentAnalyzer
+
+    def make(texts=None, **options):
+        analyzer, _ = quiet(FinancialSentimentAnalyzer, None, model_name=tiny_model, **options)
+        if texts is not None:
+            analyzer.df = pd.DataFrame({'text': list(texts)})
+        return analyzer
+    return make
+
+
+@pytest.fixture
+def results_frame():
+    """
+    Risultati sintetici di un'analisi, senza passare dal modello
+
+    Label predette in maiuscolo e originali in minuscolo (come in output
+    dal modello e nel dataset); confidence arrotondate, quindi con molti
+    pari merito.
+
+    Returns:
+        callable: rows=5_000, seed=0 -> pd.DataFrame
+    """
+    labels = np.array(['POSITIVE', 'NEGATIVE', 'NEUTRAL'])
+
+    def make(rows=5_000, seed=0):
+        rng = np.random.default_rng(seed)
+        predicted = labels[rng.choice(3, rows, p=[0.5, 0.3, 0.2])]
+        confidence = np.round(rng.uniform(0.5, 1.0, rows), 3).astype(np.float32)
+        original = np.where(rng.random(rows) < 0.7, predicted, labels[rng.choice(3, rows)])
+        return pd.DataFrame({
+            'text': [f"news {i}" for i in range(rows)],
+            'original_sentiment': np.char.lower(original.astype(str)),
+            'predicted_sentiment': predicted,
+            'confidence': confidence,
+        })
+    return make
+
+
+@pytest.fixture
+def assert_same_summary():
+    """
+    Confronta due ResultSummary campo per campo
+
+    Returns:
+        callable: actual, expected -> None (AssertionError se diversi)
+    """
+    def check(actual, expected):
+        assert actual.rows == expected.rows
+        assert actual.counts == expected.counts
+        assert actual.confidence_sum == pytest.approx(expected.confidence_sum)
+        assert actual.confidence_sum_sq == pytest.approx(expected.confidence_sum_sq)
+        assert actual.confidence_min == expected.confidence_min
+        assert actual.confidence_max == expected.confidence_max
+        np.testing.assert_array_equal(actual.histogram, expected.histogram)
+        assert set(actual.class_histograms) == set(expected.class_histograms)
+        for label in expected.class_histograms:
+            np.testing.assert_array_equal(actual.class_histograms[label],
+                                          expected.class_histograms[label])
+            assert actual.class_sum[label] == pytest.approx(expected.class_sum[label])
+            assert actual.class_sum_sq[label] == pytest.approx(expected.class_sum_sq[label])
+            assert actual.class_min[label] == expected.class_min[label]
+            assert actual.class_max[label] == expected.class_max[label]
+        assert set(actual.samples) == set(expected.samples)
+        for label, (keys, values) in expected.samples.items():
+            order, expected_order = np.argsort(actual.samples[label][0]), np.argsort(keys)
+            np.testing.assert_array_equal(actual.samples[label][0][order], keys[expected_order])
+            np.testing.assert_array_equal(actual.samples[label][1][order],
+                                          values[expected_order])
+        assert actual.compared == expected.compared
+        assert actual.confusion == expected.confusion
+        assert actual.top == expected.top
+        assert actual.examples == expected.examples
+        for q in (0.05, 0.5, 0.95):
+            assert actual.quantile(q) == expected.quantile(q)
+    return check
+
+
+@pytest.fixture
+def http_request():
+    """
+    Client HTTP minimo per i test del servizio (una connessione per richiesta)
+
+    Returns:
+        coroutine function: host, port, method, path, payload=None -> (status, JSON)
+    """
+    async def request(host, port, method, path, payload=None):
+        reader, writer = await asyncio.open_connection(host, port)
+        body = json.dumps(payload).encode() if payload is not None else b''
+        writer.write(f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n"
+                     f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        head, _, content = response.partition(b'\r\n\r\n')
+        return int(head.split()[1]), json.loads(content)
+    return request
@@ -0,0 +1,400 @@
+"""
+Corpus Profile
+Profilo di un dataset di news calcolato in un solo passaggio a blocchi:
+distribuzione delle classi, valori mancanti, statistiche e quantili della
+lunghezza, parole più frequenti (heavy hitters a memoria limitata) e
+campioni casuali per classe. La memoria non dipende dalla dimensione del
+corpus e i profili di più shard si combinano con `merge`
+"""
+
+import itertools
+import re
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+# Lunghezze (in caratteri) contate esattamente; oltre, bin logaritmici
+# con errore relativo al più LENGTH_GAMMA - 1 (1%)
+EXACT_LENGTHS = 65_536
+LENGTH_GAMMA = 1.01
+LENGTH_LOG_BINS = 2_048
+
+# Parole contate nel report di esplorazione: minuscole, almeno 5 lettere
+WORD_PATTERN = r'\b[a-z]{5,}\b'
+
+# Righe lette per blocco dagli script
+DEFAULT_CHUNKSIZE = 100_000
+
+
+class HeavyHitters:
+    """
+    Conteggi approssimati delle parole più frequenti (Misra-Gries)
+
+    Conserva al più `capacity` contatori: quando sono di più, tutti i
+    contatori vengono ridotti del (capacity + 1)-esimo conteggio e quelli
+    non positivi eliminati. Ogni conteggio è sottostimato al più di
+    `error` (<= parole totali / (capacity + 1)); con un vocabolario che sta
+    nella capacità i conteggi sono esatti (`error` = 0). Due riepiloghi
+    si combinano con `merge` mantenendo la stessa garanzia.
+    """
+
+    def __init__(self, capacity=10_000):
+        """
+        Args:
+            capacity (int): Contatori massimi conservati
+        """
+        if capacity < 1:
+            raise ValueError(f"capacity deve essere >= 1 (ricevuto {capacity})")
+        self.capacity = capacity
+        self.counts = pd.Series(dtype=np.int64)
+        self.total = 0
+        self.error = 0
+
+    def update(self, counts):
+        """
+        Aggiunge conteggi esatti di un blocco
+
+        Args:
+            counts (pd.Series): Parola -> occorrenze nel blocco
+        """
+        if len(counts) == 0:
+            return
+        self.total += int(counts.sum())
+        merged = self.counts.add(counts, fill_value=0) if len(self.counts) else counts
+        self._set(merged)
+
+    def merge(self, other):
+        """
+        Aggiunge un altro riepilogo (es. di un altro shard)
+
+        Returns:
+            HeavyHitters: self
+        """
+        self.total += other.total
+        self.error += other.error
+        if len(other.counts):
+            self._set(self.counts.add(other.counts, fill_value=0))
+        return self
+
+    def _set(self, counts):
+        counts = counts.astype(np.int64)
+        if len(counts) > self.capacity:
+            threshold = int(counts.nlargest(self.capacity + 1).iloc[-1])
+            counts = counts[counts > threshold] - threshold
+            self.error += threshold
+        self.counts = counts
+
+    def most_common(self, n=10):
+        """
+        Le n parole con conteggio più alto (a pari conteggio, in ordine alfabetico)
+
+        Returns:
+            list: Coppie (parola, conteggio)
+        """
+        counts = self.counts.sort_index(kind='stable').sort_values(ascending=False,
+                                                                    kind='stable')
+        return [(word, int(count)) for word, count in counts.head(n).items()]
+
+
+class CorpusProfile:
+    """
+    Statistiche di esplorazione di un corpus, aggiornate un blocco alla volta
+
+    Per ogni blocco: conteggi per classe e valori mancanti per colonna,
+    istogramma delle lunghezze del testo (da cui media, minimo, massimo e
+    quantili), conteggi delle parole nel blocco passati a `HeavyHitters`
+    e, per ogni classe, le righe con le chiavi pseudo-casuali minori
+    (reservoir di dimensione fissa, indipendente da come il corpus è
+    diviso in blocchi o shard).
+    """
+
+    def __init__(self, text_column='text', label_column='sentiment', samples_per_class=3,
+                 word_capacity=10_000, word_pattern=WORD_PATTERN, head_rows=5, seed=0):
+        """
+        Args:
+            text_column (str): Colonna del testo
+            label_column (str, optional): Colonna della classe (None = nessuna)
+            samples_per_class (int): Esempi casuali conservati per classe
+            word_capacity (int): Contatori massimi delle parole frequenti
+            word_pattern (str): Regex delle parole contate (sul testo minuscolo)
+            head_rows (int): Prime righe conservate come anteprima
+            seed (int): Seme dei campioni per classe
+        """
+        self.text_column = text_column
+        self.label_column = label_column
+        self.samples_per_class = samples_per_class
+        self.word_pattern = re.compile(word_pattern)
+        self.head_rows = head_rows
+        self.seed = seed
+        self.rows = 0
+        self.columns = []
+        self.memory_bytes = 0
+        self.head = None
+        self.class_counts = {}
+        self.missing = {}
+        self.texts = 0
+        self.length_sum = 0
+        self.length_min = None
+        self.length_max = None
+        self.length_histogram = np.zeros(EXACT_LENGTHS + LENGTH_LOG_BINS, dtype=np.int64)
+        self.words = HeavyHitters(word_capacity)
+        # Per classe: (chiavi, testi) delle righe con le chiavi minori
+        self.samples = {}
+
+    def update(self, chunk):
+        """
+        Aggiunge un blocco di righe (le righe devono seguire quelle già viste)
+
+        Args:
+            chunk (pd.DataFrame): Blocco del corpus; l'indice identifica le
+                righe (per il campione), come quello di `pd.read_csv(chunksize=...)`
+        """
+        if not self.columns:
+            self.columns = list(chunk.columns)
+        self._update_head(chunk.head(self.head_rows))
+        self.memory_bytes += int(chunk.memory_usage(deep=True).sum())
+        for column, count in chunk.isnull().sum().items():
+            self.missing[column] = self.missing.get(column, 0) + int(count)
+
+        # Funzioni sulle stringhe invece dell'accessor .str: nessun oggetto
+        # intermedio per riga che resti in memoria tra un blocco e l'altro
+        texts = chunk[self.text_column]
+        present = texts.notna().to_numpy()
+        values = texts.to_numpy()[present]
+        self._update_lengths(np.fromiter(map(len, values), dtype=np.int64, count=len(values)))
+        # Conteggi del blocco senza materializzare la lista delle parole
+        words = itertools.chain.from_iterable(self.word_pattern.findall(text.lower())
+                                              for text in values)
+        self.words.update(pd.Series(Counter(words), dtype=np.int64))
+
+        if self.label_column is not None:
+            labels = chunk[self.label_column]
+            for label, count in labels.value_counts(sort=False).items():
+                self.class_counts[label] = self.class_counts.get(label, 0) + int(count)
+            if self.samples_per_class:
+                self._update_samples(chunk.index, labels.to_numpy(), texts.to_numpy(), present)
+        self.rows += len(chunk)
+
+    def _update_head(self, head):
+        if self.head is None:
+            self.head = head
+        elif len(self.head) < self.head_rows:
+            self.head = pd.concat([self.head, head]).head(self.head_rows)
+
+    def _update_lengths(self, lengths):
+        if len(lengths) == 0:
+            return
+        self.texts += len(lengths)
+        self.length_sum += int(lengths.sum())
+        low, high = int(lengths.min()), int(lengths.max())
+        self.length_min = low if self.length_min is None else min(self.length_min, low)
+        self.length_max = high if self.length_max is None else max(self.length_max, high)
+        self.length_histogram += np.bincount(_length_bins(lengths),
+                                             minlength=len(self.length_histogram))
+
+    def _update_samples(self, index, labels, texts, present):
+        # Chiavi pseudo-casuali dall'indice delle righe: stesso campione con
+        # qualunque divisione in blocchi o shard
+        keys = pd.util.hash_array(index.to_numpy(), hash_key=f'{self.seed:016d}'[-16:])
+        valid = present & pd.notna(labels)
+        codes, uniques = pd.factorize(labels[valid], sort=False)
+        keys, texts = keys[valid], texts[valid]
+        for code, label in enumerate(uniques):
+            rows = codes == code
+            self._add_samples(label, keys[rows], texts[rows])
+
+    def _add_samples(self, label, keys, texts):
+        if label in self.samples:
+            keys = np.concatenate([self.samples[label][0], keys])
+            texts = np.concatenate([self.samples[label][1], texts])
+        order = np.argsort(keys, kind='stable')[:self.samples_per_class]
+        self.samples[label] = (keys[order], texts[order])
+
+    def merge(self, other):
+        """
+        Aggiunge il profilo di uno shard successivo
+
+        Returns:
+            CorpusProfile: self
+        """
+        self.rows += other.rows
+        self.columns = self.columns or other.columns
+        self.memory_bytes += other.memory_bytes
+        if other.head is not None:
+            self._update_head(other.head)
+        for column, count in other.missing.items():
+            self.missing[column] = self.missing.get(column, 0) + count
+        for label, count in other.class_counts.items():
+            self.class_counts[label] = self.class_counts.get(label, 0) + count
+        self.texts += other.texts
+        self.length_sum += other.length_sum
+        for bound, pick in (('length_min', min), ('length_max', max)):
+            values = [v for v in (getattr(self, bound), getattr(other, bound)) if v is not None]
+            setattr(self, bound, pick(values) if values else None)
+        self.length_histogram += other.length_histogram
+        self.words.merge(other.words)
+        for label, (keys, texts) in other.samples.items():
+            self._add_samples(label, keys, texts)
+        return self
+
+    # ------------------------------------------------------------------
+    # Metriche derivate
+    # ------------------------------------------------------------------
+
+    @property
+    def length_mean(self):
+        return self.length_sum / self.texts if self.texts else 0.0
+
+    def length_quantile(self, q):
+        """
+        Quantile della lunghezza del testo (interpolazione lineare come pandas)
+
+        Esatto per testi sotto EXACT_LENGTHS caratteri, altrimenti con
+        errore relativo al più dell'1%.
+        """
+        if not self.texts:
+            return 0.0
+        cumulative = np.cumsum(self.length_histogram)
+        position = q * (self.texts - 1)
+        below, above = int(np.floor(position)), int(np.ceil(position))
+        low, high = (_length_value(int(np.searchsorted(cumulative, rank, side='right')))
+                     for rank in (below, above))
+        value = low + (high - low) * (position - below)
+        return float(min(max(value, self.length_min), self.length_max))
+
+    @property
+    def length_median(self):
+        return self.length_quantile(0.5)
+
+    def sorted_class_counts(self):
+        """
+        Conteggi per classe, dalla più frequente (come `value_counts`)
+        """
+        return sorted(self.class_counts.items(), key=lambda item: -item[1])
+
+    def class_samples(self, label):
+        """
+        Esempi casuali (al più `samples_per_class`) della classe `label`
+        """
+        return list(self.samples[label][1]) if label in self.samples else []
+
+    def print_report(self):
+        """
+        Stampa il report di esplorazione (stesse sezioni di explore_data.py)
+        """
+        print("=" * 70)
+        print("📋 INFORMAZIONI GENERALI")
+        print("=" * 70)
+        print(f"Numero totale di news:  {self.rows:,}")
+        print(f"Numero di colonne:      {len(self.columns)}")
+        print(f"Nomi colonne:           {self.columns}")
+        print(f"Memoria (tutto in RAM): {self.memory_bytes / 1024**2:.2f} MB")
+        print()
+
+        print("=" * 70)
+        print("📐 DIMENSIONI DATASET")
+        print("=" * 70)
+        print(f"Righe (news):    {self.rows:,}")
+        print(f"Colonne:         {len(self.columns)}")
+        print()
+
+        print("=" * 70)
+        print("👀 PRIME 5 NEWS DEL DATASET")
+        print("=" * 70)
+        print(self.head)
+        print()
+
+        if self.label_column is not None:
+            print("=" * 70)
+            print("📊 DISTRIBUZIONE SENTIMENT")
+            print("=" * 70)
+            counts = pd.Series(dict(self.sorted_class_counts()), name='count')
+            print(counts.rename_axis(self.label_column))
+            print()
+            print("Percentuali:")
+            for sentiment, count in self.sorted_class_counts():
+                percentage = (count / self.rows) * 100
+                print(f"  {sentiment:10} {count:6,} ({percentage:5.1f}%)")
+            print()
+
+        print("=" * 70)
+        print("🔍 VALORI MANCANTI")
+        print("=" * 70)
+        if sum(self.missing.values()) == 0:
+            print("✅ Nessun valore mancante!")
+        else:
+            for column, count in self.missing.items():
+                print(f"  {column:10} {count:6,}")
+        print()
+
+        print("=" * 70)
+        print("📝 STATISTICHE LUNGHEZZA TESTO")
+        print("=" * 70)
+        if self.texts:
+            print(f"Lunghezza media:     {self.length_mean:.0f} caratteri")
+            print(f"Lunghezza minima:    {self.length_min} caratteri")
+            print(f"Lunghezza massima:   {self.length_max} caratteri")
+            print(f"Mediana:             {self.length_median:.0f} caratteri")
+            quantiles = ', '.join(f"p{q * 100:g} {self.length_quantile(q):.0f}"
+                                  for q in (0.05, 0.25, 0.75, 0.95, 0.99))
+            print(f"Quantili:            {quantiles}")
+        print()
+
+        if self.samples:
+            print("=" * 70)
+            print("💬 ESEMPI DI NEWS PER SENTIMENT")
+            print("=" * 70)
+            for sentiment in self.class_counts:
+                print(f"\n🏷️  {str(sentiment).upper()}:")
+                print("-" * 70)
+                for idx, text in enumerate(self.class_samples(sentiment), 1):
+                    print(f"{idx}. {text[:200]}...")
+                    print()
+
+        print("=" * 70)
+        print("🔤 TOP 10 PAROLE PIÙ COMUNI (length > 4 caratteri)")
+        print("=" * 70)
+        for idx, (word, count) in enumerate(self.words.most_common(10), 1):
+            print(f"{idx:2}. {word:15} → {count:5,} volte")
+        if self.words.error:
+            print(f"   (conteggi stimati: al più {self.words.error:,} in meno per parola)")
+        print()
+
+
+def profile_corpus(chunks, **options):
+    """
+    Profilo di un corpus in un solo passaggio
+
+    Args:
+        chunks (iterable): DataFrame a blocchi (es. `streaming.iter_csv_chunks`)
+        **options: Argomenti di CorpusProfile
+
+    Returns:
+        CorpusProfile: Profilo completo
+    """
+    profile = CorpusProfile(**options)
+    for chunk in chunks:
+        profile.update(chunk)
+    return profile
+
+
+def _length_bins(lengths):
+    """
+    Bin dell'istogramma delle lunghezze: esatti fino a EXACT_LENGTHS, poi logaritmici
+    """
+    bins = lengths.copy()
+    large = lengths >= EXACT_LENGTHS
+    if large.any():
+        steps = np.floor(np.log(lengths[large] / EXACT_LENGTHS) / np.log(LENGTH_GAMMA))
+        bins[large] = EXACT_LENGTHS + np.minimum(steps.astype(np.int64), LENGTH_LOG_BINS - 1)
+    return bins
+
+
+def _length_value(b):
+    """
+    Lunghezza rappresentativa di un bin (inverso di `_length_bins`)
+    """
+    if b < EXACT_LENGTHS:
+        return float(b)
+    return float(EXACT_LENGTHS * LENGTH_GAMMA ** (b - EXACT_LENGTHS + 0.5))
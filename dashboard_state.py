@@ -0,0 +1,243 @@
+"""
+Dashboard State
+Aggregati dei grafici salvati su disco per l'aggiornamento incrementale:
+a ogni refresh vengono lette solo le righe aggiunte in coda al file dei
+risultati e ridisegnati solo i grafici i cui dati sono cambiati
+"""
+
+import io
+import json
+import os
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from columnar import DEFAULT_ROW_GROUP_SIZE, compact_results, is_parquet_path, iter_results
+from summary import ResultSummary
+
+STATE_VERSION = 1
+
+# Byte di inizio file e prima della posizione letta usati per riconoscere
+# un file riscritto (non solo esteso) dall'ultimo refresh
+CHECK_BYTES = 64 * 1024
+
+
+class DashboardState:
+    """
+    Riepilogo dei risultati (`ResultSummary`) più la posizione già letta
+    del file e l'impronta dei dati di ogni grafico disegnato
+
+    Con un CSV (scritto in append, come `analyze_stream`) la posizione è
+    un offset in byte: `update` legge e aggrega solo i byte successivi,
+    fino all'ultima riga completa. Se il file è stato troncato o riscritto
+    (inizio o ultimi byte letti diversi) gli aggregati vengono ricalcolati
+    da zero. Un file Parquet non si estende in coda: se cambia viene riletto
+    per intero (sempre a blocchi), altrimenti non c'è nulla da leggere.
+    """
+
+    def __init__(self, path, results_path, columns=None, sample_size=0,
+                 chunksize=DEFAULT_ROW_GROUP_SIZE):
+        """
+        Args:
+            path (str): File .npz con lo stato (creato al primo `save`)
+            results_path (str): File dei risultati (CSV o Parquet)
+            columns (list, optional): Colonne da leggere (default: tutte)
+            sample_size (int): Campione di confidence per label del riepilogo
+            chunksize (int): Righe lette per blocco
+        """
+        self.path = path
+        self.results_path = results_path
+        self.columns = list(columns) if columns else None
+        self.sample_size = sample_size
+        self.chunksize = chunksize
+        self.summary = ResultSummary(sample_size=sample_size)
+        self.source = {}
+        # Nome del grafico -> impronta dei dati con cui è stato disegnato
+        self.rendered = {}
+        self._load()
+
+    def _load(self):
+        """
+        Riprende lo stato salvato, se appartiene a questo file e configurazione
+        """
+        if not os.path.exists(self.path):
+            return
+        try:
+            with np.load(self.path, allow_pickle=False) as arrays:
+                meta = json.loads(str(arrays['meta']))
+                summary = ResultSummary.from_state(meta['summary'], arrays)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"   ⚠️  Stato del dashboard illeggibile ({e}): si riparte da zero")
+            return
+        if (meta['version'] != STATE_VERSION
+                or meta['results_path'] != os.path.abspath(self.results_path)
+                or meta['columns'] != self.columns
+                or summary.sample_size != self.sample_size):
+            return
+        self.summary = summary
+        self.source = meta['source']
+        self.rendered = meta['rendered']
+
+    def save(self):
+        """
+        Salva lo stato (scrittura atomica: file temporaneo e rename)
+        """
+        summary_meta, arrays = self.summary.to_state()
+        meta = {
+            'version': STATE_VERSION,
+            'results_path': os.path.abspath(self.results_path),
+            'columns': self.columns,
+            'source': self.source,
+            'rendered': self.rendered,
+            'summary': summary_meta,
+        }
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary = self.path + '.tmp'
+        with open(temporary, 'wb') as f:
+            np.savez_compressed(f, meta=np.array(json.dumps(meta, default=_json_default)),
+                                **arrays)
+        os.replace(temporary, self.path)
+
+    def reset(self):
+        """
+        Dimentica aggregati e grafici disegnati
+        """
+        self.summary = ResultSummary(sample_size=self.sample_size)
+        self.source = {}
+        self.rendered = {}
+
+    def update(self):
+        """
+        Aggiunge al riepilogo le righe comparse dall'ultimo aggiornamento
+
+        Le righe nuove vengono aggregate in un riepilogo separato e unite
+        solo a lettura completata: un errore (es. riga scritta a metà) lascia
+        lo stato com'era e la lettura viene ripetuta al refresh successivo.
+
+        Returns:
+            int: Righe nuove aggregate
+        """
+        if is_parquet_path(self.results_path):
+            return self._update_parquet()
+        return self._update_csv()
+
+    def _update_parquet(self):
+        stat = os.stat(self.results_path)
+        source = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+        if self.source == source:
+            return 0
+        delta = ResultSummary(sample_size=self.sample_size)
+        for chunk in iter_results(self.results_path, self.columns, self.chunksize):
+            delta.update(chunk)
+        self.reset()
+        self.summary = delta
+        self.source = source
+        return delta.rows
+
+    def _update_csv(self):
+        with open(self.results_path, 'rb') as f:
+            if not self._same_csv(f):
+                if self.source:
+                    print("   ⚠️  File dei risultati riscritto: aggregati ricalcolati da zero")
+                self.reset()
+                f.seek(0)
+                header = f.readline()
+                if not header.endswith(b'\n'):
+                    return 0
+                self.source = {'names': list(pd.read_csv(io.BytesIO(header), nrows=0).columns)}
+                self._mark(f, len(header))
+            offset = self.source['offset']
+            end = _last_line_end(f)
+            if end <= offset:
+                return 0
+
+            f.seek(offset)
+            chunks = pd.read_csv(io.BufferedReader(_ByteRange(f, end)), header=None,
+                                 names=self.source['names'], usecols=self.columns,
+                                 chunksize=self.chunksize)
+            delta = ResultSummary(sample_size=self.sample_size)
+            try:
+                for chunk in chunks:
+                    start = self.summary.rows + delta.rows
+                    chunk.index = pd.RangeIndex(start, start + len(chunk))
+                    delta.update(compact_results(chunk))
+            except (pd.errors.ParserError, UnicodeDecodeError) as e:
+                print(f"   ⚠️  Righe nuove non leggibili ({e}): riprovo al prossimo refresh")
+                return 0
+
+            self.summary.merge(delta)
+            self._mark(f, end)
+        return delta.rows
+
+    def _mark(self, f, offset):
+        """
+        Registra la posizione letta e l'impronta dei byte che la precedono
+        """
+        self.source['offset'] = offset
+        self.source['head_crc'] = _crc(f, 0, min(offset, CHECK_BYTES))
+        self.source['tail_crc'] = _crc(f, max(offset - CHECK_BYTES, 0), offset)
+
+    def _same_csv(self, f):
+        """
+        True se il CSV inizia con gli stessi byte letti finora (è solo cresciuto)
+        """
+        if not self.source or 'offset' not in self.source:
+            return False
+        end = self.source['offset']
+        if os.fstat(f.fileno()).st_size < end:
+            return False
+        return (_crc(f, 0, min(end, CHECK_BYTES)) == self.source['head_crc']
+                and _crc(f, max(end - CHECK_BYTES, 0), end) == self.source['tail_crc'])
+
+
+class _ByteRange(io.RawIOBase):
+    """
+    Lettura di un file aperto dalla posizione corrente fino al byte `end`
+    """
+
+    def __init__(self, f, end):
+        self._f = f
+        self._remaining = end - f.tell()
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = min(len(buffer), self._remaining)
+        if size <= 0:
+            return 0
+        read = self._f.readinto(memoryview(buffer)[:size])
+        self._remaining -= read
+        return read
+
+
+def _last_line_end(f, block=64 * 1024):
+    """
+    Posizione subito dopo l'ultimo '\\n' del file (0 se non ce ne sono)
+    """
+    end = f.seek(0, os.SEEK_END)
+    while end > 0:
+        start = max(end - block, 0)
+        f.seek(start)
+        newline = f.read(end - start).rfind(b'\n')
+        if newline >= 0:
+            return start + newline + 1
+        end = start
+    return 0
+
+
+def _crc(f, start, end):
+    f.seek(start)
+    return zlib.crc32(f.read(end - start))
+
+
+def _json_default(value):
+    """
+    Scalari numpy (es. l'indice delle righe della top-k) come tipi Python
+    """
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
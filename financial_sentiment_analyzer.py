@@ -3,25 +3,68 @@ Financial Sentiment Analyzer
 Analizza il sentiment di news finanziarie usando DistilBERT
 """
 
+import contextlib
+import hashlib
+import io
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, replace
+import numpy as np
 import pandas as pd
-from transformers import pipeline
 import warnings
 import os
+import time
 from datetime import datetime
 
+from batch_scheduler import (AdaptiveBatchSizer, LengthBucketScheduler, batch_size_summary,
+                             merge_batch_stats, merge_padding_stats, pad_batch)
+from cascade import (HashedNgramClassifier, audit_mask, cascade_stats, cascade_summary,
+                     merge_cascade_stats)
+from checkpoint import RunCheckpoint
+from columnar import (DEFAULT_ROW_GROUP_SIZE, append_parquet, compact_results,
+                      is_parquet_path, parquet_available, write_parquet)
+from inference_backends import check_backend, create_backend, is_out_of_memory, release_memory
+from inference_options import InferenceOptions
+from instrumentation import ProgressMeter, RunMetrics, profile_run, timed_stage
+from phrasebank import is_phrasebank_path, load_phrasebank
+from long_documents import aggregate_windows, split_windows
+from prediction_cache import PredictionCache, normalize_series
+from streaming import append_csv, iter_csv_chunks
+from summary import REPORT_QUANTILES, ResultSummary
+from token_store import TokenStore, tokenizer_fingerprint
+
 warnings.filterwarnings('ignore')
 
+# Modello di default (binario POSITIVE/NEGATIVE)
+DEFAULT_MODEL = "distilbert-base-uncased-finetuned-sst-2-english"
+
+# Valori assegnati a una news che genera errore durante l'inferenza
+FALLBACK_LABEL = 'NEUTRAL'
+FALLBACK_SCORE = 0.5
+
 class FinancialSentimentAnalyzer:
     """
     Classe principale per l'analisi del sentiment di news finanziarie
     """
     
-    def __init__(self, data_path):
+    def __init__(self, data_path, model_name=DEFAULT_MODEL, cache_path=None,
+                 cache_max_entries=1_000_000, backend='torch', first_stage_path=None,
+                 token_store_path=None):
         """
         Inizializza l'analyzer
         
         Args:
             data_path (str): Percorso del file CSV con le news
+            model_name (str): Nome del modello Hugging Face o percorso locale
+            cache_path (str, optional): File SQLite per la cache persistente
+                delle predizioni (es. 'results/prediction_cache.sqlite')
+            cache_max_entries (int): Numero massimo di predizioni in cache
+            backend (str): Backend di inferenza: 'torch' (fp32), 'torch-int8'
+                (quantizzazione dinamica), 'onnx' o 'onnx-int8' (ONNX Runtime)
+            first_stage_path (str, optional): Modello .npz del primo stadio
+                della cascata (vedi `train_first_stage`)
+            token_store_path (str, optional): Corpus pre-tokenizzato (vedi
+                `pretokenize`): le news presenti non vengono ri-tokenizzate
         """
         print("\n" + "=" * 70)
         print("🚀 FINANCIAL SENTIMENT ANALYZER")
@@ -30,20 +73,274 @@ class FinancialSentimentAnalyzer:
         print("📊 Inizializzazione in corso...")
         
         self.data_path = data_path
+        self.model_name = model_name
+        self.backend_name = backend
         self.df = None
+        self.padding_stats = None
+        self.batch_stats = None
+        self.truncation_stats = None
+        self.cache_stats = None
+        self.dedup_stats = None
+        self.cascade_stats = None
+        self.summary = None
+        self._pool = None
+        self._pool_config = None
+        
+        # Tempi per stage, contatori e memoria (vedi `export_metrics`)
+        self.metrics = RunMetrics()
+        
+        self.cache_path = cache_path
+        self.cache_max_entries = cache_max_entries
         
-        # Inizializza pipeline sentiment
+        # Modello, backend, tabella label e cache vengono creati alla prima
+        # inferenza (o con `warmup()`): load_data e statistiche non li richiedono
+        self._pipeline = None
+        self.backend = None
+        self.label_dtype = None
+        self.cache = None
+        
+        # Primo stadio economico della cascata (opzionale)
+        self.first_stage = (HashedNgramClassifier.load(first_stage_path)
+                            if first_stage_path else None)
+        
+        # Token id pre-calcolati (opzionale), verificati sul tokenizer al caricamento
+        self.token_store = TokenStore(token_store_path) if token_store_path else None
+        
+        # Backend sconosciuto o dipendenza opzionale mancante: errore subito,
+        # non alla prima inferenza
+        check_backend(backend)
+        print("✅ Pronto (modello caricato alla prima inferenza)\n")
+    
+    @property
+    def sentiment_pipeline(self):
+        """
+        Pipeline Hugging Face (tokenizer + modello), caricata al primo uso
+        """
+        self._ensure_model()
+        return self._pipeline
+    
+    def _ensure_model(self):
+        """
+        Carica modello, backend, tabella delle label e cache se non già fatto
+        """
+        if self._pipeline is not None:
+            return
+        with self.metrics.stage('model_load'):
+            self._load_model()
+    
+    def _load_model(self):
+        from transformers import pipeline
+        
+        # Tutto viene creato in variabili locali e assegnato solo alla fine:
+        # se un passo fallisce il modello risulta ancora da caricare
         print("🤖 Caricamento modello DistilBERT...")
-        self.sentiment_pipeline = pipeline(
+        start = time.perf_counter()
+        sentiment_pipeline = pipeline(
             "sentiment-analysis",
-            model="distilbert-base-uncased-finetuned-sst-2-english"
+            model=self.model_name
         )
-        print("✅ Modello caricato!\n")
+        print(f"✅ Modello caricato! ({time.perf_counter() - start:.1f}s)\n")
+        revision = self._model_revision(sentiment_pipeline.model)
+        
+        # Backend del forward pass (stesso tokenizer e stesse label)
+        backend = create_backend(self.backend_name, sentiment_pipeline.model,
+                                 self.model_name, revision)
+        if self.backend_name != 'torch':
+            print(f"⚡ Backend di inferenza: {self.backend_name}\n")
+        
+        # Tabella delle label: le predizioni sono codici interi di questo dtype
+        label_dtype = self._label_dtype(sentiment_pipeline.model)
+        
+        # Cache persistente delle predizioni (opzionale)
+        cache = None
+        if self.cache_path:
+            cache = PredictionCache(
+                self.cache_path, self.model_name, revision, self.cache_max_entries
+            )
+            status = " (svuotata: modello cambiato)" if cache.invalidated else ""
+            print(f"💾 Cache predizioni: {self.cache_path} ({len(cache):,} voci){status}\n")
+        
+        # Un token store di un altro tokenizer darebbe id senza senso
+        if (self.token_store is not None
+                and self.token_store.fingerprint != tokenizer_fingerprint(sentiment_pipeline.tokenizer)):
+            print(f"⚠️  Token store {self.token_store.path} creato con un altro tokenizer: "
+                  "ignorato\n")
+            self.token_store = None
+        
+        self.backend = backend
+        self.label_dtype = label_dtype
+        self.cache = cache
+        self._pipeline = sentiment_pipeline
+    
+    def warmup(self, batch_size=32, lengths=(16, 128), rounds=2):
+        """
+        Carica il modello ed esegue batch fittizi
+        
+        Le prime forward pass pagano allocazioni e inizializzazioni una
+        tantum: farle qui rende prevedibile la latenza della prima
+        richiesta reale. Non usa né aggiorna la cache.
+        
+        Args:
+            batch_size (int): Dimensione dei batch fittizi (oltre a 1)
+            lengths (tuple): Lunghezze in token dei batch fittizi
+            rounds (int): Ripetizioni per ogni forma
+        
+        Returns:
+            float: Secondi impiegati (caricamento escluso)
+        """
+        self._ensure_model()
+        tokenizer = self._pipeline.tokenizer
+        n_prefix, n_suffix = self._special_token_layout()
+        filler = tokenizer("market", add_special_tokens=False)['input_ids'][:1] or [0]
+        probe = tokenizer("a")['input_ids']
+        prefix, suffix = probe[:n_prefix], probe[len(probe) - n_suffix:]
+        
+        start = time.perf_counter()
+        # I batch fittizi non entrano nei contatori delle metriche
+        with self.metrics.suspended():
+            for length in lengths:
+                length = max(1, min(length, self._model_max_length()) - n_prefix - n_suffix)
+                ids = prefix + filler * length + suffix
+                for size in sorted({1, batch_size}):
+                    for _ in range(rounds):
+                        self._forward([ids] * size)
+        elapsed = time.perf_counter() - start
+        self.metrics.add_time('warmup', elapsed)
+        print(f"🔥 Warmup: {len(lengths) * len({1, batch_size}) * rounds} batch fittizi "
+              f"in {elapsed * 1000:.0f} ms\n")
+        return elapsed
     
+    def train_first_stage(self, texts, labels=None, distill=False, output_path=None, **fit_options):
+        """
+        Addestra il primo stadio della cascata (n-grammi con hashing)
+        
+        Con label annotate (es. FinancialPhraseBank) le label vengono
+        ricondotte a quelle del modello ignorando maiuscole/minuscole; le
+        news con label che il modello non conosce (es. 'neutral' con un
+        modello binario) sono escluse. Con `distill=True` (o senza label)
+        il primo stadio impara le predizioni del transformer, cioè proprio
+        ciò con cui la cascata deve essere d'accordo.
+        
+        Args:
+            texts (list): Testi di training
+            labels (list, optional): Label annotate allineate ai testi
+            distill (bool): Usa come label le predizioni del transformer
+            output_path (str, optional): File .npz dove salvare il modello
+            **fit_options: Parametri di `HashedNgramClassifier`
+        
+        Returns:
+            HashedNgramClassifier: Il primo stadio (anche in `self.first_stage`)
+        """
+        self._ensure_model()
+        texts = list(texts)
+        if distill or labels is None:
+            labels, _ = self.predict(texts)
+            source = "predizioni del transformer"
+        else:
+            model_labels = {label.lower(): label for label in self.label_dtype.categories
+                            if label != FALLBACK_LABEL}
+            mapped = [model_labels.get(str(label).lower()) for label in labels]
+            texts = [text for text, label in zip(texts, mapped) if label is not None]
+            labels = [label for label in mapped if label is not None]
+            source = "label annotate"
+        
+        start = time.perf_counter()
+        with self.metrics.stage('train_first_stage'):
+            self.first_stage = HashedNgramClassifier(**fit_options).fit(texts, labels)
+        print(f"🪜 Primo stadio addestrato su {len(texts):,} news ({source}) "
+              f"in {time.perf_counter() - start:.1f}s")
+        if output_path:
+            self.first_stage.save(output_path)
+            print(f"💾 Primo stadio salvato: {output_path}")
+        print()
+        return self.first_stage
+    
+    def pretokenize(self, output_path, texts=None, batch_size=10_000):
+        """
+        Tokenizza un corpus una volta sola e lo salva come token store
+        
+        Le analisi successive dello stesso corpus (anche con un altro
+        modello con lo stesso tokenizer o un altro backend) leggono i token
+        id dal file in memory-map invece di ri-tokenizzare.
+        
+        Args:
+            output_path (str): Directory del token store (sovrascritta)
+            texts (list, optional): News da tokenizzare (default: colonna
+                'text' del dataset caricato)
+            batch_size (int): News per chiamata al tokenizer
+        
+        Returns:
+            TokenStore: Lo store (usato anche dalle analisi successive)
+        """
+        self._ensure_model()
+        texts = self.df['text'] if texts is None else pd.Series(list(texts), dtype=object)
+        start = time.perf_counter()
+        with self.metrics.stage('pretokenize'):
+            # Stessa normalizzazione della deduplicazione: l'analisi cerca
+            # nello store i testi normalizzati
+            self.token_store = TokenStore.build(output_path, normalize_series(texts),
+                                                self._pipeline.tokenizer, batch_size)
+        store = self.token_store
+        print(f"📦 Token store: {len(store):,} testi, {store.meta['tokens']:,} token "
+              f"({store.nbytes / 1024**2:.1f} MB, {store.meta['dtype']}) "
+              f"in {time.perf_counter() - start:.1f}s → {output_path}\n")
+        return store
+    
+    def _label_dtype(self, model=None):
+        """
+        Label del modello in ordine di id, più quella di fallback
+        
+        Args:
+            model (optional): Modello da usare (default: quello della pipeline)
+        
+        Returns:
+            pd.CategoricalDtype: Tabella codice intero -> label
+        """
+        model = model if model is not None else self.sentiment_pipeline.model
+        id2label = model.config.id2label
+        labels = [id2label[i] for i in range(len(id2label))]
+        if FALLBACK_LABEL not in labels:
+            labels.append(FALLBACK_LABEL)
+        return pd.CategoricalDtype(labels)
+    
+    def _label_codes(self, labels):
+        """
+        Converte label (testi unici, cache, checkpoint) in codici della tabella
+        
+        Label sconosciute diventano il fallback.
+        """
+        codes = pd.Categorical(labels, dtype=self.label_dtype).codes
+        fallback = self.label_dtype.categories.get_loc(FALLBACK_LABEL)
+        return np.where(codes < 0, fallback, codes).astype(codes.dtype)
+    
+    def _model_revision(self, model=None):
+        """
+        Revisione del modello: commit hash dell'Hub o impronta dei file locali
+        
+        Args:
+            model (optional): Modello da usare (default: quello della pipeline)
+        """
+        model = model if model is not None else self.sentiment_pipeline.model
+        revision = getattr(model.config, '_commit_hash', None)
+        if revision:
+            return revision
+        if os.path.isdir(self.model_name):
+            digest = hashlib.sha256()
+            for name in sorted(os.listdir(self.model_name)):
+                stat = os.stat(os.path.join(self.model_name, name))
+                digest.update(f"{name}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+            return digest.hexdigest()[:16]
+        return ''
+    
+    @timed_stage('load_data')
     def load_data(self, sample_size=None):
         """
         Carica il dataset
         
+        `data_path` può essere il CSV a due colonne (sentiment, testo) oppure
+        FinancialPhraseBank: la directory con i file `Sentences_*Agree.txt`
+        (unione deduplicata con colonna `agreement_level`) o un singolo file.
+        
         Args:
             sample_size (int, optional): Numero di news da campionare per test veloce
         
@@ -59,13 +356,24 @@ class FinancialSentimentAnalyzer:
             print(f"❌ ERRORE: File non trovato: {self.data_path}")
             exit(1)
         
-        # Carica CSV
         print(f"📥 Lettura da: {self.data_path}")
-        self.df = pd.read_csv(
-            self.data_path, 
-            encoding='latin-1', 
-            names=['original_sentiment', 'text']
-        )
+        if is_phrasebank_path(self.data_path):
+            # Formato FinancialPhraseBank (frase@label)
+            self.df = load_phrasebank(self.data_path)
+            levels = self.df['agreement_level'].value_counts().sort_index()
+            print("   Frasi uniche per livello di accordo: " +
+                  ", ".join(f"{level}%: {count:,}" for level, count in levels.items()))
+        else:
+            # Carica CSV
+            self.df = pd.read_csv(
+                self.data_path, 
+                encoding='latin-1', 
+                names=['original_sentiment', 'text']
+            )
+        
+        # Label originali come categoriche: pochi valori distinti, un codice per riga
+        if 'original_sentiment' in self.df:
+            self.df['original_sentiment'] = self.df['original_sentiment'].astype('category')
         
         # Sample se richiesto
         if sample_size:
@@ -78,10 +386,67 @@ class FinancialSentimentAnalyzer:
         print()
         return self.df
     
-    def analyze_sentiment(self):
+    @timed_stage('analyze_sentiment')
+    def analyze_sentiment(self, options=None, workers=1, threads_per_worker=None,
+                          checkpoint_path=None, checkpoint_every=1000, resume=False,
+                          profile=None, profile_path=None, **inference_options):
         """
         Analizza il sentiment di tutte le news nel dataset
         
+        Le news vengono tokenizzate una sola volta, raggruppate per lunghezza
+        da `LengthBucketScheduler` e inviate al modello a batch con padding
+        minimo; i risultati tornano nell'ordine originale del DataFrame.
+        
+        Con `long_documents=True` i testi più lunghi di `max_length` non
+        vengono troncati: sono divisi in finestre di token sovrapposte, le
+        finestre di tutti i documenti condividono gli stessi batch e i loro
+        punteggi sono combinati con `reducer`.
+        
+        Con `max_tokens` o `target_latency_ms` la dimensione dei batch è
+        scelta dinamicamente (fino a `batch_size` sequenze): tante news
+        corte o poche lunghe per batch. Se un batch esaurisce la memoria
+        viene diviso a metà e riprovato, e i batch successivi usano un
+        budget di token dimezzato.
+        
+        Se l'analyzer ha una cache delle predizioni, solo i testi non
+        presenti in cache passano dal modello.
+        
+        Con `cascade_threshold` il primo stadio (`train_first_stage`)
+        classifica tutte le news e solo quelle con confidence sotto la
+        soglia passano dal transformer; un campione di controllo
+        (`cascade_audit_rate`) delle altre passa comunque dal transformer
+        per stimare l'accordo con l'analisi senza cascata.
+        
+        Con `workers > 1` i testi sono divisi in shard ed elaborati da un
+        pool di processi: ogni processo carica il modello una volta e usa
+        `threads_per_worker` thread di PyTorch.
+        
+        Con `checkpoint_path` le news vengono elaborate a blocchi di
+        `checkpoint_every` e ogni blocco completato viene salvato su un file
+        append-only: con `resume=True` un'analisi interrotta (crash, OOM,
+        Ctrl-C) riparte saltando le news già analizzate.
+        
+        Tempi per stage (tokenizzazione, padding, forward pass, pandas...),
+        contatori e memoria di picco finiscono in `self.metrics`; con
+        `profile` l'analisi viene anche profilata.
+        
+        Args:
+            options (InferenceOptions, optional): Parametri di inferenza
+                (batch_size, max_length, long_documents, cascade_threshold, ...)
+            workers (int): Numero di processi per l'inferenza (1 = processo
+                corrente)
+            threads_per_worker (int, optional): Thread PyTorch per processo
+                (default: core disponibili / workers)
+            checkpoint_path (str, optional): File di checkpoint (es.
+                'results/analysis.ckpt')
+            checkpoint_every (int): News per blocco salvato nel checkpoint
+            resume (bool): Riprende dal checkpoint esistente
+            profile (str, optional): 'cprofile' o 'torch' per profilare l'analisi
+            profile_path (str, optional): File del profilo (.pstats per
+                cProfile, traccia Chrome .json per torch)
+            **inference_options: In alternativa a `options`, gli stessi
+                parametri come keyword (es. batch_size=64, max_length=128)
+        
         Returns:
             pd.DataFrame: Dataset con sentiment predetti
         """
@@ -90,49 +455,915 @@ class FinancialSentimentAnalyzer:
         print("=" * 70)
         print()
         
-        total = len(self.df)
-        sentiments = []
-        scores = []
+        options = self._resolve_options(
+            InferenceOptions.from_arguments(options, **inference_options))
         
-        print(f"📊 Analisi di {total:,} news...")
+        total = len(self.df)
+        print(f"📊 Analisi di {total:,} news (batch da {options.batch_size})...")
         print("⏳ Questo potrebbe richiedere alcuni minuti...\n")
         
-        # Analizza ogni news
-        for idx, text in enumerate(self.df['text'], 1):
-            # Progress indicator ogni 100 news
-            if idx % 100 == 0 or idx == 1:
-                percentage = (idx / total) * 100
-                print(f"   Progresso: {idx:,}/{total:,} ({percentage:.1f}%)")
-            
-            try:
-                # Tronca a 512 caratteri (limite modello)
-                text_truncated = text[:512]
-                
-                # Predizione
-                result = self.sentiment_pipeline(text_truncated)[0]
-                
-                sentiments.append(result['label'])
-                scores.append(result['score'])
-                
-            except Exception as e:
-                # In caso di errore, assegna valore neutro
-                print(f"   ⚠️  Errore su news #{idx}: {str(e)[:50]}")
-                sentiments.append('NEUTRAL')
-                scores.append(0.5)
+        with self.metrics.stage('memory_usage'):
+            memory_before = self.df.memory_usage(deep=True).sum()
+        
+        if self.cache is not None:
+            self.cache.reset_counters()
+        with profile_run(profile, profile_path):
+            if checkpoint_path:
+                sentiments, scores = self._predict_with_checkpoint(
+                    options, workers, threads_per_worker,
+                    checkpoint_path, checkpoint_every, resume,
+                )
+            else:
+                sentiments, scores = self._predict_texts(self.df['text'], options,
+                                                         workers, threads_per_worker)
         
         # Aggiungi risultati al dataframe
-        self.df['predicted_sentiment'] = sentiments
-        self.df['confidence'] = scores
+        with self.metrics.stage('assign_results'):
+            self.df['predicted_sentiment'] = sentiments
+            self.df['confidence'] = scores
+        self.summary = None
+        
+        self._print_run_report(options)
+        with self.metrics.stage('memory_usage'):
+            self._print_memory_report(memory_before)
         
         print()
         print("✅ Analisi completata!\n")
         
         return self.df
     
+    def predict(self, texts, options=None, **inference_options):
+        """
+        Predice il sentiment di una lista di testi, senza DataFrame né log
+        
+        Pensato per chiamate ripetute su pochi testi (es. il servizio
+        `sentiment_service`): stesso percorso di `analyze_sentiment`
+        (deduplicazione, cache, batch per lunghezza) nel processo corrente.
+        
+        Args:
+            texts (list): Testi da analizzare
+            options (InferenceOptions, optional): Parametri di inferenza
+            **inference_options: In alternativa a `options`, gli stessi
+                parametri come keyword (batch_size, max_length, ...)
+        
+        Returns:
+            tuple: (label, confidence) come liste allineate a `texts`
+        """
+        options = self._resolve_options(
+            InferenceOptions.from_arguments(options, **inference_options))
+        labels, scores = self._predict_texts(pd.Series(texts, dtype=object), options,
+                                             progress=False)
+        return np.asarray(labels).tolist(), scores.tolist()
+    
+    def _resolve_options(self, options):
+        """
+        Applica i default del modello alle opzioni di inferenza
+        
+        Le opzioni sono già validate alla creazione; qui restano i controlli
+        che richiedono il modello: `max_length` di default, spazio per i
+        token nuovi in ogni finestra e label del primo stadio della cascata.
+        
+        Args:
+            options (InferenceOptions): Opzioni dell'utente
+        
+        Returns:
+            InferenceOptions: Opzioni con `max_length` esplicito
+        """
+        if options.cascade:
+            if self.first_stage is None:
+                raise ValueError("cascade_threshold richiede un primo stadio: chiama "
+                                 "train_first_stage() o passa first_stage_path")
+            unknown = set(self.first_stage.classes) - set(self._label_dtype().categories)
+            if unknown:
+                raise ValueError(f"Il primo stadio usa label sconosciute al modello: "
+                                 f"{sorted(unknown)}")
+        max_length = options.max_length or self._model_max_length()
+        if options.long_documents:
+            # La sovrapposizione deve lasciare token nuovi in ogni finestra
+            n_prefix, n_suffix = self._special_token_layout()
+            size = max_length - n_prefix - n_suffix
+            if options.stride >= size:
+                raise ValueError(f"stride deve essere minore di {size} (token di contenuto di "
+                                 f"una finestra con max_length={max_length}, "
+                                 f"ricevuto {options.stride})")
+        return replace(options, max_length=max_length,
+                       cascade_audit_rate=options.cascade_audit_rate if options.cascade else 0.0)
+    
+    def _predict_texts(self, texts, options, workers=1, threads_per_worker=None,
+                       row_offset=0, progress=True):
+        """
+        Predice il sentiment di una colonna di testi
+        
+        Deduplica i testi, recupera dalla cache quelli già analizzati,
+        inferisce i rimanenti (con la cascata, solo quelli incerti per il
+        primo stadio) e propaga i risultati a tutte le righe.
+        Aggiorna `dedup_stats`, `cache_stats`, `cascade_stats`,
+        `padding_stats` e `truncation_stats`.
+        
+        Args:
+            texts (pd.Series): Testi delle news
+            options (InferenceOptions): Opzioni risolte da `_resolve_options`
+            workers (int): Numero di processi per l'inferenza
+            threads_per_worker (int, optional): Thread PyTorch per processo
+            row_offset (int): Posizione della prima news nel dataset (per i log)
+            progress (bool): Stampa l'avanzamento
+        
+        Returns:
+            tuple: (label categoriche, confidence float32) allineate a `texts`
+        """
+        self._ensure_model()
+        total = len(texts)
+        
+        # Deduplicazione: ogni testo (normalizzato) viene inferito una volta
+        with self.metrics.stage('dedup'):
+            codes, uniques = pd.factorize(normalize_series(texts))
+            unique_texts = uniques.tolist()
+            n_unique = len(unique_texts)
+            
+            # Prima occorrenza di ogni testo unico (per i log)
+            first_codes, first_rows = np.unique(codes, return_index=True)
+            first_rows = first_rows[first_codes >= 0] + row_offset
+        invalid = np.flatnonzero(codes < 0)
+        for row in invalid:
+            print(f"   ⚠️  Errore su news #{row_offset + row + 1}: testo non valido")
+        self.metrics.count('rows', total)
+        self.metrics.count('unique_texts', n_unique)
+        self.metrics.count('errors', len(invalid))
+        
+        self.dedup_stats = {
+            'rows': total,
+            'unique_texts': n_unique,
+            'duplicates': int((codes >= 0).sum()) - n_unique,
+            'dedup_ratio': n_unique / total if total else 1.0,
+        }
+        
+        unique_sentiments = np.full(n_unique, FALLBACK_LABEL, dtype=object)
+        unique_scores = np.full(n_unique, FALLBACK_SCORE)
+        
+        # Predizioni già in cache
+        todo = np.arange(n_unique)
+        if self.cache is not None:
+            settings = (f"max_length={options.max_length}" if not options.long_documents else
+                        f"max_length={options.max_length};stride={options.stride};"
+                        f"reducer={options.reducer}")
+            if self.backend_name != 'torch':
+                # I backend quantizzati hanno output leggermente diversi
+                settings += f";backend={self.backend_name}"
+            with self.metrics.stage('cache_lookup'):
+                keys = [self.cache.key(text, settings) for text in unique_texts]
+                found = self.cache.get_many(keys)
+                hit = np.zeros(n_unique, dtype=bool)
+                for idx, key in enumerate(keys):
+                    if key in found:
+                        unique_sentiments[idx], unique_scores[idx] = found[key]
+                        hit[idx] = True
+            todo = np.flatnonzero(~hit)
+            self.metrics.count('cache_hits', int(hit.sum()))
+            if progress:
+                print(f"💾 Cache: {int(hit.sum()):,} testi già analizzati, "
+                      f"{len(todo):,} da inferire\n")
+        
+        # Cascata: il primo stadio classifica tutto, al transformer vanno i
+        # testi sotto soglia e il campione di controllo
+        infer_options = options.infer_kwargs()
+        inferred = todo
+        if options.cascade:
+            todo_texts = [unique_texts[idx] for idx in todo]
+            start = time.perf_counter()
+            with self.metrics.stage('first_stage'):
+                first_labels, first_scores = self.first_stage.predict(todo_texts)
+            first_seconds = time.perf_counter() - start
+            accepted = first_scores >= options.cascade_threshold
+            audited = accepted & audit_mask(todo_texts, options.cascade_audit_rate)
+            unique_sentiments[todo] = first_labels
+            unique_scores[todo] = first_scores
+            inferred = todo[~accepted | audited]
+            self.metrics.count('first_stage_accepted', int((accepted & ~audited).sum()))
+        
+        # Inferenza sui testi rimanenti
+        start = time.perf_counter()
+        if workers > 1 and len(inferred) > 1:
+            labels, confidences = self._infer_parallel(
+                [unique_texts[idx] for idx in inferred], first_rows[inferred],
+                workers, threads_per_worker, infer_options, progress=progress,
+            )
+        else:
+            labels, confidences = self._infer([unique_texts[idx] for idx in inferred],
+                                              first_rows[inferred], progress=progress,
+                                              **infer_options)
+        unique_sentiments[inferred] = labels
+        unique_scores[inferred] = confidences
+        
+        self.cascade_stats = None
+        if options.cascade:
+            agreed = np.zeros(len(todo), dtype=bool)
+            agreed[~accepted | audited] = first_labels[~accepted | audited] == labels
+            self.cascade_stats = cascade_stats(
+                first_scores, accepted, audited, agreed, options.cascade_threshold,
+                options.cascade_audit_rate, first_seconds, time.perf_counter() - start,
+            )
+        # Chiamate al transformer; i testi risolti da cache e duplicati sono
+        # risparmiati, quelli accettati dal primo stadio contati a parte
+        self.dedup_stats['inference_calls'] = len(inferred)
+        self.dedup_stats['inference_calls_saved'] = int((codes >= 0).sum()) - len(todo)
+        self.dedup_stats['first_stage_accepted'] = len(todo) - len(inferred)
+        
+        if self.cache is not None:
+            # In cache solo le predizioni riuscite (non i fallback),
+            with self.metrics.stage('cache_store'):
+                # e solo quelle del transformer (non del primo stadio)
+                self.cache.put_many(
+                    (keys[idx], label, score)
+                    for idx, label, score in zip(inferred, labels, confidences)
+                    if label != FALLBACK_LABEL
+                )
+                self.cache_stats = self.cache.stats()
+        
+        # Broadcast dei risultati a tutte le righe (join vettoriale sui codici):
+        # le label passano dalla tabella una volta per testo unico
+        with self.metrics.stage('broadcast'):
+            valid = codes >= 0
+            unique_label_codes = self._label_codes(unique_sentiments)
+            label_codes = np.full(total, self._label_codes([FALLBACK_LABEL])[0],
+                                  dtype=unique_label_codes.dtype)
+            scores = np.full(total, FALLBACK_SCORE, dtype=np.float32)
+            label_codes[valid] = unique_label_codes[codes[valid]]
+            scores[valid] = unique_scores[codes[valid]]
+        return pd.Categorical.from_codes(label_codes, dtype=self.label_dtype), scores
+    
+    def _predict_with_checkpoint(self, options, workers, threads_per_worker,
+                                 checkpoint_path, checkpoint_every, resume):
+        """
+        Predice `self.df['text']` a blocchi, salvando ogni blocco nel checkpoint
+        
+        Returns:
+            tuple: (label categoriche, confidence float32) allineate a `self.df`
+        """
+        if checkpoint_every < 1:
+            raise ValueError(f"checkpoint_every deve essere >= 1 (ricevuto {checkpoint_every})")
+        texts = self.df['text']
+        total = len(texts)
+        
+        # Impronta di dataset, modello e parametri: un checkpoint vale solo per la stessa analisi
+        digest = hashlib.sha256()
+        digest.update(pd.util.hash_pandas_object(texts, index=False).values.tobytes())
+        digest.update(f"{self.model_name}@{self._model_revision()}:{self.backend_name}".encode())
+        digest.update(repr(sorted(asdict(options).items())).encode())
+        checkpoint = RunCheckpoint(checkpoint_path, digest.hexdigest(), total)
+        
+        label_codes = np.full(total, self._label_codes([FALLBACK_LABEL])[0])
+        scores = np.full(total, FALLBACK_SCORE, dtype=np.float32)
+        completed = np.zeros(total, dtype=bool)
+        for start, end, labels, confidences in checkpoint.start(resume):
+            label_codes[start:end] = self._label_codes(labels)
+            scores[start:end] = confidences
+            completed[start:end] = True
+        if completed.any():
+            print(f"♻️  Ripresa dal checkpoint: {int(completed.sum()):,} news già analizzate, "
+                  f"{int((~completed).sum()):,} rimanenti\n")
+        
+        # Blocchi contigui di news ancora da analizzare
+        pending = np.flatnonzero(~completed)
+        breaks = np.flatnonzero(np.diff(pending) != 1) + 1
+        blocks = []
+        for run in np.split(pending, breaks):
+            for start in range(0, len(run), checkpoint_every):
+                block = run[start:start + checkpoint_every]
+                blocks.append((int(block[0]), int(block[-1]) + 1))
+        
+        dedup, padding, batch_stats, truncation, cascade = [], [], [], [], []
+        try:
+            for start, end in blocks:
+                labels, confidences = self._predict_texts(
+                    texts.iloc[start:end], options, workers, threads_per_worker,
+                    row_offset=start, progress=False,
+                )
+                checkpoint.append(start, end, labels, confidences)
+                label_codes[start:end] = labels.codes
+                scores[start:end] = confidences
+                completed[start:end] = True
+                dedup.append(self.dedup_stats)
+                padding.append(self.padding_stats)
+                batch_stats.append(self.batch_stats)
+                truncation.append(self.truncation_stats)
+                cascade.append(self.cascade_stats)
+                
+                done = int(completed.sum())
+                print(f"   Progresso: {done:,}/{total:,} ({done / total * 100:.1f}%) "
+                      f"- checkpoint salvato")
+        except KeyboardInterrupt:
+            print(f"\n⏸️  Interrotto: {int(completed.sum()):,}/{total:,} news salvate in "
+                  f"{checkpoint_path}")
+            print("   Riprendi con analyze_sentiment(..., resume=True)")
+            raise
+        
+        if not padding:
+            # Tutto già nel checkpoint: nessuna inferenza in questa esecuzione
+            dedup = [{'rows': 0, 'unique_texts': 0, 'duplicates': 0,
+                      'inference_calls': 0, 'inference_calls_saved': 0,
+                      'first_stage_accepted': 0}]
+            padding = [LengthBucketScheduler().padding_stats([], [])]
+            batch_stats = [AdaptiveBatchSizer().stats()]
+            truncation = [self._truncation_stats([], [], options.max_length)
+                          | {'long_documents': 0, 'windows': 0}]
+        self.dedup_stats = self._merge_dedup_stats(dedup)
+        self.padding_stats = merge_padding_stats(padding)
+        self.batch_stats = merge_batch_stats(batch_stats)
+        self.truncation_stats = self._merge_truncation_stats(truncation)
+        self.cascade_stats = merge_cascade_stats(cascade)
+        return pd.Categorical.from_codes(label_codes, dtype=self.label_dtype), scores
+    
+    @timed_stage('analyze_stream')
+    def analyze_stream(self, input_path=None, output_path='results/sentiment_results.csv',
+                       chunksize=10_000, options=None, workers=1, threads_per_worker=None,
+                       **inference_options):
+        """
+        Analizza un file CSV a blocchi, senza caricarlo tutto in memoria
+        
+        Pipeline di generatori: lettura a chunk -> inferenza a batch ->
+        scrittura in coda al file di output -> statistiche incrementali.
+        Con un output `.parquet` ogni chunk diventa un row group con tipi
+        compatti, altrimenti viene esteso un CSV.
+        In memoria c'è al massimo un chunk alla volta, quindi il picco di
+        memoria non dipende dalla dimensione dell'input. `self.df` non
+        viene popolato.
+        
+        Args:
+            input_path (str, optional): CSV da analizzare (default: data_path)
+            output_path (str): CSV o Parquet dei risultati (sovrascritto)
+            chunksize (int): News per chunk
+            options (InferenceOptions, optional): Parametri di inferenza
+            workers (int): Numero di processi per l'inferenza
+            threads_per_worker (int, optional): Thread PyTorch per processo
+            **inference_options: In alternativa a `options`, gli stessi
+                parametri come keyword (batch_size, max_length, ...)
+        
+        Returns:
+            ResultSummary: Riepilogo dell'intera analisi (unione esatta dei
+                riepiloghi dei chunk)
+        """
+        print("=" * 70)
+        print("🌊 ANALISI SENTIMENT IN STREAMING")
+        print("=" * 70)
+        print()
+        
+        input_path = input_path or self.data_path
+        options = self._resolve_options(
+            InferenceOptions.from_arguments(options, **inference_options))
+        print(f"📥 Input:  {input_path} (chunk da {chunksize:,} news)")
+        print(f"💾 Output: {output_path}")
+        print()
+        
+        if self.cache is not None:
+            self.cache.reset_counters()
+        
+        chunks = iter_csv_chunks(input_path, chunksize)
+        scored = self._score_chunks(chunks, options, workers, threads_per_worker)
+        if is_parquet_path(output_path):
+            written = append_parquet(scored, output_path, row_group_size=chunksize)
+        else:
+            written = append_csv(scored, output_path)
+        
+        stats = ResultSummary()
+        dedup, padding, batch_stats, truncation, cascade = [], [], [], [], []
+        start = time.perf_counter()
+        for chunk in written:
+            stats.merge(ResultSummary.from_frame(chunk))
+            dedup.append(self.dedup_stats)
+            padding.append(self.padding_stats)
+            batch_stats.append(self.batch_stats)
+            truncation.append(self.truncation_stats)
+            cascade.append(self.cascade_stats)
+            
+            elapsed = time.perf_counter() - start
+            print(f"   Chunk {len(padding):,}: {stats.rows:,} news "
+                  f"({stats.rows / elapsed:,.0f} news/s), "
+                  f"confidence media {stats.mean_confidence:.2%}")
+        
+        if padding:
+            self.dedup_stats = self._merge_dedup_stats(dedup)
+            self.padding_stats = merge_padding_stats(padding)
+            self.batch_stats = merge_batch_stats(batch_stats)
+            self.truncation_stats = self._merge_truncation_stats(truncation)
+            self.cascade_stats = merge_cascade_stats(cascade)
+            self._print_run_report(options)
+        print()
+        stats.print_report("📈 STATISTICHE STREAMING")
+        print(f"✅ Streaming completato: {output_path}\n")
+        return stats
+    
+    def _score_chunks(self, chunks, options, workers=1, threads_per_worker=None):
+        """
+        Generatore: aggiunge predicted_sentiment e confidence a ogni chunk
+        """
+        row_offset = 0
+        for chunk in chunks:
+            sentiments, scores = self._predict_texts(
+                chunk['text'], options, workers, threads_per_worker,
+                row_offset=row_offset, progress=False,
+            )
+            chunk['predicted_sentiment'] = sentiments
+            chunk['confidence'] = scores
+            row_offset += len(chunk)
+            yield chunk
+    
+    @staticmethod
+    def _merge_dedup_stats(stats_list):
+        """
+        Combina le statistiche di deduplicazione di più chunk
+        """
+        merged = {}
+        for field in ('rows', 'unique_texts', 'duplicates',
+                      'inference_calls', 'inference_calls_saved', 'first_stage_accepted'):
+            merged[field] = sum(stats[field] for stats in stats_list)
+        merged['dedup_ratio'] = merged['unique_texts'] / merged['rows'] if merged['rows'] else 1.0
+        return merged
+    
+    def _infer(self, texts, rows, batch_size=32, sort_by_length=True, bucket_boundaries=None,
+               max_length=512, long_documents=False, stride=64, reducer='mean',
+               max_tokens=None, target_latency_ms=None, progress=True):
+        """
+        Esegue il modello su una lista di testi
+        
+        Tokenizzazione unica, troncamento o finestre sui token, batch
+        raggruppati per lunghezza (dimensione fissa o adattiva) e
+        aggregazione delle finestre.
+        Aggiorna `padding_stats`, `batch_stats` e `truncation_stats`.
+        
+        Args:
+            texts (list): Testi da analizzare
+            rows (array-like): Posizione di ogni testo nel dataset (per i log)
+            progress (bool): Stampa l'avanzamento
+            (altri parametri: vedi `analyze_sentiment`)
+        
+        Returns:
+            tuple: (label, confidence) come array allineati a `texts`;
+                i testi non validi o falliti ricevono il valore neutro
+        """
+        scheduler = LengthBucketScheduler(batch_size, bucket_boundaries, sort_by_length,
+                                          max_tokens)
+        sizer = AdaptiveBatchSizer(batch_size, max_tokens, target_latency_ms)
+        rows = np.asarray(rows, dtype=np.int64)
+        total = len(texts)
+        
+        # Tokenizzazione unica
+        with self.metrics.stage('tokenize'):
+            encodings = self._tokenize(texts, rows)
+        valid = np.flatnonzero([ids is not None for ids in encodings])
+        full_lengths = np.array([len(encodings[idx]) for idx in valid], dtype=np.int64)
+        
+        # Sequenze da inviare al modello: una per testo (troncata) o più finestre
+        n_prefix, n_suffix = self._special_token_layout()
+        with self.metrics.stage('prepare_sequences'):
+            units, unit_docs = [], []
+            for idx in valid:
+                ids = encodings[idx]
+                if len(ids) > max_length and isinstance(ids, np.ndarray):
+                    # Troncamento e finestre lavorano su liste (casi rari)
+                    ids = ids.tolist()
+                if long_documents:
+                    windows = split_windows(ids, max_length, stride, n_prefix, n_suffix)
+                elif len(ids) > max_length:
+                    # Taglia il contenuto, conserva gli special token finali
+                    windows = [ids[:max_length - n_suffix] + ids[len(ids) - n_suffix:]]
+                else:
+                    windows = [ids]
+                units.extend(windows)
+                unit_docs.extend([idx] * len(windows))
+            unit_docs = np.array(unit_docs, dtype=np.int64)
+            unit_lengths = np.array([len(ids) for ids in units], dtype=np.int64)
+        self.metrics.count('sequences', len(units))
+        unit_probs = None
+        
+        # Batch decisi uno alla volta: il sizer adatta il budget ai batch precedenti
+        batches = []
+        meter = ProgressMeter(len(units), unit='seq') if progress else None
+        for batch in scheduler.iter_batches(unit_lengths, sizer):
+            batches.append(batch)
+            probs = self._predict_batch([units[i] for i in batch], rows[unit_docs[batch]],
+                                        sizer)
+            if unit_probs is None:
+                unit_probs = np.full((len(units), probs.shape[1]), np.nan)
+            unit_probs[batch] = probs
+            if meter is not None:
+                meter.update(len(batch))
+        
+        # I testi non tokenizzabili o falliti restano con il valore neutro
+        sentiments = np.full(total, FALLBACK_LABEL, dtype=object)
+        scores = np.full(total, FALLBACK_SCORE)
+        if unit_probs is not None:
+            with self.metrics.stage('postprocess'):
+                weights = unit_lengths - n_prefix - n_suffix
+                doc_probs = aggregate_windows(unit_docs, unit_probs, weights, total, reducer)
+                scored = ~np.isnan(doc_probs).any(axis=1)
+                id2label = self.sentiment_pipeline.model.config.id2label
+                labels = np.array([id2label[i] for i in range(doc_probs.shape[1])], dtype=object)
+                sentiments[scored] = labels[doc_probs[scored].argmax(axis=1)]
+                scores[scored] = doc_probs[scored].max(axis=1)
+        
+        self.padding_stats = scheduler.padding_stats(unit_lengths, batches)
+        self.batch_stats = sizer.stats()
+        n_windows = np.bincount(unit_docs, minlength=total)[valid]
+        lengths = full_lengths if long_documents else np.minimum(full_lengths, max_length)
+        self.truncation_stats = self._truncation_stats(full_lengths, lengths, max_length)
+        self.truncation_stats['long_documents'] = int((n_windows > 1).sum())
+        self.truncation_stats['windows'] = int(n_windows.sum())
+        
+        return sentiments, scores
+    
+    def _infer_parallel(self, texts, rows, workers, threads_per_worker, options, progress=True):
+        """
+        Esegue `_infer` in un pool di processi, uno shard alla volta
+        
+        Il pool resta attivo tra un'analisi e l'altra (con la stessa
+        configurazione) per non ricaricare il modello; `close()` lo termina.
+        
+        Args:
+            texts (list): Testi da analizzare
+            rows (array-like): Posizione di ogni testo nel dataset (per i log)
+            workers (int): Numero di processi
+            threads_per_worker (int, optional): Thread PyTorch per processo
+            options (dict): Parametri di `_infer` (`InferenceOptions.infer_kwargs`)
+            progress (bool): Stampa l'avanzamento
+        
+        Returns:
+            tuple: (label, confidence) come array allineati a `texts`
+        """
+        threads_per_worker = threads_per_worker or max(1, (os.cpu_count() or 1) // workers)
+        store_path = self.token_store.path if self.token_store is not None else None
+        config = (workers, threads_per_worker, self.backend_name, store_path)
+        if self._pool is None or self._pool_config != config:
+            self.close_pool()
+            print(f"⚙️  Avvio {workers} processi x {threads_per_worker} thread...")
+            self._pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(self.model_name, threads_per_worker, self.backend_name, store_path),
+            )
+            self._pool_config = config
+        
+        # Più shard che processi, per bilanciare il carico
+        shards = np.array_split(np.arange(len(texts)), min(len(texts), workers * 4))
+        rows = np.asarray(rows, dtype=np.int64)
+        futures = [
+            self._pool.submit(_infer_shard, [texts[i] for i in shard], rows[shard], options)
+            for shard in shards
+        ]
+        
+        sentiments = np.empty(len(texts), dtype=object)
+        scores = np.empty(len(texts))
+        padding, batch_stats, truncation = [], [], []
+        meter = ProgressMeter(len(texts)) if progress else None
+        # Merge nell'ordine degli shard
+        for shard, future in zip(shards, futures):
+            (shard_sentiments, shard_scores, shard_padding, shard_batches, shard_truncation,
+             shard_metrics) = future.result()
+            sentiments[shard] = shard_sentiments
+            scores[shard] = shard_scores
+            padding.append(shard_padding)
+            batch_stats.append(shard_batches)
+            truncation.append(shard_truncation)
+            self.metrics.merge(shard_metrics)
+            if meter is not None:
+                meter.update(len(shard))
+        
+        self.padding_stats = merge_padding_stats(padding)
+        self.batch_stats = merge_batch_stats(batch_stats)
+        self.truncation_stats = self._merge_truncation_stats(truncation)
+        return sentiments, scores
+    
+    def close_pool(self):
+        """
+        Termina il pool di processi (se attivo)
+        """
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+            self._pool_config = None
+    
+    def _print_run_report(self, options):
+        """
+        Stampa deduplicazione, padding, troncamento e cache dell'ultima analisi
+        """
+        print()
+        dedup = self.dedup_stats
+        print(f"🧬 Deduplicazione: {dedup['unique_texts']:,} testi unici su {dedup['rows']:,} news "
+              f"(dedup ratio {dedup['dedup_ratio']:.1%}, {dedup['duplicates']:,} duplicati)")
+        print(f"   Inferenze eseguite: {dedup['inference_calls']:,} "
+              f"(risparmiate: {dedup['inference_calls_saved']:,})")
+        if options.cascade:
+            print(f"   Risolte dal primo stadio: {dedup['first_stage_accepted']:,}")
+        print(f"🧩 Padding efficiency: {self.padding_stats['efficiency']:.1%} "
+              f"(token reali / token con padding, {self.padding_stats['batches']:,} batch)")
+        print(f"   Senza ordinamento:  {self.padding_stats['naive_efficiency']:.1%}")
+        for bucket, stats in self.padding_stats['per_bucket'].items():
+            print(f"   Bucket {bucket:>9} token: {stats['rows']:6,} news, "
+                  f"efficiency {stats['efficiency']:.1%}")
+        self._print_batch_report(options)
+        
+        trunc = self.truncation_stats
+        max_length = options.max_length
+        if options.long_documents:
+            print(f"📜 Documenti lunghi: {trunc['long_documents']:,} "
+                  f"({trunc['windows']:,} finestre da max {max_length} token, "
+                  f"overlap {options.stride}, reducer '{options.reducer}')")
+        else:
+            print(f"✂️  Troncate a {max_length} token: {trunc['truncated_rows']:,} news "
+                  f"({trunc['truncated_pct']:.1f}%)")
+            if trunc['truncated_rows']:
+                print(f"   Token rimossi: {trunc['tokens_removed']:,} "
+                      f"(media {trunc['mean_tokens_removed']:.1f}, "
+                      f"max {trunc['max_tokens_removed']:,} per news)")
+        
+        self._print_cascade_report()
+        
+        if self.token_store is not None:
+            print(f"📦 Token store: {self.metrics.counters['pretokenized']:,} news senza "
+                  f"ri-tokenizzazione ({self.token_store.path})")
+        
+        if self.cache_stats is not None:
+            cache = self.cache_stats
+            print(f"💾 Cache: {cache['hits']:,} hit, {cache['misses']:,} miss "
+                  f"(hit rate {cache['hit_rate']:.1%}), {cache['entries']:,} voci, "
+                  f"{cache['evictions']:,} eviction")
+    
+    def _print_batch_report(self, options):
+        """
+        Dimensioni dei batch usate (adattive con budget di token o latenza)
+        """
+        batches = self.batch_stats
+        if not batches or not batches['batches']:
+            return
+        sizes = batch_size_summary(batches)
+        mode = []
+        if options.max_tokens:
+            mode.append(f"budget {options.max_tokens:,} token")
+        if options.target_latency_ms:
+            mode.append(f"latenza obiettivo {options.target_latency_ms:g} ms")
+        print(f"📦 Batch: {batches['batches']:,}"
+              + (f" ({', '.join(mode)}, max {options.batch_size} sequenze)" if mode else "")
+              + f", dimensione min {sizes['min']} / mediana {sizes['median']} / "
+              f"media {sizes['mean']:.1f} / max {sizes['max']}")
+        if mode or batches['oom_backoffs']:
+            mean_ms = batches['batch_seconds'] / batches['batches'] * 1000
+            print(f"   Latenza media per batch: {mean_ms:.1f} ms"
+                  + (f" ({batches['over_target']:,} batch oltre l'obiettivo)"
+                     if options.target_latency_ms else "")
+                  + (f", budget finale {batches['token_budget']:,} token"
+                     if batches['token_budget'] else ""))
+            # Istogramma a intervalli di potenze di 2: 1, 2-3, 4-7, ...
+            ranges = {}
+            for size, count in batches['batch_sizes'].items():
+                low = 1 << (int(size).bit_length() - 1)
+                ranges[low] = ranges.get(low, 0) + count
+            histogram = ", ".join(f"{low if low == 1 else f'{low}-{2 * low - 1}'}: {count:,}"
+                                  for low, count in sorted(ranges.items()))
+            print(f"   Dimensioni usate (sequenze: batch): {histogram}")
+        if batches['oom_backoffs']:
+            print(f"   ⚠️  Memoria esaurita {batches['oom_backoffs']:,} volte: batch divisi e "
+                  f"budget ridotto")
+    
+    def _print_cascade_report(self):
+        """
+        Instradamento della cascata, speedup, accordo e curva per soglia
+        """
+        stats = self.cascade_stats
+        if not stats:
+            return
+        summary = cascade_summary(stats)
+        
+        def fmt(value, spec):
+            return 'n.d.' if value is None else format(value, spec)
+        
+        print(f"🪜 Cascata (soglia {stats['threshold']:g}): primo stadio "
+              f"{stats['first_stage']:,} testi ({summary['first_stage_fraction']:.1%}), "
+              f"transformer {stats['transformer']:,} ({summary['transformer_fraction']:.1%}, "
+              f"di cui {stats['audited']:,} di controllo)")
+        print(f"   Tempo: primo stadio {stats['first_stage_seconds']:.2f}s "
+              f"({summary['first_stage_ms_per_text']:.3f} ms/testo), transformer "
+              f"{stats['transformer_seconds']:.2f}s; speedup stimato "
+              f"{fmt(summary['speedup'], '.2f')}x")
+        print(f"   Accordo stimato con il solo transformer: {fmt(summary['agreement'], '.1%')}"
+              + (f" (campione di controllo: {stats['audit_agreed']:,}/{stats['audited']:,})"
+                 if stats['audited'] else " (nessun campione di controllo)"))
+        print(f"   {'soglia':>8} {'al transformer':>15} {'speedup':>8} {'accordo':>8}")
+        for point in summary['curve']:
+            marker = ' ◀' if point['threshold'] == stats['threshold'] else ''
+            speedup = fmt(point['speedup'], '.2f') + 'x'
+            print(f"   {point['threshold']:8g} {point['transformer_fraction']:15.1%} "
+                  f"{speedup:>8} {fmt(point['agreement'], '.1%'):>8}{marker}")
+    
+    def _print_memory_report(self, memory_before):
+        """
+        Memoria del DataFrame prima e dopo l'analisi
+        
+        Le colonne dei risultati sono compatte: label categoriche (1 byte
+        per news) e confidence float32 (4 byte per news).
+        """
+        memory_after = self.df.memory_usage(deep=True).sum()
+        results = self.df[['predicted_sentiment', 'confidence']].memory_usage(
+            index=False, deep=True).sum()
+        rows = max(len(self.df), 1)
+        print(f"🧮 Memoria DataFrame: {memory_before / 1024 ** 2:,.1f} MB prima, "
+              f"{memory_after / 1024 ** 2:,.1f} MB dopo "
+              f"(risultati: {results / 1024 ** 2:,.2f} MB, {results / rows:.1f} byte/news)")
+    
+    def _tokenize(self, texts, rows):
+        """
+        Tokenizza le news in un'unica chiamata al tokenizer
+        
+        Le sequenze sono complete (nessun troncamento): troncamento o
+        divisione in finestre avvengono poi sui token. Le news presenti nel
+        token store (se c'è) non vengono tokenizzate: le loro id sono viste
+        sull'array in memory-map.
+        
+        Args:
+            texts (list): News da tokenizzare
+            rows (array-like): Posizione di ogni news nel dataset (per i log)
+        
+        Returns:
+            list: Token id di ogni news, special token inclusi (liste o
+                array dello store; None se la news non è un testo valido)
+        """
+        tokenizer = self.sentiment_pipeline.tokenizer
+        encodings = [None] * len(texts)
+        stored = np.full(len(texts), -1, dtype=np.int64)
+        if self.token_store is not None:
+            valid = [idx for idx, text in enumerate(texts) if isinstance(text, str)]
+            stored[valid] = self.token_store.lookup([texts[idx] for idx in valid])
+            for idx in np.flatnonzero(stored >= 0):
+                encodings[idx] = self.token_store[stored[idx]]
+            self.metrics.count('pretokenized', int((stored >= 0).sum()))
+        
+        positions = []
+        batch = []
+        for idx, (row, text) in enumerate(zip(rows, texts)):
+            if stored[idx] >= 0:
+                continue
+            if isinstance(text, str):
+                positions.append(idx)
+                batch.append(text)
+            else:
+                print(f"   ⚠️  Errore su news #{row + 1}: testo non valido")
+                self.metrics.count('errors')
+        
+        if batch:
+            input_ids = tokenizer(batch, verbose=False)['input_ids']
+            for idx, ids in zip(positions, input_ids):
+                encodings[idx] = ids
+        return encodings
+    
+    def _special_token_layout(self):
+        """
+        Numero di special token aggiunti dal tokenizer in testa e in coda
+        (es. [CLS] e [SEP])
+        """
+        tokenizer = self.sentiment_pipeline.tokenizer
+        with_special = tokenizer('a')['input_ids']
+        content = tokenizer('a', add_special_tokens=False)['input_ids']
+        for prefix in range(len(with_special) - len(content) + 1):
+            if with_special[prefix:prefix + len(content)] == content:
+                return prefix, len(with_special) - prefix - len(content)
+        return 0, 0
+    
+    def _model_max_length(self):
+        """
+        Numero massimo di token accettati dal modello
+        """
+        limits = [getattr(self.sentiment_pipeline.model.config, 'max_position_embeddings', None),
+                  self.sentiment_pipeline.tokenizer.model_max_length]
+        return min(limit for limit in limits if limit) if any(limits) else 512
+    
+    @staticmethod
+    def _truncation_stats(full_lengths, lengths, max_length):
+        """
+        Quante news sono state troncate e di quanti token
+        """
+        removed = np.asarray(full_lengths) - np.asarray(lengths)
+        truncated = removed > 0
+        n_truncated = int(truncated.sum())
+        return {
+            'max_length': int(max_length),
+            'rows': int(len(removed)),
+            'truncated_rows': n_truncated,
+            'truncated_pct': n_truncated / len(removed) * 100 if len(removed) else 0.0,
+            'tokens_removed': int(removed.sum()),
+            'mean_tokens_removed': float(removed[truncated].mean()) if n_truncated else 0.0,
+            'max_tokens_removed': int(removed.max()) if len(removed) else 0,
+        }
+    
+    @staticmethod
+    def _merge_truncation_stats(stats_list):
+        """
+        Combina le statistiche di troncamento di più shard
+        """
+        merged = {'max_length': stats_list[0]['max_length']}
+        for field in ('rows', 'truncated_rows', 'tokens_removed', 'long_documents', 'windows'):
+            merged[field] = sum(stats[field] for stats in stats_list)
+        n_truncated = merged['truncated_rows']
+        merged['truncated_pct'] = n_truncated / merged['rows'] * 100 if merged['rows'] else 0.0
+        merged['mean_tokens_removed'] = merged['tokens_removed'] / n_truncated if n_truncated else 0.0
+        merged['max_tokens_removed'] = max(stats['max_tokens_removed'] for stats in stats_list)
+        return merged
+    
+    def _predict_batch(self, encodings, rows, sizer=None):
+        """
+        Predice il sentiment di un batch di sequenze con un solo forward pass
+        
+        Se il batch esaurisce la memoria viene diviso a metà e riprovato
+        (e il sizer riduce il budget dei batch successivi). Per gli altri
+        errori le sequenze vengono riprovate una alla volta: solo quelle
+        che generano errore restano senza punteggio (e la news riceve il
+        valore neutro).
+        
+        Args:
+            encodings (list): Token id delle sequenze del batch
+            rows (array-like): News di appartenenza di ogni sequenza (per i log)
+            sizer (AdaptiveBatchSizer, optional): Riceve tempi e token dei
+                batch eseguiti
+        
+        Returns:
+            np.ndarray: Probabilità per classe, una riga per sequenza
+                (NaN per le sequenze fallite)
+        """
+        padded_tokens = len(encodings) * max(len(ids) for ids in encodings)
+        try:
+            start = time.perf_counter()
+            probs = self._forward(encodings)
+            if sizer is not None:
+                sizer.observe(len(encodings), padded_tokens, time.perf_counter() - start)
+            return probs
+        except Exception as e:
+            # Fuori dal blocco except: il traceback non trattiene i tensori del batch
+            out_of_memory = is_out_of_memory(e) and len(encodings) > 1
+        
+        if out_of_memory:
+            # Backoff: metà batch alla volta, budget dimezzato per i successivi
+            release_memory()
+            self.metrics.count('oom_backoffs')
+            if sizer is not None:
+                sizer.on_out_of_memory(padded_tokens)
+            half = len(encodings) // 2
+            print(f"   ⚠️  Memoria esaurita su un batch da {len(encodings)} sequenze "
+                  f"({padded_tokens:,} token): riprovo a metà")
+            return np.concatenate([
+                self._predict_batch(encodings[:half], rows[:half], sizer),
+                self._predict_batch(encodings[half:], rows[half:], sizer),
+            ])
+        
+        # Isola le sequenze che causano l'errore
+        self.metrics.count('batch_retries')
+        n_labels = len(self.sentiment_pipeline.model.config.id2label)
+        probs = np.full((len(encodings), n_labels), np.nan)
+        for idx, (row, ids) in enumerate(zip(rows, encodings)):
+            try:
+                probs[idx] = self._forward([ids])[0]
+            except Exception as e:
+                print(f"   ⚠️  Errore su news #{row + 1}: {str(e)[:50]}")
+                self.metrics.count('errors')
+        return probs
+    
+    def _forward(self, encodings):
+        """
+        Padding al più lungo del batch, forward pass e softmax
+        
+        Returns:
+            np.ndarray: Probabilità per classe, una riga per sequenza
+        """
+        tokenizer = self.sentiment_pipeline.tokenizer
+        with self.metrics.stage('pad'):
+            input_ids, attention_mask = pad_batch(encodings, tokenizer.pad_token_id or 0,
+                                                  tokenizer.padding_side)
+        with self.metrics.stage('forward'):
+            probs = self.backend.forward(input_ids, attention_mask)
+        self.metrics.count('batches')
+        self.metrics.count('tokens', attention_mask.sum())
+        self.metrics.count('padded_tokens', attention_mask.size)
+        return probs
+    
+    def summarize(self):
+        """
+        Riepilogo dei risultati calcolato in un solo passaggio
+        
+        Viene riusato da `generate_statistics` e `save_results` e ricalcolato
+        solo dopo una nuova analisi.
+        
+        Returns:
+            ResultSummary: Conteggi, confidence, confusione, top-k
+        """
+        if self.summary is None or self.summary.rows != len(self.df):
+            with self.metrics.stage('summarize'):
+                self.summary = ResultSummary.from_frame(self.df)
+        return self.summary
+    
+    @timed_stage('generate_statistics')
     def generate_statistics(self):
         """
         Genera statistiche descrittive sui risultati
         """
+        summary = self.summarize()
+        
         print("=" * 70)
         print("📈 STATISTICHE ANALISI")
         print("=" * 70)
@@ -141,9 +1372,8 @@ class FinancialSentimentAnalyzer:
         # 1. Distribuzione sentiment predetti
         print("1️⃣  DISTRIBUZIONE SENTIMENT PREDETTI")
         print("-" * 70)
-        sentiment_dist = self.df['predicted_sentiment'].value_counts()
-        for sentiment, count in sentiment_dist.items():
-            percentage = (count / len(self.df)) * 100
+        for sentiment, count in summary.sorted_counts():
+            percentage = (count / summary.rows) * 100
             bar = "█" * int(percentage / 2)
             print(f"   {sentiment:10} {count:5,} ({percentage:5.1f}%)  {bar}")
         print()
@@ -151,33 +1381,41 @@ class FinancialSentimentAnalyzer:
         # 2. Confidence statistics
         print("2️⃣  CONFIDENCE SCORES")
         print("-" * 70)
-        print(f"   Media:    {self.df['confidence'].mean():.2%}")
-        print(f"   Mediana:  {self.df['confidence'].median():.2%}")
-        print(f"   Min:      {self.df['confidence'].min():.2%}")
-        print(f"   Max:      {self.df['confidence'].max():.2%}")
+        print(f"   Media:    {summary.mean_confidence:.2%}")
+        print(f"   Mediana:  {summary.median_confidence:.2%}")
+        print(f"   Dev. std: {summary.std_confidence:.2%}")
+        print(f"   Min:      {summary.confidence_min:.2%}")
+        print(f"   Max:      {summary.confidence_max:.2%}")
+        print("   Quantili: " + ", ".join(f"p{round(q * 100)} {summary.quantile(q):.2%}"
+                                         for q in REPORT_QUANTILES))
         print()
         
         # 3. Confronto con sentiment originale
         print("3️⃣  CONFRONTO CON SENTIMENT ORIGINALE")
         print("-" * 70)
         
-        # Mappa sentiment per confronto (case-insensitive)
-        self.df['original_lower'] = self.df['original_sentiment'].str.lower()
-        self.df['predicted_lower'] = self.df['predicted_sentiment'].str.lower()
-        
-        # Calcola accuracy
-        matches = (self.df['original_lower'] == self.df['predicted_lower']).sum()
-        accuracy = (matches / len(self.df)) * 100
+        # Confronto case-insensitive fatto sulle label distinte, non per riga
+        matches = summary.matches
+        accuracy = summary.accuracy * 100
         
-        print(f"   Match:      {matches:,}/{len(self.df):,} ({accuracy:.1f}%)")
-        print(f"   Mismatch:   {len(self.df) - matches:,} ({100-accuracy:.1f}%)")
+        print(f"   Match:      {matches:,}/{summary.compared:,} ({accuracy:.1f}%)")
+        print(f"   Mismatch:   {summary.compared - matches:,} ({100-accuracy:.1f}%)")
+        if summary.confusion:
+            print()
+            print("   Matrice di confusione (righe: originale, colonne: predetto):")
+            for line in summary.confusion_matrix().to_string().splitlines():
+                print(f"      {line}")
+            print()
+            print(f"   {'Classe':10} {'Precision':>9} {'Recall':>7} {'Support':>8}")
+            for label, metrics in summary.class_metrics().items():
+                print(f"   {label:10} {metrics['precision']:9.1%} {metrics['recall']:7.1%} "
+                      f"{metrics['support']:8,}")
         print()
         
         # 4. Top confident predictions
         print("4️⃣  TOP 3 PREDIZIONI PIÙ SICURE")
         print("-" * 70)
-        top_confident = self.df.nlargest(3, 'confidence')
-        for idx, (_, row) in enumerate(top_confident.iterrows(), 1):
+        for idx, row in enumerate(summary.top[:3], 1):
             print(f"{idx}. {row['predicted_sentiment']} ({row['confidence']:.2%})")
             print(f"   '{row['text'][:80]}...'")
             print()
@@ -185,112 +1423,162 @@ class FinancialSentimentAnalyzer:
         # 5. Esempi per sentiment
         print("5️⃣  ESEMPI PER SENTIMENT")
         print("-" * 70)
-        for sentiment in self.df['predicted_sentiment'].unique():
-            examples = self.df[self.df['predicted_sentiment'] == sentiment].head(2)
+        for sentiment, examples in summary.examples.items():
             print(f"\n   📌 {sentiment}:")
-            for _, row in examples.iterrows():
+            for row in examples:
                 print(f"      • {row['text'][:100]}...")
                 print(f"        Confidence: {row['confidence']:.2%}")
         
+        # 6. Cache predizioni
+        if self.cache_stats is not None:
+            cache = self.cache_stats
+            print()
+            print("6️⃣  CACHE PREDIZIONI")
+            print("-" * 70)
+            print(f"   Hit:        {cache['hits']:,} ({cache['hit_rate']:.1%})")
+            print(f"   Miss:       {cache['misses']:,}")
+            print(f"   Voci:       {cache['entries']:,}/{cache['max_entries']:,}")
+            print(f"   Eviction:   {cache['evictions']:,}")
+        
         print()
         print("=" * 70)
         print()
     
-    def save_results(self, output_dir='results'):
+    @timed_stage('save_results')
+    def save_results(self, output_dir='results', formats=('parquet', 'csv'), excel=False,
+                     row_group_size=DEFAULT_ROW_GROUP_SIZE):
         """
-        Salva i risultati in CSV e Excel
+        Salva i risultati in Parquet e/o CSV, più un summary
+        
+        Il Parquet usa tipi compatti (label categoriche, confidence float32)
+        ed è scritto a row group; eventuali colonne di appoggio
+        (original_lower, predicted_lower) non vengono salvate. L'Excel, lento
+        e pesante con openpyxl, è opzionale e contiene solo le statistiche
+        riassuntive. Statistiche, Excel e summary usano lo stesso riepilogo
+        (`summarize`).
         
         Args:
             output_dir (str): Directory dove salvare i risultati
+            formats (tuple): Formati dei risultati completi: 'parquet', 'csv'
+            excel (bool): Salva anche il workbook Excel riassuntivo
+            row_group_size (int): Righe per row group del Parquet
         """
         print("=" * 70)
         print("💾 SALVATAGGIO RISULTATI")
         print("=" * 70)
         print()
         
+        unknown = set(formats) - {'parquet', 'csv'}
+        if unknown:
+            raise ValueError(f"Formati non supportati: {sorted(unknown)} (usa 'parquet' o 'csv')")
+        
         # Crea directory se non esiste
         os.makedirs(output_dir, exist_ok=True)
+        saved = []
+        summary = self.summarize()
+        with self.metrics.stage('compact_results'):
+            results = compact_results(self.df)
         
-        # Timestamp per i file
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        
-        # 1. Salva CSV
-        csv_path = f"{output_dir}/sentiment_results.csv"
-        print(f"💾 Salvataggio CSV: {csv_path}")
-        self.df.to_csv(csv_path, index=False)
-        print(f"   ✅ CSV salvato ({len(self.df):,} righe)")
-        print()
+        # 1. Salva Parquet
+        if 'parquet' in formats:
+            if parquet_available():
+                parquet_path = f"{output_dir}/sentiment_results.parquet"
+                print(f"🧱 Salvataggio Parquet: {parquet_path}")
+                with self.metrics.stage('write_parquet'):
+                    write_parquet(results, parquet_path, row_group_size)
+                size_mb = os.path.getsize(parquet_path) / 1024 ** 2
+                print(f"   ✅ Parquet salvato ({len(results):,} righe, {size_mb:.1f} MB)")
+                saved.append('sentiment_results.parquet')
+            else:
+                print("⚠️  pyarrow non installato: Parquet non salvato (pip install pyarrow)")
+            print()
         
-        # 2. Salva Excel con sheet multipli
-        excel_path = f"{output_dir}/sentiment_results.xlsx"
-        print(f"📊 Salvataggio Excel: {excel_path}")
+        # 2. Salva CSV
+        if 'csv' in formats:
+            csv_path = f"{output_dir}/sentiment_results.csv"
+            print(f"💾 Salvataggio CSV: {csv_path}")
+            with self.metrics.stage('write_csv'):
+                results.to_csv(csv_path, index=False)
+            print(f"   ✅ CSV salvato ({len(results):,} righe)")
+            saved.append('sentiment_results.csv')
+            print()
         
-        with pd.ExcelWriter(excel_path, engine='openpyxl') as writer:
-            # Sheet 1: Risultati completi
-            self.df.to_excel(writer, sheet_name='Results', index=False)
+        # 3. Excel riassuntivo (opzionale)
+        if excel:
+            excel_path = f"{output_dir}/sentiment_results.xlsx"
+            print(f"📊 Salvataggio Excel: {excel_path}")
             
-            # Sheet 2: Statistiche
-            stats_data = {
-                'Metric': [
-                    'Total News',
-                    'Positive',
-                    'Negative', 
-                    'Neutral',
-                    'Avg Confidence',
-                    'Min Confidence',
-                    'Max Confidence'
-                ],
-                'Value': [
-                    len(self.df),
-                    (self.df['predicted_sentiment'] == 'POSITIVE').sum(),
-                    (self.df['predicted_sentiment'] == 'NEGATIVE').sum(),
-                    (self.df['predicted_sentiment'] == 'NEUTRAL').sum() 
-                        if 'NEUTRAL' in self.df['predicted_sentiment'].values else 0,
-                    f"{self.df['confidence'].mean():.2%}",
-                    f"{self.df['confidence'].min():.2%}",
-                    f"{self.df['confidence'].max():.2%}"
-                ]
-            }
-            stats_df = pd.DataFrame(stats_data)
-            stats_df.to_excel(writer, sheet_name='Statistics', index=False)
+            with self.metrics.stage('write_excel'), \
+                    pd.ExcelWriter(excel_path, engine='openpyxl') as writer:
+                # Sheet 1: Statistiche
+                stats_data = {
+                    'Metric': [
+                        'Total News',
+                        'Positive',
+                        'Negative', 
+                        'Neutral',
+                        'Avg Confidence',
+                        'Median Confidence',
+                        'Std Confidence',
+                        'Min Confidence',
+                        'Max Confidence',
+                        'Accuracy vs Original'
+                    ],
+                    'Value': [
+                        summary.rows,
+                        summary.counts.get('POSITIVE', 0),
+                        summary.counts.get('NEGATIVE', 0),
+                        summary.counts.get('NEUTRAL', 0),
+                        f"{summary.mean_confidence:.2%}",
+                        f"{summary.median_confidence:.2%}",
+                        f"{summary.std_confidence:.2%}",
+                        f"{summary.confidence_min:.2%}",
+                        f"{summary.confidence_max:.2%}",
+                        f"{summary.accuracy:.2%}"
+                    ]
+                }
+                stats_df = pd.DataFrame(stats_data)
+                stats_df.to_excel(writer, sheet_name='Statistics', index=False)
+                
+                # Sheet 2: Distribution
+                dist_df = pd.DataFrame(summary.sorted_counts(), columns=['Sentiment', 'Count'])
+                dist_df['Percentage'] = (dist_df['Count'] / summary.rows * 100).round(1)
+                dist_df.to_excel(writer, sheet_name='Distribution', index=False)
+                
+                # Sheet 3: Confusion matrix e precision/recall per classe
+                if summary.confusion:
+                    summary.confusion_matrix().to_excel(writer, sheet_name='Confusion')
+                    class_df = pd.DataFrame(summary.class_metrics()).T
+                    class_df.index.name = 'Class'
+                    class_df.to_excel(writer, sheet_name='Class Metrics')
             
-            # Sheet 3: Distribution
-            dist_df = self.df['predicted_sentiment'].value_counts().reset_index()
-            dist_df.columns = ['Sentiment', 'Count']
-            dist_df['Percentage'] = (dist_df['Count'] / len(self.df) * 100).round(1)
-            dist_df.to_excel(writer, sheet_name='Distribution', index=False)
-        
-        print(f"   ✅ Excel salvato con 3 sheet:")
-        print(f"      - Results (dati completi)")
-        print(f"      - Statistics (metriche)")
-        print(f"      - Distribution (distribuzione)")
-        print()
+            print(f"   ✅ Excel salvato con statistiche e distribuzione"
+                  f"{', confusione e metriche per classe' if summary.confusion else ''}")
+            saved.append('sentiment_results.xlsx')
+            print()
         
-        # 3. Summary report
+        # 4. Summary report
         summary_path = f"{output_dir}/analysis_summary.txt"
         print(f"📄 Salvataggio summary: {summary_path}")
         
-        with open(summary_path, 'w') as f:
+        with self.metrics.stage('write_summary'), open(summary_path, 'w') as f:
             f.write("=" * 70 + "\n")
             f.write("FINANCIAL NEWS SENTIMENT ANALYSIS - SUMMARY REPORT\n")
             f.write("=" * 70 + "\n\n")
             f.write(f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
             f.write(f"Dataset: {self.data_path}\n")
-            f.write(f"Total News Analyzed: {len(self.df):,}\n\n")
+            f.write(f"Total News Analyzed: {summary.rows:,}\n\n")
             
             f.write("SENTIMENT DISTRIBUTION:\n")
             f.write("-" * 70 + "\n")
-            for sentiment, count in self.df['predicted_sentiment'].value_counts().items():
-                percentage = (count / len(self.df)) * 100
+            for sentiment, count in summary.sorted_counts():
+                percentage = (count / summary.rows) * 100
                 f.write(f"{sentiment:10} {count:6,} ({percentage:5.1f}%)\n")
             
-            f.write(f"\nAVERAGE CONFIDENCE: {self.df['confidence'].mean():.2%}\n")
+            f.write(f"\nAVERAGE CONFIDENCE: {summary.mean_confidence:.2%}\n")
             
             # Confronto con originale
-            matches = (self.df['original_sentiment'].str.lower() == 
-                      self.df['predicted_sentiment'].str.lower()).sum()
-            accuracy = (matches / len(self.df)) * 100
-            f.write(f"ACCURACY vs ORIGINAL: {accuracy:.1f}%\n")
+            f.write(f"ACCURACY vs ORIGINAL: {summary.accuracy * 100:.1f}%\n")
         
         print(f"   ✅ Summary salvato")
         print()
@@ -300,10 +1588,55 @@ class FinancialSentimentAnalyzer:
         print("=" * 70)
         print()
         print(f"📁 File generati in '{output_dir}/':")
-        print(f"   • sentiment_results.csv")
-        print(f"   • sentiment_results.xlsx")
-        print(f"   • analysis_summary.txt")
+        for name in saved + ['analysis_summary.txt']:
+            print(f"   • {name}")
         print()
+    
+    def export_metrics(self, path='results/run_metrics.json'):
+        """
+        Salva le metriche dell'esecuzione (tempi per stage, contatori, memoria)
+        
+        Args:
+            path (str): File di output: JSON, oppure formato testuale di
+                Prometheus con estensione .prom
+        """
+        self.metrics.save(path)
+        print(f"📏 Metriche salvate: {path}")
+
+
+# Analyzer del processo worker (un modello caricato per processo)
+_worker_analyzer = None
+
+
+def _init_worker(model_name, threads, backend='torch', token_store_path=None):
+    """
+    Inizializza un processo del pool: thread PyTorch e caricamento modello
+    
+    Il token store viene riaperto nel worker: il memory-map condivide le
+    pagine del file con gli altri processi.
+    """
+    global _worker_analyzer
+    import torch
+    torch.set_num_threads(threads)
+    with contextlib.redirect_stdout(io.StringIO()):
+        _worker_analyzer = FinancialSentimentAnalyzer(None, model_name=model_name,
+                                                      backend=backend,
+                                                      token_store_path=token_store_path)
+        _worker_analyzer._ensure_model()
+
+
+def _infer_shard(texts, rows, options):
+    """
+    Analizza uno shard nel processo worker
+    
+    Returns:
+        tuple: (label, confidence, padding_stats, batch_stats, truncation_stats, metriche)
+    """
+    _worker_analyzer.metrics.reset()
+    with _worker_analyzer.metrics.stage('worker_infer'):
+        sentiments, scores = _worker_analyzer._infer(texts, rows, progress=False, **options)
+    return (sentiments, scores, _worker_analyzer.padding_stats, _worker_analyzer.batch_stats,
+            _worker_analyzer.truncation_stats, _worker_analyzer.metrics.to_dict())
 
 
 def main():
@@ -319,7 +1652,11 @@ def main():
     print()
     
     # Inizializza analyzer
-    analyzer = FinancialSentimentAnalyzer('data/all-data.csv')
+    # CSV Kaggle se presente, altrimenti i file originali di FinancialPhraseBank
+    data_path = 'data/all-data.csv'
+    if not os.path.exists(data_path) and os.path.isdir('data/FinancialPhraseBank'):
+        data_path = 'data/FinancialPhraseBank'
+    analyzer = FinancialSentimentAnalyzer(data_path)
     
     # Carica dati
     # Per test veloce usa: sample_size=500
@@ -342,6 +1679,12 @@ def main():
     # Salva risultati
     analyzer.save_results()
     
+    # Metriche dell'esecuzione (tempi per stage, contatori, memoria)
+    analyzer.metrics.print_report()
+    analyzer.export_metrics('results/run_metrics.json')
+    analyzer.export_metrics('results/run_metrics.prom')
+    print()
+    
     print("=" * 70)
     print("🎉 ANALISI COMPLETATA CON SUCCESSO!")
     print("=" * 70)
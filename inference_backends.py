@@ -0,0 +1,234 @@
+"""
+Inference Backends
+Backend intercambiabili per il forward pass del classificatore:
+PyTorch fp32, PyTorch con quantizzazione dinamica int8 e ONNX Runtime
+(grafo esportato, opzionalmente quantizzato int8)
+
+torch e onnxruntime sono importati solo quando un backend viene creato.
+"""
+
+import copy
+import hashlib
+import importlib.util
+import inspect
+import os
+import sys
+
+import numpy as np
+
+# Directory dei modelli esportati in ONNX
+DEFAULT_EXPORT_DIR = os.path.join(os.path.expanduser('~'), '.cache',
+                                  'financial_sentiment_analyzer', 'onnx')
+
+ONNX_OPSET = 17
+
+
+def softmax(logits):
+    """
+    Softmax numericamente stabile su numpy (ultima dimensione)
+    """
+    logits = logits.astype(np.float32, copy=False)
+    shifted = np.exp(logits - logits.max(axis=-1, keepdims=True))
+    return shifted / shifted.sum(axis=-1, keepdims=True)
+
+
+class TorchBackend:
+    """
+    Forward pass del modello PyTorch originale (fp32)
+    """
+
+    name = 'torch'
+    requires = ('torch',)
+
+    def __init__(self, model, **kwargs):
+        self.model = model.eval()
+
+    def forward(self, input_ids, attention_mask):
+        """
+        Args:
+            input_ids (np.ndarray): Token id con padding, (batch, lunghezza)
+            attention_mask (np.ndarray): 1 sui token reali, 0 sul padding
+
+        Returns:
+            np.ndarray: Probabilità per classe, una riga per sequenza
+        """
+        import torch
+        device = next(self.model.parameters()).device
+        inputs = {'input_ids': torch.from_numpy(np.asarray(input_ids, dtype=np.int64)).to(device),
+                  'attention_mask': torch.from_numpy(
+                      np.asarray(attention_mask, dtype=np.int64)).to(device)}
+        with torch.inference_mode():
+            logits = self.model(**inputs).logits
+        return torch.softmax(logits.float(), dim=-1).cpu().numpy()
+
+
+class TorchInt8Backend(TorchBackend):
+    """
+    PyTorch con quantizzazione dinamica int8 dei layer lineari (solo CPU)
+
+    I pesi dei `nn.Linear` diventano int8, le attivazioni sono quantizzate
+    al volo: meno memoria e matmul più veloci su CPU, con una piccola
+    deriva rispetto a fp32. Il modello originale non viene modificato.
+    """
+
+    name = 'torch-int8'
+
+    def __init__(self, model, **kwargs):
+        import torch
+        from torch.ao.quantization import quantize_dynamic
+        quantized = quantize_dynamic(copy.deepcopy(model).to('cpu').eval(),
+                                     {torch.nn.Linear}, dtype=torch.qint8)
+        super().__init__(quantized)
+
+
+class OnnxBackend:
+    """
+    ONNX Runtime su CPU con il grafo esportato dal modello PyTorch
+
+    L'export avviene una sola volta per modello e revisione; il file viene
+    riusato dalle esecuzioni successive (e dai processi worker).
+    """
+
+    name = 'onnx'
+    # onnx serve all'export (torch.onnx) e alla quantizzazione del grafo
+    requires = ('torch', 'onnxruntime', 'onnx')
+    quantize = False
+
+    def __init__(self, model, model_id='', revision='', export_dir=None, **kwargs):
+        import torch
+        try:
+            import onnxruntime
+        except ImportError:
+            raise ImportError("Il backend ONNX richiede onnxruntime e onnx: "
+                              "pip install onnxruntime onnx") from None
+
+        self.path = self._export(model, model_id, revision, export_dir or DEFAULT_EXPORT_DIR)
+        options = onnxruntime.SessionOptions()
+        # Stessi thread di PyTorch (rispetta threads_per_worker nei processi worker)
+        options.intra_op_num_threads = torch.get_num_threads()
+        options.inter_op_num_threads = 1
+        self.session = onnxruntime.InferenceSession(self.path, options,
+                                                    providers=['CPUExecutionProvider'])
+        self.input_names = {node.name for node in self.session.get_inputs()}
+
+    def _export(self, model, model_id, revision, export_dir):
+        """
+        Esporta il modello in ONNX (e lo quantizza se richiesto), se non già fatto
+
+        Returns:
+            str: Percorso del file .onnx da caricare
+        """
+        key = hashlib.sha256(f"{model_id}@{revision}".encode()).hexdigest()[:16]
+        directory = os.path.join(export_dir, key)
+        fp32_path = os.path.join(directory, 'model.onnx')
+        target = os.path.join(directory, 'model.int8.onnx') if self.quantize else fp32_path
+        if os.path.exists(target):
+            return target
+        os.makedirs(directory, exist_ok=True)
+
+        if not os.path.exists(fp32_path):
+            import torch
+            model = copy.deepcopy(model).to('cpu').eval()
+            dummy_ids = torch.ones((2, 8), dtype=torch.long)
+            dummy_mask = torch.ones((2, 8), dtype=torch.long)
+            kwargs = {}
+            if 'dynamo' in inspect.signature(torch.onnx.export).parameters:
+                kwargs['dynamo'] = False  # exporter TorchScript: assi dinamici semplici
+            tmp_path = f"{fp32_path}.{os.getpid()}.tmp"
+            torch.onnx.export(
+                model, (dummy_ids, dummy_mask), tmp_path,
+                input_names=['input_ids', 'attention_mask'],
+                output_names=['logits'],
+                dynamic_axes={'input_ids': {0: 'batch', 1: 'sequence'},
+                              'attention_mask': {0: 'batch', 1: 'sequence'},
+                              'logits': {0: 'batch'}},
+                opset_version=ONNX_OPSET,
+                **kwargs,
+            )
+            os.replace(tmp_path, fp32_path)
+
+        if self.quantize:
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+            tmp_path = f"{target}.{os.getpid()}.tmp"
+            quantize_dynamic(fp32_path, tmp_path, weight_type=QuantType.QInt8)
+            os.replace(tmp_path, target)
+        return target
+
+    def forward(self, input_ids, attention_mask):
+        feeds = {'input_ids': np.asarray(input_ids, dtype=np.int64),
+                 'attention_mask': np.asarray(attention_mask, dtype=np.int64)}
+        if 'token_type_ids' in self.input_names:
+            feeds['token_type_ids'] = np.zeros_like(feeds['input_ids'])
+        feeds = {name: value for name, value in feeds.items() if name in self.input_names}
+        logits = self.session.run(['logits'], feeds)[0]
+        return softmax(logits)
+
+
+class OnnxInt8Backend(OnnxBackend):
+    """
+    ONNX Runtime con grafo quantizzato dinamicamente (pesi int8)
+    """
+
+    name = 'onnx-int8'
+    quantize = True
+
+
+def is_out_of_memory(error):
+    """
+    True se l'eccezione indica memoria esaurita (GPU, CPU o ONNX Runtime)
+    """
+    if isinstance(error, MemoryError):
+        return True
+    message = str(error).lower()
+    return any(marker in message for marker in ('out of memory', "can't allocate memory",
+                                                'failed to allocate memory'))
+
+
+def release_memory():
+    """
+    Libera la memoria trattenuta dall'allocatore CUDA dopo un errore di memoria
+    """
+    torch = sys.modules.get('torch')
+    if torch is not None and torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
+
+BACKENDS = {backend.name: backend
+            for backend in (TorchBackend, TorchInt8Backend, OnnxBackend, OnnxInt8Backend)}
+
+
+def check_backend(name):
+    """
+    Verifica che il backend esista e che le sue dipendenze opzionali siano
+    installate, senza importarle (il backend viene creato solo al primo uso)
+
+    Raises:
+        ValueError: Backend sconosciuto
+        ImportError: Dipendenza opzionale mancante
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"backend non valido: {name!r} (scegli tra {', '.join(BACKENDS)})")
+    missing = [module for module in BACKENDS[name].requires
+               if importlib.util.find_spec(module) is None]
+    if missing:
+        raise ImportError(f"Il backend {name} richiede {' e '.join(missing)}: "
+                          f"pip install {' '.join(missing)}")
+
+
+def create_backend(name, model, model_id='', revision='', export_dir=None):
+    """
+    Crea il backend richiesto
+
+    Args:
+        name (str): 'torch', 'torch-int8', 'onnx' o 'onnx-int8'
+        model: Modello PyTorch `...ForSequenceClassification` caricato
+        model_id (str): Nome o percorso del modello (per l'export ONNX)
+        revision (str): Revisione del modello (per l'export ONNX)
+        export_dir (str, optional): Directory dei modelli esportati
+
+    Returns:
+        Backend con metodo `forward(input_ids, attention_mask)`
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"backend non valido: {name!r} (scegli tra {', '.join(BACKENDS)})")
+    return BACKENDS[name](model, model_id=model_id, revision=revision, export_dir=export_dir)
@@ -0,0 +1,124 @@
+"""
+Inference Options
+Parametri di inferenza di un'analisi (batch, troncamento, finestre,
+budget di token, cascata) raccolti in un unico oggetto validato alla
+creazione e condiviso da analyze_sentiment, analyze_stream, predict e
+dal servizio
+"""
+
+from dataclasses import dataclass, fields
+
+from long_documents import REDUCERS
+
+
+@dataclass(frozen=True)
+class InferenceOptions:
+    """
+    Parametri di inferenza, validati una volta alla creazione
+
+    I controlli che non dipendono dal modello avvengono qui, prima di
+    caricarlo; quelli che richiedono il tokenizer (default di `max_length`,
+    finestre) li fa l'analyzer quando risolve le opzioni.
+
+    Attributes:
+        batch_size (int): Numero di sequenze per forward pass
+            (1 = una news alla volta, come nella versione originale)
+        sort_by_length (bool): Raggruppa sequenze di lunghezza simile
+        bucket_boundaries (tuple, optional): Limiti dei bucket in token,
+            es. (16, 32, 64)
+        max_length (int, optional): Lunghezza massima in token, special
+            token inclusi (default: limite del modello, 512 per DistilBERT);
+            es. 128 per headline
+        long_documents (bool): Analizza i testi lunghi a finestre invece
+            di troncarli
+        stride (int): Token di sovrapposizione tra finestre consecutive
+        reducer (str): Come combinare le finestre: 'mean',
+            'max_confidence' o 'length_weighted'
+        max_tokens (int, optional): Budget di token con padding per batch
+            (news x lunghezza della più lunga), es. 8192
+        target_latency_ms (float, optional): Latenza obiettivo per batch:
+            il budget di token si adatta alla velocità misurata
+        cascade_threshold (float, optional): Confidence minima del primo
+            stadio per non passare dal transformer, es. 0.9
+        cascade_audit_rate (float): Frazione delle news accettate dal
+            primo stadio controllata anche con il transformer
+    """
+
+    batch_size: int = 32
+    sort_by_length: bool = True
+    bucket_boundaries: tuple = None
+    max_length: int = None
+    long_documents: bool = False
+    stride: int = 64
+    reducer: str = 'mean'
+    max_tokens: int = None
+    target_latency_ms: float = None
+    cascade_threshold: float = None
+    cascade_audit_rate: float = 0.02
+
+    def __post_init__(self):
+        if self.bucket_boundaries is not None:
+            object.__setattr__(self, 'bucket_boundaries', tuple(self.bucket_boundaries))
+        if self.batch_size < 1:
+            raise ValueError(f"batch_size deve essere >= 1 (ricevuto {self.batch_size})")
+        if self.reducer not in REDUCERS:
+            raise ValueError(f"reducer non valido: {self.reducer!r} "
+                             f"(scegli tra {', '.join(REDUCERS)})")
+        if self.max_length is not None and self.max_length < 1:
+            raise ValueError(f"max_length deve essere >= 1 (ricevuto {self.max_length})")
+        if self.stride < 0:
+            raise ValueError(f"stride deve essere >= 0 (ricevuto {self.stride})")
+        if self.long_documents and self.max_length is not None and self.stride >= self.max_length:
+            raise ValueError(f"stride ({self.stride}) deve essere minore di max_length "
+                             f"({self.max_length})")
+        if self.max_tokens is not None and self.max_tokens < 1:
+            raise ValueError(f"max_tokens deve essere >= 1 (ricevuto {self.max_tokens})")
+        if self.target_latency_ms is not None and self.target_latency_ms <= 0:
+            raise ValueError(f"target_latency_ms deve essere > 0 "
+                             f"(ricevuto {self.target_latency_ms})")
+        if self.cascade_threshold is not None:
+            if not 0 < self.cascade_threshold <= 1:
+                raise ValueError(f"cascade_threshold deve essere in (0, 1] "
+                                 f"(ricevuto {self.cascade_threshold})")
+            if not 0 <= self.cascade_audit_rate <= 1:
+                raise ValueError(f"cascade_audit_rate deve essere in [0, 1] "
+                                 f"(ricevuto {self.cascade_audit_rate})")
+
+    @classmethod
+    def from_arguments(cls, options=None, **overrides):
+        """
+        Opzioni da un oggetto InferenceOptions o da argomenti keyword
+
+        Args:
+            options (InferenceOptions, optional): Opzioni già create
+            **overrides: Parametri come keyword (in alternativa a `options`)
+
+        Returns:
+            InferenceOptions: Opzioni validate
+        """
+        if options is None:
+            return cls(**overrides)
+        if overrides:
+            raise TypeError(f"Passa le opzioni di inferenza come InferenceOptions o come "
+                            f"keyword, non entrambe ({', '.join(sorted(overrides))})")
+        if not isinstance(options, cls):
+            raise TypeError(f"options deve essere InferenceOptions (ricevuto "
+                            f"{type(options).__name__})")
+        return options
+
+    @property
+    def cascade(self):
+        """
+        True se la cascata a due stadi è attiva
+        """
+        return self.cascade_threshold is not None
+
+    def infer_kwargs(self):
+        """
+        Parametri di `_infer` (tutti tranne quelli della cascata)
+
+        Returns:
+            dict: Nome -> valore, serializzabile per i processi worker
+        """
+        return {field.name: getattr(self, field.name) for field in fields(self)
+                if not field.name.startswith('cascade_')}
@@ -0,0 +1,323 @@
+"""
+Instrumentation
+Timer per stage, contatori, memoria di picco, avanzamento con velocità ed
+ETA, profiling opzionale (cProfile o torch.profiler) ed export delle
+metriche in JSON o nel formato testuale di Prometheus
+"""
+
+import contextlib
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import sys
+import time
+from collections import Counter
+
+try:
+    import resource
+except ImportError:  # Windows: memoria di picco non disponibile
+    resource = None
+
+PROFILE_MODES = ('cprofile', 'torch')
+
+
+def peak_rss_bytes():
+    """
+    Memoria residente di picco del processo corrente (None se non disponibile)
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux riporta KB, macOS byte
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class RunMetrics:
+    """
+    Metriche di un'esecuzione: tempo e chiamate per stage, contatori, memoria
+
+    Gli stage possono essere annidati: il nome registrato è il percorso
+    (es. 'analyze_sentiment/forward'). Le metriche dei processi worker si
+    uniscono con `merge` sotto lo stage attivo; il loro tempo è sommato
+    sui processi.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """
+        Azzera tempi, contatori e memoria di picco
+        """
+        self.stages = {}
+        self.counters = Counter()
+        self.workers_peak_rss = None
+        self.started = time.time()
+        self._stack = []
+        self._suspended = 0
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """
+        Misura il tempo del blocco come stage `name`
+        """
+        if self._suspended:
+            yield
+            return
+        self._stack.append(name)
+        path = '/'.join(self._stack)
+        # Registrato all'ingresso: gli stage annidati seguono il proprio genitore
+        self.stages.setdefault(path, {'seconds': 0.0, 'calls': 0})
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            self.add_time(path, time.perf_counter() - start)
+
+    def add_time(self, path, seconds, calls=1):
+        entry = self.stages.setdefault(path, {'seconds': 0.0, 'calls': 0})
+        entry['seconds'] += seconds
+        entry['calls'] += calls
+
+    def count(self, name, value=1):
+        """
+        Incrementa un contatore
+        """
+        if not self._suspended:
+            self.counters[name] += int(value)
+
+    @contextlib.contextmanager
+    def suspended(self):
+        """
+        Blocco escluso dalle metriche (es. batch fittizi del warmup)
+        """
+        self._suspended += 1
+        try:
+            yield
+        finally:
+            self._suspended -= 1
+
+    def merge(self, data):
+        """
+        Aggiunge le metriche di un altro processo (da `to_dict`) sotto lo stage attivo
+        """
+        prefix = '/'.join(self._stack)
+        for path, entry in data['stages'].items():
+            self.add_time(f"{prefix}/{path}" if prefix else path, entry['seconds'],
+                          entry['calls'])
+        self.counters.update(data['counters'])
+        peaks = [peak for peak in (self.workers_peak_rss, data.get('peak_rss_bytes')) if peak]
+        self.workers_peak_rss = max(peaks) if peaks else None
+
+    def rows_per_second(self):
+        """
+        News analizzate al secondo negli stage di analisi
+        """
+        seconds = sum(self.stages[name]['seconds']
+                      for name in ('analyze_sentiment', 'analyze_stream') if name in self.stages)
+        return self.counters['rows'] / seconds if seconds else None
+
+    def to_dict(self):
+        """
+        Metriche come dizionario serializzabile in JSON
+        """
+        counters = dict(self.counters)
+        padded = counters.get('padded_tokens', 0)
+        return {
+            'started': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started)),
+            'wall_seconds': time.time() - self.started,
+            'stages': {path: dict(entry) for path, entry in self.stages.items()},
+            'counters': counters,
+            'padding_efficiency': counters.get('tokens', 0) / padded if padded else None,
+            'rows_per_second': self.rows_per_second(),
+            'peak_rss_bytes': peak_rss_bytes(),
+            'workers_peak_rss_bytes': self.workers_peak_rss,
+        }
+
+    def to_prometheus(self, prefix='fsa'):
+        """
+        Metriche nel formato testuale di Prometheus
+        """
+        data = self.to_dict()
+        lines = [f"# HELP {prefix}_stage_seconds_total Tempo trascorso per stage",
+                 f"# TYPE {prefix}_stage_seconds_total counter"]
+        lines += [f'{prefix}_stage_seconds_total{{stage="{path}"}} {entry["seconds"]:.6f}'
+                  for path, entry in data['stages'].items()]
+        lines += [f"# HELP {prefix}_stage_calls_total Esecuzioni per stage",
+                  f"# TYPE {prefix}_stage_calls_total counter"]
+        lines += [f'{prefix}_stage_calls_total{{stage="{path}"}} {entry["calls"]}'
+                  for path, entry in data['stages'].items()]
+        for name, value in sorted(data['counters'].items()):
+            lines += [f"# TYPE {prefix}_{name}_total counter", f"{prefix}_{name}_total {value}"]
+        for name in ('padding_efficiency', 'rows_per_second', 'peak_rss_bytes',
+                     'workers_peak_rss_bytes'):
+            if data[name] is not None:
+                lines += [f"# TYPE {prefix}_{name} gauge", f"{prefix}_{name} {data[name]:g}"]
+        return '\n'.join(lines) + '\n'
+
+    def save(self, path):
+        """
+        Salva le metriche: Prometheus per `.prom`/`.txt`, altrimenti JSON
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w') as f:
+            if path.endswith(('.prom', '.txt')):
+                f.write(self.to_prometheus())
+            else:
+                json.dump(self.to_dict(), f, indent=2)
+
+    def print_report(self, title="⏱️  METRICHE DI ESECUZIONE"):
+        """
+        Stampa tempi per stage, contatori e memoria
+        """
+        data = self.to_dict()
+        print("=" * 70)
+        print(title)
+        print("=" * 70)
+        print()
+        for path, entry in data['stages'].items():
+            depth = path.count('/')
+            name = '  ' * depth + path.rsplit('/', 1)[-1]
+            print(f"   {name:32} {entry['seconds']:10.3f}s {entry['calls']:8,} chiamate")
+        if data['counters']:
+            print()
+            for name, value in data['counters'].items():
+                print(f"   {name:32} {value:14,}")
+        print()
+        if data['padding_efficiency'] is not None:
+            print(f"   Padding efficiency:  {data['padding_efficiency']:.1%}")
+        if data['rows_per_second'] is not None:
+            print(f"   Velocità analisi:    {data['rows_per_second']:,.1f} news/s")
+        if data['peak_rss_bytes'] is not None:
+            print(f"   Memoria di picco:    {data['peak_rss_bytes'] / 1024 ** 2:,.0f} MB"
+                  + (f" (worker: {data['workers_peak_rss_bytes'] / 1024 ** 2:,.0f} MB)"
+                     if data['workers_peak_rss_bytes'] else ""))
+        print()
+
+
+def timed_stage(name):
+    """
+    Decoratore: misura il metodo come stage `name` in `self.metrics`
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.metrics.stage(name):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class ProgressMeter:
+    """
+    Avanzamento con velocità ed ETA, stampato al più ogni `interval` secondi
+
+    Su terminale la riga viene riscritta sul posto, altrimenti (log, file)
+    viene stampata una riga per aggiornamento.
+    """
+
+    def __init__(self, total, unit='news', interval=1.0, stream=None):
+        self.total = total
+        self.unit = unit
+        self.interval = interval
+        self.stream = stream or sys.stdout
+        self.done = 0
+        self.start = time.perf_counter()
+        self._last_print = None
+        self._inline = getattr(self.stream, 'isatty', lambda: False)()
+
+    def update(self, n):
+        """
+        Registra `n` elementi completati
+        """
+        self.done += n
+        now = time.perf_counter()
+        if (self._last_print is None or now - self._last_print >= self.interval
+                or self.done >= self.total):
+            self._last_print = now
+            self._print(now)
+
+    def _print(self, now):
+        elapsed = now - self.start
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        remaining = (self.total - self.done) / rate if rate else float('nan')
+        percentage = self.done / self.total * 100 if self.total else 100.0
+        line = (f"   Progresso: {self.done:,}/{self.total:,} ({percentage:.1f}%) - "
+                f"{rate:,.0f} {self.unit}/s - ETA {format_seconds(remaining)}")
+        if self._inline:
+            end = '\n' if self.done >= self.total else ''
+            self.stream.write(f"\r{line}\033[K{end}")
+        else:
+            self.stream.write(line + '\n')
+        self.stream.flush()
+
+
+def format_seconds(seconds):
+    """
+    Durata leggibile, es. '1h 02m', '3m 05s', '12s'
+    """
+    if seconds != seconds:  # NaN: velocità non ancora nota
+        return '?'
+    seconds = int(round(seconds))
+    if seconds >= 3600:
+        return f"{seconds // 3600}h {seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m {seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+@contextlib.contextmanager
+def profile_run(mode, output_path=None, top=20):
+    """
+    Profila il blocco con cProfile o torch.profiler
+
+    Con 'cprofile' stampa le funzioni con più tempo cumulativo e salva le
+    statistiche (`.pstats`, leggibili con `pstats` o snakeviz); con 'torch'
+    stampa gli operatori più costosi e salva una traccia Chrome (`.json`,
+    apribile in chrome://tracing o Perfetto). Nei processi worker il
+    profiler non è attivo.
+
+    Args:
+        mode (str): 'cprofile', 'torch' o None (nessun profiling)
+        output_path (str, optional): File dove salvare il profilo
+        top (int): Righe da stampare
+    """
+    if mode is None:
+        yield
+        return
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"profiling non valido: {mode!r} (scegli tra {', '.join(PROFILE_MODES)})")
+    if output_path and os.path.dirname(output_path):
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+    if mode == 'cprofile':
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            buffer = io.StringIO()
+            pstats.Stats(profiler, stream=buffer).sort_stats('cumulative').print_stats(top)
+            print(buffer.getvalue())
+            if output_path:
+                profiler.dump_stats(output_path)
+                print(f"🔬 Profilo cProfile salvato: {output_path}\n")
+        return
+
+    import torch
+    activities = [torch.profiler.ProfilerActivity.CPU]
+    if torch.cuda.is_available():
+        activities.append(torch.profiler.ProfilerActivity.CUDA)
+    with torch.profiler.profile(activities=activities) as profiler:
+        yield
+    print(profiler.key_averages().table(sort_by='self_cpu_time_total', row_limit=top))
+    if output_path:
+        profiler.export_chrome_trace(output_path)
+        print(f"🔬 Traccia torch.profiler salvata: {output_path}\n")
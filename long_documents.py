@@ -0,0 +1,92 @@
+"""
+Long Documents
+Divisione in finestre di token sovrapposte e aggregazione dei punteggi
+per analizzare articoli più lunghi del limite del modello
+"""
+
+import numpy as np
+
+# Metodi disponibili per combinare i punteggi delle finestre
+REDUCERS = ('mean', 'max_confidence', 'length_weighted')
+
+
+def split_windows(ids, max_length, stride, n_prefix, n_suffix):
+    """
+    Divide una sequenza di token in finestre sovrapposte
+
+    Ogni finestra contiene al massimo `max_length` token, special token
+    inclusi; finestre consecutive condividono `stride` token di contenuto.
+    Il numero di finestre cresce linearmente con la lunghezza del testo.
+
+    Args:
+        ids (list): Token id completi (con special token)
+        max_length (int): Lunghezza massima di una finestra
+        stride (int): Token di sovrapposizione tra finestre consecutive
+        n_prefix (int): Special token in testa (es. [CLS])
+        n_suffix (int): Special token in coda (es. [SEP])
+
+    Returns:
+        list: Finestre (liste di token id), ognuna con i propri special token
+    """
+    if len(ids) <= max_length:
+        return [ids]
+
+    prefix = ids[:n_prefix]
+    suffix = ids[len(ids) - n_suffix:] if n_suffix else []
+    content = ids[n_prefix:len(ids) - n_suffix]
+
+    size = max_length - n_prefix - n_suffix
+    if not 0 <= stride < size:
+        raise ValueError(f"stride deve essere tra 0 e {size - 1} (ricevuto {stride})")
+    step = size - stride
+
+    windows = []
+    for start in range(0, len(content), step):
+        windows.append(prefix + content[start:start + size] + suffix)
+        if start + size >= len(content):
+            break
+    return windows
+
+
+def aggregate_windows(doc_index, probs, weights, n_docs, reducer='mean'):
+    """
+    Combina i punteggi delle finestre in un punteggio per documento
+
+    Args:
+        doc_index (np.ndarray): Documento di appartenenza di ogni finestra
+        probs (np.ndarray): Probabilità per classe di ogni finestra
+            (righe NaN = finestra fallita, ignorata)
+        weights (np.ndarray): Token di contenuto di ogni finestra
+        n_docs (int): Numero di documenti
+        reducer (str): 'mean' (media delle probabilità), 'max_confidence'
+            (finestra più sicura) o 'length_weighted' (media pesata per
+            numero di token)
+
+    Returns:
+        np.ndarray: Probabilità per classe di ogni documento (NaN se tutte
+            le sue finestre sono fallite)
+    """
+    if reducer not in REDUCERS:
+        raise ValueError(f"reducer non valido: {reducer!r} (scegli tra {', '.join(REDUCERS)})")
+
+    ok = ~np.isnan(probs).any(axis=1)
+    doc_index, probs, weights = doc_index[ok], probs[ok], np.asarray(weights, dtype=float)[ok]
+    result = np.full((n_docs, probs.shape[1]), np.nan)
+
+    if reducer == 'max_confidence':
+        # Per ogni documento, la finestra con probabilità massima più alta
+        order = np.lexsort((-probs.max(axis=1), doc_index))
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = doc_index[order][1:] != doc_index[order][:-1]
+        best = order[first]
+        result[doc_index[best]] = probs[best]
+        return result
+
+    if reducer == 'mean':
+        weights = np.ones(len(doc_index))
+    sums = np.zeros((n_docs, probs.shape[1]))
+    np.add.at(sums, doc_index, probs * weights[:, None])
+    totals = np.bincount(doc_index, weights=weights, minlength=n_docs)
+    has_windows = totals > 0
+    result[has_windows] = sums[has_windows] / totals[has_windows, None]
+    return result
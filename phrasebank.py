@@ -0,0 +1,131 @@
+"""
+FinancialPhraseBank Loader
+Legge i file `Sentences_*Agree.txt` (formato `frase@label`) e li unisce
+in un'unica tabella deduplicata con il livello di accordo degli annotatori
+"""
+
+import os
+import re
+
+import pandas as pd
+
+# Livello di accordo minimo (in %) di ogni file, dal meno al più restrittivo
+AGREEMENT_FILES = {
+    50: 'Sentences_50Agree.txt',
+    66: 'Sentences_66Agree.txt',
+    75: 'Sentences_75Agree.txt',
+    100: 'Sentences_AllAgree.txt',
+}
+
+_AGREEMENT_IN_NAME = re.compile(r'Sentences_(\d+|All)Agree', re.IGNORECASE)
+
+
+def decode_bytes(raw):
+    """
+    Decodifica il contenuto di un file: UTF-8 se valido, altrimenti Latin-1
+
+    I file distribuiti con il dataset sono ISO-8859-1; una versione
+    ri-salvata in UTF-8 viene comunque letta correttamente.
+    """
+    try:
+        return raw.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        return raw.decode('latin-1')
+
+
+def read_phrasebank_file(path):
+    """
+    Legge un file PhraseBank in un solo passaggio
+
+    Ogni riga è divisa sull'ultimo '@' (la frase può contenerne altri);
+    righe vuote o senza label vengono ignorate.
+
+    Args:
+        path (str): File `frase@label`
+
+    Returns:
+        tuple: (frasi, label) come liste parallele
+
+    Raises:
+        ValueError: Nessuna riga `frase@label` (il file non è di PhraseBank)
+    """
+    with open(path, 'rb') as f:
+        content = decode_bytes(f.read())
+
+    sentences, labels = [], []
+    for line in content.splitlines():
+        sentence, sep, label = line.rpartition('@')
+        if not sep or not sentence.strip():
+            continue
+        sentences.append(sentence.strip())
+        labels.append(label.strip().lower())
+    if not sentences:
+        raise ValueError(f"Nessuna riga 'frase@label' in {path}: non è un file PhraseBank")
+    return sentences, labels
+
+
+def agreement_from_filename(path):
+    """
+    Livello di accordo (in %) indicato dal nome del file, es. 75 o 100
+    """
+    match = _AGREEMENT_IN_NAME.search(os.path.basename(path))
+    if not match:
+        return None
+    level = match.group(1)
+    return 100 if level.lower() == 'all' else int(level)
+
+
+def load_phrasebank(path):
+    """
+    Carica FinancialPhraseBank come DataFrame
+
+    Con una directory, unisce i quattro livelli di accordo in una sola
+    tabella: ogni frase compare una volta, con `agreement_level` pari al
+    livello più alto in cui compare. I file sono sottoinsiemi annidati,
+    quindi `df[df['agreement_level'] >= 75]` corrisponde al file 75Agree.
+    L'unione usa un indice frase -> riga, senza riletture dei file.
+
+    Args:
+        path (str): Directory con i file `Sentences_*Agree.txt` o un singolo file
+
+    Returns:
+        pd.DataFrame: Colonne original_sentiment, text, agreement_level
+    """
+    if os.path.isdir(path):
+        files = [(level, os.path.join(path, name)) for level, name in AGREEMENT_FILES.items()
+                 if os.path.exists(os.path.join(path, name))]
+        if not files:
+            raise FileNotFoundError(f"Nessun file Sentences_*Agree.txt in {path}")
+    else:
+        files = [(agreement_from_filename(path) or 0, path)]
+
+    index = {}
+    texts, labels, levels = [], [], []
+    for level, file_path in sorted(files):
+        sentences, file_labels = read_phrasebank_file(file_path)
+        for sentence, label in zip(sentences, file_labels):
+            row = index.get(sentence)
+            if row is None:
+                index[sentence] = len(texts)
+                texts.append(sentence)
+                labels.append(label)
+                levels.append(level)
+            else:
+                levels[row] = max(levels[row], level)
+
+    return pd.DataFrame({
+        'original_sentiment': labels,
+        'text': texts,
+        'agreement_level': pd.array(levels, dtype='int8'),
+    })
+
+
+def is_phrasebank_path(path):
+    """
+    True se il percorso è una directory PhraseBank o un file `Sentences_*Agree.txt`
+
+    Gli altri file (anche `.txt`) non sono riconosciuti: vengono letti come CSV.
+    """
+    if os.path.isdir(path):
+        return any(os.path.exists(os.path.join(path, name)) for name in AGREEMENT_FILES.values())
+    return agreement_from_filename(path) is not None
@@ -0,0 +1,250 @@
+"""
+Prediction Cache
+Cache persistente (SQLite) delle predizioni, indirizzata dal contenuto:
+la chiave è l'hash del testo normalizzato, del modello e dei parametri
+di inferenza, così testi già analizzati non passano più dal modello
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import unicodedata
+
+# Massimo numero di parametri per query SQLite
+_SQL_CHUNK = 500
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_text(text):
+    """
+    Normalizza un testo per il confronto: Unicode NFC e spazi compattati
+    """
+    return _WHITESPACE.sub(' ', unicodedata.normalize('NFC', text)).strip()
+
+
+def normalize_series(texts):
+    """
+    Versione vettoriale di `normalize_text` per una colonna pandas
+
+    I valori non testuali (es. NaN) diventano NaN.
+    """
+    texts = texts.where(texts.map(lambda value: isinstance(value, str)))
+    return (texts.str.normalize('NFC')
+                 .str.replace(_WHITESPACE, ' ', regex=True)
+                 .str.strip())
+
+
+class PredictionCache:
+    """
+    Cache su disco delle predizioni con eviction LRU
+
+    Le voci sono valide solo per il modello (id + revisione) con cui la
+    cache è stata aperta: se il modello cambia, la cache viene svuotata.
+
+    L'ordine LRU usa un contatore monotono (`last_used`), non l'orologio:
+    nessun pari merito dovuto alla risoluzione del tempo e nessun salto
+    se l'orologio di sistema torna indietro. Il numero di voci è tenuto in
+    memoria, quindi a ogni `put_many` non serve un COUNT(*) sulla tabella:
+    la cache assume un solo processo che scrive.
+    """
+
+    def __init__(self, path, model_id, revision='', max_entries=1_000_000):
+        """
+        Apre (o crea) la cache
+
+        Args:
+            path (str): File SQLite
+            model_id (str): Nome o percorso del modello
+            revision (str): Revisione del modello (commit hash o impronta
+                dei file locali)
+            max_entries (int): Numero massimo di predizioni conservate
+        """
+        if max_entries < 1:
+            raise ValueError(f"max_entries deve essere >= 1 (ricevuto {max_entries})")
+        self.path = path
+        self.model_id = model_id
+        self.revision = revision or ''
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidated = False
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS predictions ("
+            " key BLOB PRIMARY KEY, label TEXT NOT NULL,"
+            " score REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS predictions_last_used ON predictions(last_used)"
+        )
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+        self._check_model()
+        # Contatore LRU e numero di voci: letti una volta all'apertura
+        self._clock = self.conn.execute(
+            "SELECT COALESCE(MAX(last_used), 0) FROM predictions").fetchone()[0]
+        self._entries = self.conn.execute("SELECT COUNT(*) FROM predictions").fetchone()[0]
+
+    def _check_model(self):
+        """
+        Svuota la cache se è stata creata con un altro modello
+        """
+        fingerprint = f"{self.model_id}@{self.revision}"
+        row = self.conn.execute("SELECT value FROM meta WHERE name = 'model'").fetchone()
+        if row is not None and row[0] != fingerprint:
+            self.conn.execute("DELETE FROM predictions")
+            self.invalidated = True
+        self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('model', ?)", (fingerprint,))
+        self.conn.commit()
+
+    def key(self, text, settings=''):
+        """
+        Chiave di un testo: hash di testo normalizzato, modello e parametri
+
+        Args:
+            text (str): Testo
+            settings (str): Parametri di inferenza che influenzano l'output
+                (es. max_length)
+
+        Returns:
+            bytes: Digest SHA-256 (16 byte)
+        """
+        payload = '\0'.join((normalize_text(text), self.model_id, self.revision, settings))
+        return hashlib.sha256(payload.encode('utf-8')).digest()[:16]
+
+    def get_many(self, keys):
+        """
+        Cerca più chiavi e aggiorna il loro ultimo utilizzo
+
+        Args:
+            keys (list): Chiavi prodotte da `key`
+
+        Returns:
+            dict: chiave -> (label, score) per le chiavi presenti
+        """
+        found = {}
+        unique = list(dict.fromkeys(keys))
+        for start in range(0, len(unique), _SQL_CHUNK):
+            chunk = unique[start:start + _SQL_CHUNK]
+            placeholders = ','.join('?' * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT key, label, score FROM predictions WHERE key IN ({placeholders})",
+                chunk,
+            ).fetchall()
+            for key, label, score in rows:
+                found[bytes(key)] = (label, score)
+
+        now = self._tick()
+        hit_keys = list(found)
+        for start in range(0, len(hit_keys), _SQL_CHUNK):
+            chunk = hit_keys[start:start + _SQL_CHUNK]
+            placeholders = ','.join('?' * len(chunk))
+            self.conn.execute(
+                f"UPDATE predictions SET last_used = ? WHERE key IN ({placeholders})",
+                [now] + chunk,
+            )
+        self.conn.commit()
+
+        n_hits = sum(1 for key in keys if key in found)
+        self.hits += n_hits
+        self.misses += len(keys) - n_hits
+        return found
+
+    def put_many(self, items):
+        """
+        Salva nuove predizioni ed applica il limite di dimensione
+
+        Args:
+            items (iterable): Tuple (chiave, label, score)
+        """
+        # Una voce per chiave (vince l'ultima), usate più di recente in ordine
+        rows = {key: (key, label, float(score)) for key, label, score in items}
+        keys = list(rows)
+        # Chiavi già presenti (sostituite, non nuove): ricerca sulla chiave
+        # primaria, costa quanto il batch e non quanto la tabella
+        existing = 0
+        for start in range(0, len(keys), _SQL_CHUNK):
+            chunk = keys[start:start + _SQL_CHUNK]
+            placeholders = ','.join('?' * len(chunk))
+            existing += self.conn.execute(
+                f"SELECT COUNT(*) FROM predictions WHERE key IN ({placeholders})", chunk,
+            ).fetchone()[0]
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO predictions VALUES (?, ?, ?, ?)",
+            (row + (self._tick(),) for row in rows.values()),
+        )
+        self._entries += len(keys) - existing
+        self._evict()
+        self.conn.commit()
+
+    def _tick(self):
+        """
+        Prossimo valore del contatore LRU
+        """
+        self._clock += 1
+        return self._clock
+
+    def _evict(self):
+        """
+        Rimuove le voci usate meno di recente oltre `max_entries`
+        """
+        excess = self._entries - self.max_entries
+        if excess > 0:
+            self.conn.execute(
+                "DELETE FROM predictions WHERE key IN ("
+                " SELECT key FROM predictions ORDER BY last_used LIMIT ?)",
+                (excess,),
+            )
+            self._entries -= excess
+            self.evictions += excess
+
+    def reset_counters(self):
+        """
+        Azzera hit, miss ed eviction (inizio di una nuova analisi)
+        """
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def clear(self):
+        """
+        Svuota la cache
+        """
+        self.conn.execute("DELETE FROM predictions")
+        self.conn.commit()
+        self._entries = 0
+
+    def stats(self):
+        """
+        Contatori della cache per il report
+
+        Returns:
+            dict: hit, miss, hit rate, eviction e voci presenti
+        """
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'entries': len(self),
+            'max_entries': self.max_entries,
+            'invalidated': self.invalidated,
+        }
+
+    def close(self):
+        """
+        Chiude la connessione
+        """
+        self.conn.close()
+
+    def __len__(self):
+        return self._entries
@@ -0,0 +1,418 @@
+"""
+Sentiment Service
+Servizio HTTP locale (TCP o Unix socket) che tiene il modello caricato e
+raggruppa le richieste concorrenti in micro-batch
+
+Endpoint:
+    POST /predict   {"text": "..."} oppure {"texts": ["...", ...]}
+    GET  /metrics   latenze p50/p95/p99, istogramma dei batch, coda
+    GET  /health    stato del servizio
+
+Uso:
+    python sentiment_service.py [--model distilbert-...] [--port 8000]
+                                [--unix-socket /tmp/sentiment.sock]
+                                [--max-batch-size 32] [--max-wait-ms 5]
+                                [--max-queue 1024]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from financial_sentiment_analyzer import DEFAULT_MODEL, FinancialSentimentAnalyzer
+from inference_options import InferenceOptions
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+            413: 'Payload Too Large', 500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+# Dimensione massima del corpo di una richiesta
+MAX_BODY_BYTES = 10 * 1024 * 1024
+
+
+class QueueFullError(Exception):
+    """
+    La coda delle richieste è piena: il client deve riprovare più tardi
+    """
+
+
+class ServiceMetrics:
+    """
+    Latenze delle richieste (finestra mobile) e istogramma delle dimensioni dei batch
+    """
+
+    def __init__(self, window=10_000):
+        """
+        Args:
+            window (int): Numero di latenze recenti usate per i percentili
+        """
+        self.latencies = deque(maxlen=window)
+        self.batch_sizes = Counter()
+        self.batch_seconds = 0.0
+        self.requests = 0
+        self.texts = 0
+        self.rejected = 0
+        self.errors = 0
+
+    def record_request(self, seconds, n_texts):
+        self.latencies.append(seconds)
+        self.requests += 1
+        self.texts += n_texts
+
+    def record_batch(self, size, seconds):
+        self.batch_sizes[size] += 1
+        self.batch_seconds += seconds
+
+    def snapshot(self, queue_depth=0, queue_capacity=0):
+        """
+        Metriche correnti
+
+        Returns:
+            dict: Latenze in ms (p50/p95/p99/media/max), istogramma
+                dimensione batch -> numero di batch, contatori e coda
+        """
+        latency = {}
+        if self.latencies:
+            values = np.fromiter(self.latencies, dtype=np.float64) * 1000
+            p50, p95, p99 = np.percentile(values, [50, 95, 99])
+            latency = {'p50_ms': float(p50), 'p95_ms': float(p95), 'p99_ms': float(p99),
+                       'mean_ms': float(values.mean()), 'max_ms': float(values.max())}
+        batches = sum(self.batch_sizes.values())
+        return {
+            'requests': self.requests,
+            'texts': self.texts,
+            'rejected': self.rejected,
+            'errors': self.errors,
+            'latency': latency,
+            'batches': batches,
+            'mean_batch_size': self.texts / batches if batches else 0.0,
+            'batch_size_histogram': {str(size): count
+                                     for size, count in sorted(self.batch_sizes.items())},
+            'inference_seconds': self.batch_seconds,
+            'queue_depth': queue_depth,
+            'queue_capacity': queue_capacity,
+        }
+
+
+class MicroBatcher:
+    """
+    Raccoglie i testi in arrivo e li inferisce a micro-batch
+
+    Un batch parte quando raggiunge `max_batch_size` testi oppure quando
+    il primo testo ha atteso `max_wait_ms`. L'inferenza gira in un thread
+    dedicato, quindi l'event loop continua ad accettare richieste (che
+    formeranno il batch successivo). La coda è limitata: se è piena le
+    nuove richieste vengono rifiutate invece di accumulare latenza.
+    """
+
+    def __init__(self, predict_fn, max_batch_size=32, max_wait_ms=5.0, max_queue=1024,
+                 metrics=None):
+        """
+        Args:
+            predict_fn (callable): Funzione bloccante lista di testi ->
+                (label, confidence)
+            max_batch_size (int): Testi massimi per batch
+            max_wait_ms (float): Attesa massima del primo testo prima di
+                lanciare un batch incompleto
+            max_queue (int): Testi massimi in attesa (backpressure)
+            metrics (ServiceMetrics, optional): Dove registrare i batch
+        """
+        if max_batch_size < 1:
+            raise ValueError(f"max_batch_size deve essere >= 1 (ricevuto {max_batch_size})")
+        if max_queue < max_batch_size:
+            raise ValueError(f"max_queue ({max_queue}) deve essere >= max_batch_size "
+                             f"({max_batch_size})")
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_queue = max_queue
+        self.metrics = metrics or ServiceMetrics()
+        self.queue = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='inference')
+        self._task = None
+
+    async def start(self):
+        """
+        Avvia il ciclo di batching nell'event loop corrente
+        """
+        self.queue = asyncio.Queue(maxsize=self.max_queue)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+        Ferma il ciclo e il thread di inferenza
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._executor.shutdown(wait=True)
+
+    async def run_blocking(self, fn, *args):
+        """
+        Esegue una funzione nel thread di inferenza (es. warmup)
+        """
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def submit(self, texts):
+        """
+        Accoda i testi di una richiesta e attende i risultati
+
+        Args:
+            texts (list): Testi della richiesta
+
+        Returns:
+            list: Tuple (label, confidence), una per testo
+
+        Raises:
+            QueueFullError: Se la coda non ha posto per tutti i testi
+        """
+        # Tutto o niente: una richiesta non viene mai accodata a metà
+        if self.queue.qsize() + len(texts) > self.max_queue:
+            self.metrics.rejected += 1
+            raise QueueFullError(f"coda piena ({self.queue.qsize()}/{self.max_queue})")
+        loop = asyncio.get_running_loop()
+        futures = [loop.create_future() for _ in texts]
+        for text, future in zip(texts, futures):
+            self.queue.put_nowait((text, future))
+        return await asyncio.gather(*futures)
+
+    async def _next_batch(self):
+        """
+        Attende il primo testo, poi raccoglie fino a max_batch_size o max_wait
+        """
+        loop = asyncio.get_running_loop()
+        batch = [await self.queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            # Prima quello che è già in coda, senza attese
+            if not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch()
+            # Richieste abbandonate dal client (connessione chiusa) non vanno inferite
+            batch = [(text, future) for text, future in batch if not future.done()]
+            if not batch:
+                continue
+            texts = [text for text, _ in batch]
+            start = time.perf_counter()
+            try:
+                labels, scores = await loop.run_in_executor(self._executor, self.predict_fn, texts)
+            except Exception as exc:
+                self.metrics.errors += 1
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+            self.metrics.record_batch(len(batch), time.perf_counter() - start)
+            for (_, future), label, score in zip(batch, labels, scores):
+                if not future.done():
+                    future.set_result((label, score))
+
+
+class SentimentService:
+    """
+    Server HTTP/1.1 minimale (solo libreria standard) sopra un MicroBatcher
+    """
+
+    def __init__(self, analyzer, max_batch_size=32, max_wait_ms=5.0, max_queue=1024,
+                 **inference_options):
+        """
+        Args:
+            analyzer (FinancialSentimentAnalyzer): Analyzer con il modello caricato
+            max_batch_size (int): Testi massimi per micro-batch
+            max_wait_ms (float): Attesa massima per riempire un batch
+            max_queue (int): Testi massimi in attesa prima di rispondere 503
+            **inference_options: Parametri di inferenza (max_length, ...),
+                validati qui una volta per tutte le richieste
+        """
+        self.analyzer = analyzer
+        self.options = InferenceOptions(**dict(inference_options, batch_size=max_batch_size))
+        self.metrics = ServiceMetrics()
+        self.batcher = MicroBatcher(self._predict, max_batch_size, max_wait_ms, max_queue,
+                                    self.metrics)
+        self.server = None
+
+    def _predict(self, texts):
+        return self.analyzer.predict(texts, self.options)
+
+    async def start(self, host='127.0.0.1', port=8000, unix_socket=None):
+        """
+        Avvia batcher e server; il modello viene scaldato prima di accettare richieste
+
+        Returns:
+            asyncio.AbstractServer: Server in ascolto
+        """
+        await self.batcher.start()
+        await self.batcher.run_blocking(self.analyzer.warmup, self.batcher.max_batch_size)
+        if unix_socket:
+            self.server = await asyncio.start_unix_server(self._handle, path=unix_socket)
+        else:
+            self.server = await asyncio.start_server(self._handle, host, port)
+        return self.server
+
+    async def stop(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        await self.batcher.stop()
+
+    async def _handle(self, reader, writer):
+        """
+        Gestisce una connessione (keep-alive: più richieste in sequenza)
+        """
+        try:
+            while True:
+                request = await _read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                status, payload, extra = await self._route(method, path, body)
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                writer.write(_response(status, payload, extra, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method, path, body):
+        """
+        Returns:
+            tuple: (status HTTP, payload JSON, header aggiuntivi)
+        """
+        if path == '/health':
+            return 200, {'status': 'ok', 'model': self.analyzer.model_name}, {}
+        if path == '/metrics':
+            return 200, self.metrics.snapshot(self.batcher.queue.qsize(),
+                                              self.batcher.max_queue), {}
+        if path != '/predict':
+            return 404, {'error': f"endpoint sconosciuto: {path}"}, {}
+        if method != 'POST':
+            return 405, {'error': "usa POST"}, {'Allow': 'POST'}
+
+        try:
+            data = json.loads(body or b'{}')
+            single = 'text' in data
+            texts = [data['text']] if single else data['texts']
+            if not texts or not all(isinstance(text, str) and text.strip() for text in texts):
+                raise ValueError
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return 400, {'error': 'corpo atteso: {"text": "..."} o {"texts": ["...", ...]} '
+                                  'con testi non vuoti'}, {}
+        if len(texts) > self.batcher.max_queue:
+            return 413, {'error': f"massimo {self.batcher.max_queue} testi per richiesta"}, {}
+
+        start = time.perf_counter()
+        try:
+            results = await self.batcher.submit(texts)
+        except QueueFullError as exc:
+            return 503, {'error': str(exc)}, {'Retry-After': '1'}
+        except Exception as exc:
+            return 500, {'error': f"inferenza fallita: {exc}"}, {}
+        elapsed = time.perf_counter() - start
+        self.metrics.record_request(elapsed, len(texts))
+
+        items = [{'label': label, 'score': score} for label, score in results]
+        payload = items[0] if single else {'results': items}
+        return 200, payload, {}
+
+
+async def _read_request(reader):
+    """
+    Legge una richiesta HTTP/1.1
+
+    Returns:
+        tuple: (metodo, path, header in minuscolo, corpo) o None se la
+            connessione è stata chiusa
+    """
+    line = await reader.readline()
+    if not line:
+        return None
+    method, path, _ = line.decode('latin-1').split(' ', 2)
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get('content-length', 0))
+    if length > MAX_BODY_BYTES:
+        raise ValueError("corpo troppo grande")
+    body = await reader.readexactly(length) if length else b''
+    return method.upper(), path.split('?', 1)[0], headers, body
+
+
+def _response(status, payload, extra_headers, keep_alive):
+    body = json.dumps(payload).encode('utf-8')
+    headers = {
+        'Content-Type': 'application/json',
+        'Content-Length': str(len(body)),
+        'Connection': 'keep-alive' if keep_alive else 'close',
+        **extra_headers,
+    }
+    head = f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+    head += ''.join(f"{name}: {value}\r\n" for name, value in headers.items())
+    return head.encode('latin-1') + b'\r\n' + body
+
+
+async def serve(args):
+    analyzer = FinancialSentimentAnalyzer(None, model_name=args.model,
+                                          cache_path=args.cache_path)
+    service = SentimentService(analyzer, args.max_batch_size, args.max_wait_ms,
+                               args.max_queue, max_length=args.max_length)
+    server = await service.start(args.host, args.port, args.unix_socket)
+    where = args.unix_socket or f"http://{args.host}:{args.port}"
+    print(f"🛰️  Servizio sentiment in ascolto su {where}")
+    print(f"   Micro-batch: max {args.max_batch_size} testi, attesa max {args.max_wait_ms} ms, "
+          f"coda {args.max_queue}")
+    print("   Endpoint: POST /predict, GET /metrics, GET /health (Ctrl-C per uscire)\n")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default=DEFAULT_MODEL)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--unix-socket', default=None)
+    parser.add_argument('--max-batch-size', type=int, default=32)
+    parser.add_argument('--max-wait-ms', type=float, default=5.0)
+    parser.add_argument('--max-queue', type=int, default=1024)
+    parser.add_argument('--max-length', type=int, default=None)
+    parser.add_argument('--cache-path', default=None)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        print("\n👋 Servizio fermato")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Streaming
+Stadi a generatore per analizzare corpora che non stanno in memoria:
+lettura a chunk e scrittura incrementale (le statistiche incrementali
+sono in `summary.ResultSummary`)
+"""
+
+import os
+
+import pandas as pd
+
+
+def iter_csv_chunks(path, chunksize=10_000, encoding='latin-1',
+                    names=('original_sentiment', 'text')):
+    """
+    Legge un CSV a blocchi (stesso formato di `load_data`)
+
+    Args:
+        path (str): File CSV
+        chunksize (int): Righe per chunk
+        encoding (str): Encoding del file
+        names (tuple): Nomi delle colonne
+
+    Yields:
+        pd.DataFrame: Un chunk alla volta
+    """
+    yield from pd.read_csv(path, encoding=encoding, names=list(names), chunksize=chunksize)
+
+
+def append_csv(chunks, path):
+    """
+    Scrive i chunk in coda a un CSV man mano che arrivano
+
+    Il file viene sovrascritto al primo chunk (con header) e poi esteso.
+
+    Args:
+        chunks (iterable): DataFrame da scrivere
+        path (str): CSV di output
+
+    Yields:
+        pd.DataFrame: Gli stessi chunk, dopo la scrittura
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    first = True
+    for chunk in chunks:
+        chunk.to_csv(path, mode='w' if first else 'a', header=first, index=False)
+        first = False
+        yield chunk
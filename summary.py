@@ -0,0 +1,542 @@
+"""
+Result Summary
+Statistiche dei risultati calcolate in un solo passaggio vettoriale e
+combinabili in modo esatto tra shard (processi paralleli, chunk in streaming)
+"""
+
+import heapq
+
+import numpy as np
+import pandas as pd
+
+# Bin dell'istogramma della confidence su [0, 1]: i quantili hanno
+# risoluzione 1 / HISTOGRAM_BINS e l'istogramma si somma esattamente
+HISTOGRAM_BINS = 10_000
+
+REPORT_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+
+class ResultSummary:
+    """
+    Riepilogo di un insieme di risultati (predicted_sentiment, confidence,
+    e se presenti original_sentiment e text)
+
+    Contiene conteggi per label, momenti e istogramma della confidence
+    (complessivi e per label predetta), matrice di confusione (label confrontate senza distinzione tra
+    maiuscole e minuscole), le `top_k` righe più sicure, i primi esempi
+    per label e, con `sample_size`, un campione casuale della confidence
+    per label. Tutti i campi sono somme, min/max o selezioni ordinate,
+    quindi `merge` di più shard dà lo stesso risultato di un unico passaggio.
+
+    L'istogramma fine fa da sketch dei quantili: memoria fissa,
+    combinabile esattamente, errore al più 1 / HISTOGRAM_BINS.
+    """
+
+    def __init__(self, top_k=5, examples_per_class=2, sample_size=0):
+        """
+        Args:
+            top_k (int): Righe con confidence più alta da conservare
+            examples_per_class (int): Esempi (in ordine di riga) per label predetta
+            sample_size (int): Dimensione massima del campione di confidence
+                per label (0 = nessun campione)
+        """
+        self.top_k = top_k
+        self.examples_per_class = examples_per_class
+        self.sample_size = sample_size
+        self.rows = 0
+        self.counts = {}
+        self.confidence_sum = 0.0
+        self.confidence_sum_sq = 0.0
+        self.confidence_min = float('inf')
+        self.confidence_max = float('-inf')
+        self.histogram = np.zeros(HISTOGRAM_BINS, dtype=np.int64)
+        # Stesse statistiche per label predetta (box plot e violin senza i dati)
+        self.class_sum = {}
+        self.class_sum_sq = {}
+        self.class_min = {}
+        self.class_max = {}
+        self.class_histograms = {}
+        # Campione per label: (chiavi, confidence) delle righe con le chiavi minori
+        self.samples = {}
+        self.compared = 0
+        self.confusion = {}
+        self.top = []
+        self.examples = {}
+
+    @classmethod
+    def from_frame(cls, df, top_k=5, examples_per_class=2, sample_size=0):
+        """
+        Calcola il riepilogo di un DataFrame di risultati
+
+        Args:
+            df (pd.DataFrame): Risultati; l'indice identifica le righe
+                (per i pari merito della top-k e per il campione)
+            top_k (int): Righe con confidence più alta da conservare
+            examples_per_class (int): Esempi per label predetta
+            sample_size (int): Campione massimo di confidence per label
+
+        Returns:
+            ResultSummary: Riepilogo
+        """
+        summary = cls(top_k, examples_per_class, sample_size)
+        summary.update(df)
+        return summary
+
+    def update(self, df):
+        """
+        Aggiunge un blocco di risultati (le righe devono seguire quelle già viste)
+
+        Args:
+            df (pd.DataFrame): Risultati con predicted_sentiment e confidence
+        """
+        if len(df) == 0:
+            return
+        other = ResultSummary(self.top_k, self.examples_per_class, self.sample_size)
+        other._aggregate(df)
+        self.merge(other)
+
+    def _aggregate(self, df):
+        """
+        Riempie un riepilogo vuoto con un solo passaggio sulle colonne
+        """
+        predicted = df['predicted_sentiment']
+        confidence = df['confidence'].to_numpy(dtype=np.float64)
+        self.rows = len(df)
+
+        # Conteggi sui codici interi, non sulle stringhe
+        codes, labels = pd.factorize(predicted, sort=False)
+        valid = codes >= 0
+        for label, count in zip(labels, np.bincount(codes[valid], minlength=len(labels))):
+            self.counts[label] = int(count)
+
+        self.confidence_sum = float(confidence.sum())
+        self.confidence_sum_sq = float(np.dot(confidence, confidence))
+        self.confidence_min = float(confidence.min())
+        self.confidence_max = float(confidence.max())
+        bins = np.clip((confidence * HISTOGRAM_BINS).astype(np.int64), 0, HISTOGRAM_BINS - 1)
+        self.histogram = np.bincount(bins, minlength=HISTOGRAM_BINS).astype(np.int64)
+
+        # Per label: un solo bincount su (codice, bin) e riduzioni raggruppate
+        if len(labels):
+            class_codes, class_bins = codes[valid], bins[valid]
+            class_confidence = confidence[valid]
+            histograms = np.bincount(class_codes * HISTOGRAM_BINS + class_bins,
+                                     minlength=len(labels) * HISTOGRAM_BINS)
+            histograms = histograms.reshape(len(labels), HISTOGRAM_BINS).astype(np.int64)
+            sums = np.bincount(class_codes, weights=class_confidence, minlength=len(labels))
+            sums_sq = np.bincount(class_codes, weights=class_confidence ** 2,
+                                  minlength=len(labels))
+            for code, label in enumerate(labels):
+                values = class_confidence[class_codes == code]
+                self.class_histograms[label] = histograms[code]
+                self.class_sum[label] = float(sums[code])
+                self.class_sum_sq[label] = float(sums_sq[code])
+                self.class_min[label] = float(values.min()) if len(values) else float('inf')
+                self.class_max[label] = float(values.max()) if len(values) else float('-inf')
+
+        if self.sample_size and len(labels):
+            # Reservoir con chiavi pseudo-casuali ricavate dall'indice: il
+            # campione non dipende da come le righe sono divise tra shard
+            keys = pd.util.hash_array(df.index.to_numpy())
+            for code, label in enumerate(labels):
+                rows = np.flatnonzero(codes == code)
+                self.samples[label] = _smallest_keys(keys[rows], confidence[rows],
+                                                     self.sample_size)
+
+        if 'original_sentiment' in df:
+            self.compared = len(df)
+            self.confusion = _confusion_counts(df['original_sentiment'], codes, labels)
+
+        if self.top_k:
+            positions = _top_positions(confidence, self.top_k)
+            self.top = [self._row(df, i) for i in positions]
+
+        if self.examples_per_class:
+            # Prime righe di ogni label: ordinamento stabile per codice
+            order = np.argsort(np.where(valid, codes, len(labels)), kind='stable')
+            start = 0
+            for code, label in enumerate(labels):
+                count = self.counts[label]
+                positions = order[start:start + min(count, self.examples_per_class)]
+                self.examples[label] = [self._row(df, i) for i in positions]
+                start += count
+
+    @staticmethod
+    def _row(df, position):
+        """
+        Riga come dizionario (indice, label, confidence, testo)
+        """
+        row = {
+            'index': df.index[position],
+            'predicted_sentiment': df['predicted_sentiment'].iat[position],
+            'confidence': float(df['confidence'].iat[position]),
+        }
+        if 'text' in df:
+            row['text'] = df['text'].iat[position]
+        return row
+
+    def merge(self, other):
+        """
+        Aggiunge un altro riepilogo (shard successivo) a questo
+
+        Args:
+            other (ResultSummary): Riepilogo da combinare
+
+        Returns:
+            ResultSummary: self
+        """
+        self.rows += other.rows
+        for label, count in other.counts.items():
+            self.counts[label] = self.counts.get(label, 0) + count
+        self.confidence_sum += other.confidence_sum
+        self.confidence_sum_sq += other.confidence_sum_sq
+        self.confidence_min = min(self.confidence_min, other.confidence_min)
+        self.confidence_max = max(self.confidence_max, other.confidence_max)
+        self.histogram += other.histogram
+        for label, histogram in other.class_histograms.items():
+            if label in self.class_histograms:
+                self.class_histograms[label] = self.class_histograms[label] + histogram
+                self.class_sum[label] += other.class_sum[label]
+                self.class_sum_sq[label] += other.class_sum_sq[label]
+                self.class_min[label] = min(self.class_min[label], other.class_min[label])
+                self.class_max[label] = max(self.class_max[label], other.class_max[label])
+            else:
+                self.class_histograms[label] = histogram.copy()
+                self.class_sum[label] = other.class_sum[label]
+                self.class_sum_sq[label] = other.class_sum_sq[label]
+                self.class_min[label] = other.class_min[label]
+                self.class_max[label] = other.class_max[label]
+        for label, (keys, values) in other.samples.items():
+            if label in self.samples:
+                keys = np.concatenate([self.samples[label][0], keys])
+                values = np.concatenate([self.samples[label][1], values])
+            self.samples[label] = _smallest_keys(keys, values, self.sample_size)
+        self.compared += other.compared
+        for pair, count in other.confusion.items():
+            self.confusion[pair] = self.confusion.get(pair, 0) + count
+
+        # A pari confidence vince la riga vista prima (come DataFrame.nlargest)
+        ranked = list(enumerate(self.top + other.top))
+        best = heapq.nsmallest(self.top_k, ranked,
+                               key=lambda item: (-item[1]['confidence'], item[0]))
+        self.top = [row for _, row in best]
+
+        for label, rows in other.examples.items():
+            current = self.examples.setdefault(label, [])
+            current.extend(rows[:self.examples_per_class - len(current)])
+        return self
+
+    # ------------------------------------------------------------------
+    # Persistenza
+    # ------------------------------------------------------------------
+
+    def to_state(self):
+        """
+        Stato completo del riepilogo, per salvarlo e riprenderlo
+
+        Returns:
+            tuple: (metadati serializzabili in JSON, dizionario di array numpy)
+        """
+        classes = list(self.class_histograms)
+        meta = {
+            'top_k': self.top_k,
+            'examples_per_class': self.examples_per_class,
+            'sample_size': self.sample_size,
+            'rows': self.rows,
+            'counts': list(self.counts.items()),
+            'confidence_sum': self.confidence_sum,
+            'confidence_sum_sq': self.confidence_sum_sq,
+            'confidence_min': self.confidence_min,
+            'confidence_max': self.confidence_max,
+            'classes': classes,
+            'class_sum': [self.class_sum[label] for label in classes],
+            'class_sum_sq': [self.class_sum_sq[label] for label in classes],
+            'class_min': [self.class_min[label] for label in classes],
+            'class_max': [self.class_max[label] for label in classes],
+            'sample_classes': list(self.samples),
+            'compared': self.compared,
+            'confusion': [[original, predicted, count]
+                          for (original, predicted), count in self.confusion.items()],
+            'top': self.top,
+            'examples': list(self.examples.items()),
+        }
+        arrays = {'histogram': self.histogram}
+        if classes:
+            arrays['class_histograms'] = np.stack([self.class_histograms[label]
+                                                   for label in classes])
+        for i, (keys, values) in enumerate(self.samples.values()):
+            arrays[f'sample_keys_{i}'] = keys
+            arrays[f'sample_values_{i}'] = values
+        return meta, arrays
+
+    @classmethod
+    def from_state(cls, meta, arrays):
+        """
+        Ricostruisce un riepilogo salvato con `to_state`
+
+        Args:
+            meta (dict): Metadati
+            arrays (Mapping): Array per nome (anche un file .npz aperto)
+
+        Returns:
+            ResultSummary: Riepilogo identico all'originale
+        """
+        summary = cls(meta['top_k'], meta['examples_per_class'], meta['sample_size'])
+        summary.rows = meta['rows']
+        summary.counts = dict(meta['counts'])
+        summary.confidence_sum = meta['confidence_sum']
+        summary.confidence_sum_sq = meta['confidence_sum_sq']
+        summary.confidence_min = meta['confidence_min']
+        summary.confidence_max = meta['confidence_max']
+        summary.histogram = np.asarray(arrays['histogram'], dtype=np.int64)
+        histograms = arrays['class_histograms'] if meta['classes'] else []
+        for i, label in enumerate(meta['classes']):
+            summary.class_histograms[label] = np.asarray(histograms[i], dtype=np.int64)
+            summary.class_sum[label] = meta['class_sum'][i]
+            summary.class_sum_sq[label] = meta['class_sum_sq'][i]
+            summary.class_min[label] = meta['class_min'][i]
+            summary.class_max[label] = meta['class_max'][i]
+        for i, label in enumerate(meta['sample_classes']):
+            summary.samples[label] = (arrays[f'sample_keys_{i}'], arrays[f'sample_values_{i}'])
+        summary.compared = meta['compared']
+        summary.confusion = {(original, predicted): count
+                             for original, predicted, count in meta['confusion']}
+        summary.top = meta['top']
+        summary.examples = dict(meta['examples'])
+        return summary
+
+    # ------------------------------------------------------------------
+    # Metriche derivate
+    # ------------------------------------------------------------------
+
+    @property
+    def mean_confidence(self):
+        return self.confidence_sum / self.rows if self.rows else 0.0
+
+    @property
+    def std_confidence(self):
+        if self.rows < 2:
+            return 0.0
+        variance = (self.confidence_sum_sq - self.rows * self.mean_confidence ** 2) / (self.rows - 1)
+        return float(np.sqrt(max(variance, 0.0)))
+
+    def quantile(self, q):
+        """
+        Quantile della confidence dall'istogramma (interpolato dentro il bin)
+
+        Args:
+            q (float): Quantile in [0, 1]
+
+        Returns:
+            float: Valore, limitato a [min, max] osservati
+        """
+        return _histogram_quantile(self.histogram, self.rows, q, self.confidence_min,
+                                   self.confidence_max)
+
+    @property
+    def median_confidence(self):
+        return self.quantile(0.5)
+
+    def class_quantile(self, label, q):
+        """
+        Quantile della confidence delle righe con label predetta `label`
+        """
+        return _histogram_quantile(self.class_histograms[label], self.counts[label], q,
+                                   self.class_min[label], self.class_max[label])
+
+    def class_mean(self, label):
+        """
+        Confidence media delle righe con label predetta `label`
+        """
+        return self.class_sum[label] / self.counts[label] if self.counts[label] else 0.0
+
+    def class_std(self, label):
+        """
+        Deviazione standard (campionaria) della confidence per label predetta
+        """
+        rows = self.counts[label]
+        if rows < 2:
+            return 0.0
+        variance = (self.class_sum_sq[label] - rows * self.class_mean(label) ** 2) / (rows - 1)
+        return float(np.sqrt(max(variance, 0.0)))
+
+    def class_sample(self, label):
+        """
+        Campione casuale uniforme (al più `sample_size` valori) della
+        confidence delle righe con label predetta `label`
+        """
+        return self.samples[label][1] if label in self.samples else np.empty(0)
+
+    def histogram_counts(self, edges, label=None):
+        """
+        Conteggi della confidence in bin arbitrari, dall'istogramma fine
+
+        Ogni bin fine (larghezza 1 / HISTOGRAM_BINS) è assegnato al bin di
+        `edges` che contiene il suo centro: l'errore sui bordi è al più di
+        un bin fine.
+
+        Args:
+            edges (np.ndarray): Bordi crescenti dei bin
+            label (str, optional): Solo le righe con questa label predetta
+
+        Returns:
+            np.ndarray: Conteggi (len(edges) - 1)
+        """
+        histogram = self.histogram if label is None else self.class_histograms[label]
+        centers = (np.arange(HISTOGRAM_BINS) + 0.5) / HISTOGRAM_BINS
+        target = np.clip(np.searchsorted(edges, centers, side='right') - 1, 0, len(edges) - 2)
+        return np.bincount(target, weights=histogram, minlength=len(edges) - 1).astype(np.int64)
+
+    @property
+    def matches(self):
+        return sum(count for (original, predicted), count in self.confusion.items()
+                   if original == predicted)
+
+    @property
+    def accuracy(self):
+        return self.matches / self.compared if self.compared else 0.0
+
+    def sorted_counts(self):
+        """
+        Conteggi per label, dalla più frequente
+        """
+        return sorted(self.counts.items(), key=lambda item: -item[1])
+
+    def confusion_matrix(self):
+        """
+        Matrice di confusione (righe: label originale, colonne: predetta)
+
+        Returns:
+            pd.DataFrame: Conteggi, label in minuscolo
+        """
+        originals = sorted({original for original, _ in self.confusion})
+        predicted = sorted({pred for _, pred in self.confusion})
+        matrix = pd.DataFrame(0, index=pd.Index(originals, name='original'),
+                              columns=pd.Index(predicted, name='predicted'), dtype=np.int64)
+        for (original, pred), count in self.confusion.items():
+            matrix.loc[original, pred] = count
+        return matrix
+
+    def class_metrics(self):
+        """
+        Precision, recall e support per label (senza distinzione di maiuscole)
+
+        Returns:
+            dict: label -> {'precision', 'recall', 'support', 'predicted'}
+        """
+        labels = sorted({label for pair in self.confusion for label in pair})
+        metrics = {}
+        for label in labels:
+            true_positive = self.confusion.get((label, label), 0)
+            predicted = sum(c for (_, p), c in self.confusion.items() if p == label)
+            support = sum(c for (o, _), c in self.confusion.items() if o == label)
+            metrics[label] = {
+                'precision': true_positive / predicted if predicted else 0.0,
+                'recall': true_positive / support if support else 0.0,
+                'support': support,
+                'predicted': predicted,
+            }
+        return metrics
+
+    def print_report(self, title="📈 RIEPILOGO RISULTATI"):
+        """
+        Stampa distribuzione, confidence e accuracy in forma compatta
+        """
+        print(title)
+        print("-" * 70)
+        print(f"   News analizzate: {self.rows:,}")
+        for sentiment, count in self.sorted_counts():
+            percentage = count / self.rows * 100
+            print(f"   {sentiment:10} {count:8,} ({percentage:5.1f}%)")
+        if self.rows:
+            print(f"   Confidence media: {self.mean_confidence:.2%} "
+                  f"(mediana {self.median_confidence:.2%}, "
+                  f"min {self.confidence_min:.2%}, max {self.confidence_max:.2%})")
+        if self.compared:
+            print(f"   Accuracy vs originale: {self.accuracy:.1%}")
+        print()
+
+
+def merge_summaries(summaries):
+    """
+    Combina i riepiloghi di più shard, nell'ordine delle righe
+
+    Args:
+        summaries (list): Oggetti ResultSummary
+
+    Returns:
+        ResultSummary: Riepilogo complessivo
+    """
+    summaries = list(summaries)
+    if not summaries:
+        return ResultSummary()
+    merged = ResultSummary(summaries[0].top_k, summaries[0].examples_per_class,
+                           summaries[0].sample_size)
+    for summary in summaries:
+        merged.merge(summary)
+    return merged
+
+
+def _confusion_counts(original, predicted_codes, predicted_labels):
+    """
+    Coppie (originale, predetta) in minuscolo -> conteggio
+
+    Le label vengono portate in minuscolo una volta per valore distinto;
+    le righe sono contate sui codici interi. Righe senza label originale
+    contano come confrontate ma non entrano nella matrice.
+    """
+    original_codes, original_labels = pd.factorize(original, sort=False)
+    original_lower = [str(label).lower() for label in original_labels]
+    predicted_lower = [str(label).lower() for label in predicted_labels]
+
+    valid = (original_codes >= 0) & (predicted_codes >= 0)
+    width = max(len(predicted_labels), 1)
+    pairs = np.bincount(original_codes[valid] * width + predicted_codes[valid],
+                        minlength=len(original_labels) * width)
+    confusion = {}
+    for pair_code in np.flatnonzero(pairs):
+        key = (original_lower[pair_code // width], predicted_lower[pair_code % width])
+        confusion[key] = confusion.get(key, 0) + int(pairs[pair_code])
+    return confusion
+
+
+def _histogram_quantile(histogram, rows, q, low, high):
+    """
+    Quantile da un istogramma su [0, 1] (interpolato dentro il bin), limitato a [low, high]
+    """
+    if not rows:
+        return 0.0
+    target = q * rows
+    cumulative = np.cumsum(histogram)
+    b = int(np.searchsorted(cumulative, target, side='left'))
+    b = min(b, HISTOGRAM_BINS - 1)
+    before = cumulative[b - 1] if b > 0 else 0
+    in_bin = histogram[b]
+    fraction = (target - before) / in_bin if in_bin else 0.0
+    value = (b + fraction) / HISTOGRAM_BINS
+    return float(min(max(value, low), high))
+
+
+def _smallest_keys(keys, values, k):
+    """
+    Le k coppie (chiave, valore) con le chiavi minori
+    """
+    if len(keys) > k:
+        keep = np.argpartition(keys, k - 1)[:k]
+        keys, values = keys[keep], values[keep]
+    return keys, values
+
+
+def _top_positions(values, k):
+    """
+    Posizioni dei k valori più alti, a pari valore la posizione minore
+    """
+    k = min(k, len(values))
+    if k == 0:
+        return []
+    candidates = np.argpartition(-values, k - 1)[:k]
+    # Include eventuali pari merito al k-esimo valore
+    threshold = values[candidates].min()
+    candidates = np.flatnonzero(values >= threshold)
+    order = np.lexsort((candidates, -values[candidates]))
+    return candidates[order][:k].tolist()
@@ -0,0 +1,92 @@
+"""
+Test Adaptive Batching
+Batch limitati da un budget di token, budget adattato alla latenza
+obiettivo e backoff dopo memoria esaurita
+"""
+
+import numpy as np
+import pytest
+
+from batch_scheduler import (AdaptiveBatchSizer, LengthBucketScheduler, batch_size_summary,
+                             merge_batch_stats)
+
+LENGTHS = np.array([10] * 20 + [100] * 4)
+
+
+def test_token_budget_gives_big_batches_for_short_news():
+    scheduler = LengthBucketScheduler(batch_size=16, max_tokens=200)
+
+    batches = scheduler.schedule(LENGTHS)
+
+    assert [len(batch) for batch in batches] == [16, 4, 2, 2]
+    assert all(LENGTHS[batch].max() * len(batch) <= 200 for batch in batches)
+
+
+def test_news_longer_than_budget_still_runs_alone():
+    batches = LengthBucketScheduler(batch_size=8, max_tokens=50).schedule(LENGTHS[-3:])
+
+    assert [len(batch) for batch in batches] == [1, 1, 1]
+
+
+def test_out_of_memory_halves_budget_for_following_batches():
+    sizer = AdaptiveBatchSizer(max_batch_size=8)
+    batches = LengthBucketScheduler().iter_batches(LENGTHS, sizer)
+
+    first = next(batches)
+    sizer.on_out_of_memory(len(first) * 10)
+
+    assert len(first) == 8
+    assert sizer.token_budget() == 40
+    assert len(next(batches)) == 4
+    assert sizer.stats()['oom_backoffs'] == 1
+
+
+def test_latency_budget_follows_cost_per_token():
+    sizer = AdaptiveBatchSizer(max_batch_size=64, target_latency_ms=10)
+
+    sizer.observe(8, 1_000, 0.040)  # 4x la latenza obiettivo
+    assert sizer.token_budget() == pytest.approx(250, abs=1)
+    for _ in range(20):  # ora ogni token costa 10 volte meno
+        sizer.observe(8, sizer.token_budget(), sizer.token_budget() * 4e-6)
+
+    assert sizer.token_budget() == pytest.approx(2_500, rel=0.05)
+    assert sizer.stats()['over_target'] == 1
+    with pytest.raises(ValueError):
+        AdaptiveBatchSizer(target_latency_ms=0)
+
+
+def test_batch_reports_merge_and_summarize():
+    first, second = AdaptiveBatchSizer(max_tokens=500), AdaptiveBatchSizer(max_tokens=500)
+    for size in (8, 8, 4):
+        first.observe(size, size * 10, 0.01)
+    second.observe(2, 20, 0.01)
+    second.on_out_of_memory(40)
+
+    merged = merge_batch_stats([first.stats(), second.stats()])
+
+    assert merged['batch_sizes'] == {2: 1, 4: 1, 8: 2}
+    assert merged['batches'] == 4 and merged['oom_backoffs'] == 1
+    assert merged['token_budget'] == 20
+    assert batch_size_summary(merged) == {'min': 2, 'median': 4, 'mean': 5.5, 'max': 8}
+
+
+def test_out_of_memory_batches_are_split_and_retried(make_analyzer, sentences, quiet):
+    texts = sentences[:24]
+    analyzer = make_analyzer(texts)
+    expected, _ = quiet(analyzer.analyze_sentiment, batch_size=16)
+    expected = expected[['predicted_sentiment', 'confidence']].copy()
+    forward = analyzer.backend.forward
+
+    def small_memory_forward(input_ids, attention_mask):
+        if len(input_ids) > 4:
+            raise RuntimeError("CUDA out of memory. Tried to allocate 2.00 GiB")
+        return forward(input_ids, attention_mask)
+    analyzer.backend.forward = small_memory_forward
+
+    results, output = quiet(analyzer.analyze_sentiment, batch_size=16)
+
+    assert "Memoria esaurita" in output
+    assert analyzer.batch_stats['oom_backoffs'] >= 1
+    assert max(analyzer.batch_stats['batch_sizes']) <= 4
+    assert results['predicted_sentiment'].tolist() == expected['predicted_sentiment'].tolist()
+    np.testing.assert_allclose(results['confidence'], expected['confidence'], atol=1e-5)
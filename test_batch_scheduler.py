@@ -0,0 +1,106 @@
+"""
+Test Batch Scheduler
+Bucket per lunghezza, batch con padding minimo e statistiche di padding
+"""
+
+import numpy as np
+import pytest
+
+from batch_scheduler import LengthBucketScheduler, merge_padding_stats, pad_batch
+
+LENGTHS = np.array([5, 40, 7, 3, 90, 12, 6, 41, 8, 200, 4, 15])
+
+
+def test_every_news_is_scheduled_once():
+    batches = LengthBucketScheduler(batch_size=4).schedule(LENGTHS)
+
+    assert all(1 <= len(batch) <= 4 for batch in batches)
+    np.testing.assert_array_equal(np.sort(np.concatenate(batches)), np.arange(len(LENGTHS)))
+
+
+def test_sorted_batches_group_similar_lengths():
+    batches = LengthBucketScheduler(batch_size=4).schedule(LENGTHS)
+
+    assert [LENGTHS[batch].tolist() for batch in batches] == [
+        [3, 4, 5, 6], [7, 8, 12, 15], [40, 41, 90, 200]]
+
+
+def test_batches_never_cross_bucket_boundaries():
+    scheduler = LengthBucketScheduler(batch_size=8, bucket_boundaries=[10, 50])
+    batches = scheduler.schedule(LENGTHS)
+
+    for batch in batches:
+        assert len(set(scheduler.assign_buckets(LENGTHS[batch]))) == 1
+    assert [len(batch) for batch in batches] == [6, 4, 2]
+
+
+def test_unsorted_without_buckets_keeps_original_order():
+    batches = LengthBucketScheduler(batch_size=5, sort_by_length=False).schedule(LENGTHS)
+
+    np.testing.assert_array_equal(np.concatenate(batches), np.arange(len(LENGTHS)))
+
+
+def test_padding_stats_count_real_and_padded_tokens():
+    scheduler = LengthBucketScheduler(batch_size=4, bucket_boundaries=[10])
+    batches = scheduler.schedule(LENGTHS)
+
+    stats = scheduler.padding_stats(LENGTHS, batches)
+
+    padded = sum(int(LENGTHS[batch].max()) * len(batch) for batch in batches)
+    assert stats['real_tokens'] == LENGTHS.sum()
+    assert stats['padded_tokens'] == padded
+    assert stats['efficiency'] == pytest.approx(LENGTHS.sum() / padded)
+    # Batch consecutivi nell'ordine originale: padding molto maggiore
+    assert stats['naive_efficiency'] < stats['efficiency']
+    assert set(stats['per_bucket']) == {'1-10', '>10'}
+    assert stats['per_bucket']['1-10']['rows'] == 6
+
+
+def test_empty_input_and_invalid_batch_size():
+    assert LengthBucketScheduler().schedule([]) == []
+    with pytest.raises(ValueError):
+        LengthBucketScheduler(batch_size=0)
+
+
+def test_analysis_reports_padding_and_keeps_row_order(make_analyzer, sentences, quiet):
+    texts = sentences[:30]
+    analyzer = make_analyzer(texts)
+    unsorted, _ = quiet(analyzer.analyze_sentiment, batch_size=8, sort_by_length=False)
+    unsorted = unsorted[['predicted_sentiment', 'confidence']].copy()
+
+    results, _ = quiet(analyzer.analyze_sentiment, batch_size=8, bucket_boundaries=[16, 32])
+
+    assert results['predicted_sentiment'].tolist() == unsorted['predicted_sentiment'].tolist()
+    np.testing.assert_allclose(results['confidence'], unsorted['confidence'], atol=1e-4)
+    assert analyzer.padding_stats['efficiency'] >= analyzer.padding_stats['naive_efficiency']
+
+
+def test_merged_padding_stats_equal_stats_of_all_batches():
+    scheduler = LengthBucketScheduler(batch_size=3, bucket_boundaries=[10])
+    shards = [LENGTHS[:5], LENGTHS[5:]]
+    parts = [scheduler.padding_stats(shard, scheduler.schedule(shard)) for shard in shards]
+
+    merged = merge_padding_stats(parts)
+
+    assert merged['batches'] == sum(part['batches'] for part in parts)
+    assert merged['real_tokens'] == LENGTHS.sum()
+    assert merged['padded_tokens'] == sum(part['padded_tokens'] for part in parts)
+    assert merged['efficiency'] == pytest.approx(merged['real_tokens'] / merged['padded_tokens'])
+    assert merged['per_bucket']['1-10']['rows'] == 6
+    assert merged['per_bucket']['>10']['rows'] == 6
+
+
+@pytest.mark.parametrize('padding_side', ['right', 'left'])
+def test_pad_batch_matches_the_tokenizer(tiny_model, sentences, padding_side):
+    from transformers import AutoTokenizer
+    tokenizer = AutoTokenizer.from_pretrained(tiny_model, padding_side=padding_side)
+    encoded = tokenizer(sentences[:6])['input_ids']
+    # Anche array uint16, come le viste del token store
+    sequences = [np.asarray(ids, dtype=np.uint16) for ids in encoded[:3]] + encoded[3:]
+
+    input_ids, attention_mask = pad_batch(sequences, tokenizer.pad_token_id, padding_side)
+
+    expected = tokenizer.pad({'input_ids': encoded}, return_tensors='np')
+    np.testing.assert_array_equal(input_ids, expected['input_ids'])
+    np.testing.assert_array_equal(attention_mask, expected['attention_mask'])
+    assert input_ids.dtype == attention_mask.dtype == np.int64
@@ -0,0 +1,44 @@
+"""
+Test Batched Inference
+Inferenza a batch di analyze_sentiment: stessi risultati della singola
+news e fallback solo per le news che generano errore
+"""
+
+import numpy as np
+import pytest
+
+from financial_sentiment_analyzer import FALLBACK_LABEL, FALLBACK_SCORE
+
+
+def test_batches_match_one_news_at_a_time(make_analyzer, sentences, quiet):
+    texts = sentences[:40]
+    analyzer = make_analyzer(texts)
+    single, _ = quiet(analyzer.analyze_sentiment, batch_size=1)
+    single = single[['predicted_sentiment', 'confidence']].copy()
+
+    batched, _ = quiet(analyzer.analyze_sentiment, batch_size=16)
+
+    assert batched['predicted_sentiment'].tolist() == single['predicted_sentiment'].tolist()
+    np.testing.assert_allclose(batched['confidence'], single['confidence'], atol=1e-4)
+
+
+def test_failing_news_gets_fallback_alone(make_analyzer, sentences, quiet):
+    texts = sentences[:10]
+    expected, _ = quiet(make_analyzer(texts).analyze_sentiment, batch_size=1)
+    expected = expected[['predicted_sentiment', 'confidence']].copy()
+
+    broken = texts[:3] + [np.nan] + texts[3:]
+    results, _ = quiet(make_analyzer(broken).analyze_sentiment, batch_size=8)
+
+    assert results['predicted_sentiment'].iloc[3] == FALLBACK_LABEL
+    assert results['confidence'].iloc[3] == FALLBACK_SCORE
+    others = results.drop(index=3)
+    assert others['predicted_sentiment'].tolist() == expected['predicted_sentiment'].tolist()
+    np.testing.assert_allclose(others['confidence'], expected['confidence'], atol=1e-4)
+
+
+def test_invalid_batch_size_is_rejected(make_analyzer, sentences, quiet):
+    analyzer = make_analyzer(sentences[:3])
+
+    with pytest.raises(ValueError):
+        quiet(analyzer.analyze_sentiment, batch_size=0)
@@ -0,0 +1,137 @@
+"""
+Test Model Cascade
+Primo stadio su n-grammi con hashing, campione di controllo e
+instradamento delle news tra primo stadio e transformer
+"""
+
+import numpy as np
+import pytest
+
+from cascade import (CURVE_THRESHOLDS, HashedNgramClassifier, audit_mask, cascade_stats,
+                     cascade_summary, merge_cascade_stats)
+
+TRAIN = ([("profit rose strongly", 'positive'), ("sales grew and profit rose", 'positive'),
+          ("record profit this quarter", 'positive')] * 10
+         + [("loss widened sharply", 'negative'), ("sales fell and loss widened", 'negative'),
+            ("heavy loss this quarter", 'negative')] * 10)
+
+
+@pytest.fixture(scope='module')
+def classifier():
+    texts, labels = zip(*TRAIN)
+    return HashedNgramClassifier(n_features=2 ** 12, epochs=10).fit(texts, labels)
+
+
+def test_first_stage_learns_separable_labels(classifier):
+    labels, confidences = classifier.predict(["profit rose again", "the loss widened", None])
+
+    assert labels[:2].tolist() == ['positive', 'negative']
+    assert (confidences[:2] > 0.8).all()
+    assert confidences[2] < confidences[:2].min()  # nessuna feature: solo il bias
+
+
+def test_saved_first_stage_predicts_the_same(classifier, tmp_path):
+    path = str(tmp_path / 'first_stage.npz')
+    classifier.save(path)
+
+    loaded = HashedNgramClassifier.load(path)
+
+    texts = ["profit rose", "loss widened", "quarter"]
+    np.testing.assert_allclose(loaded.predict_proba(texts), classifier.predict_proba(texts),
+                               rtol=1e-6)
+    assert loaded.classes.tolist() == classifier.classes.tolist()
+
+
+def test_single_class_and_untrained_model_are_rejected():
+    with pytest.raises(ValueError):
+        HashedNgramClassifier().fit(["a", "b"], ['positive', 'positive'])
+    with pytest.raises(RuntimeError):
+        HashedNgramClassifier().predict(["a"])
+
+
+def test_audit_sample_is_deterministic_and_near_rate():
+    texts = [f"news {i}" for i in range(20_000)]
+
+    mask = audit_mask(texts, 0.05)
+
+    assert mask.mean() == pytest.approx(0.05, abs=0.01)
+    np.testing.assert_array_equal(audit_mask(texts[::-1], 0.05), mask[::-1])
+    assert not audit_mask(texts, 0).any()
+
+
+def test_routing_stats_and_estimates():
+    confidences = np.array([0.95, 0.92, 0.97, 0.99, 0.5, 0.6])
+    accepted = confidences >= 0.9
+    audited = np.array([True, False, False, False, False, False])
+    agreed = np.array([True, False, False, False, True, False])
+
+    stats = cascade_stats(confidences, accepted, audited, agreed, 0.9, 0.25,
+                          first_stage_seconds=0.0, transformer_seconds=3.0)
+    summary = cascade_summary(stats)
+
+    assert (stats['first_stage'], stats['transformer'], stats['audited']) == (3, 3, 1)
+    assert summary['first_stage_fraction'] == pytest.approx(0.5)
+    assert summary['speedup'] == pytest.approx(2.0)  # 6 testi a 1s contro 3
+    assert summary['agreement'] == pytest.approx(1.0)  # audit tutto d'accordo
+    # Il campione di controllo pesa 1/audit_rate nella curva
+    assert stats['curve'][0.9] == {'accepted': 4, 'compared': 4.0, 'agreed': 4.0}
+    assert stats['curve'][0.5]['compared'] == 6.0
+
+
+def test_merged_chunks_equal_single_run():
+    rng = np.random.default_rng(0)
+    confidences = rng.uniform(0.4, 1.0, 200)
+    accepted = confidences >= 0.8
+    audited = accepted & (rng.random(200) < 0.1)
+    agreed = rng.random(200) < 0.9
+
+    whole = cascade_stats(confidences, accepted, audited, agreed, 0.8, 0.1, 1.0, 2.0)
+    parts = [cascade_stats(confidences[s], accepted[s], audited[s], agreed[s], 0.8, 0.1,
+                           0.5, 1.0)
+             for s in (slice(0, 80), slice(80, 200))]
+    merged = merge_cascade_stats(parts + [None])
+
+    assert merged == whole
+    assert set(merged['curve']) == set(CURVE_THRESHOLDS)
+
+
+def test_analysis_routes_only_uncertain_news_to_transformer(make_analyzer, sentences, quiet):
+    texts = sentences[:60]
+    analyzer = make_analyzer(texts)
+    with pytest.raises(ValueError):
+        quiet(analyzer.analyze_sentiment, cascade_threshold=0.9)
+    expected, _ = quiet(analyzer.analyze_sentiment, batch_size=16)
+    expected = expected[['predicted_sentiment', 'confidence']].copy()
+    quiet(analyzer.train_first_stage, texts, distill=True, n_features=2 ** 12)
+    _, first_scores = analyzer.first_stage.predict(texts)
+    threshold = float(np.quantile(first_scores, 0.5))
+
+    results, output = quiet(analyzer.analyze_sentiment, batch_size=16,
+                            cascade_threshold=threshold, cascade_audit_rate=0.0)
+
+    routed = first_scores < threshold
+    assert analyzer.cascade_stats['transformer'] == routed.sum()
+    assert analyzer.cascade_stats['first_stage'] == (~routed).sum()
+    assert results['predicted_sentiment'][routed].tolist() == \
+        expected['predicted_sentiment'][routed].tolist()
+    np.testing.assert_allclose(results['confidence'][~routed], first_scores[~routed], rtol=1e-5)
+    assert "Cascata" in output
+    # Solo le news instradate contano come inferenze del transformer
+    assert analyzer.dedup_stats['inference_calls'] == routed.sum()
+    assert analyzer.dedup_stats['first_stage_accepted'] == (~routed).sum()
+    assert analyzer.dedup_stats['inference_calls_saved'] == analyzer.dedup_stats['duplicates']
+    assert f"Risolte dal primo stadio: {(~routed).sum():,}" in output
+
+
+def test_audited_news_count_as_transformer_calls(make_analyzer, sentences, quiet):
+    texts = sentences[:80]
+    analyzer = make_analyzer(texts)
+    quiet(analyzer.train_first_stage, texts, distill=True, n_features=2 ** 12)
+
+    quiet(analyzer.analyze_sentiment, batch_size=16, cascade_threshold=1e-6,
+          cascade_audit_rate=0.25)
+
+    stats, dedup = analyzer.cascade_stats, analyzer.dedup_stats
+    assert stats['transformer'] == stats['audited'] > 0
+    assert dedup['inference_calls'] == stats['audited']
+    assert dedup['first_stage_accepted'] == dedup['unique_texts'] - stats['audited']
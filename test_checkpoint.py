@@ -0,0 +1,123 @@
+"""
+Test Run Checkpoint
+Ripresa di un'analisi da un checkpoint con coda troncata o corrotta
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks._common import synthetic_corpus
+from checkpoint import RunCheckpoint
+
+
+def write_checkpoint(path, n_ranges=3, size=10):
+    checkpoint = RunCheckpoint(path, 'analisi', n_ranges * size)
+    checkpoint.start()
+    for i in range(n_ranges):
+        start = i * size
+        checkpoint.append(start, start + size, ['POSITIVE'] * size,
+                          [0.5 + i / 10] * size)
+    return checkpoint
+
+
+def line_offsets(path):
+    with open(path, 'rb') as f:
+        lines = f.readlines()
+    return np.cumsum([0] + [len(line) for line in lines])
+
+
+def test_resume_returns_completed_ranges(tmp_path):
+    path = str(tmp_path / 'run.ckpt')
+    write_checkpoint(path)
+
+    ranges = RunCheckpoint(path, 'analisi', 30).start(resume=True)
+
+    assert [(start, end) for start, end, _, _ in ranges] == [(0, 10), (10, 20), (20, 30)]
+    assert ranges[2][3] == [pytest.approx(0.7)] * 10
+
+
+def test_truncated_tail_is_dropped_and_appends_continue(tmp_path):
+    path = str(tmp_path / 'run.ckpt')
+    write_checkpoint(path)
+    offsets = line_offsets(path)
+    # Crash a metà della scrittura dell'ultima riga
+    with open(path, 'r+b') as f:
+        f.truncate(offsets[-2] + 25)
+
+    checkpoint = RunCheckpoint(path, 'analisi', 30)
+    ranges = checkpoint.start(resume=True)
+
+    assert [(start, end) for start, end, _, _ in ranges] == [(0, 10), (10, 20)]
+    assert os.path.getsize(path) == offsets[-2]
+    checkpoint.append(20, 30, ['NEGATIVE'] * 10, [0.9] * 10)
+    ranges = RunCheckpoint(path, 'analisi', 30).start(resume=True)
+    assert [(start, end) for start, end, _, _ in ranges] == [(0, 10), (10, 20), (20, 30)]
+    assert ranges[2][2] == ['NEGATIVE'] * 10
+
+
+def test_corrupt_crc_discards_record_and_everything_after(tmp_path):
+    path = str(tmp_path / 'run.ckpt')
+    write_checkpoint(path)
+    with open(path, 'rb') as f:
+        lines = f.readlines()
+    # JSON ancora valido, ma il contenuto non corrisponde al CRC
+    record = json.loads(lines[2])
+    record['data']['scores'][0] = 0.99
+    lines[2] = (json.dumps(record, separators=(',', ':')) + '\n').encode('utf-8')
+    with open(path, 'wb') as f:
+        f.writelines(lines)
+
+    ranges = RunCheckpoint(path, 'analisi', 30).start(resume=True)
+
+    assert [(start, end) for start, end, _, _ in ranges] == [(0, 10)]
+    assert os.path.getsize(path) == len(lines[0]) + len(lines[1])
+
+
+def test_other_analysis_or_no_resume_starts_over(tmp_path, quiet):
+    path = str(tmp_path / 'run.ckpt')
+    write_checkpoint(path)
+
+    assert quiet(RunCheckpoint(path, 'altra analisi', 30).start, resume=True)[0] == []
+    assert len(line_offsets(path)) == 2  # solo l'header nuovo
+
+    write_checkpoint(path)
+    assert RunCheckpoint(path, 'analisi', 30).start(resume=False) == []
+    assert RunCheckpoint(path, 'analisi', 30).start(resume=True) == []
+
+
+@pytest.mark.parametrize('damage', ['truncate', 'corrupt'])
+def test_analysis_resumes_from_damaged_checkpoint(make_analyzer, quiet, tmp_path, damage):
+    analyzer = make_analyzer(synthetic_corpus(300))
+
+    def analyze(path, resume):
+        results, _ = quiet(analyzer.analyze_sentiment, batch_size=16, checkpoint_path=path,
+                           checkpoint_every=50, resume=resume)
+        return results[['predicted_sentiment', 'confidence']].copy()
+
+    path = str(tmp_path / 'run.ckpt')
+    expected = analyze(path, resume=False)
+    offsets = line_offsets(path)
+    # Header + 6 blocchi da 50: si danneggia il quinto blocco (righe 200-250)
+    with open(path, 'r+b') as f:
+        if damage == 'truncate':
+            f.truncate(offsets[5] + 40)
+        else:
+            f.seek(offsets[5] + 20)
+            f.write(b'#')
+
+    calls = []
+    predict_texts = analyzer._predict_texts
+
+    def spy(texts, *args, row_offset=0, **kwargs):
+        calls.append((row_offset, row_offset + len(texts)))
+        return predict_texts(texts, *args, row_offset=row_offset, **kwargs)
+
+    analyzer._predict_texts = spy
+    resumed = analyze(path, resume=True)
+
+    assert calls == [(200, 250), (250, 300)]
+    pd.testing.assert_frame_equal(resumed, expected)
@@ -0,0 +1,102 @@
+"""
+Test Columnar Results
+Tipi compatti dei risultati, scrittura Parquet a row group e lettura con
+proiezione delle colonne
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from columnar import (append_parquet, compact_results, iter_results, parquet_available,
+                      read_results, write_parquet)
+
+needs_pyarrow = pytest.mark.skipif(not parquet_available(), reason="pyarrow non installato")
+
+
+def with_helper_columns(df):
+    return df.assign(original_lower=df['original_sentiment'].str.lower(),
+                     predicted_lower=df['predicted_sentiment'].str.lower())
+
+
+def test_compact_results_uses_small_dtypes_and_drops_helpers(results_frame):
+    df = with_helper_columns(results_frame(10))
+
+    compact = compact_results(df)
+
+    assert list(compact.columns) == ['text', 'original_sentiment', 'predicted_sentiment',
+                                     'confidence']
+    assert isinstance(compact['predicted_sentiment'].dtype, pd.CategoricalDtype)
+    assert isinstance(compact['original_sentiment'].dtype, pd.CategoricalDtype)
+    assert compact['confidence'].dtype == np.float32
+    assert 'original_lower' in df  # l'originale non viene modificato
+
+
+def test_csv_is_read_with_column_projection(tmp_path, results_frame):
+    path = tmp_path / 'results.csv'
+    results_frame(10).to_csv(path, index=False)
+
+    df = read_results(str(path), columns=['predicted_sentiment', 'confidence'])
+
+    assert list(df.columns) == ['predicted_sentiment', 'confidence']
+    assert df['confidence'].dtype == np.float32
+
+
+def test_csv_chunks_are_compact_and_indexed_by_file_position(tmp_path, results_frame):
+    path = tmp_path / 'results.csv'
+    df = results_frame(25)
+    df.to_csv(path, index=False)
+
+    chunks = list(iter_results(str(path), columns=['predicted_sentiment', 'confidence'],
+                               chunksize=10))
+
+    assert [len(chunk) for chunk in chunks] == [10, 10, 5]
+    loaded = pd.concat(chunks)
+    assert loaded.index.tolist() == list(range(25))
+    assert chunks[0]['confidence'].dtype == np.float32
+    assert loaded['predicted_sentiment'].astype(str).tolist() == df['predicted_sentiment'].tolist()
+
+
+@needs_pyarrow
+def test_parquet_chunks_follow_the_batch_size_across_row_groups(tmp_path, results_frame):
+    path = str(tmp_path / 'results.parquet')
+    df = results_frame(25)
+    write_parquet(df, path, row_group_size=10)
+
+    chunks = list(iter_results(path, columns=['confidence'], chunksize=8))
+
+    assert [len(chunk) for chunk in chunks] == [8, 8, 8, 1]
+    loaded = pd.concat(chunks)
+    assert loaded.index.tolist() == list(range(25))
+    np.testing.assert_allclose(loaded['confidence'], df['confidence'], rtol=1e-6)
+
+
+@needs_pyarrow
+def test_parquet_round_trip_in_row_groups(tmp_path, results_frame):
+    import pyarrow.parquet as pq
+    path = str(tmp_path / 'results.parquet')
+    df = results_frame(25)
+
+    write_parquet(df, path, row_group_size=10)
+
+    assert pq.ParquetFile(path).metadata.num_row_groups == 3
+    loaded = read_results(path, columns=['predicted_sentiment', 'confidence'])
+    assert list(loaded.columns) == ['predicted_sentiment', 'confidence']
+    assert loaded['predicted_sentiment'].astype(str).tolist() == df['predicted_sentiment'].tolist()
+    np.testing.assert_allclose(loaded['confidence'], df['confidence'], rtol=1e-6)
+
+
+@needs_pyarrow
+def test_appended_chunks_with_different_labels_share_one_schema(tmp_path, results_frame):
+    path = str(tmp_path / 'stream.parquet')
+    df = with_helper_columns(results_frame(12))
+    first = df['predicted_sentiment'].ne(df['predicted_sentiment'].iloc[0]).idxmax()
+    # Il primo chunk ha una sola label, gli altri introducono le restanti
+    chunks = [df.iloc[:first], df.iloc[first:first + 1], df.iloc[first + 1:]]
+
+    written = sum(len(chunk) for chunk in append_parquet(chunks, path))
+
+    loaded = read_results(path)
+    assert written == len(loaded) == 12
+    assert loaded['predicted_sentiment'].astype(str).tolist() == df['predicted_sentiment'].tolist()
+    assert 'original_lower' not in loaded
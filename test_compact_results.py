@@ -0,0 +1,49 @@
+"""
+Test Compact Results
+Label predette come categoriche (un codice per riga) e confidence float32
+"""
+
+import numpy as np
+import pandas as pd
+
+from financial_sentiment_analyzer import FALLBACK_LABEL
+
+
+def test_label_table_holds_model_labels_and_fallback(make_analyzer, quiet):
+    analyzer = make_analyzer()
+    quiet(analyzer._ensure_model)
+
+    categories = list(analyzer.label_dtype.categories)
+
+    id2label = analyzer.sentiment_pipeline.model.config.id2label
+    assert categories == [id2label[i] for i in range(len(id2label))] + [FALLBACK_LABEL]
+    codes = analyzer._label_codes([categories[1], 'sconosciuta', FALLBACK_LABEL])
+    assert codes.tolist() == [1, len(categories) - 1, len(categories) - 1]
+
+
+def test_results_are_categorical_and_float32(make_analyzer, sentences, quiet):
+    texts = sentences[:20] + [np.nan] + sentences[:5]
+    analyzer = make_analyzer(texts)
+
+    results, output = quiet(analyzer.analyze_sentiment, batch_size=8)
+
+    assert results['predicted_sentiment'].dtype == analyzer.label_dtype
+    assert results['confidence'].dtype == np.float32
+    assert results['predicted_sentiment'].iloc[20] == FALLBACK_LABEL
+    assert results['predicted_sentiment'].iloc[21:].tolist() == \
+        results['predicted_sentiment'].iloc[:5].tolist()
+    assert results['predicted_sentiment'].cat.codes.dtype == np.int8  # 1 byte per news
+    assert "Memoria" in output
+
+
+def test_loaded_labels_are_categorical(make_analyzer, tmp_path, quiet):
+    path = tmp_path / 'news.csv'
+    pd.DataFrame({'label': ['positive', 'negative', 'positive'],
+                  'text': ['a', 'b', 'c']}).to_csv(path, header=False, index=False)
+    analyzer = make_analyzer()
+    analyzer.data_path = str(path)
+
+    df, _ = quiet(analyzer.load_data)
+
+    assert isinstance(df['original_sentiment'].dtype, pd.CategoricalDtype)
+    assert df['original_sentiment'].tolist() == ['positive', 'negative', 'positive']
@@ -0,0 +1,115 @@
+"""
+Test Corpus Profile
+Profilo del corpus a blocchi e per shard contro le statistiche pandas
+sull'intero DataFrame, e limite di errore degli heavy hitters
+"""
+
+import re
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from corpus_profile import WORD_PATTERN, CorpusProfile, HeavyHitters, profile_corpus
+
+
+@pytest.fixture
+def corpus(sentences):
+    """
+    Corpus con label, un testo mancante e lunghezze variabili
+    """
+    labels = ['positive', 'negative', 'neutral']
+    texts = [sentence * (1 + i % 4) for i, sentence in enumerate(sentences[:600])]
+    texts[17] = None
+    return pd.DataFrame({'sentiment': [labels[i % 5 % 3] for i in range(600)], 'text': texts})
+
+
+def chunks(df, size):
+    return (df.iloc[start:start + size] for start in range(0, len(df), size))
+
+
+def test_profile_matches_pandas_on_the_whole_frame(corpus):
+    profile = profile_corpus(chunks(corpus, 97))
+
+    lengths = corpus['text'].dropna().str.len()
+    assert profile.rows == 600
+    assert profile.columns == ['sentiment', 'text']
+    assert profile.missing == {'sentiment': 0, 'text': 1}
+    assert profile.sorted_class_counts() == list(corpus['sentiment'].value_counts().items())
+    assert (profile.length_min, profile.length_max) == (lengths.min(), lengths.max())
+    assert profile.length_mean == pytest.approx(lengths.mean())
+    for q in (0.05, 0.25, 0.5, 0.75, 0.99):
+        assert profile.length_quantile(q) == pytest.approx(lengths.quantile(q))
+    pd.testing.assert_frame_equal(profile.head, corpus.head())
+    words = Counter(word for text in corpus['text'].dropna()
+                    for word in re.findall(WORD_PATTERN, text.lower()))
+    assert profile.words.error == 0
+    assert profile.words.most_common(10) == sorted(words.items(),
+                                                   key=lambda item: (-item[1], item[0]))[:10]
+
+
+def test_profile_does_not_depend_on_chunks_or_shards(corpus):
+    single = profile_corpus([corpus])
+    shards = [profile_corpus(chunks(corpus.iloc[start:end], 50))
+              for start, end in [(0, 5), (5, 333), (333, 600)]]
+
+    merged = shards[0]
+    for shard in shards[1:]:
+        merged.merge(shard)
+
+    assert merged.rows == single.rows
+    assert merged.class_counts == single.class_counts
+    assert merged.missing == single.missing
+    np.testing.assert_array_equal(merged.length_histogram, single.length_histogram)
+    pd.testing.assert_frame_equal(merged.head, single.head)
+    assert merged.words.most_common(20) == single.words.most_common(20)
+    for label in single.class_counts:
+        samples = merged.class_samples(label)
+        assert samples == single.class_samples(label)
+        assert len(samples) == 3
+        assert set(samples) <= set(corpus.loc[corpus['sentiment'] == label, 'text'])
+
+
+def test_very_long_texts_have_bounded_relative_error():
+    lengths = [100, 70_000, 150_000, 1_000_000]
+    profile = profile_corpus([pd.DataFrame({'text': ['x' * n for n in lengths]})],
+                             label_column=None)
+
+    assert (profile.length_min, profile.length_max) == (100, 1_000_000)
+    assert profile.length_quantile(0.5) == pytest.approx(np.quantile(lengths, 0.5), rel=0.01)
+
+
+@pytest.mark.parametrize('capacity', [1, 5, 50])
+def test_heavy_hitters_undercount_within_the_error_bound(capacity):
+    rng = np.random.default_rng(capacity)
+    words = [f"w{i}" for i in rng.zipf(1.5, 5_000) % 200]
+    exact = Counter(words)
+
+    sketch = HeavyHitters(capacity)
+    other = HeavyHitters(capacity)
+    for start in range(0, 2_500, 400):
+        sketch.update(pd.Series(Counter(words[start:min(start + 400, 2_500)])))
+    for start in range(2_500, 5_000, 700):
+        other.update(pd.Series(Counter(words[start:start + 700])))
+    sketch.merge(other)
+
+    assert len(sketch.counts) <= capacity
+    assert sketch.total == 5_000
+    assert sketch.error <= 5_000 / (capacity + 1)
+    for word, count in exact.items():
+        estimate = int(sketch.counts.get(word, 0))
+        assert count - sketch.error <= estimate <= count
+
+
+def test_heavy_hitters_capacity_must_be_positive():
+    with pytest.raises(ValueError):
+        HeavyHitters(0)
+
+
+def test_profile_without_labels_has_no_samples(corpus):
+    profile = CorpusProfile(label_column=None)
+    profile.update(corpus)
+
+    assert profile.class_counts == {}
+    assert profile.samples == {}
@@ -0,0 +1,142 @@
+"""
+Test Dashboard State
+Refresh incrementale degli aggregati del dashboard: righe aggiunte in coda,
+riga scritta a metà, file riscritto e stato ripreso da un altro processo"""
+
+import pytest
+
+from columnar import iter_results, parquet_available, write_parquet
+from dashboard_state import DashboardState
+from summary import ResultSummary
+
+SAMPLE_SIZE = 25
+
+
+def full_summary(path):
+    """
+    Riepilogo dell'intero file in un solo passaggio (riferimento)
+    """
+    summary = ResultSummary(sample_size=SAMPLE_SIZE)
+    for chunk in iter_results(path, chunksize=700):
+        summary.update(chunk)
+    return summary
+
+
+def append_rows(df, path):
+    df.to_csv(path, mode='a', header=False, index=False)
+
+
+def open_state(tmp_path, results_path):
+    return DashboardState(str(tmp_path / 'state.npz'), results_path,
+                          sample_size=SAMPLE_SIZE, chunksize=700)
+
+
+@pytest.fixture
+def quiet_update(quiet):
+    """
+    state -> (righe lette, output stampato)
+    """
+    return lambda state: quiet(state.update)
+
+
+def test_append_reads_only_new_rows(tmp_path, results_frame, quiet_update, assert_same_summary):
+    path = str(tmp_path / 'results.csv')
+    df = results_frame(3_000)
+    df.iloc[:2_000].to_csv(path, index=False)
+    state = open_state(tmp_path, path)
+    assert quiet_update(state)[0] == 2_000
+    state.save()
+
+    append_rows(df.iloc[2_000:], path)
+    # Un altro processo riprende dallo stato salvato
+    resumed = open_state(tmp_path, path)
+    rows, output = quiet_update(resumed)
+
+    assert rows == 1_000
+    assert output == ''
+    assert_same_summary(resumed.summary, full_summary(path))
+    assert quiet_update(resumed)[0] == 0
+
+
+def test_partial_last_line_waits_for_completion(tmp_path, results_frame, quiet_update,
+                                                assert_same_summary):
+    path = str(tmp_path / 'results.csv')
+    df = results_frame(1_001)
+    df.iloc[:1_000].to_csv(path, index=False)
+    state = open_state(tmp_path, path)
+    quiet_update(state)
+
+    line = df.iloc[1_000:].to_csv(header=False, index=False)
+    with open(path, 'a') as f:
+        f.write(line[:10])
+    assert quiet_update(state)[0] == 0
+    assert state.summary.rows == 1_000
+
+    with open(path, 'a') as f:
+        f.write(line[10:])
+    assert quiet_update(state)[0] == 1
+    assert_same_summary(state.summary, full_summary(path))
+
+
+@pytest.mark.parametrize('rows', [1_500, 4_000])
+def test_rewritten_file_is_rebuilt(tmp_path, rows, results_frame, quiet_update,
+                                   assert_same_summary):
+    path = str(tmp_path / 'results.csv')
+    results_frame(3_000).to_csv(path, index=False)
+    state = open_state(tmp_path, path)
+    quiet_update(state)
+    state.save()
+
+    # Nuova analisi: file più corto o più lungo, con righe iniziali diverse
+    results_frame(rows, seed=7).to_csv(path, index=False)
+    resumed = open_state(tmp_path, path)
+    read, output = quiet_update(resumed)
+
+    assert read == rows
+    assert 'riscritto' in output
+    assert_same_summary(resumed.summary, full_summary(path))
+
+
+def test_rendered_fingerprints_survive_save_and_reset_on_rewrite(tmp_path, results_frame,
+                                                                 quiet_update):
+    path = str(tmp_path / 'results.csv')
+    results_frame(500).to_csv(path, index=False)
+    state = open_state(tmp_path, path)
+    quiet_update(state)
+    state.rendered['dashboard'] = 'abc'
+    state.save()
+
+    resumed = open_state(tmp_path, path)
+    assert resumed.rendered == {'dashboard': 'abc'}
+
+    results_frame(500, seed=3).to_csv(path, index=False)
+    quiet_update(resumed)
+    assert resumed.rendered == {}
+
+
+def test_state_of_another_results_file_is_ignored(tmp_path, results_frame, quiet_update):
+    first, second = str(tmp_path / 'a.csv'), str(tmp_path / 'b.csv')
+    results_frame(500).to_csv(first, index=False)
+    results_frame(800, seed=2).to_csv(second, index=False)
+    state = open_state(tmp_path, first)
+    quiet_update(state)
+    state.save()
+
+    other = open_state(tmp_path, second)
+
+    assert other.summary.rows == 0
+    assert quiet_update(other)[0] == 800
+
+
+@pytest.mark.skipif(not parquet_available(), reason="pyarrow non installato")
+def test_changed_parquet_is_reread(tmp_path, results_frame, quiet_update, assert_same_summary):
+    path = str(tmp_path / 'results.parquet')
+    df = results_frame(2_000)
+    write_parquet(df.iloc[:1_200], path)
+    state = open_state(tmp_path, path)
+    assert quiet_update(state)[0] == 1_200
+    assert quiet_update(state)[0] == 0
+
+    write_parquet(df, path)
+    assert quiet_update(state)[0] == 2_000
+    assert_same_summary(state.summary, full_summary(path))
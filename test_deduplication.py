@@ -0,0 +1,48 @@
+"""
+Test Deduplication
+Testi identici (dopo la normalizzazione) inferiti una sola volta e
+risultati propagati a tutte le righe
+"""
+
+import numpy as np
+import pandas as pd
+
+from financial_sentiment_analyzer import FALLBACK_LABEL, FALLBACK_SCORE
+from prediction_cache import normalize_series, normalize_text
+
+
+def test_normalize_series_matches_normalize_text():
+    texts = pd.Series(["Profits  rose\n", "Café sales", " ok ", np.nan, 3])
+
+    normalized = normalize_series(texts)
+
+    assert normalized.iloc[:3].tolist() == [normalize_text(text) for text in texts.iloc[:3]]
+    assert normalized.iloc[3:].isna().all()
+
+
+def test_duplicates_are_inferred_once(make_analyzer, sentences, quiet, monkeypatch):
+    unique = sentences[:8]
+    texts = unique + [unique[0] + "  ", "\n" + unique[1]] + unique[:4] + [np.nan]
+    analyzer = make_analyzer(texts)
+    inferred = []
+    infer = analyzer._infer
+
+    def spy(batch, rows, **kwargs):
+        inferred.extend(batch)
+        return infer(batch, rows, **kwargs)
+    monkeypatch.setattr(analyzer, '_infer', spy)
+
+    results, _ = quiet(analyzer.analyze_sentiment, batch_size=4)
+
+    assert sorted(inferred) == sorted(unique)
+    assert analyzer.dedup_stats['rows'] == 15
+    assert analyzer.dedup_stats['unique_texts'] == 8
+    assert analyzer.dedup_stats['duplicates'] == 6
+    assert analyzer.dedup_stats['inference_calls'] == 8
+    assert analyzer.dedup_stats['inference_calls_saved'] == 6
+    # Ogni copia ha la predizione del suo originale, il NaN il fallback
+    for copy, original in [(8, 0), (9, 1), (10, 0), (13, 3)]:
+        assert results['predicted_sentiment'].iloc[copy] == results['predicted_sentiment'].iloc[original]
+        assert results['confidence'].iloc[copy] == results['confidence'].iloc[original]
+    assert results['predicted_sentiment'].iloc[14] == FALLBACK_LABEL
+    assert results['confidence'].iloc[14] == FALLBACK_SCORE
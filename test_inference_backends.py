@@ -0,0 +1,79 @@
+"""
+Test Inference Backends
+Selezione del backend e deriva dei backend quantizzati rispetto a fp32
+"""
+
+import numpy as np
+import pytest
+
+from inference_backends import (BACKENDS, OnnxBackend, TorchBackend, TorchInt8Backend, check_backend,
+                                create_backend, softmax)
+
+
+def test_softmax_is_stable_and_normalized():
+    logits = np.array([[1000.0, 1000.0, 999.0], [-5.0, 0.0, 5.0]])
+
+    probs = softmax(logits)
+
+    assert probs.dtype == np.float32
+    np.testing.assert_allclose(probs.sum(axis=1), 1.0, rtol=1e-6)
+    assert probs[0, 0] == pytest.approx(probs[0, 1])
+    assert probs[1].argmax() == 2
+
+
+def test_backends_are_selected_by_name(make_analyzer):
+    model = make_analyzer().sentiment_pipeline.model
+
+    assert set(BACKENDS) == {'torch', 'torch-int8', 'onnx', 'onnx-int8'}
+    assert type(create_backend('torch', model)) is TorchBackend
+    assert type(create_backend('torch-int8', model)) is TorchInt8Backend
+    with pytest.raises(ValueError):
+        create_backend('tensorrt', model)
+
+
+def test_missing_optional_dependency_is_reported_before_loading(make_analyzer, monkeypatch):
+    monkeypatch.setattr(OnnxBackend, 'requires', ('torch', 'no_such_runtime'))
+
+    check_backend('torch')
+    with pytest.raises(ImportError, match='no_such_runtime'):
+        check_backend('onnx')
+    with pytest.raises(ValueError):
+        check_backend('tensorrt')
+    with pytest.raises(ImportError):
+        make_analyzer(backend='onnx')
+
+
+@pytest.mark.parametrize('name', ['onnx', 'onnx-int8'])
+def test_onnx_backends_require_the_onnx_package(name, monkeypatch):
+    import importlib.util
+    find_spec = importlib.util.find_spec
+    monkeypatch.setattr(importlib.util, 'find_spec',
+                        lambda module: None if module == 'onnx' else find_spec(module))
+
+    with pytest.raises(ImportError, match=r' onnx$'):
+        check_backend(name)
+
+
+def test_torch_backend_matches_the_pipeline_model(make_analyzer, sentences):
+    analyzer = make_analyzer()
+    encodings = analyzer.sentiment_pipeline.tokenizer(sentences[:6], padding=True, return_tensors='np')
+
+    probs = TorchBackend(analyzer.sentiment_pipeline.model).forward(
+        encodings['input_ids'], encodings['attention_mask'])
+
+    assert probs.shape == (6, len(analyzer.label_dtype.categories) - 1)
+    np.testing.assert_allclose(probs.sum(axis=1), 1.0, rtol=1e-5)
+
+
+def test_int8_results_stay_close_to_fp32(make_analyzer, sentences, quiet):
+    texts = sentences[:40]
+    expected, _ = quiet(make_analyzer(texts).analyze_sentiment, batch_size=8)
+    expected = expected[['predicted_sentiment', 'confidence']].copy()
+
+    results, _ = quiet(make_analyzer(texts, backend='torch-int8').analyze_sentiment, batch_size=8)
+
+    # Modello minuscolo a pesi casuali: deriva maggiore che con FinBERT
+    agreement = (results['predicted_sentiment'] == expected['predicted_sentiment']).mean()
+    drift = np.abs(results['confidence'] - expected['confidence'])
+    assert agreement >= 0.8
+    assert drift.mean() < 0.03 and drift.max() < 0.15
@@ -0,0 +1,72 @@
+"""
+Test Inference Options
+Validazione dei parametri di inferenza alla creazione e stesso risultato
+passandoli come InferenceOptions o come keyword
+"""
+
+import dataclasses
+
+import numpy as np
+import pytest
+
+from inference_options import InferenceOptions
+
+
+@pytest.mark.parametrize('invalid', [
+    dict(batch_size=0), dict(reducer='median'), dict(max_length=0), dict(stride=-1),
+    dict(long_documents=True, max_length=64, stride=64), dict(max_tokens=0),
+    dict(target_latency_ms=0), dict(cascade_threshold=0.0), dict(cascade_threshold=1.5),
+    dict(cascade_threshold=0.9, cascade_audit_rate=2.0),
+])
+def test_invalid_options_are_rejected_on_creation(invalid):
+    with pytest.raises(ValueError):
+        InferenceOptions(**invalid)
+
+
+def test_options_are_frozen_and_split_for_infer():
+    options = InferenceOptions(bucket_boundaries=[16, 32], cascade_threshold=0.9)
+
+    assert options.bucket_boundaries == (16, 32)
+    assert options.cascade
+    assert not InferenceOptions().cascade
+    assert set(options.infer_kwargs()) == {
+        field.name for field in dataclasses.fields(options)} - {
+        'cascade_threshold', 'cascade_audit_rate'}
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        options.batch_size = 1
+
+
+def test_options_come_from_an_object_or_keywords_not_both():
+    options = InferenceOptions(batch_size=8)
+
+    assert InferenceOptions.from_arguments(options) is options
+    assert InferenceOptions.from_arguments(batch_size=8) == options
+    with pytest.raises(TypeError):
+        InferenceOptions.from_arguments(options, max_length=64)
+    with pytest.raises(TypeError):
+        InferenceOptions.from_arguments({'batch_size': 8})
+
+
+def test_analysis_with_options_matches_keywords(make_analyzer, sentences, quiet):
+    analyzer = make_analyzer(sentences[:20])
+    expected, _ = quiet(analyzer.analyze_sentiment, batch_size=4, max_length=32)
+    expected = expected[['predicted_sentiment', 'confidence']].copy()
+
+    results, _ = quiet(analyzer.analyze_sentiment,
+                       InferenceOptions(batch_size=4, max_length=32))
+
+    assert results['predicted_sentiment'].tolist() == expected['predicted_sentiment'].tolist()
+    np.testing.assert_allclose(results['confidence'], expected['confidence'], atol=1e-6)
+    labels, scores = analyzer.predict(sentences[:20], InferenceOptions(batch_size=4, max_length=32))
+    assert labels == expected['predicted_sentiment'].astype(str).tolist()
+
+
+def test_service_validates_options_once_before_serving(make_analyzer):
+    from sentiment_service import SentimentService
+    analyzer = make_analyzer()
+
+    with pytest.raises(ValueError):
+        SentimentService(analyzer, reducer='median')
+    service = SentimentService(analyzer, max_batch_size=16, max_length=64)
+    assert service.options == InferenceOptions(batch_size=16, max_length=64)
+    assert analyzer._pipeline is None
@@ -0,0 +1,122 @@
+"""
+Test Instrumentation
+Stage annidati, contatori, merge delle metriche dei worker ed export
+"""
+
+import io
+import json
+
+import pytest
+
+from instrumentation import ProgressMeter, RunMetrics, format_seconds, profile_run
+
+
+def test_nested_stages_and_counters():
+    metrics = RunMetrics()
+
+    for _ in range(3):
+        with metrics.stage('analyze_sentiment'):
+            with metrics.stage('forward'):
+                metrics.count('batches')
+                metrics.count('tokens', 40)
+
+    assert list(metrics.stages) == ['analyze_sentiment', 'analyze_sentiment/forward']
+    assert metrics.stages['analyze_sentiment/forward']['calls'] == 3
+    assert (metrics.stages['analyze_sentiment']['seconds']
+            >= metrics.stages['analyze_sentiment/forward']['seconds'])
+    assert metrics.counters == {'batches': 3, 'tokens': 120}
+
+
+def test_suspended_block_is_not_recorded():
+    metrics = RunMetrics()
+
+    with metrics.suspended():
+        with metrics.stage('forward'):
+            metrics.count('batches')
+
+    assert metrics.stages == {} and metrics.counters == {}
+
+
+def test_worker_metrics_are_merged_under_active_stage():
+    worker = RunMetrics()
+    with worker.stage('forward'):
+        worker.count('batches', 2)
+    metrics = RunMetrics()
+    metrics.count('batches')
+
+    with metrics.stage('analyze_sentiment'):
+        metrics.merge(worker.to_dict())
+        metrics.merge(worker.to_dict())
+
+    assert metrics.stages['analyze_sentiment/forward']['calls'] == 2
+    assert metrics.counters['batches'] == 5
+    assert metrics.workers_peak_rss is not None
+
+
+def test_json_and_prometheus_export(tmp_path):
+    metrics = RunMetrics()
+    with metrics.stage('analyze_sentiment'):
+        metrics.count('rows', 10)
+        metrics.count('tokens', 75)
+        metrics.count('padded_tokens', 100)
+
+    metrics.save(str(tmp_path / 'run.json'))
+    metrics.save(str(tmp_path / 'run.prom'))
+
+    data = json.loads((tmp_path / 'run.json').read_text())
+    assert data['counters'] == {'rows': 10, 'tokens': 75, 'padded_tokens': 100}
+    assert data['padding_efficiency'] == pytest.approx(0.75)
+    prom = (tmp_path / 'run.prom').read_text().splitlines()
+    assert 'fsa_stage_calls_total{stage="analyze_sentiment"} 1' in prom
+    assert 'fsa_rows_total 10' in prom
+    assert 'fsa_padding_efficiency 0.75' in prom
+
+
+def test_progress_meter_prints_rate_and_eta():
+    stream = io.StringIO()
+    meter = ProgressMeter(100, interval=3600, stream=stream)
+
+    meter.update(10)
+    meter.update(10)  # entro l'intervallo: nessuna stampa
+    meter.update(80)
+
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == 2
+    assert lines[0].startswith("   Progresso: 10/100 (10.0%)")
+    assert lines[1].startswith("   Progresso: 100/100 (100.0%)") and lines[1].endswith("ETA 0s")
+
+
+@pytest.mark.parametrize('seconds, text', [(12.4, '12s'), (185, '3m 05s'),
+                                           (3720, '1h 02m'), (float('nan'), '?')])
+def test_format_seconds(seconds, text):
+    assert format_seconds(seconds) == text
+
+
+def test_cprofile_run_saves_stats(tmp_path, quiet):
+    path = str(tmp_path / 'profile' / 'run.pstats')
+
+    def work():
+        with profile_run('cprofile', path, top=5):
+            sum(range(10_000))
+    _, output = quiet(work)
+
+    assert (tmp_path / 'profile' / 'run.pstats').exists()
+    assert "Profilo cProfile salvato" in output
+    with pytest.raises(ValueError):
+        with profile_run('perf'):
+            pass
+
+
+def test_analysis_records_stages_and_counters(make_analyzer, sentences, quiet):
+    analyzer = make_analyzer(sentences[:20] + sentences[:5])
+    quiet(analyzer.warmup, batch_size=4, rounds=1)
+
+    quiet(analyzer.analyze_sentiment, batch_size=8)
+
+    counters = analyzer.metrics.counters
+    assert counters['rows'] == 25
+    assert counters['unique_texts'] == 20
+    assert counters['sequences'] == 20
+    assert counters['batches'] == 3  # i batch del warmup non contano
+    assert {'analyze_sentiment/tokenize', 'analyze_sentiment/pad',
+            'analyze_sentiment/forward'} <= set(analyzer.metrics.stages)
@@ -0,0 +1,65 @@
+"""
+Test Lazy Loading
+Import senza librerie pesanti, modello caricato alla prima inferenza e warmup
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+# pyarrow escluso: se installato lo importa già pandas
+HEAVY_MODULES = ('torch', 'transformers', 'matplotlib', 'seaborn')
+
+
+def test_import_does_not_load_heavy_libraries():
+    code = ("import sys, financial_sentiment_analyzer, visualizations, columnar; "
+            f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+
+    loaded = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)), check=True)
+
+    assert loaded.stdout.strip() == ''
+
+
+def test_model_is_loaded_on_first_inference(make_analyzer, sentences, quiet):
+    analyzer = make_analyzer(sentences[:5])
+    assert analyzer._pipeline is None and analyzer.label_dtype is None
+
+    _, output = quiet(analyzer.analyze_sentiment, batch_size=4)
+
+    assert analyzer._pipeline is not None
+    assert "Caricamento modello" in output
+    _, output = quiet(analyzer.analyze_sentiment, batch_size=4)
+    assert "Caricamento modello" not in output
+
+
+def test_failed_load_is_retried_on_next_call(make_analyzer, sentences, quiet, monkeypatch):
+    import financial_sentiment_analyzer
+    analyzer = make_analyzer(sentences[:5])
+    create_backend = financial_sentiment_analyzer.create_backend
+
+    def broken(*args, **kwargs):
+        raise RuntimeError("export fallito")
+    monkeypatch.setattr(financial_sentiment_analyzer, 'create_backend', broken)
+    with pytest.raises(RuntimeError):
+        quiet(analyzer.analyze_sentiment, batch_size=4)
+    assert analyzer._pipeline is None and analyzer.label_dtype is None
+
+    monkeypatch.setattr(financial_sentiment_analyzer, 'create_backend', create_backend)
+    results, _ = quiet(analyzer.analyze_sentiment, batch_size=4)
+
+    assert len(results) == 5
+    assert analyzer._pipeline is not None
+
+
+def test_warmup_loads_the_model_without_touching_the_cache(make_analyzer, tmp_path, quiet):
+    analyzer = make_analyzer(cache_path=str(tmp_path / 'cache.sqlite'))
+
+    elapsed, output = quiet(analyzer.warmup, batch_size=4, lengths=(8, 32), rounds=1)
+
+    assert elapsed > 0
+    assert "Warmup: 4 batch fittizi" in output
+    assert analyzer.label_dtype is not None
+    assert len(analyzer.cache) == 0
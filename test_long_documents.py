@@ -0,0 +1,118 @@
+"""
+Test Long Documents
+Finestre di token sovrapposte e aggregazione dei punteggi per documento
+"""
+
+import numpy as np
+import pytest
+
+from long_documents import aggregate_windows, split_windows
+
+CLS, SEP = 101, 102
+
+
+def document(n_content):
+    return [CLS] + list(range(1, n_content + 1)) + [SEP]
+
+
+def test_short_sequence_is_a_single_window():
+    ids = document(10)
+
+    assert split_windows(ids, 16, 4, 1, 1) == [ids]
+
+
+def test_windows_overlap_by_stride_and_cover_everything():
+    ids = document(30)
+
+    windows = split_windows(ids, 12, 4, 1, 1)
+
+    assert all(len(window) <= 12 and window[0] == CLS and window[-1] == SEP
+               for window in windows)
+    contents = [window[1:-1] for window in windows]
+    assert contents[0] == list(range(1, 11))
+    for previous, current in zip(contents, contents[1:]):
+        assert previous[-4:] == current[:4]
+    assert sorted(set(token for content in contents for token in content)) == list(range(1, 31))
+    assert len(windows) == 5  # finestre da 10 token, 6 nuovi per finestra
+
+
+def test_window_count_grows_linearly():
+    counts = [len(split_windows(document(n), 66, 16, 1, 1)) for n in (640, 1_280, 2_560)]
+
+    # 1 + ceil((n - 64) / 48) finestre
+    assert counts == [13, 27, 53]
+
+
+@pytest.mark.parametrize('stride', [-1, 10, 50])
+def test_invalid_stride_is_rejected(stride):
+    with pytest.raises(ValueError):
+        split_windows(document(30), 12, stride, 1, 1)
+
+
+PROBS = np.array([[0.2, 0.8], [0.6, 0.4], [0.9, 0.1], [np.nan, np.nan], [0.3, 0.7]])
+DOCS = np.array([0, 0, 1, 2, 2])
+WEIGHTS = np.array([10, 30, 5, 8, 2])
+
+
+def test_mean_reducer_averages_windows_and_skips_failed_ones():
+    result = aggregate_windows(DOCS, PROBS, WEIGHTS, 4, 'mean')
+
+    np.testing.assert_allclose(result[0], [0.4, 0.6])
+    np.testing.assert_allclose(result[1], [0.9, 0.1])
+    np.testing.assert_allclose(result[2], [0.3, 0.7])
+    assert np.isnan(result[3]).all()
+
+
+def test_length_weighted_reducer():
+    result = aggregate_windows(DOCS, PROBS, WEIGHTS, 3, 'length_weighted')
+
+    np.testing.assert_allclose(result[0], [(0.2 * 10 + 0.6 * 30) / 40, (0.8 * 10 + 0.4 * 30) / 40])
+
+
+def test_max_confidence_reducer_keeps_most_confident_window():
+    result = aggregate_windows(DOCS, PROBS, WEIGHTS, 3, 'max_confidence')
+
+    np.testing.assert_allclose(result, [[0.2, 0.8], [0.9, 0.1], [0.3, 0.7]])
+
+
+def test_unknown_reducer_is_rejected():
+    with pytest.raises(ValueError):
+        aggregate_windows(DOCS, PROBS, WEIGHTS, 3, 'median')
+
+
+def test_long_document_mode_reads_the_whole_text(make_analyzer, sentences, quiet):
+    long_text = " ".join(sentences[:40])
+    analyzer = make_analyzer([long_text, sentences[50]])
+
+    truncated, _ = quiet(analyzer.analyze_sentiment, batch_size=4, max_length=64)
+    truncated = truncated['confidence'].copy()
+    results, _ = quiet(analyzer.analyze_sentiment, batch_size=4, max_length=64,
+                       long_documents=True, stride=16)
+
+    assert analyzer.truncation_stats['long_documents'] == 1
+    assert analyzer.truncation_stats['windows'] > 10
+    # La news corta non cambia, quella lunga usa tutte le finestre
+    assert results['confidence'].iloc[1] == pytest.approx(truncated.iloc[1], abs=1e-5)
+    assert results['confidence'].iloc[0] != pytest.approx(truncated.iloc[0], abs=1e-5)
+
+
+@pytest.mark.parametrize('stride, max_length', [(-1, None), (64, 64), (100, 64)])
+def test_invalid_stride_is_rejected_before_loading_the_model(make_analyzer, sentences, quiet,
+                                                             stride, max_length):
+    analyzer = make_analyzer(sentences[:3])
+
+    with pytest.raises(ValueError, match='stride'):
+        quiet(analyzer.analyze_sentiment, long_documents=True, stride=stride,
+              max_length=max_length)
+    assert analyzer._pipeline is None
+
+
+def test_stride_must_leave_room_for_new_tokens(make_analyzer, sentences, quiet):
+    analyzer = make_analyzer(sentences[:3])
+
+    # 64 token meno [CLS] e [SEP]: 62 di contenuto per finestra
+    with pytest.raises(ValueError, match='minore di 62'):
+        quiet(analyzer.analyze_sentiment, long_documents=True, stride=62, max_length=64)
+    results, _ = quiet(analyzer.analyze_sentiment, long_documents=True, stride=61,
+                       max_length=64)
+    assert len(results) == 3
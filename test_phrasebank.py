@@ -0,0 +1,86 @@
+"""
+Test PhraseBank
+Lettura dei file `frase@label` e unione dei livelli di accordo
+"""
+
+import pytest
+
+from phrasebank import (agreement_from_filename, is_phrasebank_path, load_phrasebank,
+                        read_phrasebank_file)
+
+
+def write(path, lines, encoding='latin-1'):
+    path.write_bytes(("\r\n".join(lines) + "\r\n").encode(encoding))
+    return str(path)
+
+
+def test_lines_are_split_on_the_last_at_sign(tmp_path):
+    path = write(tmp_path / 'Sentences_50Agree.txt', [
+        "Profit rose to EUR 5 mn @ 3 % margin@positive",
+        "",
+        "no label on this line",
+        "Sales fell .@Negative ",
+    ])
+
+    sentences, labels = read_phrasebank_file(path)
+
+    assert sentences == ["Profit rose to EUR 5 mn @ 3 % margin", "Sales fell ."]
+    assert labels == ['positive', 'negative']
+
+
+@pytest.mark.parametrize('encoding', ['latin-1', 'utf-8'])
+def test_latin1_and_utf8_files_give_the_same_text(tmp_path, encoding):
+    path = write(tmp_path / 'Sentences_AllAgree.txt', ["Nokia Oyj 's café sales grew@positive"],
+                 encoding)
+
+    assert read_phrasebank_file(path)[0] == ["Nokia Oyj 's café sales grew"]
+
+
+@pytest.mark.parametrize('name, level', [
+    ('Sentences_50Agree.txt', 50), ('Sentences_66Agree.txt', 66),
+    ('sentences_75agree.txt', 75), ('Sentences_AllAgree.txt', 100), ('news.txt', None),
+])
+def test_agreement_from_filename(name, level):
+    assert agreement_from_filename(f"data/FinancialPhraseBank/{name}") == level
+
+
+def test_directory_keeps_each_sentence_once_with_highest_agreement(tmp_path):
+    everyone = ["A@positive", "B@negative"]
+    most = everyone + ["C@neutral"]
+    write(tmp_path / 'Sentences_AllAgree.txt', everyone)
+    write(tmp_path / 'Sentences_75Agree.txt', most)
+    write(tmp_path / 'Sentences_66Agree.txt', most + ["D@neutral"])
+    write(tmp_path / 'Sentences_50Agree.txt', most + ["D@neutral", "E@positive"])
+
+    df = load_phrasebank(str(tmp_path))
+
+    assert df['text'].tolist() == ['A', 'B', 'C', 'D', 'E']
+    assert df['agreement_level'].tolist() == [100, 100, 75, 66, 50]
+    assert df['original_sentiment'].tolist() == ['positive', 'negative', 'neutral',
+                                                 'neutral', 'positive']
+    # Livelli annidati: il filtro riproduce il file corrispondente
+    assert df[df['agreement_level'] >= 75]['text'].tolist() == ['A', 'B', 'C']
+
+
+def test_directory_without_phrasebank_files(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        load_phrasebank(str(tmp_path))
+
+
+def test_file_without_labels_is_rejected(tmp_path):
+    path = write(tmp_path / 'Sentences_66Agree.txt', ["positive,Profit rose", ""])
+
+    with pytest.raises(ValueError):
+        read_phrasebank_file(path)
+
+
+def test_only_phrasebank_names_and_directories_are_recognised(tmp_path):
+    write(tmp_path / 'Sentences_AllAgree.txt', ["A@positive"])
+    other = tmp_path / 'other'
+    other.mkdir()
+
+    assert is_phrasebank_path(str(tmp_path))
+    assert is_phrasebank_path(str(tmp_path / 'Sentences_AllAgree.txt'))
+    assert not is_phrasebank_path(write(tmp_path / 'news.txt', ["positive,Profit rose"]))
+    assert not is_phrasebank_path(str(tmp_path / 'news.csv'))
+    assert not is_phrasebank_path(str(other))
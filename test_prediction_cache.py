@@ -0,0 +1,119 @@
+"""
+Test Prediction Cache
+Eviction LRU, invalidazione al cambio di modello e chiavi normalizzate
+della cache persistente delle predizioni
+"""
+
+import sqlite3
+
+import numpy as np
+
+from prediction_cache import PredictionCache
+
+
+def open_cache(tmp_path, revision='r1', max_entries=3):
+    return PredictionCache(str(tmp_path / 'cache.sqlite'), 'modello', revision, max_entries)
+
+
+def put(cache, *texts):
+    cache.put_many((cache.key(text), text.upper(), 0.9) for text in texts)
+
+
+def present(cache, *texts):
+    found = cache.get_many([cache.key(text) for text in texts])
+    return [text for text in texts if cache.key(text) in found]
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = open_cache(tmp_path)
+    for text in ('a', 'b', 'c'):
+        put(cache, text)
+    assert present(cache, 'a') == ['a']  # 'a' torna la più recente
+
+    put(cache, 'd')
+
+    assert len(cache) == 3
+    assert cache.evictions == 1
+    assert present(cache, 'a', 'b', 'c', 'd') == ['a', 'c', 'd']
+
+
+def test_batch_larger_than_capacity_keeps_max_entries(tmp_path):
+    cache = open_cache(tmp_path)
+    put(cache, 'a', 'b', 'c', 'd', 'e')
+
+    assert len(cache) == 3
+    assert cache.stats()['evictions'] == 2
+    # Nello stesso batch le ultime voci sono le più recenti
+    assert present(cache, 'a', 'b', 'c', 'd', 'e') == ['c', 'd', 'e']
+
+
+def test_entry_count_follows_inserts_replacements_and_evictions(tmp_path):
+    cache = open_cache(tmp_path, max_entries=4)
+    put(cache, 'a', 'b', 'a')
+    put(cache, 'b', 'c')
+    assert len(cache) == 3
+    assert cache.evictions == 0
+
+    put(cache, 'd', 'e', 'f')
+    cache.clear()
+    put(cache, 'g')
+
+    with sqlite3.connect(cache.path) as conn:
+        rows = conn.execute("SELECT COUNT(*) FROM predictions").fetchone()[0]
+    assert len(cache) == rows == 1
+
+
+def test_recency_survives_reopening(tmp_path):
+    cache = open_cache(tmp_path)
+    put(cache, 'a', 'b', 'c')
+    cache.close()
+
+    cache = open_cache(tmp_path)
+    assert len(cache) == 3
+    assert present(cache, 'a') == ['a']
+    put(cache, 'd')
+
+    assert present(cache, 'a', 'b', 'c', 'd') == ['a', 'c', 'd']
+
+
+def test_model_revision_change_invalidates(tmp_path):
+    cache = open_cache(tmp_path)
+    put(cache, 'a', 'b')
+    cache.close()
+
+    cache = open_cache(tmp_path)
+    assert not cache.invalidated
+    assert present(cache, 'a', 'b') == ['a', 'b']
+    cache.close()
+
+    cache = open_cache(tmp_path, revision='r2')
+    assert cache.invalidated
+    assert len(cache) == 0
+    put(cache, 'c')
+    cache.close()
+
+    cache = open_cache(tmp_path, revision='r2')
+    assert not cache.invalidated
+    assert present(cache, 'c') == ['c']
+
+
+def test_keys_use_normalized_text_and_settings(tmp_path):
+    cache = open_cache(tmp_path)
+
+    assert cache.key("Profits  rose\n") == cache.key("Profits rose")
+    assert cache.key("Cafe\u0301") == cache.key("Caf\u00e9")
+    assert cache.key("Profits rose", 'max_length=128') != cache.key("Profits rose")
+    assert cache.key("profits rose") != cache.key("Profits rose")
+
+
+def test_analyzer_serves_repeated_texts_from_cache(tmp_path, make_analyzer, sentences, quiet):
+    analyzer = make_analyzer(sentences[:50], cache_path=str(tmp_path / 'cache.sqlite'))
+    expected, _ = quiet(analyzer.analyze_sentiment, batch_size=16)
+    expected = expected[['predicted_sentiment', 'confidence']].copy()
+
+    cached, _ = quiet(analyzer.analyze_sentiment, batch_size=16)
+
+    assert analyzer.cache_stats['misses'] == 0
+    assert analyzer.cache_stats['hits'] == 50
+    assert cached['predicted_sentiment'].tolist() == expected['predicted_sentiment'].tolist()
+    np.testing.assert_allclose(cached['confidence'], expected['confidence'], atol=1e-6)
@@ -0,0 +1,175 @@
+"""
+Test Sentiment Service
+Micro-batching, backpressure e route HTTP di `sentiment_service`
+"""
+
+import asyncio
+import contextlib
+import io
+import threading
+import time
+
+import pytest
+
+from sentiment_service import MicroBatcher, QueueFullError, SentimentService
+
+
+@pytest.fixture
+def analyzer(make_analyzer):
+    return make_analyzer()
+
+
+def recording_predict(batches, release=None):
+    """
+    predict_fn finta: registra i batch e (opzionale) attende un evento
+    """
+    def predict(texts):
+        batches.append(list(texts))
+        if release is not None:
+            release.wait(5)
+        return [text.upper() for text in texts], [1.0] * len(texts)
+    return predict
+
+
+async def with_batcher(batcher, coroutine):
+    await batcher.start()
+    try:
+        return await coroutine
+    finally:
+        await batcher.stop()
+
+
+def test_requests_are_coalesced_up_to_max_batch_size():
+    batches = []
+    batcher = MicroBatcher(recording_predict(batches), max_batch_size=4, max_wait_ms=50)
+    texts = [f"news {i}" for i in range(10)]
+
+    async def submit_all():
+        return await asyncio.gather(*(batcher.submit([text]) for text in texts))
+
+    results = asyncio.run(with_batcher(batcher, submit_all()))
+
+    assert [len(batch) for batch in batches] == [4, 4, 2]
+    assert [result[0] for result in results] == [(text.upper(), 1.0) for text in texts]
+    assert batcher.metrics.batch_sizes == {4: 2, 2: 1}
+
+
+def test_partial_batch_flushed_after_max_wait():
+    batches = []
+    batcher = MicroBatcher(recording_predict(batches), max_batch_size=32, max_wait_ms=100)
+
+    async def submit_one():
+        start = time.perf_counter()
+        result = await batcher.submit(["lonely news"])
+        return result, time.perf_counter() - start
+
+    result, elapsed = asyncio.run(with_batcher(batcher, submit_one()))
+
+    assert result == [("LONELY NEWS", 1.0)]
+    assert batches == [["lonely news"]]
+    assert 0.1 <= elapsed < 2.0
+
+
+def test_full_queue_rejects_whole_request():
+    release = threading.Event()
+    batches = []
+    batcher = MicroBatcher(recording_predict(batches, release), max_batch_size=1,
+                           max_wait_ms=0, max_queue=2)
+
+    async def overflow():
+        first = asyncio.ensure_future(batcher.submit(["a"]))
+        while not batches:  # il primo batch è in inferenza, la coda è vuota
+            await asyncio.sleep(0.001)
+        second = asyncio.ensure_future(batcher.submit(["b"]))
+        await asyncio.sleep(0)
+        with pytest.raises(QueueFullError):
+            await batcher.submit(["c", "d"])
+        release.set()
+        return await first, await second
+
+    first, second = asyncio.run(with_batcher(batcher, overflow()))
+
+    assert first == [("A", 1.0)] and second == [("B", 1.0)]
+    assert batcher.metrics.rejected == 1
+    assert ["c"] not in batches and ["d"] not in batches
+
+
+async def serve(analyzer, requests, **options):
+    """
+    Avvia il servizio su una porta libera ed esegue `requests(host, port, service)`
+    """
+    service = SentimentService(analyzer, **options)
+    with contextlib.redirect_stdout(io.StringIO()):
+        await service.start(port=0)
+    try:
+        host, port = service.server.sockets[0].getsockname()[:2]
+        return await requests(host, port, service)
+    finally:
+        await service.stop()
+
+
+def test_error_routes(analyzer, http_request):
+    async def requests(host, port, service):
+        return [
+            await http_request(host, port, 'GET', '/unknown'),
+            await http_request(host, port, 'GET', '/predict'),
+            await http_request(host, port, 'POST', '/predict', {'wrong': 'key'}),
+            await http_request(host, port, 'POST', '/predict', {'texts': []}),
+            await http_request(host, port, 'POST', '/predict', {'texts': ["ok", "  "]}),
+            await http_request(host, port, 'POST', '/predict', {'texts': ["ok", 3]}),
+            await http_request(host, port, 'POST', '/predict', {'texts': ["x"] * 9}),
+            await http_request(host, port, 'GET', '/health'),
+        ]
+
+    responses = asyncio.run(serve(analyzer, requests, max_batch_size=4, max_queue=8))
+
+    assert [status for status, _ in responses] == [404, 405, 400, 400, 400, 400, 413, 200]
+    assert all('error' in payload for _, payload in responses[:-1])
+    assert responses[-1][1]['status'] == 'ok'
+
+
+def test_full_queue_returns_503(analyzer, http_request):
+    release = threading.Event()
+    batches = []
+
+    async def requests(host, port, service):
+        service.batcher.predict_fn = recording_predict(batches, release)
+        first = asyncio.ensure_future(
+            http_request(host, port, 'POST', '/predict', {'text': "first"}))
+        while not batches:
+            await asyncio.sleep(0.001)
+        second = asyncio.ensure_future(
+            http_request(host, port, 'POST', '/predict', {'text': "second"}))
+        while service.batcher.queue.qsize() < 1:
+            await asyncio.sleep(0.001)
+        rejected = await http_request(host, port, 'POST', '/predict', {'text': "third"})
+        release.set()
+        return rejected, await first, await second
+
+    rejected, first, second = asyncio.run(
+        serve(analyzer, requests, max_batch_size=1, max_wait_ms=0, max_queue=1))
+
+    assert rejected[0] == 503 and 'error' in rejected[1]
+    assert first == (200, {'label': "FIRST", 'score': 1.0})
+    assert second == (200, {'label': "SECOND", 'score': 1.0})
+
+
+def test_results_match_analyzer_predict(analyzer, http_request, sentences):
+    sentences = sentences[:40]
+    expected_labels, expected_scores = analyzer.predict(sentences, batch_size=8)
+
+    async def requests(host, port, service):
+        singles = await asyncio.gather(*(
+            http_request(host, port, 'POST', '/predict', {'text': sentence})
+            for sentence in sentences))
+        grouped = await http_request(host, port, 'POST', '/predict', {'texts': sentences})
+        return singles, grouped
+
+    singles, (status, grouped) = asyncio.run(
+        serve(analyzer, requests, max_batch_size=8, max_wait_ms=5))
+
+    assert status == 200
+    assert all(status == 200 for status, _ in singles)
+    for items in ([payload for _, payload in singles], grouped['results']):
+        assert [item['label'] for item in items] == expected_labels
+        assert [item['score'] for item in items] == pytest.approx(expected_scores, abs=1e-5)
@@ -0,0 +1,52 @@
+"""
+Test Streaming
+Analisi a chunk di un CSV: stessi risultati dell'analisi in memoria
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from streaming import append_csv, iter_csv_chunks
+
+
+@pytest.fixture
+def news_csv(tmp_path, sentences):
+    """
+    CSV nel formato del dataset (senza header, latin-1) con 45 news
+    """
+    labels = ['positive', 'negative', 'neutral']
+    frame = pd.DataFrame({'original_sentiment': [labels[i % 3] for i in range(45)],
+                          'text': sentences[:45]})
+    path = tmp_path / 'news.csv'
+    frame.to_csv(path, header=False, index=False, encoding='latin-1')
+    return str(path), frame
+
+
+def test_chunks_cover_the_file_and_are_appended_in_order(news_csv, tmp_path):
+    path, frame = news_csv
+    output = str(tmp_path / 'out' / 'copy.csv')
+
+    sizes = [len(chunk) for chunk in append_csv(iter_csv_chunks(path, chunksize=20), output)]
+
+    assert sizes == [20, 20, 5]
+    pd.testing.assert_frame_equal(pd.read_csv(output), frame)
+
+
+def test_stream_matches_in_memory_analysis(news_csv, tmp_path, make_analyzer, quiet):
+    path, frame = news_csv
+    analyzer = make_analyzer(frame['text'])
+    expected, _ = quiet(analyzer.analyze_sentiment, batch_size=8)
+    expected = expected[['predicted_sentiment', 'confidence']].copy()
+    output = str(tmp_path / 'results.csv')
+
+    stats, _ = quiet(analyzer.analyze_stream, path, output, chunksize=16, batch_size=8)
+
+    results = pd.read_csv(output)
+    assert results['text'].tolist() == frame['text'].tolist()
+    assert results['predicted_sentiment'].tolist() == expected['predicted_sentiment'].tolist()
+    np.testing.assert_allclose(results['confidence'], expected['confidence'], atol=1e-5)
+    assert stats.rows == 45
+    assert stats.compared == 45
+    assert stats.mean_confidence == pytest.approx(expected['confidence'].mean(), abs=1e-5)
+    assert analyzer.dedup_stats['rows'] == 45
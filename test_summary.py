@@ -0,0 +1,85 @@
+"""
+Test Result Summary
+`merge` dei riepiloghi di più shard (e `update` a blocchi) contro il
+riepilogo calcolato in un solo passaggio
+"""
+
+import pandas as pd
+import pytest
+
+from summary import ResultSummary, merge_summaries
+
+
+@pytest.mark.parametrize('bounds', [
+    [0, 2_500, 5_000],
+    [0, 1, 700, 701, 3_333, 5_000],
+    [0, 4_990, 5_000],  # ultimo shard con poche righe e non tutte le label
+])
+def test_merge_of_shards_matches_single_pass(bounds, results_frame, assert_same_summary):
+    df = results_frame()
+    options = dict(top_k=7, examples_per_class=3, sample_size=50)
+    expected = ResultSummary.from_frame(df, **options)
+
+    shards = [ResultSummary.from_frame(df.iloc[start:end], **options)
+              for start, end in zip(bounds[:-1], bounds[1:])]
+
+    assert_same_summary(merge_summaries(shards), expected)
+
+
+def test_update_in_chunks_matches_single_pass(results_frame, assert_same_summary):
+    df = results_frame(seed=1)
+    expected = ResultSummary.from_frame(df, sample_size=20)
+
+    summary = ResultSummary(sample_size=20)
+    for start in range(0, len(df), 999):
+        summary.update(df.iloc[start:start + 999])
+    summary.update(df.iloc[:0])
+
+    assert_same_summary(summary, expected)
+
+
+def test_counts_confusion_and_accuracy_are_case_insensitive():
+    df = pd.DataFrame({
+        'original_sentiment': ['positive', 'negative', 'neutral', 'neutral', 'positive'],
+        'predicted_sentiment': ['POSITIVE', 'NEUTRAL', 'NEUTRAL', 'NEGATIVE', 'POSITIVE'],
+        'confidence': [0.9, 0.4, 0.7, 0.6, 0.8],
+    })
+
+    summary = ResultSummary.from_frame(df)
+
+    assert summary.counts == {'POSITIVE': 2, 'NEUTRAL': 2, 'NEGATIVE': 1}
+    assert summary.mean_confidence == pytest.approx(0.68)
+    assert (summary.confidence_min, summary.confidence_max) == (0.4, 0.9)
+    assert summary.accuracy == pytest.approx(3 / 5)
+
+
+def test_class_sample_is_capped_and_drawn_from_the_label(results_frame):
+    df = results_frame(seed=3)
+
+    summary = ResultSummary.from_frame(df, sample_size=30)
+
+    for label in summary.counts:
+        sample = summary.class_sample(label)
+        values = df.loc[df['predicted_sentiment'] == label, 'confidence']
+        assert len(sample) == 30
+        assert set(sample) <= set(values)
+    assert ResultSummary.from_frame(df).samples == {}
+
+
+def test_top_rows_keep_first_seen_on_ties():
+    df = pd.DataFrame({'predicted_sentiment': ['POSITIVE'] * 6,
+                       'confidence': [0.9, 0.99, 0.9, 0.99, 0.5, 0.99]})
+
+    merged = merge_summaries([ResultSummary.from_frame(df.iloc[:3], top_k=3),
+                              ResultSummary.from_frame(df.iloc[3:], top_k=3)])
+
+    expected = df['confidence'].nlargest(3).index.tolist()
+    assert [row['index'] for row in merged.top] == expected == [1, 3, 5]
+
+
+def test_merge_of_no_summaries_is_empty():
+    summary = merge_summaries([])
+
+    assert summary.rows == 0
+    assert summary.counts == {}
+    assert summary.mean_confidence == 0.0
@@ -0,0 +1,17 @@
+"""
+Test Tiny Model
+Il DistilBERT minuscolo dei test e dei benchmark conosce il vocabolario
+di FinancialPhraseBank (non solo gli special token)
+"""
+
+
+def test_tiny_model_tokenizes_phrasebank_words(tiny_model, sentences):
+    from transformers import AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(tiny_model)
+    ids = tokenizer(sentences[:50])['input_ids']
+
+    assert len(tokenizer) > 1_000
+    tokens = [token for sequence in ids for token in sequence]
+    # Solo qualche carattere raro resta [UNK]
+    assert tokens.count(tokenizer.unk_token_id) < len(tokens) // 100
@@ -0,0 +1,143 @@
+"""
+Test Token Store
+Costruzione e ricerca del corpus pre-tokenizzato (testi presenti, assenti,
+valori mancanti) e analisi che lo usa, offline con il DistilBERT minuscolo
+dei benchmark"""
+
+import copy
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import token_store
+from token_store import META_FILE, TokenStore, tokenizer_fingerprint
+
+
+@pytest.fixture(scope='module')
+def tokenizer(tiny_model):
+    from transformers import AutoTokenizer
+    return AutoTokenizer.from_pretrained(tiny_model)
+
+
+@pytest.fixture
+def corpus(sentences):
+    # Duplicati e valori non testuali, come in una colonna del dataset
+    return sentences[:60] + sentences[:10] + [None, np.nan]
+
+
+def test_build_stores_each_text_once_with_tokenizer_ids(tmp_path, tokenizer, corpus):
+    store = TokenStore.build(str(tmp_path / 'store'), corpus, tokenizer, batch_size=16)
+    texts = list(dict.fromkeys(text for text in corpus if isinstance(text, str)))
+
+    assert len(store) == len(texts) == store.meta['texts']
+    assert store.input_ids.dtype == np.uint16
+    assert store.meta['tokens'] == int(np.sum(store.lengths))
+    expected = tokenizer(texts)['input_ids']
+    for i, ids in enumerate(expected):
+        assert store[i].tolist() == ids
+
+
+def test_lookup_present_missing_and_none(tmp_path, tokenizer, corpus):
+    store = TokenStore.build(str(tmp_path / 'store'), corpus, tokenizer)
+    texts = list(dict.fromkeys(text for text in corpus if isinstance(text, str)))
+    queries = [texts[5], "not in the corpus", None, texts[0], np.nan, texts[5], ""]
+
+    positions = store.lookup(queries)
+
+    assert positions.tolist() == [5, -1, -1, 0, -1, 5, -1]
+    assert store.lookup(pd.Series(queries, dtype=object)).tolist() == positions.tolist()
+    assert store.lookup([]).tolist() == []
+
+
+def test_colliding_primary_hashes_never_return_another_text(tmp_path, tokenizer, corpus,
+                                                            monkeypatch):
+    # Primo hash costante: ogni coppia di testi collide
+    monkeypatch.setattr(token_store, 'text_hashes',
+                        lambda texts: np.zeros(len(texts), dtype=np.uint64))
+    store = TokenStore.build(str(tmp_path / 'store'), corpus, tokenizer)
+    texts = list(dict.fromkeys(text for text in corpus if isinstance(text, str)))
+
+    positions = store.lookup(texts + ["not in the corpus"])
+
+    assert len(store) == len(texts)
+    assert positions[-1] == -1
+    assert (positions[:-1] >= 0).any()
+    for text, position in zip(texts, positions):
+        if position >= 0:
+            assert store[position].tolist() == tokenizer(text)['input_ids']
+
+
+def test_reopened_store_matches_and_empty_store_finds_nothing(tmp_path, tokenizer, corpus):
+    path = str(tmp_path / 'store')
+    built = TokenStore.build(path, corpus, tokenizer)
+    reopened = TokenStore(path)
+
+    assert reopened.fingerprint == built.fingerprint == tokenizer_fingerprint(tokenizer)
+    np.testing.assert_array_equal(np.asarray(reopened.input_ids), np.asarray(built.input_ids))
+
+    # Ricostruito sulla stessa directory con un corpus vuoto
+    empty = TokenStore.build(path, [None], tokenizer)
+    assert len(empty) == 0
+    assert empty.lookup([corpus[0], None]).tolist() == [-1, -1]
+
+
+def test_incomplete_store_is_rejected(tmp_path, tokenizer, corpus):
+    path = str(tmp_path / 'store')
+    TokenStore.build(path, corpus, tokenizer)
+    os.remove(os.path.join(path, META_FILE))
+
+    with pytest.raises(FileNotFoundError):
+        TokenStore(path)
+
+
+def test_store_of_an_older_format_is_rejected(tmp_path, tokenizer, corpus):
+    path = str(tmp_path / 'store')
+    TokenStore.build(path, corpus, tokenizer)
+    meta_path = os.path.join(path, META_FILE)
+    with open(meta_path) as f:
+        meta = json.load(f)
+    with open(meta_path, 'w') as f:
+        json.dump(dict(meta, version=1), f)
+
+    with pytest.raises(ValueError, match='pretokenize'):
+        TokenStore(path)
+
+
+def test_fingerprint_changes_with_vocabulary(tokenizer):
+    changed = copy.deepcopy(tokenizer)
+    changed.add_tokens(['ebitda'])
+
+    assert tokenizer_fingerprint(changed) != tokenizer_fingerprint(tokenizer)
+
+
+def test_analysis_with_store_matches_plain_tokenization(tmp_path, make_analyzer, quiet, corpus):
+    texts = corpus + ["  Operating   profit rose\n", "a news added after pretokenize"]
+    path = str(tmp_path / 'store')
+
+    plain = make_analyzer(texts)
+    expected, _ = quiet(plain.analyze_sentiment, batch_size=8)
+    quiet(plain.pretokenize, path, texts[:-1])
+
+    stored = make_analyzer(texts, token_store_path=path)
+    results, _ = quiet(stored.analyze_sentiment, batch_size=8)
+
+    pd.testing.assert_frame_equal(results[['predicted_sentiment', 'confidence']],
+                                  expected[['predicted_sentiment', 'confidence']])
+    unique = stored.dedup_stats['unique_texts']
+    assert stored.metrics.counters['pretokenized'] == unique - 1
+
+
+def test_store_of_another_tokenizer_is_ignored(tmp_path, make_analyzer, quiet, tokenizer, corpus):
+    changed = copy.deepcopy(tokenizer)
+    changed.add_tokens(['ebitda'])
+    path = str(tmp_path / 'store')
+    TokenStore.build(path, corpus, changed)
+
+    analyzer = make_analyzer(token_store_path=path)
+    _, output = quiet(analyzer.predict, corpus[:5])
+
+    assert analyzer.token_store is None
+    assert "un altro tokenizer" in output
@@ -0,0 +1,41 @@
+"""
+Test Truncation
+Troncamento sui token a max_length, con gli special token conservati
+"""
+
+import numpy as np
+
+
+def test_long_news_is_truncated_on_tokens(make_analyzer, quiet):
+    long_text = " ".join(["profit"] * 100)
+    analyzer = make_analyzer([long_text, " ".join(["profit"] * 14), "sales fell"])
+
+    results, _ = quiet(analyzer.analyze_sentiment, batch_size=4, max_length=16)
+
+    stats = analyzer.truncation_stats
+    assert stats['truncated_rows'] == 1
+    assert stats['tokens_removed'] == 102 - 16
+    assert stats['max_tokens_removed'] == 102 - 16
+    # [CLS] + i primi 14 token + [SEP]: come la news già corta
+    assert results['predicted_sentiment'].iloc[0] == results['predicted_sentiment'].iloc[1]
+    np.testing.assert_allclose(results['confidence'].iloc[0], results['confidence'].iloc[1],
+                               atol=1e-5)
+
+
+def test_default_limit_is_the_model_maximum(make_analyzer, quiet):
+    analyzer = make_analyzer([" ".join(["profit"] * 1_000), "sales fell"])
+
+    results, _ = quiet(analyzer.analyze_sentiment, batch_size=2)
+
+    assert analyzer.truncation_stats['truncated_rows'] == 1
+    assert analyzer.truncation_stats['tokens_removed'] == 1_002 - 512
+    assert results['confidence'].iloc[0] != 0.5
+
+
+def test_short_news_are_not_truncated(make_analyzer, sentences, quiet):
+    analyzer = make_analyzer(sentences[:20])
+
+    quiet(analyzer.analyze_sentiment, batch_size=8, max_length=128)
+
+    assert analyzer.truncation_stats['truncated_rows'] == 0
+    assert analyzer.truncation_stats['tokens_removed'] == 0
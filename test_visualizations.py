@@ -0,0 +1,121 @@
+"""
+Test Visualizations
+Grafici disegnati dagli aggregati di ResultSummary: statistiche di box
+plot e violin confrontate con quelle di matplotlib sui dati grezzi
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from benchmarks._common import synthetic_dataset
+from summary import HISTOGRAM_BINS, ResultSummary
+from visualizations import box_stats, violin_stats
+
+
+def test_synthetic_dataset_is_labelled_and_reproducible():
+    texts, labels = synthetic_dataset(6_000, seed=3)
+
+    assert len(texts) == len(labels) == 6_000
+    assert len(set(texts)) == 6_000
+    assert set(labels) == {'positive', 'negative', 'neutral'}
+    assert synthetic_dataset(6_000, seed=3) == (texts, labels)
+    assert synthetic_dataset(6_000, seed=4)[0] != texts
+
+
+@pytest.fixture
+def summary(results_frame):
+    return ResultSummary.from_frame(results_frame(20_000, seed=2))
+
+
+@pytest.fixture
+def raw(results_frame):
+    df = results_frame(20_000, seed=2)
+    return {label: group['confidence'].to_numpy(dtype=np.float64)
+            for label, group in df.groupby('predicted_sentiment')}
+
+
+def test_box_stats_match_matplotlib_on_raw_data(summary, raw):
+    from matplotlib import cbook
+    labels = sorted(raw)
+
+    stats = box_stats(summary, labels)
+
+    for label, approx in zip(labels, stats):
+        (exact,) = cbook.boxplot_stats(raw[label])
+        for field in ('mean', 'med', 'q1', 'q3', 'whislo', 'whishi'):
+            assert approx[field] == pytest.approx(exact[field], abs=2 / HISTOGRAM_BINS), field
+
+
+def test_violin_stats_match_matplotlib_kde(summary, raw):
+    from matplotlib import cbook, mlab
+    labels = sorted(raw)
+
+    stats = violin_stats(summary, labels)
+
+    for label, approx in zip(labels, stats):
+        (exact,) = cbook.violin_stats(raw[label][:, None],
+                                      lambda data, coords: mlab.GaussianKDE(data, 'scott')
+                                      .evaluate(coords), points=len(approx['coords']))
+        np.testing.assert_allclose(approx['coords'], exact['coords'], atol=1e-6)
+        np.testing.assert_allclose(approx['vals'], exact['vals'], rtol=0.02, atol=0.01)
+        assert approx['median'] == pytest.approx(exact['median'], abs=2 / HISTOGRAM_BINS)
+
+
+def test_violin_from_capped_sample_matches_its_kde(results_frame):
+    from matplotlib import cbook, mlab
+    summary = ResultSummary.from_frame(results_frame(20_000, seed=2), sample_size=400)
+    labels = sorted(summary.counts)
+
+    stats = violin_stats(summary, labels)
+
+    for label, approx in zip(labels, stats):
+        sample = summary.class_sample(label).astype(np.float64)
+        assert len(sample) == 400
+        kde = mlab.GaussianKDE(sample, 'scott')
+        np.testing.assert_allclose(approx['vals'], kde.evaluate(approx['coords']), rtol=1e-6)
+        # Mediana ed estremi restano quelli di tutte le righe
+        assert approx['min'] == summary.class_min[label]
+        assert approx['max'] == summary.class_max[label]
+
+
+def test_histogram_counts_rebin_the_fine_histogram(summary, raw):
+    edges = np.linspace(0.5, 1.0, 21)
+    values = np.concatenate(list(raw.values()))
+
+    counts = summary.histogram_counts(edges)
+
+    expected, _ = np.histogram(values, edges)
+    assert counts.sum() == len(values)
+    # Solo le righe a meno di un bin fine da un bordo possono cambiare bin
+    assert np.abs(counts - expected).sum() <= 0.01 * len(values)
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_figures_are_rendered_from_the_summary(results_frame, tmp_path, quiet, workers):
+    from visualizations import SentimentVisualizer
+    path = tmp_path / 'results.csv'
+    results_frame(300).to_csv(path, index=False)
+    output_dir = str(tmp_path / f'figures_{workers}')
+
+    visualizer, _ = quiet(SentimentVisualizer, str(path), output_dir=output_dir, dpi=50)
+    quiet(visualizer.generate_all_visualizations, workers=workers)
+
+    assert sorted(os.listdir(output_dir)) == [
+        'confidence_analysis.png', 'dashboard.png', 'sentiment_distribution.png']
+
+
+def test_chunked_loading_matches_the_whole_file(results_frame, tmp_path, quiet,
+                                                assert_same_summary):
+    from columnar import read_results
+    from visualizations import PLOT_COLUMNS, SentimentVisualizer
+    path = tmp_path / 'results.csv'
+    results_frame(1_000).to_csv(path, index=False)
+
+    visualizer, _ = quiet(SentimentVisualizer, str(path), output_dir=str(tmp_path / 'figures'),
+                          violin_sample_cap=40, chunksize=128)
+
+    expected = ResultSummary.from_frame(read_results(str(path), PLOT_COLUMNS),
+                                       sample_size=40)
+    assert_same_summary(visualizer.summary, expected)
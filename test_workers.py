@@ -0,0 +1,26 @@
+"""
+Test Workers
+Inferenza divisa in shard su più processi: stessi risultati del processo
+singolo, nell'ordine originale
+"""
+
+import numpy as np
+
+
+def test_sharded_inference_matches_single_process(make_analyzer, sentences, quiet):
+    analyzer = make_analyzer(sentences[:60])
+    single, _ = quiet(analyzer.analyze_sentiment, batch_size=8)
+    single = single[['predicted_sentiment', 'confidence']].copy()
+    single_padding = analyzer.padding_stats
+    try:
+        sharded, output = quiet(analyzer.analyze_sentiment, batch_size=8,
+                                workers=2, threads_per_worker=1)
+    finally:
+        analyzer.close_pool()
+
+    assert "Avvio 2 processi" in output
+    assert sharded['predicted_sentiment'].tolist() == single['predicted_sentiment'].tolist()
+    np.testing.assert_allclose(sharded['confidence'], single['confidence'], atol=1e-5)
+    # Stessi token reali, batch formati dentro ogni shard
+    assert analyzer.padding_stats['real_tokens'] == single_padding['real_tokens']
+    assert analyzer.truncation_stats['truncated_rows'] == 0
@@ -0,0 +1,207 @@
+"""
+Token Store
+Corpus pre-tokenizzato su disco: i token id di tutte le news in un unico
+array piatto letto in memory-map, con offset e lunghezza di ogni news e
+due hash del testo per ritrovarla. Rianalizzare lo stesso corpus (altra
+testa di classificazione, altro backend) non richiede di ri-tokenizzarlo
+"""
+
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+FORMAT_VERSION = 2
+
+META_FILE = 'meta.json'
+IDS_FILE = 'input_ids.bin'
+OFFSETS_FILE = 'offsets.npy'
+LENGTHS_FILE = 'lengths.npy'
+HASHES_FILE = 'text_hashes.npy'
+CHECKS_FILE = 'text_checks.npy'
+
+# Chiave del secondo hash (16 caratteri), indipendente da quella di default
+CHECK_HASH_KEY = 'token-store-chk1'
+
+
+def tokenizer_fingerprint(tokenizer):
+    """
+    Impronta del tokenizer (vocabolario, normalizzazione, special token)
+
+    Modelli diversi con lo stesso tokenizer (es. un'altra testa di
+    classificazione sullo stesso DistilBERT) hanno la stessa impronta e
+    possono usare lo stesso token store.
+    """
+    backend = getattr(tokenizer, 'backend_tokenizer', None)
+    if backend is not None:
+        content = backend.to_str()
+    else:
+        content = json.dumps([type(tokenizer).__name__, sorted(tokenizer.get_vocab().items()),
+                              tokenizer.all_special_ids])
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def text_hashes(texts):
+    """
+    Hash a 64 bit di ogni testo (chiave delle news nello store)
+    """
+    return pd.util.hash_array(np.asarray(texts, dtype=object))
+
+
+def text_checks(texts):
+    """
+    Secondo hash a 64 bit di ogni testo, con un'altra chiave
+
+    Una news viene riconosciuta solo se coincidono entrambi gli hash:
+    scambiare due testi richiede una collisione su 128 bit.
+    """
+    return pd.util.hash_array(np.asarray(texts, dtype=object), hash_key=CHECK_HASH_KEY)
+
+
+class TokenStore:
+    """
+    Token id di un corpus in formato piatto, aperti in memory-map
+
+    Una directory con:
+        input_ids.bin    token id di tutte le news, uno dopo l'altro
+                         (uint16 se il vocabolario lo consente, altrimenti int32)
+        offsets.npy      posizione della prima id di ogni news
+        lengths.npy      numero di token di ogni news (special token inclusi)
+        text_hashes.npy  hash del testo di ogni news (ricerca)
+        text_checks.npy  secondo hash indipendente (verifica)
+        meta.json        formato, dtype e impronta del tokenizer
+
+    `store[i]` è una vista sull'array mappato, senza copie: le id vengono
+    copiate una sola volta, direttamente nel batch con padding. Ogni testo
+    compare una sola volta; le news si ritrovano dal testo con `lookup`.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): Directory creata da `TokenStore.build`
+        """
+        self.path = path
+        with open(os.path.join(path, META_FILE), encoding='utf-8') as f:
+            self.meta = json.load(f)
+        if self.meta.get('version') != FORMAT_VERSION:
+            raise ValueError(f"Formato del token store non supportato: {path} "
+                             "(ricrealo con pretokenize)")
+
+        dtype = np.dtype(self.meta['dtype'])
+        if self.meta['tokens']:
+            self.input_ids = np.memmap(os.path.join(path, IDS_FILE), dtype=dtype, mode='r')
+        else:
+            self.input_ids = np.empty(0, dtype=dtype)
+        self.offsets = np.load(os.path.join(path, OFFSETS_FILE), mmap_mode='r')
+        self.lengths = np.load(os.path.join(path, LENGTHS_FILE), mmap_mode='r')
+        hashes = np.load(os.path.join(path, HASHES_FILE))
+        # Hash ordinati per la ricerca binaria, secondo hash nello stesso ordine
+        self._order = np.argsort(hashes, kind='stable')
+        self._sorted_hashes = hashes[self._order]
+        self._sorted_checks = np.load(os.path.join(path, CHECKS_FILE))[self._order]
+
+    @property
+    def fingerprint(self):
+        return self.meta['tokenizer']
+
+    @property
+    def nbytes(self):
+        """
+        Dimensione su disco dei token id
+        """
+        return self.input_ids.nbytes
+
+    def __len__(self):
+        return len(self.lengths)
+
+    def __getitem__(self, i):
+        start = self.offsets[i]
+        return self.input_ids[start:start + self.lengths[i]]
+
+    def lookup(self, texts):
+        """
+        Posizione nello store di ogni testo
+
+        La ricerca usa il primo hash, il secondo la conferma. Se due testi
+        dello store avessero lo stesso primo hash, viene trovato solo uno
+        dei due: l'altro risulta assente e viene tokenizzato, mai scambiato.
+
+        Args:
+            texts (list): Testi (stringhe)
+
+        Returns:
+            np.ndarray: Indici nello store, -1 per i testi assenti
+        """
+        if not len(texts) or not len(self._sorted_hashes):
+            return np.full(len(texts), -1, dtype=np.int64)
+        hashes = text_hashes(texts)
+        slots = np.minimum(np.searchsorted(self._sorted_hashes, hashes),
+                           len(self._sorted_hashes) - 1)
+        found = ((self._sorted_hashes[slots] == hashes)
+                 & (self._sorted_checks[slots] == text_checks(texts)))
+        return np.where(found, self._order[slots], -1).astype(np.int64)
+
+    @classmethod
+    def build(cls, path, texts, tokenizer, batch_size=10_000):
+        """
+        Tokenizza un corpus e lo salva come token store
+
+        I testi ripetuti vengono tokenizzati e salvati una volta; valori non
+        testuali (NaN) sono ignorati. Le id sono le stesse dell'analisi:
+        sequenze complete con special token, senza troncamento.
+
+        Args:
+            path (str): Directory di output (sovrascritta)
+            texts (iterable): News da tokenizzare
+            tokenizer: Tokenizer Hugging Face del modello
+            batch_size (int): News tokenizzate per chiamata al tokenizer
+
+        Returns:
+            TokenStore: Lo store appena scritto, aperto in lettura
+        """
+        texts = np.asarray([text for text in texts if isinstance(text, str)], dtype=object)
+        hashes, checks = text_hashes(texts), text_checks(texts)
+        _, first = np.unique(np.stack([hashes, checks], axis=1), axis=0, return_index=True)
+        keep = np.sort(first)
+        texts, hashes, checks = texts[keep], hashes[keep], checks[keep]
+
+        dtype = np.dtype(np.uint16 if len(tokenizer) <= 2 ** 16 else np.int32)
+        os.makedirs(path, exist_ok=True)
+        # meta.json viene scritto per ultimo: uno store senza meta è incompleto
+        meta_path = os.path.join(path, META_FILE)
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+
+        start = time.perf_counter()
+        lengths = np.empty(len(texts), dtype=np.int32)
+        with open(os.path.join(path, IDS_FILE), 'wb') as f:
+            for begin in range(0, len(texts), batch_size):
+                batch = texts[begin:begin + batch_size].tolist()
+                input_ids = tokenizer(batch, verbose=False)['input_ids']
+                lengths[begin:begin + len(batch)] = [len(ids) for ids in input_ids]
+                flat = np.fromiter((i for ids in input_ids for i in ids), dtype=dtype,
+                                   count=int(lengths[begin:begin + len(batch)].sum()))
+                flat.tofile(f)
+        offsets = np.zeros(len(texts), dtype=np.int64)
+        np.cumsum(lengths[:-1], out=offsets[1:])
+
+        np.save(os.path.join(path, OFFSETS_FILE), offsets)
+        np.save(os.path.join(path, LENGTHS_FILE), lengths)
+        np.save(os.path.join(path, HASHES_FILE), hashes)
+        np.save(os.path.join(path, CHECKS_FILE), checks)
+        meta = {
+            'version': FORMAT_VERSION,
+            'dtype': dtype.name,
+            'texts': len(texts),
+            'tokens': int(lengths.sum()),
+            'tokenizer': tokenizer_fingerprint(tokenizer),
+            'tokenizer_name': getattr(tokenizer, 'name_or_path', ''),
+            'seconds': time.perf_counter() - start,
+        }
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+        return cls(path)
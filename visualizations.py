@@ -2,36 +2,109 @@
 Visualizations Generator
 Genera grafici per i risultati dell'analisi sentiment
 Versione ottimizzata - solo visualizzazioni coerenti con transformer-based models
+
+I grafici sono disegnati dagli aggregati di `ResultSummary` (conteggi,
+istogrammi e quantili della confidence per label, top-k), non dalle
+righe: il costo del rendering non dipende dal numero di news. I grafici
+sono indipendenti e possono essere generati in parallelo in processi
+separati.
+
+In modalità incrementale gli aggregati sono salvati su disco
+(`DashboardState`): ogni refresh legge solo le righe aggiunte al file dei
+risultati e ridisegna solo i grafici i cui dati sono cambiati.
 """
 
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import numpy as np
+import hashlib
+import multiprocessing
 import os
+import time
 import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+from columnar import DEFAULT_ROW_GROUP_SIZE, iter_results, parquet_available
+from dashboard_state import DashboardState
+from summary import HISTOGRAM_BINS, ResultSummary
 
 warnings.filterwarnings('ignore')
 
-# Configurazione stile grafici
-sns.set_style("whitegrid")
-plt.rcParams['figure.figsize'] = (12, 6)
-plt.rcParams['font.size'] = 11
-plt.rcParams['axes.titlesize'] = 14
-plt.rcParams['axes.labelsize'] = 12
+# matplotlib e seaborn vengono importati al primo grafico (vedi _load_plotting)
+plt = None
+sns = None
+
+
+def _load_plotting():
+    """
+    Importa matplotlib/seaborn e applica lo stile dei grafici (una sola volta)
+    """
+    global plt, sns
+    if plt is not None:
+        return
+    import matplotlib.pyplot as pyplot
+    import seaborn
+
+    # Configurazione stile grafici
+    seaborn.set_style("whitegrid")
+    pyplot.rcParams['figure.figsize'] = (12, 6)
+    pyplot.rcParams['font.size'] = 11
+    pyplot.rcParams['axes.titlesize'] = 14
+    pyplot.rcParams['axes.labelsize'] = 12
+    plt, sns = pyplot, seaborn
+
+# Colonne usate dai grafici: le altre non vengono caricate
+PLOT_COLUMNS = ['predicted_sentiment', 'confidence', 'text']
+
+# Grafici generati da generate_all_visualizations (nome -> file)
+FIGURES = {
+    'sentiment_distribution': 'sentiment_distribution.png',
+    'confidence_analysis': 'confidence_analysis.png',
+    'dashboard': 'dashboard.png',
+}
+
+# Punti su cui viene valutata la densità di ogni violin (come matplotlib)
+VIOLIN_POINTS = 100
+
+# Stato della modalità incrementale, nella directory dei grafici
+STATE_FILE = '.dashboard_state.npz'
 
 class SentimentVisualizer:
     """
     Classe per generare visualizzazioni dei risultati sentiment analysis
     """
     
-    def __init__(self, results_path='results/sentiment_results.csv'):
+    def __init__(self, results_path=None, columns=PLOT_COLUMNS, output_dir='visualizations',
+                 dpi=300, violin_sample_cap=None, chunksize=DEFAULT_ROW_GROUP_SIZE,
+                 incremental=False, state_path=None):
         """
         Inizializza visualizer
         
+        I risultati vengono letti a blocchi di `chunksize` righe e ridotti
+        agli aggregati dei grafici: la memoria non dipende dalla dimensione
+        del file.
+        
         Args:
-            results_path (str): Percorso file CSV con risultati
+            results_path (str, optional): File Parquet o CSV con risultati
+                (default: results/sentiment_results.parquet se presente,
+                altrimenti il CSV)
+            columns (list): Colonne da caricare (proiezione)
+            output_dir (str): Directory dei grafici
+            dpi (int): Risoluzione dei PNG
+            violin_sample_cap (int, optional): Densità dei violin plot da un
+                campione casuale di al più questo numero di valori per label
+                (default: dagli istogrammi per label)
+            chunksize (int): Righe lette per blocco
+            incremental (bool): Riprende gli aggregati salvati dall'ultimo
+                aggiornamento e legge solo le righe aggiunte al file; i
+                grafici con dati invariati non vengono ridisegnati (vedi `refresh`)
+            state_path (str, optional): File dello stato incrementale
+                (default: output_dir/.dashboard_state.npz)
         """
+        if results_path is None:
+            results_path = 'results/sentiment_results.parquet'
+            if not (os.path.exists(results_path) and parquet_available()):
+                results_path = 'results/sentiment_results.csv'
+        
         print("\n" + "=" * 70)
         print("🎨 SENTIMENT ANALYSIS VISUALIZER")
         print("=" * 70)
@@ -43,14 +116,31 @@ class SentimentVisualizer:
             print("   Esegui prima: python financial_sentiment_analyzer.py")
             exit(1)
         
-        # Carica risultati
+        # Carica risultati a blocchi: conteggi, istogrammi, quantili, top-k
+        # (ed eventuale campione) calcolati una volta per tutti i grafici,
+        # che usano solo questi aggregati
         print(f"📂 Caricamento risultati da: {results_path}")
-        self.df = pd.read_csv(results_path)
-        print(f"✅ Caricati {len(self.df):,} risultati")
+        if incremental:
+            self.state = DashboardState(state_path or os.path.join(output_dir, STATE_FILE),
+                                        results_path, columns, violin_sample_cap or 0,
+                                        chunksize)
+            added = self.state.update()
+            self.state.save()
+            self.summary = self.state.summary
+            print(f"✅ Caricati {self.summary.rows:,} risultati "
+                  f"({added:,} nuovi dall'ultimo aggiornamento)")
+        else:
+            self.state = None
+            self.summary = ResultSummary(sample_size=violin_sample_cap or 0)
+            for chunk in iter_results(results_path, columns, chunksize):
+                self.summary.update(chunk)
+            print(f"✅ Caricati {self.summary.rows:,} risultati")
         print()
         
         # Crea directory visualizations
-        os.makedirs('visualizations', exist_ok=True)
+        self.output_dir = output_dir
+        self.dpi = dpi
+        os.makedirs(output_dir, exist_ok=True)
         
         # Colori personalizzati
         self.colors = {
@@ -67,59 +157,7 @@ class SentimentVisualizer:
         print("📊 GENERAZIONE: Sentiment Distribution")
         print("=" * 70)
         print()
-        
-        fig, axes = plt.subplots(1, 2, figsize=(14, 6))
-        
-        sentiment_counts = self.df['predicted_sentiment'].value_counts()
-        colors_list = [self.colors.get(s, '#95a5a6') for s in sentiment_counts.index]
-        
-        # 1. Bar Chart
-        ax1 = axes[0]
-        bars = ax1.bar(sentiment_counts.index, sentiment_counts.values, 
-                       color=colors_list, edgecolor='black', linewidth=1.5)
-        ax1.set_title('Sentiment Distribution - Counts', fontweight='bold', fontsize=14)
-        ax1.set_xlabel('Sentiment', fontweight='bold')
-        ax1.set_ylabel('Number of News', fontweight='bold')
-        ax1.grid(axis='y', alpha=0.3)
-        
-        # Aggiungi valori sopra le barre
-        for bar in bars:
-            height = bar.get_height()
-            ax1.text(bar.get_x() + bar.get_width()/2., height,
-                    f'{int(height):,}',
-                    ha='center', va='bottom', fontweight='bold')
-        
-        # 2. Pie Chart
-        ax2 = axes[1]
-        wedges, texts, autotexts = ax2.pie(
-            sentiment_counts.values, 
-            labels=sentiment_counts.index,
-            autopct='%1.1f%%',
-            colors=colors_list,
-            startangle=90,
-            textprops={'fontsize': 12, 'fontweight': 'bold'}
-        )
-        
-        # Migliora leggibilità percentuali
-        for autotext in autotexts:
-            autotext.set_color('white')
-            autotext.set_fontsize(13)
-            autotext.set_fontweight('bold')
-        
-        ax2.set_title('Sentiment Distribution - Percentage', fontweight='bold', fontsize=14)
-        
-        plt.suptitle('📊 Financial News Sentiment Analysis - Distribution', 
-                     fontsize=16, fontweight='bold', y=1.02)
-        
-        plt.tight_layout()
-        
-        # Salva
-        filepath = 'visualizations/sentiment_distribution.png'
-        plt.savefig(filepath, dpi=300, bbox_inches='tight')
-        print(f"✅ Salvato: {filepath}")
-        # plt.show()  # Commentato per non bloccare
-        plt.close()
-        print()
+        self._render('sentiment_distribution')
     
     def plot_confidence_distribution(self):
         """
@@ -129,58 +167,7 @@ class SentimentVisualizer:
         print("📈 GENERAZIONE: Confidence Distribution")
         print("=" * 70)
         print()
-        
-        fig, axes = plt.subplots(1, 2, figsize=(14, 6))
-        
-        # 1. Histogram
-        ax1 = axes[0]
-        ax1.hist(self.df['confidence'], bins=30, color='#3498db', 
-                edgecolor='black', alpha=0.7)
-        ax1.axvline(self.df['confidence'].mean(), color='red', 
-                   linestyle='--', linewidth=2,
-                   label=f"Mean: {self.df['confidence'].mean():.2%}")
-        ax1.axvline(self.df['confidence'].median(), color='green', 
-                   linestyle='--', linewidth=2,
-                   label=f"Median: {self.df['confidence'].median():.2%}")
-        ax1.set_title('Confidence Score Distribution', fontweight='bold', fontsize=14)
-        ax1.set_xlabel('Confidence Score', fontweight='bold')
-        ax1.set_ylabel('Frequency', fontweight='bold')
-        ax1.legend(loc='upper left', fontsize=11)
-        ax1.grid(axis='y', alpha=0.3)
-        
-        # 2. Boxplot per sentiment
-        ax2 = axes[1]
-        sentiments = self.df['predicted_sentiment'].unique()
-        colors_box = [self.colors.get(s, '#95a5a6') for s in sentiments]
-        
-        box_data = [self.df[self.df['predicted_sentiment']==s]['confidence'].values 
-                    for s in sentiments]
-        
-        bp = ax2.boxplot(box_data, labels=sentiments, patch_artist=True,
-                        showmeans=True, meanline=True)
-        
-        # Colora boxplot
-        for patch, color in zip(bp['boxes'], colors_box):
-            patch.set_facecolor(color)
-            patch.set_alpha(0.7)
-        
-        ax2.set_title('Confidence by Sentiment', fontweight='bold', fontsize=14)
-        ax2.set_xlabel('Sentiment', fontweight='bold')
-        ax2.set_ylabel('Confidence Score', fontweight='bold')
-        ax2.grid(axis='y', alpha=0.3)
-        
-        plt.suptitle('📈 Confidence Analysis', 
-                     fontsize=16, fontweight='bold', y=1.02)
-        
-        plt.tight_layout()
-        
-        # Salva
-        filepath = 'visualizations/confidence_analysis.png'
-        plt.savefig(filepath, dpi=300, bbox_inches='tight')
-        print(f"✅ Salvato: {filepath}")
-        # plt.show()  # Commentato
-        plt.close()
-        print()
+        self._render('confidence_analysis')
     
     def create_summary_dashboard(self):
         """
@@ -190,127 +177,95 @@ class SentimentVisualizer:
         print("🎨 GENERAZIONE: Summary Dashboard")
         print("=" * 70)
         print()
-        
-        fig = plt.figure(figsize=(16, 10))
-        gs = fig.add_gridspec(3, 3, hspace=0.3, wspace=0.3)
-        
-        # 1. Sentiment Distribution (Bar) - GRANDE
-        ax1 = fig.add_subplot(gs[0, :2])
-        sentiment_counts = self.df['predicted_sentiment'].value_counts()
-        colors_list = [self.colors.get(s, '#95a5a6') for s in sentiment_counts.index]
-        bars = ax1.bar(sentiment_counts.index, sentiment_counts.values, 
-                      color=colors_list, edgecolor='black', linewidth=2)
-        ax1.set_title('Sentiment Distribution', fontsize=13, fontweight='bold')
-        ax1.set_ylabel('Count', fontweight='bold')
-        ax1.grid(axis='y', alpha=0.3)
-        
-        for bar in bars:
-            height = bar.get_height()
-            ax1.text(bar.get_x() + bar.get_width()/2., height,
-                    f'{int(height):,}',
-                    ha='center', va='bottom', fontweight='bold', fontsize=10)
-        
-        # 2. Key Metrics
-        ax2 = fig.add_subplot(gs[0, 2])
-        ax2.axis('off')
-        
-        total = len(self.df)
-        pos_count = (self.df['predicted_sentiment'] == 'POSITIVE').sum()
-        neg_count = (self.df['predicted_sentiment'] == 'NEGATIVE').sum()
-        avg_conf = self.df['confidence'].mean()
-        
-        metrics_text = f"""
-        📊 KEY METRICS
-        {'─'*25}
-        
-        Total News: {total:,}
-        
-        🟢 Positive: {pos_count:,}
-           ({pos_count/total*100:.1f}%)
-        
-        🔴 Negative: {neg_count:,}
-           ({neg_count/total*100:.1f}%)
-        
-        📈 Avg Confidence:
-           {avg_conf:.1%}
-        
-        📉 Min: {self.df['confidence'].min():.1%}
-        📈 Max: {self.df['confidence'].max():.1%}
+        self._render('dashboard')
+    
+    def _render(self, name):
+        filepath, _ = render_figure(name, self.summary, self.colors, self.output_dir, self.dpi)
+        self._rendered(name)
+        print(f"✅ Salvato: {filepath}")
+        print()
+    
+    def _render_parallel(self, names, workers):
         """
+        Disegna i grafici `names` in processi separati
+        """
+        print(f"⚙️  Rendering di {len(names)} grafici in {workers} processi...")
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=workers,
+                                 mp_context=multiprocessing.get_context('spawn')) as pool:
+            futures = {name: pool.submit(render_figure, name, self.summary, self.colors,
+                                         self.output_dir, self.dpi) for name in names}
+            for name, future in futures.items():
+                filepath, seconds = future.result()
+                self._rendered(name)
+                print(f"✅ Salvato: {filepath} ({seconds:.1f}s)")
+        print(f"   Completato in {time.perf_counter() - start:.1f}s")
+        print()
+    
+    def _rendered(self, name):
+        """
+        Registra con quali dati è stato disegnato un grafico (modalità incrementale)
+        """
+        if self.state is not None:
+            self.state.rendered[name] = figure_fingerprint(name, self.summary, self.colors,
+                                                           self.dpi)
+    
+    def changed_figures(self):
+        """
+        Grafici da ridisegnare: tutti, oppure in modalità incrementale solo
+        quelli con dati cambiati dall'ultimo rendering (o PNG mancante)
         
-        ax2.text(0.05, 0.5, metrics_text, fontsize=10, 
-                family='monospace', verticalalignment='center',
-                bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.3))
-        
-        # 3. Confidence Distribution Histogram
-        ax3 = fig.add_subplot(gs[1, :2])
-        ax3.hist(self.df['confidence'], bins=40, color='#3498db', 
-                edgecolor='black', alpha=0.7)
-        ax3.axvline(self.df['confidence'].mean(), color='red', 
-                   linestyle='--', linewidth=2,
-                   label=f"Mean: {self.df['confidence'].mean():.2%}")
-        ax3.set_title('Confidence Score Distribution', fontsize=13, fontweight='bold')
-        ax3.set_xlabel('Confidence Score', fontweight='bold')
-        ax3.set_ylabel('Frequency', fontweight='bold')
-        ax3.legend()
-        ax3.grid(axis='y', alpha=0.3)
-        
-        # 4. Confidence by Sentiment (Violin Plot)
-        ax4 = fig.add_subplot(gs[1, 2])
-        sentiments = self.df['predicted_sentiment'].unique()
-        colors_box = [self.colors.get(s, '#95a5a6') for s in sentiments]
-        
-        parts = ax4.violinplot(
-            [self.df[self.df['predicted_sentiment']==s]['confidence'].values for s in sentiments],
-            positions=range(len(sentiments)),
-            showmeans=True,
-            showmedians=True
-        )
-        
-        for pc, color in zip(parts['bodies'], colors_box):
-            pc.set_facecolor(color)
-            pc.set_alpha(0.7)
-        
-        ax4.set_xticks(range(len(sentiments)))
-        ax4.set_xticklabels(sentiments)
-        ax4.set_title('Confidence by Sentiment', fontsize=13, fontweight='bold')
-        ax4.set_ylabel('Confidence Score', fontweight='bold')
-        ax4.grid(axis='y', alpha=0.3)
-        
-        # 5. Top Confident Predictions
-        ax5 = fig.add_subplot(gs[2, :])
-        ax5.axis('off')
-        
-        top_conf = self.df.nlargest(5, 'confidence')
-        
-        examples_text = "🏆 TOP 5 MOST CONFIDENT PREDICTIONS\n"
-        examples_text += "─" * 80 + "\n\n"
-        
-        for idx, (_, row) in enumerate(top_conf.iterrows(), 1):
-            emoji = "🟢" if row['predicted_sentiment'] == 'POSITIVE' else "🔴"
-            text_preview = row['text'][:90] + "..." if len(row['text']) > 90 else row['text']
-            examples_text += f"{idx}. {emoji} {row['predicted_sentiment']} ({row['confidence']:.2%})\n"
-            examples_text += f"   \"{text_preview}\"\n\n"
-        
-        ax5.text(0.05, 0.95, examples_text, fontsize=9, 
-                family='monospace', verticalalignment='top',
-                bbox=dict(boxstyle='round', facecolor='lightblue', alpha=0.3))
+        Returns:
+            list: Chiavi di FIGURES
+        """
+        if self.state is None:
+            return list(FIGURES)
+        return [name for name in FIGURES
+                if self.state.rendered.get(name) != figure_fingerprint(
+                    name, self.summary, self.colors, self.dpi)
+                or not os.path.exists(os.path.join(self.output_dir, FIGURES[name]))]
+    
+    def refresh(self, workers=None):
+        """
+        Aggiornamento incrementale: aggrega solo le righe aggiunte al file
+        dei risultati dall'ultimo refresh e ridisegna solo i grafici i cui
+        dati sono cambiati; lo stato viene poi salvato su disco
         
-        # Titolo principale
-        plt.suptitle('📊 FINANCIAL NEWS SENTIMENT ANALYSIS - DASHBOARD', 
-                    fontsize=18, fontweight='bold', y=0.98)
+        Args:
+            workers (int, optional): Processi per il rendering (default: un
+                processo per grafico da ridisegnare, al più i core disponibili)
         
-        # Salva
-        filepath = 'visualizations/dashboard.png'
-        plt.savefig(filepath, dpi=300, bbox_inches='tight')
-        print(f"✅ Salvato: {filepath}")
-        # plt.show()  # Commentato
-        plt.close()
-        print()
+        Returns:
+            list: Grafici ridisegnati (chiavi di FIGURES)
+        """
+        if self.state is None:
+            raise ValueError("refresh richiede SentimentVisualizer(..., incremental=True)")
+        added = self.state.update()
+        self.summary = self.state.summary
+        names = self.changed_figures()
+        if workers is None:
+            workers = min(len(names), os.cpu_count() or 1)
+        if workers > 1:
+            self._render_parallel(names, workers)
+        else:
+            for name in names:
+                self._render(name)
+        self.state.save()
+        print(f"🔄 Refresh: {added:,} righe nuove, grafici ridisegnati: "
+              f"{', '.join(names) or 'nessuno'}")
+        return names
     
-    def generate_all_visualizations(self):
+    def generate_all_visualizations(self, workers=None):
         """
-        Genera tutte le visualizzazioni in sequenza
+        Genera tutte le visualizzazioni
+        
+        I grafici sono indipendenti: con più core vengono generati in
+        parallelo, uno per processo, a partire dagli stessi aggregati.
+        
+        Args:
+            workers (int, optional): Processi per il rendering (default: un
+                processo per grafico, al più i core disponibili; 1 = in sequenza
+                nel processo corrente)
         """
         print("\n" + "=" * 70)
         print("🎨 GENERAZIONE TUTTE LE VISUALIZZAZIONI")
@@ -321,23 +276,39 @@ class SentimentVisualizer:
         print("   DistilBERT uses contextual analysis, not keyword frequency")
         print()
         
-        # 1. Sentiment Distribution
-        self.plot_sentiment_distribution()
-        
-        # 2. Confidence Analysis
-        self.plot_confidence_distribution()
-        
-        # 3. Dashboard
-        self.create_summary_dashboard()
+        # In modalità incrementale solo i grafici con dati cambiati
+        names = self.changed_figures()
+        unchanged = [name for name in FIGURES if name not in names]
+        if unchanged:
+            print(f"⏭️  Invariati dall'ultimo aggiornamento: {', '.join(unchanged)}")
+            print()
+        
+        if workers is None:
+            workers = min(len(names), os.cpu_count() or 1)
+        if workers > 1:
+            self._render_parallel(names, workers)
+        else:
+            # 1. Sentiment Distribution
+            if 'sentiment_distribution' in names:
+                self.plot_sentiment_distribution()
+            
+            # 2. Confidence Analysis
+            if 'confidence_analysis' in names:
+                self.plot_confidence_distribution()
+            
+            # 3. Dashboard
+            if 'dashboard' in names:
+                self.create_summary_dashboard()
+        if self.state is not None:
+            self.state.save()
         
         print("=" * 70)
         print("🎉 TUTTE LE VISUALIZZAZIONI GENERATE!")
         print("=" * 70)
         print()
-        print("📁 File salvati in 'visualizations/':")
-        print("   • sentiment_distribution.png")
-        print("   • confidence_analysis.png")
-        print("   • dashboard.png")
+        print(f"📁 File salvati in '{self.output_dir}/':")
+        for filename in FIGURES.values():
+            print(f"   • {filename}")
         print()
         print("📌 DESIGN CHOICE:")
         print("   Keyword frequency charts deliberately excluded")
@@ -350,12 +321,370 @@ class SentimentVisualizer:
         print()
 
 
+def render_figure(name, summary, colors, output_dir='visualizations', dpi=300):
+    """
+    Disegna e salva un grafico dagli aggregati (eseguibile in un processo worker)
+    
+    Args:
+        name (str): Chiave di FIGURES
+        summary (ResultSummary): Aggregati dei risultati
+        colors (dict): Colore per label
+        output_dir (str): Directory di output
+        dpi (int): Risoluzione del PNG
+    
+    Returns:
+        tuple: (percorso del file, secondi impiegati)
+    """
+    start = time.perf_counter()
+    _load_plotting()
+    filepath = os.path.join(output_dir, FIGURES[name])
+    _DRAW[name](summary, colors)
+    plt.savefig(filepath, dpi=dpi, bbox_inches='tight')
+    # plt.show()  # Commentato per non bloccare
+    plt.close()
+    return filepath, time.perf_counter() - start
+
+
+def figure_fingerprint(name, summary, colors, dpi):
+    """
+    Impronta degli aggregati disegnati da un grafico (più colori e DPI)
+    
+    Se l'impronta non cambia tra due refresh, il PNG già salvato è ancora
+    aggiornato e non va ridisegnato.
+    
+    Returns:
+        str: Digest esadecimale
+    """
+    digest = hashlib.sha1(repr((name, dpi, sorted(colors.items()))).encode())
+    for part in _FIGURE_INPUTS[name](summary):
+        digest.update(part.tobytes() if isinstance(part, np.ndarray) else repr(part).encode())
+    return digest.hexdigest()
+
+
+def _distribution_inputs(summary):
+    return [summary.sorted_counts()]
+
+
+def _confidence_inputs(summary):
+    labels = list(summary.counts)
+    parts = [labels, summary.rows, summary.confidence_sum, summary.confidence_min,
+             summary.confidence_max, summary.histogram]
+    for label in labels:
+        parts += [summary.counts[label], summary.class_sum[label], summary.class_sum_sq[label],
+                  summary.class_min[label], summary.class_max[label],
+                  summary.class_histograms[label]]
+    return parts
+
+
+def _dashboard_inputs(summary):
+    parts = _distribution_inputs(summary) + _confidence_inputs(summary)
+    parts += [[(row['predicted_sentiment'], row['confidence'], row.get('text'))
+               for row in summary.top[:5]]]
+    if summary.sample_size:
+        parts += [np.sort(summary.class_sample(label)) for label in summary.counts]
+    return parts
+
+
+_FIGURE_INPUTS = {
+    'sentiment_distribution': _distribution_inputs,
+    'confidence_analysis': _confidence_inputs,
+    'dashboard': _dashboard_inputs,
+}
+
+
+def _draw_sentiment_distribution(summary, colors):
+    fig, axes = plt.subplots(1, 2, figsize=(14, 6))
+    
+    sentiment_counts = pd.Series(dict(summary.sorted_counts()))
+    colors_list = [colors.get(s, '#95a5a6') for s in sentiment_counts.index]
+    
+    # 1. Bar Chart
+    ax1 = axes[0]
+    bars = ax1.bar(sentiment_counts.index, sentiment_counts.values, 
+                   color=colors_list, edgecolor='black', linewidth=1.5)
+    ax1.set_title('Sentiment Distribution - Counts', fontweight='bold', fontsize=14)
+    ax1.set_xlabel('Sentiment', fontweight='bold')
+    ax1.set_ylabel('Number of News', fontweight='bold')
+    ax1.grid(axis='y', alpha=0.3)
+    
+    # Aggiungi valori sopra le barre
+    for bar in bars:
+        height = bar.get_height()
+        ax1.text(bar.get_x() + bar.get_width()/2., height,
+                f'{int(height):,}',
+                ha='center', va='bottom', fontweight='bold')
+    
+    # 2. Pie Chart
+    ax2 = axes[1]
+    wedges, texts, autotexts = ax2.pie(
+        sentiment_counts.values, 
+        labels=sentiment_counts.index,
+        autopct='%1.1f%%',
+        colors=colors_list,
+        startangle=90,
+        textprops={'fontsize': 12, 'fontweight': 'bold'}
+    )
+    
+    # Migliora leggibilità percentuali
+    for autotext in autotexts:
+        autotext.set_color('white')
+        autotext.set_fontsize(13)
+        autotext.set_fontweight('bold')
+    
+    ax2.set_title('Sentiment Distribution - Percentage', fontweight='bold', fontsize=14)
+    
+    plt.suptitle('📊 Financial News Sentiment Analysis - Distribution', 
+                 fontsize=16, fontweight='bold', y=1.02)
+    
+    plt.tight_layout()
+
+
+def _draw_confidence_analysis(summary, colors):
+    fig, axes = plt.subplots(1, 2, figsize=(14, 6))
+    
+    # 1. Histogram (dall'istogramma fine del riepilogo)
+    ax1 = axes[0]
+    _histogram_bars(ax1, summary, bins=30, color='#3498db', edgecolor='black', alpha=0.7)
+    ax1.axvline(summary.mean_confidence, color='red', 
+               linestyle='--', linewidth=2,
+               label=f"Mean: {summary.mean_confidence:.2%}")
+    ax1.axvline(summary.median_confidence, color='green', 
+               linestyle='--', linewidth=2,
+               label=f"Median: {summary.median_confidence:.2%}")
+    ax1.set_title('Confidence Score Distribution', fontweight='bold', fontsize=14)
+    ax1.set_xlabel('Confidence Score', fontweight='bold')
+    ax1.set_ylabel('Frequency', fontweight='bold')
+    ax1.legend(loc='upper left', fontsize=11)
+    ax1.grid(axis='y', alpha=0.3)
+    
+    # 2. Boxplot per sentiment (statistiche dai quantili per label)
+    ax2 = axes[1]
+    sentiments = list(summary.counts)
+    colors_box = [colors.get(s, '#95a5a6') for s in sentiments]
+    
+    bp = ax2.bxp(box_stats(summary, sentiments), patch_artist=True,
+                 showmeans=True, meanline=True)
+    
+    # Colora boxplot
+    for patch, color in zip(bp['boxes'], colors_box):
+        patch.set_facecolor(color)
+        patch.set_alpha(0.7)
+    
+    ax2.set_title('Confidence by Sentiment', fontweight='bold', fontsize=14)
+    ax2.set_xlabel('Sentiment', fontweight='bold')
+    ax2.set_ylabel('Confidence Score', fontweight='bold')
+    ax2.grid(axis='y', alpha=0.3)
+    
+    plt.suptitle('📈 Confidence Analysis', 
+                 fontsize=16, fontweight='bold', y=1.02)
+    
+    plt.tight_layout()
+
+
+def _draw_dashboard(summary, colors):
+    fig = plt.figure(figsize=(16, 10))
+    gs = fig.add_gridspec(3, 3, hspace=0.3, wspace=0.3)
+    
+    # 1. Sentiment Distribution (Bar) - GRANDE
+    ax1 = fig.add_subplot(gs[0, :2])
+    sentiment_counts = pd.Series(dict(summary.sorted_counts()))
+    colors_list = [colors.get(s, '#95a5a6') for s in sentiment_counts.index]
+    bars = ax1.bar(sentiment_counts.index, sentiment_counts.values, 
+                  color=colors_list, edgecolor='black', linewidth=2)
+    ax1.set_title('Sentiment Distribution', fontsize=13, fontweight='bold')
+    ax1.set_ylabel('Count', fontweight='bold')
+    ax1.grid(axis='y', alpha=0.3)
+    
+    for bar in bars:
+        height = bar.get_height()
+        ax1.text(bar.get_x() + bar.get_width()/2., height,
+                f'{int(height):,}',
+                ha='center', va='bottom', fontweight='bold', fontsize=10)
+    
+    # 2. Key Metrics
+    ax2 = fig.add_subplot(gs[0, 2])
+    ax2.axis('off')
+    
+    total = summary.rows
+    pos_count = summary.counts.get('POSITIVE', 0)
+    neg_count = summary.counts.get('NEGATIVE', 0)
+    avg_conf = summary.mean_confidence
+    
+    metrics_text = f"""
+        📊 KEY METRICS
+        {'─'*25}
+        
+        Total News: {total:,}
+        
+        🟢 Positive: {pos_count:,}
+           ({pos_count/total*100:.1f}%)
+        
+        🔴 Negative: {neg_count:,}
+           ({neg_count/total*100:.1f}%)
+        
+        📈 Avg Confidence:
+           {avg_conf:.1%}
+        
+        📉 Min: {summary.confidence_min:.1%}
+        📈 Max: {summary.confidence_max:.1%}
+        """
+    
+    ax2.text(0.05, 0.5, metrics_text, fontsize=10, 
+            family='monospace', verticalalignment='center',
+            bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.3))
+    
+    # 3. Confidence Distribution Histogram
+    ax3 = fig.add_subplot(gs[1, :2])
+    _histogram_bars(ax3, summary, bins=40, color='#3498db', edgecolor='black', alpha=0.7)
+    ax3.axvline(summary.mean_confidence, color='red', 
+               linestyle='--', linewidth=2,
+               label=f"Mean: {summary.mean_confidence:.2%}")
+    ax3.set_title('Confidence Score Distribution', fontsize=13, fontweight='bold')
+    ax3.set_xlabel('Confidence Score', fontweight='bold')
+    ax3.set_ylabel('Frequency', fontweight='bold')
+    ax3.legend()
+    ax3.grid(axis='y', alpha=0.3)
+    
+    # 4. Confidence by Sentiment (Violin Plot, densità dagli istogrammi per label)
+    ax4 = fig.add_subplot(gs[1, 2])
+    sentiments = list(summary.counts)
+    colors_box = [colors.get(s, '#95a5a6') for s in sentiments]
+    
+    parts = ax4.violin(
+        violin_stats(summary, sentiments),
+        positions=range(len(sentiments)),
+        showmeans=True,
+        showmedians=True
+    )
+    
+    for pc, color in zip(parts['bodies'], colors_box):
+        pc.set_facecolor(color)
+        pc.set_alpha(0.7)
+    
+    ax4.set_xticks(range(len(sentiments)))
+    ax4.set_xticklabels(sentiments)
+    ax4.set_title('Confidence by Sentiment', fontsize=13, fontweight='bold')
+    ax4.set_ylabel('Confidence Score', fontweight='bold')
+    ax4.grid(axis='y', alpha=0.3)
+    
+    # 5. Top Confident Predictions
+    ax5 = fig.add_subplot(gs[2, :])
+    ax5.axis('off')
+    
+    examples_text = "🏆 TOP 5 MOST CONFIDENT PREDICTIONS\n"
+    examples_text += "─" * 80 + "\n\n"
+    
+    for idx, row in enumerate(summary.top[:5], 1):
+        emoji = "🟢" if row['predicted_sentiment'] == 'POSITIVE' else "🔴"
+        text_preview = row['text'][:90] + "..." if len(row['text']) > 90 else row['text']
+        examples_text += f"{idx}. {emoji} {row['predicted_sentiment']} ({row['confidence']:.2%})\n"
+        examples_text += f"   \"{text_preview}\"\n\n"
+    
+    ax5.text(0.05, 0.95, examples_text, fontsize=9, 
+            family='monospace', verticalalignment='top',
+            bbox=dict(boxstyle='round', facecolor='lightblue', alpha=0.3))
+    
+    # Titolo principale
+    plt.suptitle('📊 FINANCIAL NEWS SENTIMENT ANALYSIS - DASHBOARD', 
+                fontsize=18, fontweight='bold', y=0.98)
+
+
+_DRAW = {
+    'sentiment_distribution': _draw_sentiment_distribution,
+    'confidence_analysis': _draw_confidence_analysis,
+    'dashboard': _draw_dashboard,
+}
+
+
+def _histogram_bars(ax, summary, bins, **style):
+    """
+    Istogramma della confidence come `ax.hist(confidence, bins)`, ma dai
+    conteggi del riepilogo (bin equispaziati tra minimo e massimo)
+    """
+    low, high = summary.confidence_min, summary.confidence_max
+    if high <= low:
+        low, high = low - 0.5, high + 0.5
+    edges = np.linspace(low, high, bins + 1)
+    counts = summary.histogram_counts(edges)
+    return ax.bar(edges[:-1], counts, width=np.diff(edges), align='edge', **style)
+
+
+def box_stats(summary, labels):
+    """
+    Statistiche per `Axes.bxp` (stesse regole di `boxplot`) dagli istogrammi per label
+    
+    Quartili interpolati nell'istogramma fine; i baffi arrivano al dato
+    più estremo entro 1.5 IQR dai quartili e gli outlier sono i bin non
+    vuoti oltre i baffi (un punto per bin; minimo e massimo esatti).
+    
+    Returns:
+        list: Un dizionario per label
+    """
+    centers = (np.arange(HISTOGRAM_BINS) + 0.5) / HISTOGRAM_BINS
+    stats = []
+    for label in labels:
+        q1, median, q3 = (summary.class_quantile(label, q) for q in (0.25, 0.5, 0.75))
+        iqr = q3 - q1
+        # Un valore per bin non vuoto: il primo e l'ultimo bin contengono minimo e massimo
+        values = centers[summary.class_histograms[label] > 0]
+        values[0], values[-1] = summary.class_min[label], summary.class_max[label]
+        
+        inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+        whislo = min(inside.min(initial=q1), q1)
+        whishi = max(inside.max(initial=q3), q3)
+        stats.append({'label': label, 'mean': summary.class_mean(label), 'med': median,
+                      'q1': q1, 'q3': q3, 'whislo': whislo, 'whishi': whishi,
+                      'fliers': values[(values < whislo) | (values > whishi)]})
+    return stats
+
+
+def violin_stats(summary, labels, points=VIOLIN_POINTS):
+    """
+    Statistiche per `Axes.violin` dagli aggregati per label
+    
+    La densità è la stessa KDE gaussiana di `violinplot` (banda di Scott,
+    n^-1/5 per la deviazione standard), calcolata sui centri dei bin non
+    vuoti pesati per i conteggi oppure, se il riepilogo ha un campione
+    (`sample_size`), sui valori del campione. In entrambi i casi il costo
+    è limitato (bin o campione), non dipende dalle righe; mediana, media,
+    minimo e massimo vengono dagli aggregati completi.
+    
+    Returns:
+        list: Un dizionario per label (coords, vals, mean, median, min, max)
+    """
+    centers = (np.arange(HISTOGRAM_BINS) + 0.5) / HISTOGRAM_BINS
+    stats = []
+    for label in labels:
+        low, high = summary.class_min[label], summary.class_max[label]
+        coords = np.linspace(low, high, points)
+        if summary.sample_size:
+            values = summary.class_sample(label).astype(np.float64)
+            weights = np.ones(len(values))
+            spread = values.std(ddof=1) if len(values) > 1 else 0.0
+        else:
+            histogram = summary.class_histograms[label]
+            occupied = np.flatnonzero(histogram)
+            values, weights = centers[occupied], histogram[occupied].astype(np.float64)
+            spread = summary.class_std(label)
+        n = weights.sum()
+        bandwidth = spread * n ** (-1 / 5) if n > 1 else 0.0
+        if bandwidth > 0:
+            offsets = (coords[:, None] - values[None, :]) / bandwidth
+            kernel = np.exp(-0.5 * offsets ** 2) / (bandwidth * np.sqrt(2 * np.pi))
+            vals = kernel @ (weights / n)
+        else:
+            vals = np.ones(points)
+        stats.append({'coords': coords, 'vals': vals, 'mean': summary.class_mean(label),
+                      'median': summary.class_quantile(label, 0.5), 'min': low, 'max': high})
+    return stats
+
+
 def main():
     """
     Funzione principale
     """
     # Inizializza visualizer
-    visualizer = SentimentVisualizer('results/sentiment_results.csv')
+    visualizer = SentimentVisualizer()
     
     # Genera tutte le visualizzazioni
     visualizer.generate_all_visualizations()